@@ -0,0 +1,473 @@
+"""
+deepbookpy benchmark suite
+
+Measures transaction building throughput, BCS decode rates, level 2 formatting cost and end-to-end read latency
+against a local ``FullnodeStub``. Results are written as JSON so that runs can be compared and regressions flagged.
+
+Benchmarks that need a fullnode (transaction building and reads) replay fixtures through the stub. Without recorded
+fixtures, or with ``--synthetic``, the fixtures are generated by ``benchmarks/synthetic.py`` into a temporary directory,
+so every machine replays the same responses. The fixture source is stored in the results ``meta``.
+
+    # optionally record fixtures from a fullnode
+    python3 benchmarks/run.py --record-from https://fullnode.mainnet.sui.io:443/
+    # run and store results
+    python3 benchmarks/run.py --output benchmarks/results/baseline.json
+    # compare a later run against the baseline
+    python3 benchmarks/run.py --compare benchmarks/results/baseline.json --threshold 0.1
+"""
+
+import argparse
+import json
+import os
+import pathlib
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+PROJECT_DIR = pathlib.Path(os.path.dirname(__file__))
+PARENT = PROJECT_DIR.parent
+sys.path.insert(0, str(PARENT))
+
+from pysui import SyncClient, SuiConfig
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.bcs import Address
+from pysui.version import __version__ as pysui_version
+
+from deepbookpy.version import __version__
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.custom_types import PlaceLimitOrderParams
+from deepbookpy.custom_types.serialization_types import (
+    Order,
+    Account,
+    RangeInput,
+    OrderDeepPrice,
+    VecSet,
+    OptionID,
+    Balances,
+)
+from deepbookpy.transactions.templates import LimitOrderTemplate, ModifyOrderTemplate
+from deepbookpy.utils.constants import CLOCK
+from deepbookpy.utils.fullnode_stub import FullnodeStub
+from benchmarks.synthetic import write_fixtures
+
+
+FIXTURES_DIR = os.path.join(PROJECT_DIR, "fixtures")
+RESULTS_DIR = os.path.join(PROJECT_DIR, "results")
+
+ENV = "mainnet"
+POOL_KEY = "SUI_USDC"
+MANAGER_KEY = "MANAGER_1"
+BALANCE_MANAGERS = {
+    MANAGER_KEY: {
+        "address": "0x344c2734b1d211bd15212bfb7847c66a3b18803f3f5ab00f5ff6f87b6fe6d27d",
+        "trade_cap": "",
+    }
+}
+# Throwaway key, only used to derive a sender address for the stub
+PRIVATE_KEY = "AIUPxQveY18QggDDdTO0D0OD6PNVvtet50072d1grIyl"
+ORDER_ID = 170141183460487678475761013267500113861
+LEVEL2_DEPTH = 100
+
+BENCHMARKS = {}
+
+
+class SkipBenchmark(Exception):
+    pass
+
+
+def benchmark(name: str, unit: str = "ops"):
+    """
+    Register a benchmark
+
+    A benchmark function receives the run context and returns a callable to time.
+
+    :param name: benchmark name used in the results file
+    :param unit: what a single call of the timed callable counts as
+    """
+
+    def register(func):
+        BENCHMARKS[name] = (func, unit)
+        return func
+
+    return register
+
+
+def timed(func, min_time: float, repeat: int) -> dict:
+    """
+    Time a callable
+
+    :param func: callable to time
+    :param min_time: minimum seconds per repetition
+    :param repeat: number of repetitions
+    :returns: dictionary with ops per second and latency percentiles in microseconds
+    """
+    func()
+
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        while True:
+            call_started = time.perf_counter()
+            func()
+            samples.append(time.perf_counter() - call_started)
+            if time.perf_counter() - started >= min_time:
+                break
+
+    samples.sort()
+    total = sum(samples)
+    return dict(
+        calls=len(samples),
+        ops_per_sec=len(samples) / total,
+        mean_us=total / len(samples) * 1e6,
+        p50_us=samples[len(samples) // 2] * 1e6,
+        p99_us=samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6,
+        stdev_us=statistics.pstdev(samples) * 1e6,
+    )
+
+
+# Synthetic payloads
+
+
+def order_bytes() -> bytes:
+    return Order(
+        balance_manager_id=Address.from_str(BALANCE_MANAGERS[MANAGER_KEY]["address"]),
+        order_id=ORDER_ID,
+        client_order_id=1234,
+        quantity=10_000_000_000,
+        filled_quantity=2_500_000_000,
+        fee_is_deep=True,
+        order_deep_price=OrderDeepPrice(asset_is_base=False, deep_per_asset=21_000_000),
+        epoch=650,
+        status=0,
+        expire_timestamp=1844674407370955161,
+    ).serialize()
+
+
+def account_bytes() -> bytes:
+    return Account(
+        epoch=650,
+        open_orders=VecSet(constants=[ORDER_ID + i for i in range(20)]),
+        taker_volume=1_000_000_000_000,
+        maker_volume=2_000_000_000_000,
+        active_stake=100_000_000,
+        inactive_stake=0,
+        created_proposal=False,
+        voted_proposal=OptionID(None),
+        unclaimed_rebates=Balances(base=1, quote=2, deep=3),
+        settled_balances=Balances(base=4, quote=5, deep=6),
+        owed_balances=Balances(base=7, quote=8, deep=9),
+    ).serialize()
+
+
+def range_bytes() -> bytes:
+    return RangeInput(range=[3_500_000 + i * 1_000 for i in range(LEVEL2_DEPTH)]).serialize()
+
+
+# Offline benchmarks
+
+
+@benchmark("decode_order", unit="orders")
+def bench_decode_order(context):
+    data = order_bytes()
+    return lambda: Order.deserialize(data)
+
+
+@benchmark("decode_account", unit="accounts")
+def bench_decode_account(context):
+    data = account_bytes()
+    return lambda: Account.deserialize(data)
+
+
+@benchmark("decode_range_input", unit="ranges")
+def bench_decode_range_input(context):
+    data = range_bytes()
+    return lambda: RangeInput.deserialize(data)
+
+
+@benchmark("format_level2", unit="books")
+def bench_format_level2(context):
+    deepbook_client = DeepBookClient(None, "0x0", ENV)
+    config = deepbook_client._config
+    pool = config.get_pool(POOL_KEY)
+    base_coin = config.get_coin(pool["base_coin"])
+    quote_coin = config.get_coin(pool["quote_coin"])
+
+    prices = RangeInput.deserialize(range_bytes()).range
+    quantities = [1_000_000_000 + i for i in range(LEVEL2_DEPTH)]
+
+    def format_book():
+        bids = deepbook_client.format_levels(prices, quantities, base_coin, quote_coin)
+        asks = deepbook_client.format_levels(prices, quantities, base_coin, quote_coin)
+        return json.dumps(
+            dict(
+                bid_prices=bids[0],
+                bid_quantities=bids[1],
+                ask_prices=asks[0],
+                ask_quantities=asks[1],
+            ),
+            indent=4,
+        )
+
+    return format_book
+
+
+# Benchmarks replaying recorded fullnode responses
+
+
+def stub_client(context) -> SyncClient:
+    if context["client"] is None:
+        if context["stub"] is None:
+            raise SkipBenchmark("no fullnode stub")
+        cfg = SuiConfig.user_config(rpc_url=context["stub"].url, prv_keys=[PRIVATE_KEY])
+        try:
+            context["client"] = SyncClient(cfg)
+        except Exception as e:
+            raise SkipBenchmark(f"unable to init client from fixtures: {e}")
+    return context["client"]
+
+
+def stub_deepbook_client(context, warm: bool = False) -> DeepBookClient:
+    """
+    DeepBookClient of the stub
+
+    :param context: run context
+    :param warm: cache the benchmarked shared objects first, so builds time PTB construction rather than their fetch
+    """
+    client = stub_client(context)
+    deepbook_client = DeepBookClient(
+        client, client.config.active_address.address, ENV, BALANCE_MANAGERS
+    )
+    if warm:
+        pool = deepbook_client.config.get_pool(POOL_KEY)
+        try:
+            deepbook_client.preload_objects(
+                [pool["address"], BALANCE_MANAGERS[MANAGER_KEY]["address"], CLOCK]
+            )
+        except Exception as e:
+            raise SkipBenchmark(f"missing fixtures: {e}")
+    return deepbook_client
+
+
+def build_or_skip(build):
+    try:
+        build()
+    except Exception as e:
+        raise SkipBenchmark(f"missing fixtures: {e}")
+    return build
+
+
+@benchmark("build_place_limit_order", unit="orders")
+def bench_build_place_limit_order(context):
+    deepbook_client = stub_deepbook_client(context, warm=True)
+    params = PlaceLimitOrderParams(
+        pool_key=POOL_KEY,
+        balance_manager_key=MANAGER_KEY,
+        client_order_id="1",
+        price=3.5,
+        quantity=10,
+        is_bid=True,
+    )
+
+    def build():
+        tx = SyncTransaction(client=deepbook_client.client)
+        deepbook_client.deepbook.place_limit_order(params, tx)
+        return tx.build_for_inspection()
+
+    return build_or_skip(build)
+
+
+@benchmark("build_cancel_order", unit="orders")
+def bench_build_cancel_order(context):
+    deepbook_client = stub_deepbook_client(context, warm=True)
+
+    def build():
+        tx = SyncTransaction(client=deepbook_client.client)
+        deepbook_client.deepbook.cancel_order(POOL_KEY, MANAGER_KEY, str(ORDER_ID), tx)
+        return tx.build_for_inspection()
+
+    return build_or_skip(build)
+
+
+@benchmark("build_modify_order", unit="orders")
+def bench_build_modify_order(context):
+    deepbook_client = stub_deepbook_client(context, warm=True)
+
+    def build():
+        tx = SyncTransaction(client=deepbook_client.client)
+        deepbook_client.deepbook.modify_order(POOL_KEY, MANAGER_KEY, str(ORDER_ID), 5, tx)
+        return tx.build_for_inspection()
+
+    return build_or_skip(build)
+
+
+@benchmark("template_place_limit_order", unit="orders")
+def bench_template_place_limit_order(context):
+    deepbook_client = stub_deepbook_client(context)
+    params = PlaceLimitOrderParams(
+        pool_key=POOL_KEY,
+        balance_manager_key=MANAGER_KEY,
+        client_order_id="1",
+        price=3.5,
+        quantity=10,
+        is_bid=True,
+    )
+    try:
+        template = LimitOrderTemplate(deepbook_client, [params])
+    except Exception as e:
+        raise SkipBenchmark(f"missing fixtures: {e}")
+    state = {"client_order_id": 1}
+
+    def requote():
+        state["client_order_id"] += 1
+        template.quote(0, price=3.5, quantity=10, client_order_id=state["client_order_id"])
+        return template.build_for_inspection()
+
+    return requote
+
+
+@benchmark("template_modify_order", unit="orders")
+def bench_template_modify_order(context):
+    deepbook_client = stub_deepbook_client(context)
+    try:
+        template = ModifyOrderTemplate(deepbook_client, POOL_KEY, MANAGER_KEY, [(str(ORDER_ID), 5)])
+    except Exception as e:
+        raise SkipBenchmark(f"missing fixtures: {e}")
+
+    def requote():
+        template.modify(0, order_id=ORDER_ID, quantity=5)
+        return template.build_for_inspection()
+
+    return requote
+
+
+@benchmark("read_mid_price", unit="reads")
+def bench_read_mid_price(context):
+    deepbook_client = stub_deepbook_client(context)
+    return build_or_skip(lambda: deepbook_client.mid_price(POOL_KEY))
+
+
+@benchmark("read_level2_ticks_from_mid", unit="reads")
+def bench_read_level2_ticks_from_mid(context):
+    deepbook_client = stub_deepbook_client(context)
+    return build_or_skip(
+        lambda: deepbook_client.get_level2_ticks_from_mid(POOL_KEY, LEVEL2_DEPTH)
+    )
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Flag benchmarks whose throughput dropped by more than threshold
+
+    :param results: results of the current run
+    :param baseline: results of a previous run
+    :param threshold: allowed relative slowdown, e.g. 0.1 for 10%
+    :returns: list of regression descriptions
+    """
+    regressions = []
+    for name, result in results["benchmarks"].items():
+        previous = baseline["benchmarks"].get(name)
+        if not previous or "ops_per_sec" not in previous or "ops_per_sec" not in result:
+            continue
+        change = result["ops_per_sec"] / previous["ops_per_sec"] - 1
+        result["change"] = change
+        if change < -threshold:
+            regressions.append(
+                f"{name}: {previous['ops_per_sec']:.1f} -> {result['ops_per_sec']:.1f} {result['unit']}/sec ({change:+.1%})"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="deepbookpy benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run, defaults to all")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fullnode fixtures directory")
+    parser.add_argument("--record-from", default=None, help="fullnode RPC URL to record fixtures from")
+    parser.add_argument(
+        "--synthetic", action="store_true", help="replay generated fixtures even when recorded ones exist"
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="artificial stub latency in seconds")
+    parser.add_argument("--min-time", type=float, default=0.5, help="minimum seconds per repetition")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default=None, help="results file, defaults to results/<timestamp>.json")
+    parser.add_argument("--compare", default=None, help="baseline results file")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    names = args.names or list(BENCHMARKS)
+    unknown = set(names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    if args.synthetic and args.record_from:
+        parser.error("--synthetic and --record-from are exclusive")
+
+    fixtures_dir, synthetic_dir = args.fixtures, None
+    if args.record_from:
+        fixtures_source = "recording"
+    elif os.path.isdir(args.fixtures) and not args.synthetic:
+        fixtures_source = "recorded"
+    else:
+        fixtures_source = "synthetic"
+        synthetic_dir = tempfile.TemporaryDirectory(prefix="deepbookpy-fixtures-")
+        fixtures_dir = os.path.join(synthetic_dir.name, "fixtures")
+        write_fixtures(
+            fixtures_dir, ENV, POOL_KEY, BALANCE_MANAGERS[MANAGER_KEY]["address"], LEVEL2_DEPTH
+        )
+    stub = FullnodeStub(fixtures_dir, record_from=args.record_from, latency=args.latency).start()
+    context = dict(stub=stub, client=None)
+
+    started_at = datetime.now(timezone.utc)
+    results = dict(
+        meta=dict(
+            timestamp=started_at.isoformat(),
+            deepbookpy=__version__,
+            pysui=pysui_version,
+            python=platform.python_version(),
+            platform=platform.platform(),
+            stub_latency=args.latency,
+            fixtures=fixtures_source,
+        ),
+        benchmarks={},
+    )
+
+    try:
+        for name in names:
+            func, unit = BENCHMARKS[name]
+            try:
+                result = timed(func(context), args.min_time, args.repeat)
+                result["unit"] = unit
+                print(f"{name:32} {result['ops_per_sec']:14.1f} {unit}/sec  p50 {result['p50_us']:10.1f}us  p99 {result['p99_us']:10.1f}us")
+            except SkipBenchmark as e:
+                result = dict(unit=unit, skipped=str(e))
+                print(f"{name:32} skipped ({e})")
+            results["benchmarks"][name] = result
+    finally:
+        stub.stop()
+        if synthetic_dir is not None:
+            synthetic_dir.cleanup()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, started_at.strftime("%Y%m%dT%H%M%SZ") + ".json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as output_file:
+        json.dump(results, output_file, indent=4)
+    print(f"Results written to {output}")
+
+    if regressions:
+        print("Regressions:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
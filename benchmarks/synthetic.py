@@ -0,0 +1,327 @@
+"""
+Synthetic fullnode fixtures for the benchmark suite.
+
+``write_fixtures`` writes, in the ``FixtureStore`` layout, every response the stub-backed benchmarks ask for: the
+RPC method descriptors, gas price and protocol config read by ``SyncClient``, the normalized signatures of the
+DeepBook functions called, the shared objects they take and the devInspect results of the read benchmarks. The
+responses are generated from constants, so every machine replays the same bytes and runs are comparable without
+recording from a fullnode first.
+"""
+
+import hashlib
+import itertools
+import os
+import shutil
+
+from deepbookpy.utils.config import DeepBookConfig
+from deepbookpy.utils.fullnode_stub import DEV_INSPECT_METHOD, FixtureStore, fixture_key
+from deepbookpy.utils.normalizer import normalize_coin_type, normalize_sui_object_id
+
+
+# Version reported by rpc.discover, the one the installed pysui is built for
+RPC_VERSION = "1.47.0"
+REFERENCE_GAS_PRICE = "750"
+PROTOCOL_VERSION = "78"
+EPOCH = "650"
+CLOCK = normalize_sui_object_id("0x6")
+
+# Parameters of the RPC methods used by the benchmarks: name and whether the value is an array
+RPC_METHODS = {
+    "rpc.discover": [],
+    "suix_getReferenceGasPrice": [],
+    "sui_getProtocolConfig": [("version", False)],
+    "sui_getObject": [("object_id", False), ("options", False)],
+    "sui_multiGetObjects": [("object_ids", True), ("options", False)],
+    "sui_getNormalizedMoveFunction": [("package", False), ("module_name", False), ("function_name", False)],
+    "sui_devInspectTransactionBlock": [
+        ("sender_address", False),
+        ("tx_bytes", False),
+        ("gas_price", False),
+        ("epoch", False),
+        ("additional_args", False),
+    ],
+}
+
+PROTOCOL_ATTRIBUTES = {
+    "max_arguments": {"u32": "512"},
+    "max_input_objects": {"u64": "2048"},
+    "max_num_transferred_move_object_ids": {"u64": "2048"},
+    "max_programmable_tx_commands": {"u32": "1024"},
+    "max_pure_argument_size": {"u32": "16384"},
+    "max_tx_size_bytes": {"u64": "131072"},
+    "max_type_argument_depth": {"u32": "16"},
+    "max_type_arguments": {"u32": "16"},
+    "max_tx_gas": {"u64": "50000000000"},
+}
+
+# Synthetic book: mid price and levels around it, in on-chain integers
+MID_PRICE = 3_500_000
+TICK = 1_000
+LEVEL_QUANTITY = 1_000_000_000
+
+
+def _type_parameter(index: int) -> dict:
+    return {"TypeParameter": index}
+
+
+def _struct(address: str, module: str, name: str, type_arguments=()) -> dict:
+    return {"Struct": {"address": address, "module": module, "name": name, "typeArguments": list(type_arguments)}}
+
+
+def _digest(seed: str) -> str:
+    """Base58 object digest derived from a seed"""
+    alphabet = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+    value = int.from_bytes(hashlib.sha256(seed.encode()).digest(), "big")
+    digest = ""
+    while value:
+        value, remainder = divmod(value, 58)
+        digest = alphabet[remainder] + digest
+    return digest
+
+
+def _functions(package_id: str) -> dict:
+    """Normalized signatures of the DeepBook functions called by the benchmarks"""
+    pool = _struct(package_id, "pool", "Pool", [_type_parameter(0), _type_parameter(1)])
+    balance_manager = _struct(package_id, "balance_manager", "BalanceManager")
+    trade_proof = _struct(package_id, "balance_manager", "TradeProof")
+    clock = _struct("0x2", "clock", "Clock")
+    tx_context = {"Reference": _struct("0x2", "tx_context", "TxContext")}
+    order_info = _struct(package_id, "order_info", "OrderInfo")
+    u64_vector = {"Vector": "U64"}
+
+    def function(parameters, returns, type_parameters=0):
+        return {
+            "visibility": "Public",
+            "isEntry": False,
+            "typeParameters": [{"abilities": []}] * type_parameters,
+            "parameters": parameters,
+            "return": returns,
+        }
+
+    return {
+        ("balance_manager", "generate_proof_as_owner"): function(
+            [{"MutableReference": balance_manager}, tx_context], [trade_proof]
+        ),
+        ("pool", "place_limit_order"): function(
+            [
+                {"MutableReference": pool},
+                {"MutableReference": balance_manager},
+                {"Reference": trade_proof},
+                "U64",
+                "U8",
+                "U8",
+                "U64",
+                "U64",
+                "Bool",
+                "Bool",
+                "U64",
+                {"Reference": clock},
+                tx_context,
+            ],
+            [order_info],
+            2,
+        ),
+        ("pool", "cancel_order"): function(
+            [
+                {"MutableReference": pool},
+                {"MutableReference": balance_manager},
+                {"Reference": trade_proof},
+                "U128",
+                {"Reference": clock},
+                tx_context,
+            ],
+            [],
+            2,
+        ),
+        ("pool", "modify_order"): function(
+            [
+                {"MutableReference": pool},
+                {"MutableReference": balance_manager},
+                {"Reference": trade_proof},
+                "U128",
+                "U64",
+                {"Reference": clock},
+                tx_context,
+            ],
+            [],
+            2,
+        ),
+        ("pool", "mid_price"): function([{"Reference": pool}, {"Reference": clock}], ["U64"], 2),
+        ("pool", "get_level2_ticks_from_mid"): function(
+            [{"Reference": pool}, "U64", {"Reference": clock}], [u64_vector] * 4, 2
+        ),
+    }
+
+
+def _object(object_id: str, object_type: str, initial_shared_version: int) -> dict:
+    return {
+        "data": {
+            "objectId": object_id,
+            "version": str(initial_shared_version + 1000),
+            "digest": _digest(object_id),
+            "type": object_type,
+            "owner": {"Shared": {"initial_shared_version": initial_shared_version}},
+            "previousTransaction": _digest(object_id + "previous"),
+            "storageRebate": "0",
+        }
+    }
+
+
+def _effects(seed: str) -> dict:
+    return {
+        "messageVersion": "v1",
+        "status": {"status": "success"},
+        "executedEpoch": EPOCH,
+        "gasUsed": {
+            "computationCost": "750000",
+            "storageCost": "0",
+            "storageRebate": "0",
+            "nonRefundableStorageFee": "0",
+        },
+        "transactionDigest": _digest(seed),
+        "gasObject": {
+            "owner": {"AddressOwner": normalize_sui_object_id("0x0")},
+            "reference": {"objectId": normalize_sui_object_id("0x0"), "version": 0, "digest": _digest("gas")},
+        },
+        "dependencies": [],
+    }
+
+
+def _u64(value: int) -> list:
+    return list(value.to_bytes(8, "little"))
+
+
+def _u64_vector(values: list) -> list:
+    # ULEB128 length prefix
+    length, prefix = len(values), []
+    while True:
+        byte = length & 0x7F
+        length >>= 7
+        prefix.append(byte | (0x80 if length else 0))
+        if not length:
+            break
+    return prefix + [byte for value in values for byte in _u64(value)]
+
+
+def _inspection(seed: str, return_values: list) -> dict:
+    return {
+        "effects": _effects(seed),
+        "events": [],
+        "results": [{"returnValues": values} for values in return_values],
+    }
+
+
+def _call_key(target: str, type_arguments: list, arguments: list) -> str:
+    """devInspect fixture key of a single Move call, as ``fixture_key`` builds it from the transaction bytes"""
+    return f"{DEV_INSPECT_METHOD}|{target}<{','.join(type_arguments)}>({','.join(arguments)})"
+
+
+def rpc_discover() -> dict:
+    """Minimal OpenRPC document describing ``RPC_METHODS``"""
+    methods = []
+    for name, parameters in RPC_METHODS.items():
+        methods.append(
+            {
+                "name": name,
+                "params": [
+                    {
+                        "name": parameter,
+                        "schema": {"type": "array", "items": {}} if is_array else {},
+                        "required": False,
+                    }
+                    for parameter, is_array in parameters
+                ],
+                "result": {"name": "result", "schema": {}},
+            }
+        )
+    return {
+        "openrpc": "1.2.6",
+        "info": {"title": "Synthetic Sui JSON-RPC", "version": RPC_VERSION},
+        "methods": methods,
+        "components": {"schemas": {}},
+    }
+
+
+def protocol_config() -> dict:
+    return {
+        "minSupportedProtocolVersion": "1",
+        "maxSupportedProtocolVersion": PROTOCOL_VERSION,
+        "protocolVersion": PROTOCOL_VERSION,
+        "featureFlags": {},
+        "attributes": PROTOCOL_ATTRIBUTES,
+    }
+
+
+def write_fixtures(fixtures_dir: str, env: str, pool_key: str, balance_manager_id: str, ticks: int) -> int:
+    """
+    Write the synthetic fixtures of the benchmark suite, replacing the directory's content
+
+    :param fixtures_dir: directory the fixture files are written to
+    :param env: environment of the configured package and pools
+    :param pool_key: key of the benchmarked pool
+    :param balance_manager_id: address of the benchmarked balance manager
+    :param ticks: number of ticks from mid of the level 2 read
+    :returns: number of fixtures written
+    """
+    if os.path.isdir(fixtures_dir):
+        shutil.rmtree(fixtures_dir)
+    store = FixtureStore(fixtures_dir)
+    config = DeepBookConfig(env=env, address="0x0")
+    package_id = config.DEEPBOOK_PACKAGE_ID
+    pool = config.get_pool(pool_key)
+
+    def put(method: str, params: list, result):
+        store.put(fixture_key(method, params), method, params, {"result": result})
+
+    put("rpc.discover", [], rpc_discover())
+    put("suix_getReferenceGasPrice", [], REFERENCE_GAS_PRICE)
+    put("sui_getProtocolConfig", [], protocol_config())
+
+    for (module, function), signature in _functions(package_id).items():
+        put("sui_getNormalizedMoveFunction", [package_id, module, function], signature)
+
+    pool_type = (
+        f"{package_id}::pool::Pool<{config.get_coin(pool['base_coin'])['type']},"
+        f"{config.get_coin(pool['quote_coin'])['type']}>"
+    )
+    objects = {
+        normalize_sui_object_id(pool["address"]): _object(pool["address"], pool_type, 389_750_322),
+        normalize_sui_object_id(balance_manager_id): _object(
+            balance_manager_id, f"{package_id}::balance_manager::BalanceManager", 412_015_117
+        ),
+        CLOCK: _object(CLOCK, "0x2::clock::Clock", 1),
+    }
+    for object_id, response in objects.items():
+        put("sui_getObject", [object_id, {}], response)
+    # Builders fetch the objects of a call they have not resolved yet in one request, in call argument order
+    for count in range(1, len(objects) + 1):
+        for object_ids in itertools.permutations(objects, count):
+            put("sui_multiGetObjects", [list(object_ids), {}], [objects[object_id] for object_id in object_ids])
+
+    # Read benchmarks: one devInspect per read, keyed by the Move call since the transaction bytes are not stable
+    type_arguments = [
+        normalize_coin_type(config.get_coin(pool["base_coin"])["type"]),
+        normalize_coin_type(config.get_coin(pool["quote_coin"])["type"]),
+    ]
+    pool_argument = f"object:{normalize_sui_object_id(pool['address'])}"
+    clock_argument = f"object:{CLOCK}"
+    mid_price_key = _call_key(f"{package_id}::pool::mid_price", type_arguments, [pool_argument, clock_argument])
+    store.put(
+        mid_price_key,
+        DEV_INSPECT_METHOD,
+        [],
+        {"result": _inspection(mid_price_key, [[[_u64(MID_PRICE), "u64"]]])},
+    )
+
+    bid_prices = [MID_PRICE - TICK * (level + 1) for level in range(ticks)]
+    ask_prices = [MID_PRICE + TICK * (level + 1) for level in range(ticks)]
+    quantities = [LEVEL_QUANTITY] * ticks
+    level2_key = _call_key(
+        f"{package_id}::pool::get_level2_ticks_from_mid",
+        type_arguments,
+        [pool_argument, "pure:" + bytes(_u64(ticks)).hex(), clock_argument],
+    )
+    level2 = [[[_u64_vector(values), "vector<u64>"] for values in (bid_prices, quantities, ask_prices, quantities)]]
+    store.put(level2_key, DEV_INSPECT_METHOD, [], {"result": _inspection(level2_key, level2)})
+
+    return len(store)
@@ -32,6 +32,10 @@ class Order(Struct):
     ]
 
 
+class Orders(Struct):
+    _fields = [("orders", ArrayT(Order))]
+
+
 class Balances(Struct):
     _fields = [("base", Uint64), ("quote", Uint64), ("deep", Uint64)]
 
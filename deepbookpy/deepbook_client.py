@@ -1,15 +1,21 @@
 """DeepBook Python SDK"""
 import json
+import re
 import warnings
-from typing import List
+from typing import Callable, Dict, List, Optional, Tuple
 
 from canoser import BoolT, Uint64
-from pysui import SyncClient
+from pysui import SyncClient, SuiRpcResult
 from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.address import SuiAddress
 
 from deepbookpy.utils.normalizer import normalize_sui_address
-from deepbookpy.utils.coin import format_value
+from deepbookpy.utils.coin import SUI_COIN_TYPE, format_value
+from deepbookpy.utils.gas_model import GasModel, transaction_shape
 from deepbookpy.utils.config import DeepBookConfig, DEEP_SCALAR, FLOAT_SCALAR
+from deepbookpy.utils.metrics import Metrics, NOOP_TIMER
+from deepbookpy.utils.object_cache import ObjectReferenceCache
+from deepbookpy.utils.tracing import Tracer, traced_execute
 from deepbookpy.transactions.balance_manager import BalanceManagerContract
 from deepbookpy.transactions.deepbook_admin import DeepBookAdminContract
 from deepbookpy.transactions.deepbook import DeepBookContract
@@ -18,6 +24,7 @@ from deepbookpy.transactions.governance import GovernanceContract
 from deepbookpy.custom_types.serialization_types import (
     VecSet,
     Order,
+    Orders,
     Account,
     RangeInput,
     OrderDeepPrice,
@@ -39,6 +46,11 @@ class DeepBookClient:
         coins=None,
         pools=None,
         admin_cap=None,
+        metrics: Metrics = None,
+        tracer: Tracer = None,
+        object_cache: ObjectReferenceCache = None,
+        gas_model: GasModel = None,
+        registry_cache: str = None,
     ):
         """
         Initializes the DeepBookClient class.
@@ -50,8 +62,17 @@ class DeepBookClient:
         :param coins: Optional initial coin map
         :param pools: Optional initial pool map
         :param admin_cap: Optional admin capability
+        :param metrics: Optional Metrics instance, instrumentation is off when not set
+        :param tracer: Optional Tracer instance recording order flow spans, tracing is off when not set
+        :param object_cache: Optional ObjectReferenceCache, preloaded with the configured shared objects so builds
+            resolve them without fetching
+        :param gas_model: Optional GasModel budgeting executed transactions from the gas used by earlier ones of the
+            same shape, and fed by their effects
+        :param registry_cache: Optional registry cache file written by ``RegistryDiscovery``, its pools and coins are
+            added to the configured ones at startup
         """
         self.client = client
+        self.metrics = metrics
         self._address = normalize_sui_address(address)
         self._config = DeepBookConfig(
             address=self._address,
@@ -60,6 +81,10 @@ class DeepBookClient:
             coins=coins,
             pools=pools,
             admin_cap=admin_cap,
+            tracer=tracer,
+            objects=object_cache,
+            gas_model=gas_model,
+            registry_cache=registry_cache,
         )
         self.balance_manager = BalanceManagerContract(self._config)
         self.deepbook = DeepBookContract(self._config)
@@ -67,6 +92,202 @@ class DeepBookClient:
         self.flash_loans = FlashLoanContract(self._config)
         self.governance = GovernanceContract(self._config)
 
+        if metrics is not None and self._config.objects.metrics is None:
+            self._config.objects.metrics = metrics
+        if object_cache is not None:
+            self.preload_objects()
+
+    @property
+    def config(self) -> DeepBookConfig:
+        """DeepBookConfig shared by the client and its contracts"""
+        return self._config
+
+    def preload_objects(self, object_ids: List[str] = None) -> int:
+        """
+        Cache the shared object references of the configured pools and balance managers, the registry, the treasury
+        and the clock, or of the given objects, in one call
+
+        :param object_ids: optional object IDs, defaults to every configured shared object
+        :returns: number of objects added to the cache
+        """
+        if object_ids is None:
+            object_ids = self._config.shared_object_ids()
+        return self._config.objects.preload(self.client, object_ids)
+
+    def execute_transaction(
+        self,
+        tx: SyncTransaction,
+        gas_budget: str = "",
+        use_gas_object: str = None,
+        options: dict = None,
+        **attributes,
+    ) -> SuiRpcResult:
+        """
+        Execute a transaction, recording finalize, sign, submit and effects spans when tracing is on
+
+        :param tx: SyncTransaction object
+        :param gas_budget: gas budget, taken from the gas model for known transaction shapes when empty, a dry-run
+            sets it otherwise
+        :param use_gas_object: optional gas coin object ID
+        :param options: optional sui_executeTransactionBlock options
+        :param attributes: span attributes, e.g. ``client_order_id`` and ``pool_key``
+        :returns: SuiRpcResult object
+        """
+        gas_model = self._config.gas_model
+        if gas_model is not None:
+            shape = transaction_shape(tx)
+            if not gas_budget and shape in gas_model:
+                gas_budget = str(gas_model.budget(shape))
+
+        result = traced_execute(
+            tx,
+            self._config.tracer,
+            gas_budget=gas_budget,
+            use_gas_object=use_gas_object,
+            options=options,
+            **attributes,
+        )
+        if gas_model is not None and result.is_ok() and result.result_data.effects.status.succeeded:
+            gas_model.record(shape, result.result_data.effects)
+        return result
+
+    def manager_transfer_transactions(
+        self,
+        deposits: Dict[Tuple[str, str], float] = None,
+        withdrawals: Dict[Tuple[str, str], Optional[float]] = None,
+        recipient: str = None,
+        max_operations: int = 256,
+    ) -> List[SyncTransaction]:
+        """
+        Build the deposits into and withdrawals from several balance managers in as few transactions as
+        possible, with one listing of the owned coins
+
+        The deposits of one coin type stay in one transaction, merging and splitting its coins once, so the
+        transactions use distinct coins and can be executed in any order.
+
+        :param deposits: dictionary of (manager key, coin key) to the amount to deposit
+        :param withdrawals: dictionary of (manager key, coin key) to the amount to withdraw, None withdraws all
+        :param recipient: recipient of the withdrawn funds, defaults to the client address
+        :param max_operations: deposits and withdrawals per transaction, a coin type with more deposits gets
+            a transaction of its own
+        :returns: list of SyncTransaction objects
+        """
+        deposits = deposits or {}
+        withdrawals = withdrawals or {}
+        recipient = recipient or self._address
+
+        owned_objects = None
+        if any(self._config.get_coin(coin_key)["type"] != SUI_COIN_TYPE for _, coin_key in deposits):
+            owned_objects = self.client.get_objects(address=SuiAddress(self._address), fetch_all=True)
+
+        groups: Dict[str, dict] = {}
+        for (manager_key, coin_key), amount in deposits.items():
+            groups.setdefault(coin_key, {})[(manager_key, coin_key)] = amount
+
+        batches = []
+        for group in sorted(groups.values(), key=len, reverse=True):
+            for batch in batches:
+                if len(batch[0]) + len(group) <= max_operations:
+                    batch[0].update(group)
+                    break
+            else:
+                batches.append(({**group}, {}))
+
+        for key, amount in withdrawals.items():
+            for batch in batches:
+                if len(batch[0]) + len(batch[1]) < max_operations:
+                    break
+            else:
+                batch = ({}, {})
+                batches.append(batch)
+            batch[1][key] = amount
+
+        transactions = []
+        for batch_deposits, batch_withdrawals in batches:
+            tx = SyncTransaction(client=self.client, initial_sender=SuiAddress(self._address))
+            if batch_deposits:
+                self.balance_manager.deposit_many_into_managers(owned_objects, batch_deposits, tx)
+            if batch_withdrawals:
+                self.balance_manager.withdraw_many_from_managers(batch_withdrawals, recipient, tx)
+            transactions.append(tx)
+        return transactions
+
+    def _timer(self, method: str):
+        """
+        Start timing the phases of a read call
+
+        :param method: name of the DeepBookClient method
+        :returns: PhaseTimer object, or a no-op timer when instrumentation is off
+        """
+        if self.metrics is None:
+            return NOOP_TIMER
+        return self.metrics.timer(method)
+
+    def _inspect(self, tx: SyncTransaction, timer) -> list:
+        """
+        Run devInspect for a built transaction
+
+        :param tx: SyncTransaction object
+        :param timer: PhaseTimer of the current call
+        :returns: list of command results
+        """
+        timer.mark("build")
+        result = tx.inspect_all().results
+        timer.mark("inspect")
+        self._count(tx, result, timer)
+
+        return result
+
+    def _count(self, tx: SyncTransaction, result: list, timer):
+        """Count the commands of an inspected transaction and the bytes of its return values"""
+        if self.metrics is not None:
+            timer.count("ptb_commands", len(tx.builder.commands))
+            timer.count(
+                "bytes_decoded",
+                sum(
+                    len(return_value[0])
+                    for command_result in result
+                    for return_value in command_result.get("returnValues", [])
+                ),
+            )
+
+    def _inspect_each(
+        self, keys: list, add_calls: Callable, commands: int, timer, what: str
+    ) -> Tuple[list, list]:
+        """
+        Run devInspect for the calls of several keys, dropping the keys whose calls abort.
+        An aborting key is dropped and the others inspected again, one extra call per aborting key.
+
+        :param keys: keys the calls are added for
+        :param add_calls: function adding the calls of a key to a transaction
+        :param commands: number of commands added per key
+        :param timer: PhaseTimer of the current call
+        :param what: what is inspected, for error messages
+        :returns: keys kept and the list of their command results
+        """
+        pending = list(keys)
+        while pending:
+            tx = SyncTransaction(client=self.client)
+            for key in pending:
+                add_calls(key, tx)
+            timer.mark("build")
+            inspection = tx.inspect_all()
+            timer.mark("inspect")
+
+            if not hasattr(inspection, "effects"):
+                raise ValueError(f"Unable to inspect {what}: {inspection.result_string}")
+            error = inspection.error or inspection.effects.status.error
+            if error:
+                failed = re.search(r"in command (\d+)", error)
+                if failed is None or int(failed[1]) // commands >= len(pending):
+                    raise ValueError(f"Unable to inspect {what}: {error}")
+                pending.pop(int(failed[1]) // commands)
+                continue
+
+            self._count(tx, inspection.results, timer)
+            return pending, inspection.results
+        return [], []
+
     def check_manager_balance(
         self, manager_key: str, coin_key: str
     ) -> str:
@@ -77,15 +298,17 @@ class DeepBookClient:
         :param coin_key: key of the coin
         :returns: JSON string object with coin type and balance.
         """
+        timer = self._timer("check_manager_balance")
         tx = SyncTransaction(client=self.client)
 
         coin = self._config.get_coin(coin_key)
         self.balance_manager.check_manager_balance(manager_key, coin_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         result_bytes = result[0]["returnValues"][0][0]
 
         parsed_balance = Uint64.deserialize(bytes(result_bytes))
+        timer.mark("decode")
         adjusted_balance = parsed_balance / coin["scalar"]
 
         formatted_result = dict(
@@ -93,7 +316,7 @@ class DeepBookClient:
             balance=adjusted_balance
             )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def whitelisted(self, pool_key: str) -> bool:
         """
@@ -102,15 +325,16 @@ class DeepBookClient:
         :param pool_key: key of the pool
         :returns: a boolean that indicates the whitelisted pool status
         """
+        timer = self._timer("whitelisted")
         tx = SyncTransaction(client=self.client)
         self.deepbook.whitelisted(pool_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         result_bytes = result[0]["returnValues"][0][0]
 
         whitelisted = BoolT.deserialize(bytes(result_bytes))
 
-        return whitelisted
+        return timer.mark("decode", whitelisted)
 
     def get_quote_quantity_out(
         self, pool_key: str, base_quantity: int
@@ -122,6 +346,7 @@ class DeepBookClient:
         :param base_quantity: base quantity to convert
         :returns: JSON string object with base quantity, base out, quote out, and deep required
         """
+        timer = self._timer("get_quote_quantity_out")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -130,10 +355,11 @@ class DeepBookClient:
 
         self.deepbook.get_quote_quantity_out(pool_key, base_quantity, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         base_out = Uint64.deserialize(result[0]["returnValues"][0][0])
         quote_out = Uint64.deserialize(result[0]["returnValues"][1][0])
         deep_required = Uint64.deserialize(result[0]["returnValues"][2][0])
+        timer.mark("decode")
 
         formatted_result = dict(
             base_quantity=base_quantity,
@@ -142,7 +368,7 @@ class DeepBookClient:
             deep_required=format_value(deep_required / DEEP_SCALAR),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
     
     def get_base_quantity_out(
         self, pool_key: str, quote_quantity: int
@@ -154,6 +380,7 @@ class DeepBookClient:
         :param quote_quantity: quote quantity to convert
         :returns: JSON string object with quote quantity, base out, quote out, and deep required
         """
+        timer = self._timer("get_base_quantity_out")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -162,10 +389,11 @@ class DeepBookClient:
 
         self.deepbook.get_base_quantity_out(pool_key, quote_quantity, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         base_out = Uint64.deserialize(result[0]["returnValues"][0][0])
         quote_out = Uint64.deserialize(result[0]["returnValues"][1][0])
         deep_required = Uint64.deserialize(result[0]["returnValues"][2][0])
+        timer.mark("decode")
 
         formatted_result = dict(
             quote_quantity=quote_quantity,
@@ -174,7 +402,7 @@ class DeepBookClient:
             deep_required=format_value(deep_required / DEEP_SCALAR),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def get_quantity_out(
         self, pool_key: str, base_quantity: int, quote_quantity: int
@@ -187,6 +415,7 @@ class DeepBookClient:
         :param quote_quantity: quote quantity to convert
         :returns: JSON string object with base quantity, quote quantity, base out, quote out, and deep required
         """
+        timer = self._timer("get_quantity_out")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -195,10 +424,11 @@ class DeepBookClient:
 
         self.deepbook.get_quantity_out(pool_key, base_quantity, quote_quantity, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         base_out = Uint64.deserialize(result[0]["returnValues"][0][0])
         quote_out = Uint64.deserialize(result[0]["returnValues"][1][0])
         deep_required = Uint64.deserialize(result[0]["returnValues"][2][0])
+        timer.mark("decode")
 
         formatted_result = dict(
             base_quantity=base_quantity,
@@ -208,7 +438,7 @@ class DeepBookClient:
             deep_required=format_value(deep_required / DEEP_SCALAR),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def account_open_orders(self, pool_key: str, manager_key: str) -> List[int]:
         """
@@ -218,16 +448,17 @@ class DeepBookClient:
         :param manager_key: key of BalanceManager
         :returns: an array with open orders
         """
+        timer = self._timer("account_open_orders")
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.account_open_orders(pool_key, manager_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
         order_ids = result[0]["returnValues"][0][0]
 
         deserialized_data = VecSet.deserialize(bytes(order_ids))
 
-        return deserialized_data.__dict__["constants"]
+        return timer.mark("decode", deserialized_data.__dict__["constants"])
 
     def get_order(self, pool_key: str, order_id: str) -> str:
         """
@@ -237,18 +468,20 @@ class DeepBookClient:
         :param order_id: Order ID
         :returns: JSON string object containing the order information
         """
+        timer = self._timer("get_order")
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.get_order(pool_key, order_id, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         try:
             parsed_bytes = result[0]["returnValues"][0][0]
             order_info = Order.deserialize(bytes(parsed_bytes)).__dict__
+            timer.mark("decode")
             order_info["balance_manager_id"] = order_info["balance_manager_id"].to_sui_address().__dict__["address"]
             order_info["order_deep_price"] = order_info["order_deep_price"].__dict__
-            return json.dumps(order_info, indent=4)
+            return timer.mark("format", json.dumps(order_info, indent=4))
         except:
             return None
 
@@ -260,41 +493,19 @@ class DeepBookClient:
         :param order_ids: list of order IDs to retrieve information for
         :returns: a list with order information.
         """
+        timer = self._timer("get_orders")
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.get_orders(pool_key, order_ids, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         parsed_bytes = result[0]["returnValues"][0][0]
 
-        # Each order is 99 bytes
-        bytes_per_order = 99
-
-        # Process each order
-        orders = []
-
-        # Process the first order
-        if len(order_ids) >= 1:
-            orders.append(Order.deserialize(parsed_bytes[:bytes_per_order]))
+        # vector<Order>, the length prefix precedes the 99 byte orders
+        orders = Orders.deserialize(bytes(parsed_bytes)).orders
 
-        # Process additional orders
-        initial_pos = bytes_per_order
-        for i in range(1, len(order_ids)):
-            next_pos = initial_pos + bytes_per_order
-
-            # Ensure we don't go out of bounds
-            if next_pos <= len(parsed_bytes):
-                order_bytes = parsed_bytes[initial_pos:next_pos]
-                order_info = Order.deserialize(order_bytes)
-                orders.append(order_info)
-            else:
-                print(f"Warning: Not enough bytes for order {i+1}")
-
-            # Update initial_pos for the next iteration
-            initial_pos = next_pos
-
-        return orders
+        return timer.mark("decode", orders)
 
     def get_level2_range(
         self, pool_key: str, price_low: int, price_high: int, is_bid: bool
@@ -308,6 +519,7 @@ class DeepBookClient:
         :param is_bid: whether to get bid or ask orders
         :returns: a JSON string object with arrays of prices and quantities
         """
+        timer = self._timer("get_level2_range")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -316,29 +528,48 @@ class DeepBookClient:
 
         self.deepbook.get_level2_range(pool_key, price_low, price_high, is_bid, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         prices = result[0]["returnValues"][0][0]
         parsed_prices = RangeInput.deserialize(prices).__dict__
         quantities = result[0]["returnValues"][1][0]
         parsed_quantities = RangeInput.deserialize(quantities).__dict__
+        timer.mark("decode")
 
-        formatted_result = dict(
-            prices=[
-                round(
-                    (float(price) / FLOAT_SCALAR / quote_coin["scalar"])
-                    * base_coin["scalar"],
-                    9,
-                )
-                for price in parsed_prices["range"]
-            ],
-            quantities=[
-                round(float(quantity) / base_coin["scalar"], 9)
-                for quantity in parsed_quantities["range"]
-            ],
+        prices, quantities = self.format_levels(
+            parsed_prices["range"], parsed_quantities["range"], base_coin, quote_coin
         )
+
+        formatted_result = dict(prices=prices, quantities=quantities)
     
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
+
+    def format_levels(
+        self, raw_prices: List[int], raw_quantities: List[int], base_coin, quote_coin
+    ) -> tuple:
+        """
+        Convert on-chain level 2 prices and quantities to human readable values
+
+        :param raw_prices: list of prices as returned on-chain
+        :param raw_quantities: list of quantities as returned on-chain
+        :param base_coin: base coin of the pool
+        :param quote_coin: quote coin of the pool
+        :returns: a tuple with lists of prices and quantities
+        """
+        prices = [
+            round(
+                (float(price) / FLOAT_SCALAR / quote_coin["scalar"])
+                * base_coin["scalar"],
+                9,
+            )
+            for price in raw_prices
+        ]
+        quantities = [
+            round(float(quantity) / base_coin["scalar"], 9)
+            for quantity in raw_quantities
+        ]
+
+        return prices, quantities
 
     def get_level2_ticks_from_mid(self, pool_key: str, ticks: int) -> str:
         """
@@ -348,6 +579,7 @@ class DeepBookClient:
         :param ticks: lower bound of the price ranger
         :returns: JSON string object with arrays of prices and quantities
         """
+        timer = self._timer("get_level2_ticks_from_mid")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -356,7 +588,7 @@ class DeepBookClient:
 
         self.deepbook.get_level2_ticks_from_mid(pool_key, ticks, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         bid_prices = result[0]["returnValues"][0][0]
         parsed_bid_prices = RangeInput.deserialize(bid_prices).__dict__
@@ -369,35 +601,72 @@ class DeepBookClient:
 
         ask_quantities = result[0]["returnValues"][3][0]
         parsed_ask_quantities = RangeInput.deserialize(ask_quantities).__dict__
+        timer.mark("decode")
+
+        bid_prices, bid_quantities = self.format_levels(
+            parsed_bid_prices["range"],
+            parsed_bid_quantities["range"],
+            base_coin,
+            quote_coin,
+        )
+        ask_prices, ask_quantities = self.format_levels(
+            parsed_ask_prices["range"],
+            parsed_ask_quantities["range"],
+            base_coin,
+            quote_coin,
+        )
 
         formatted_result = dict(
-            bid_prices=[
-                round(
-                    (float(price) / FLOAT_SCALAR / quote_coin["scalar"])
-                    * base_coin["scalar"],
-                    9,
-                )
-                for price in parsed_bid_prices["range"]
-            ],
-            bid_quantities=[
-                round(float(quantity) / base_coin["scalar"], 9)
-                for quantity in parsed_bid_quantities["range"]
-            ],
-            ask_prices=[
-                round(
-                    (float(price) / FLOAT_SCALAR / quote_coin["scalar"])
-                    * base_coin["scalar"],
-                    9,
-                )
-                for price in parsed_ask_prices["range"]
-            ],
-            ask_quantities=[
-                round(float(quantity) / base_coin["scalar"], 9)
-                for quantity in parsed_ask_quantities["range"]
-            ],
+            bid_prices=bid_prices,
+            bid_quantities=bid_quantities,
+            ask_prices=ask_prices,
+            ask_quantities=ask_quantities,
         )
     
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
+
+    def get_level2_snapshots(
+        self, pool_keys: List[str], ticks: int, skip_empty: bool = False
+    ) -> Dict[str, dict]:
+        """
+        Get the mid price and level 2 ticks from mid of several pools in a single devInspect call
+
+        Values are the exact on-chain integers. A pool with an empty side aborts ``mid_price`` and fails the call,
+        unless ``skip_empty`` is set.
+
+        :param pool_keys: keys of the pools
+        :param ticks: number of ticks from mid price
+        :param skip_empty: if True pools whose calls abort are left out, one extra call per such pool
+        :returns: dictionary keyed by pool key of dictionaries with ``mid_price``, ``bid_prices``,
+            ``bid_quantities``, ``ask_prices`` and ``ask_quantities``
+        """
+        timer = self._timer("get_level2_snapshots")
+
+        def add_calls(pool_key: str, tx: SyncTransaction):
+            self.deepbook.mid_price(pool_key, tx)
+            self.deepbook.get_level2_ticks_from_mid(pool_key, ticks, tx)
+
+        if skip_empty:
+            pool_keys, result = self._inspect_each(pool_keys, add_calls, 2, timer, "level 2 snapshots")
+        else:
+            tx = SyncTransaction(client=self.client)
+            for pool_key in pool_keys:
+                add_calls(pool_key, tx)
+            result = self._inspect(tx, timer)
+
+        snapshots = {}
+        for index, pool_key in enumerate(pool_keys):
+            mid_price = result[2 * index]["returnValues"][0][0]
+            levels = result[2 * index + 1]["returnValues"]
+            snapshots[pool_key] = dict(
+                mid_price=Uint64.deserialize(bytes(mid_price)),
+                bid_prices=RangeInput.deserialize(levels[0][0]).range,
+                bid_quantities=RangeInput.deserialize(levels[1][0]).range,
+                ask_prices=RangeInput.deserialize(levels[2][0]).range,
+                ask_quantities=RangeInput.deserialize(levels[3][0]).range,
+            )
+
+        return timer.mark("decode", snapshots)
 
     def account(self, pool_key: str, manager_key: str) -> str:
         """
@@ -407,6 +676,7 @@ class DeepBookClient:
         :param manager_key: key of the BalanceManager
         :returns: JSON string object containing the account information
         """
+        timer = self._timer("account")
         tx = SyncTransaction(client=self.client)
         pool = self._config.get_pool(pool_key)
         base_scalar = self._config.get_coin(pool["base_coin"])["scalar"]
@@ -414,11 +684,12 @@ class DeepBookClient:
 
         self.deepbook.account(pool_key, manager_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         final_results = result[0]["returnValues"][0][0]
 
         account = Account.deserialize(final_results)
+        timer.mark("decode")
 
         formatted_result = dict(
             epoch=account.epoch,
@@ -446,7 +717,7 @@ class DeepBookClient:
             ),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def get_order_normalized(self, pool_key: str, order_id: str) -> str:
         """
@@ -456,16 +727,18 @@ class DeepBookClient:
         :param order_id: Order ID
         :returns: JSON string object containing the order information with normalized price
         """
+        timer = self._timer("get_order_normalized")
 
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.get_order(pool_key, order_id, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         parsed_bytes = result[0]["returnValues"][0][0]
 
         order = Order.deserialize(bytearray(parsed_bytes))
+        timer.mark("decode")
         order_info = order.__dict__
 
         order_info["balance_manager_id"] = order_info["balance_manager_id"].to_sui_address().__dict__["address"]
@@ -498,7 +771,7 @@ class DeepBookClient:
         order_info["is_bid"] = is_bid
         order_info["normalized_price"] = normalized_price
 
-        return json.dumps(order_info, indent=4)
+        return timer.mark("format", json.dumps(order_info, indent=4))
     
     def decode_order_id(self, encoded_order_id: int) -> dict:
         """
@@ -520,6 +793,7 @@ class DeepBookClient:
         :param pool_key: key to identify the pool
         :returns: JSON string object with base, quote, and deep balances in the vault
         """
+        timer = self._timer("vault_balances")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -528,11 +802,12 @@ class DeepBookClient:
 
         self.deepbook.vault_balances(pool_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         base_in_vault = Uint64.deserialize(bytes(result[0]["returnValues"][0][0]))
         quote_in_vault = Uint64.deserialize(bytes(result[0]["returnValues"][1][0]))
         deep_in_vault = Uint64.deserialize(bytes(result[0]["returnValues"][2][0]))
+        timer.mark("decode")
 
         formatted_result = dict(
             base=format_value(base_in_vault / base_coin_scalar),
@@ -540,7 +815,7 @@ class DeepBookClient:
             deep=format_value(deep_in_vault),
         )
         
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def get_pool_id_by_assets(self, base_type: str, quote_type: str) -> str:
         """
@@ -550,13 +825,14 @@ class DeepBookClient:
         :param quote_type: type of the quote asset
         :returns: address of the pool
         """
+        timer = self._timer("get_pool_id_by_assets")
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.get_pool_id_by_assets(base_type, quote_type, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
-        return "0x" + (bytes(result[0]["returnValues"][0][0])).hex()
+        return timer.mark("decode", "0x" + (bytes(result[0]["returnValues"][0][0])).hex())
 
     def mid_price(self, pool_key: str) -> float:
         """
@@ -565,6 +841,7 @@ class DeepBookClient:
         :param pool_key: key of the pool
         :returns: mid price
         """
+        timer = self._timer("mid_price")
         tx = SyncTransaction(client=self.client)
 
         pool = self._config.get_pool(pool_key)
@@ -573,11 +850,12 @@ class DeepBookClient:
         base_coin = self._config.get_coin(pool["base_coin"])
         quote_coin = self._config.get_coin(pool["quote_coin"])
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         parsed_bytes = bytes(result[0]["returnValues"][0][0])
 
         parsed_mid_price = Uint64.deserialize(parsed_bytes)
+        timer.mark("decode")
 
         adjusted_mid_price = (
             (parsed_mid_price * base_coin["scalar"])
@@ -585,7 +863,85 @@ class DeepBookClient:
             / FLOAT_SCALAR
         )
 
-        return adjusted_mid_price
+        return timer.mark("format", adjusted_mid_price)
+
+    def mid_prices(self, pool_keys: List[str], skip_empty: bool = False) -> Dict[str, float]:
+        """
+        Get the mid price of several pools in a single devInspect call
+
+        A pool with an empty side aborts ``mid_price`` and fails the call, unless ``skip_empty`` is set.
+
+        :param pool_keys: keys of the pools
+        :param skip_empty: if True pools whose ``mid_price`` aborts are left out, one extra call per such pool
+        :returns: dictionary of mid prices keyed by pool key
+        """
+        timer = self._timer("mid_prices")
+        if skip_empty:
+            pool_keys, result = self._inspect_each(
+                pool_keys, self.deepbook.mid_price, 1, timer, "mid prices"
+            )
+        else:
+            tx = SyncTransaction(client=self.client)
+            for pool_key in pool_keys:
+                self.deepbook.mid_price(pool_key, tx)
+            result = self._inspect(tx, timer)
+
+        mid_prices = {}
+        for index, pool_key in enumerate(pool_keys):
+            pool = self._config.get_pool(pool_key)
+            base_coin = self._config.get_coin(pool["base_coin"])
+            quote_coin = self._config.get_coin(pool["quote_coin"])
+            parsed_mid_price = Uint64.deserialize(bytes(result[index]["returnValues"][0][0]))
+            mid_prices[pool_key] = (
+                (parsed_mid_price * base_coin["scalar"])
+                / quote_coin["scalar"]
+                / FLOAT_SCALAR
+            )
+
+        return timer.mark("decode", mid_prices)
+
+    def stake_states(self, pairs: List[Tuple[str, str]]) -> Dict[Tuple[str, str], dict]:
+        """
+        Get the stake of several pools and balance managers in a single devInspect call.
+        ``pool::account`` aborts for a balance manager without an account in the pool, such a
+        pair is dropped and the others inspected again, one extra call per missing account.
+
+        :param pairs: (pool key, balance manager key) pairs
+        :returns: dictionary of stake states keyed by (pool key, balance manager key)
+        """
+        timer = self._timer("stake_states")
+        pairs = list(dict.fromkeys(pairs))
+        found, result = self._inspect_each(
+            pairs,
+            lambda pair, tx: self.deepbook.account(pair[0], pair[1], tx),
+            1,
+            timer,
+            "stakes",
+        )
+
+        states = {
+            pair: dict(
+                exists=False,
+                epoch=0,
+                active_stake=0,
+                inactive_stake=0,
+                created_proposal=False,
+                voted_proposal=None,
+            )
+            for pair in pairs
+        }
+        for index, pair in enumerate(found):
+            account = Account.deserialize(result[index]["returnValues"][0][0])
+            states[pair] = dict(
+                exists=True,
+                epoch=account.epoch,
+                active_stake=format_value(account.active_stake / DEEP_SCALAR),
+                inactive_stake=format_value(account.inactive_stake / DEEP_SCALAR),
+                created_proposal=account.created_proposal,
+                voted_proposal=dict(account.voted_proposal.__dict__)["value"],
+            )
+
+        return timer.mark("decode", states)
 
     def pool_trade_params(self, pool_key: str) -> str:
         """
@@ -594,15 +950,17 @@ class DeepBookClient:
         :param pool_key: key of the pool
         :returns: JSON string object with pool trade results
         """
+        timer = self._timer("pool_trade_params")
         tx = SyncTransaction(client=self.client)
 
         self.deepbook.pool_trade_params(pool_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         taker_fee = Uint64.deserialize(bytes(result[0]["returnValues"][0][0]))
         maker_fee = Uint64.deserialize(bytes(result[0]["returnValues"][1][0]))
         stake_required = Uint64.deserialize(bytes(result[0]["returnValues"][2][0]))
+        timer.mark("decode")
 
         formatted_result = dict(
                 taker_fee=format_value(taker_fee / FLOAT_SCALAR),
@@ -610,7 +968,7 @@ class DeepBookClient:
                 stake_required=format_value(stake_required / DEEP_SCALAR),
             )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def pool_book_params(self, pool_key: str) -> str:
         """
@@ -619,17 +977,19 @@ class DeepBookClient:
         :param pool_key: key of the pool
         :returns: a JSON string object with pool book results
         """
+        timer = self._timer("pool_book_params")
         tx = SyncTransaction(client=self.client)
         pool = self._config.get_pool(pool_key)
         base_scalar = self._config.get_coin(pool["base_coin"])["scalar"]
         quote_scalar = self._config.get_coin(pool["quote_coin"])["scalar"]
         self.deepbook.pool_book_params(pool_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         tick_size = Uint64.deserialize(bytes(result[0]["returnValues"][0][0]))
         lot_size = Uint64.deserialize(bytes(result[0]["returnValues"][1][0]))
         min_size = Uint64.deserialize(bytes(result[0]["returnValues"][2][0]))
+        timer.mark("decode")
 
         formatted_result = dict(
             tick_size=format_value((tick_size * base_scalar) / quote_scalar / FLOAT_SCALAR),
@@ -637,7 +997,39 @@ class DeepBookClient:
             min_size=format_value(min_size / base_scalar),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
+
+    def pool_book_params_many(self, pool_keys: List[str]) -> Dict[str, dict]:
+        """
+        Get the tick size, lot size and min size of several pools in a single devInspect call
+
+        :param pool_keys: keys of the pools
+        :returns: dictionary of book parameters keyed by pool key
+        """
+        timer = self._timer("pool_book_params_many")
+        tx = SyncTransaction(client=self.client)
+
+        for pool_key in pool_keys:
+            self.deepbook.pool_book_params(pool_key, tx)
+
+        result = self._inspect(tx, timer)
+
+        book_params = {}
+        for index, pool_key in enumerate(pool_keys):
+            pool = self._config.get_pool(pool_key)
+            base_scalar = self._config.get_coin(pool["base_coin"])["scalar"]
+            quote_scalar = self._config.get_coin(pool["quote_coin"])["scalar"]
+            return_values = result[index]["returnValues"]
+            tick_size = Uint64.deserialize(bytes(return_values[0][0]))
+            lot_size = Uint64.deserialize(bytes(return_values[1][0]))
+            min_size = Uint64.deserialize(bytes(return_values[2][0]))
+            book_params[pool_key] = dict(
+                tick_size=format_value((tick_size * base_scalar) / quote_scalar / FLOAT_SCALAR),
+                lot_size=format_value(lot_size / base_scalar),
+                min_size=format_value(min_size / base_scalar),
+            )
+
+        return timer.mark("decode", book_params)
 
     def locked_balance(
         self, pool_key: str, balance_manager_key: str
@@ -649,6 +1041,7 @@ class DeepBookClient:
         :param balance_manager_key: key of the BalanceManager
         :returns: JSON string object with base, quote, and deep locked for the balance manager in the pool
         """
+        timer = self._timer("locked_balance")
         tx = SyncTransaction(client=self.client)
         pool = self._config.get_pool(pool_key)
         base_scalar = self._config.get_coin(pool["base_coin"])["scalar"]
@@ -656,11 +1049,12 @@ class DeepBookClient:
 
         self.deepbook.locked_balance(pool_key, balance_manager_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         base_locked = Uint64.deserialize(bytes(result[0]["returnValues"][0][0]))
         quote_locked = Uint64.deserialize(bytes(result[0]["returnValues"][1][0]))
         deep_locked = Uint64.deserialize(bytes(result[0]["returnValues"][2][0]))
+        timer.mark("decode")
 
         formatted_result = dict(
             base=format_value(base_locked / base_scalar),
@@ -668,7 +1062,7 @@ class DeepBookClient:
             deep=format_value(deep_locked / DEEP_SCALAR),
         )
 
-        return json.dumps(formatted_result, indent=4)
+        return timer.mark("format", json.dumps(formatted_result, indent=4))
 
     def get_pool_deep_price(self, pool_key: str) -> str:
         """
@@ -677,6 +1071,7 @@ class DeepBookClient:
         :param pool_key: key of the pool
         :returns: JSON string object with deep price conversion
         """
+        timer = self._timer("get_pool_deep_price")
         tx = SyncTransaction(client=self.client)
         pool = self._config.get_pool(pool_key)
         base_coin = self._config.get_coin(pool["base_coin"])
@@ -686,27 +1081,28 @@ class DeepBookClient:
 
         self.deepbook.get_pool_deep_price(pool_key, tx)
 
-        result = tx.inspect_all().results
+        result = self._inspect(tx, timer)
 
         pool_deep_price = OrderDeepPrice.deserialize(
             bytes(result[0]["returnValues"][0][0])
         )
+        timer.mark("decode")
 
         if pool_deep_price.asset_is_base:
-            return json.dumps(dict(
+            return timer.mark("format", json.dumps(dict(
                 asset_is_base=pool_deep_price.asset_is_base,
                 deep_per_base=(
                     (pool_deep_price.deep_per_asset / FLOAT_SCALAR)
                     * base_coin["scalar"]
                 )
                 / deep_coin["scalar"],
-            ), indent=4)
+            ), indent=4))
         else:
-            return json.dumps(dict(
+            return timer.mark("format", json.dumps(dict(
                 asset_is_base=pool_deep_price.asset_is_base,
                 deep_per_quote=(
                     (pool_deep_price.deep_per_asset / FLOAT_SCALAR)
                     * quote_coin["scalar"]
                 )
                 / deep_coin["scalar"],
-            ), indent=4)
+            ), indent=4))
@@ -0,0 +1,375 @@
+"""
+Pipelined build, sign and submit of order transactions.
+
+``PipelinedExecutor`` runs every transaction through three stages connected by bounded queues:
+
+- build: runs the caller's builder on a new ``SyncTransaction``, leases a gas coin from a ``GasCoinPool`` and
+  serializes the transaction data with it. With a ``SignerPool`` each order is sent by its assigned signer, proving
+  with the signer's TradeCap and paying from the signer's own gas pool
+- sign: signs the transaction bytes in a pool of workers
+- submit: executes the signed transaction with ``submit_workers`` concurrent requests, releases the gas coin with the
+  effects and resolves the future of the transaction
+
+Each transaction is keyed by a client order ID and ``submit`` returns a ``concurrent.futures.Future`` resolving to
+an ``ExecutionResult``. Full queues and leased out gas coins block ``submit``, which bounds the work in flight. A
+transaction waiting longer than ``lease_timeout`` for a gas coin fails with ``TimeoutError``.
+
+Drained coins are only replaced by ``GasCoinPool.rebalance``, the executor runs it in the background for every gas
+pool it pays from unless ``rebalance_interval`` is None.
+"""
+
+import queue
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_builders.exec_builders import ExecuteTransaction
+from pysui.sui.sui_txn import SyncTransaction
+
+from deepbookpy.custom_types import PlaceLimitOrderParams, PlaceMarketOrderParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.execution.gas_pool import GasCoinPool, gas_charged
+from deepbookpy.execution.signer_pool import Signer, SignerPool
+from deepbookpy.utils.events import ORDER_PLACED, parse_event, transaction_events
+from deepbookpy.utils.gas_model import transaction_shape
+
+
+_STOP = object()
+
+
+@dataclass
+class ExecutionResult:
+    client_order_id: str
+    digest: str
+    succeeded: bool
+    status: str
+    gas_charged: int
+    order_ids: List[int] = field(default_factory=list)
+    events: list = field(default_factory=list)
+    result: Optional[SuiRpcResult] = None
+
+
+class _Job:
+    __slots__ = (
+        "client_order_id",
+        "build",
+        "signer",
+        "gas_pool",
+        "future",
+        "attributes",
+        "tx",
+        "coin",
+        "tx_bytes",
+        "signatures",
+        "shape",
+    )
+
+    def __init__(self, client_order_id: str, build: Callable, signer: Optional[Signer], attributes: dict):
+        self.client_order_id = client_order_id
+        self.build = build
+        self.signer = signer
+        self.gas_pool = None
+        self.future = Future()
+        self.attributes = attributes
+        self.tx = None
+        self.coin = None
+        self.tx_bytes = None
+        self.signatures = None
+        self.shape = None
+
+
+class PipelinedExecutor:
+    """Builds, signs and submits transactions in pipeline stages with bounded concurrency"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        gas_pool: Optional[GasCoinPool],
+        gas_budget: int = 50_000_000,
+        build_workers: int = 1,
+        sign_workers: int = 4,
+        submit_workers: int = 8,
+        queue_size: int = 64,
+        options: Optional[dict] = None,
+        request_type: SuiRequestType = SuiRequestType.WAITFORLOCALEXECUTION,
+        signer_pool: Optional[SignerPool] = None,
+        lease_timeout: Optional[float] = 30.0,
+        rebalance_interval: Optional[float] = 10.0,
+    ):
+        """
+        Initializes the PipelinedExecutor class and starts its workers.
+
+        :param deepbook_client: DeepBookClient building the transactions
+        :param gas_pool: provisioned GasCoinPool paying for the transactions sent without a signer, may be None
+            with a ``signer_pool``
+        :param gas_budget: gas budget of each transaction, in MIST, or of the shapes the client's gas model has not
+            seen yet
+        :param build_workers: number of build workers
+        :param sign_workers: number of signing workers
+        :param submit_workers: maximum number of concurrent submissions
+        :param queue_size: capacity of each stage queue
+        :param options: optional sui_executeTransactionBlock options
+        :param request_type: execution request type
+        :param signer_pool: optional SignerPool the orders are spread across, each signer paying from its own
+            GasCoinPool
+        :param lease_timeout: seconds a transaction waits for a free gas coin before failing, None waits forever
+        :param rebalance_interval: seconds between background rebalances of the gas pools not already rebalancing,
+            None when the caller runs ``GasCoinPool.rebalance`` itself
+        """
+        if signer_pool is None and gas_pool is None:
+            raise ValueError("A gas pool is required without a signer pool")
+        if signer_pool is not None and any(signer.gas_pool is None for signer in signer_pool):
+            raise ValueError("Every signer of the signer pool needs its own gas pool")
+        self._client = deepbook_client
+        self.gas_pool = gas_pool
+        self.signer_pool = signer_pool
+        self.gas_budget = gas_budget
+        self.options = options
+        self.request_type = request_type
+        self.lease_timeout = lease_timeout
+        self.tracer = deepbook_client.config.tracer
+        self.gas_model = deepbook_client.config.gas_model
+
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+
+        self._build_queue = queue.Queue(queue_size)
+        self._sign_queue = queue.Queue(queue_size)
+        self._submit_queue = queue.Queue(queue_size)
+        self._closed = False
+        self._stages = (
+            (self._build_queue, self._build, build_workers),
+            (self._sign_queue, self._sign, sign_workers),
+            (self._submit_queue, self._submit, submit_workers),
+        )
+        # Worker threads of each stage
+        self._threads: List[List[threading.Thread]] = []
+        for source, handler, workers in self._stages:
+            threads = []
+            for _ in range(workers):
+                thread = threading.Thread(target=self._work, args=(source, handler), daemon=True)
+                thread.start()
+                threads.append(thread)
+            self._threads.append(threads)
+
+        self._rebalanced: List[GasCoinPool] = []
+        if rebalance_interval is not None:
+            gas_pools = [gas_pool] if gas_pool is not None else []
+            if signer_pool is not None:
+                gas_pools.extend(signer.gas_pool for signer in signer_pool)
+            for pool in dict.fromkeys(gas_pools):
+                if pool.start(rebalance_interval):
+                    self._rebalanced.append(pool)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def future(self, client_order_id: str) -> Optional[Future]:
+        """
+        Get the future of a transaction in flight
+
+        :param client_order_id: client order ID the transaction was submitted with
+        :returns: Future object, None once the transaction completed
+        """
+        return self._in_flight.get(str(client_order_id))
+
+    # Submission
+    def submit(self, client_order_id: str, build: Callable, signer: Optional[Signer] = None, **attributes) -> Future:
+        """
+        Queue a transaction
+
+        :param client_order_id: client order ID keying the transaction
+        :param build: callable adding the commands to a ``SyncTransaction``
+        :param signer: optional Signer of the ``signer_pool`` sending the transaction
+        :param attributes: span attributes
+        :returns: Future resolving to an ExecutionResult
+        """
+        if self._closed:
+            raise ValueError("Executor is closed")
+        if signer is not None and self.signer_pool is None:
+            raise ValueError("Signers need the executor to be created with a signer pool")
+        client_order_id = str(client_order_id)
+        job = _Job(client_order_id, build, signer, attributes)
+        with self._lock:
+            if client_order_id in self._in_flight:
+                raise ValueError(f"Client order ID {client_order_id} is already in flight")
+            self._in_flight[client_order_id] = job.future
+            self.submitted += 1
+        self._build_queue.put(job)
+        return job.future
+
+    def place_limit_order(self, params: PlaceLimitOrderParams) -> Future:
+        """
+        Queue a limit order
+
+        :param params: PlaceLimitOrderParams object
+        :returns: Future resolving to an ExecutionResult
+        """
+        signer = None
+        if self.signer_pool is not None:
+            signer = self.signer_pool.signer_for(params.pool_key)
+            params = self.signer_pool.order_params(signer, params)
+        return self.submit(
+            params.client_order_id,
+            lambda tx: self._client.deepbook.place_limit_order(params, tx),
+            signer,
+            pool_key=params.pool_key,
+        )
+
+    def place_market_order(self, params: PlaceMarketOrderParams) -> Future:
+        """
+        Queue a market order
+
+        :param params: PlaceMarketOrderParams object
+        :returns: Future resolving to an ExecutionResult
+        """
+        signer = None
+        if self.signer_pool is not None:
+            signer = self.signer_pool.signer_for(params.pool_key)
+            params = self.signer_pool.order_params(signer, params)
+        return self.submit(
+            params.client_order_id,
+            lambda tx: self._client.deepbook.place_market_order(params, tx),
+            signer,
+            pool_key=params.pool_key,
+        )
+
+    # Stages
+    def _work(self, source: queue.Queue, handler: Callable):
+        while True:
+            job = source.get()
+            try:
+                if job is _STOP:
+                    return
+                try:
+                    handler(job)
+                except Exception as e:
+                    self._fail(job, e)
+            finally:
+                source.task_done()
+
+    def _build(self, job: _Job):
+        with self.tracer.start_span("pipeline.build", client_order_id=job.client_order_id, **job.attributes):
+            if job.signer is None:
+                tx = SyncTransaction(client=self._client.client)
+                job.gas_pool = self.gas_pool
+            else:
+                tx = self.signer_pool.new_transaction(job.signer)
+                job.gas_pool = job.signer.gas_pool
+            if job.gas_pool is None:
+                raise ValueError("No gas pool for transactions sent without a signer")
+            job.build(tx)
+            job.tx = tx
+            gas_budget = self.gas_budget
+            if self.gas_model is not None:
+                job.shape = transaction_shape(tx)
+                gas_budget = self.gas_model.budget(job.shape, default=self.gas_budget)
+            job.coin = job.gas_pool.lease(self.lease_timeout)
+            job.tx_bytes = job.gas_pool.transaction_data(tx, job.coin, gas_budget)
+        self._sign_queue.put(job)
+
+    def _sign(self, job: _Job):
+        with self.tracer.start_span("pipeline.sign", client_order_id=job.client_order_id):
+            job.signatures = job.tx.signer_block.get_signatures(client=self._client.client, tx_bytes=job.tx_bytes)
+        self._submit_queue.put(job)
+
+    def _submit(self, job: _Job):
+        with self.tracer.start_span("pipeline.submit", client_order_id=job.client_order_id) as span:
+            result = self._client.client.execute(
+                ExecuteTransaction(
+                    tx_bytes=job.tx_bytes,
+                    signatures=job.signatures,
+                    options=self.options,
+                    request_type=self.request_type,
+                )
+            )
+            coin, job.coin = job.coin, None
+            job.gas_pool.release(coin, result)
+            if result.is_err():
+                span.set_error(result.result_string)
+                raise ValueError(result.result_string)
+
+            response = result.result_data
+            span.set_attribute("digest", response.digest)
+            execution_result = self._parse(job.client_order_id, result)
+            if not execution_result.succeeded:
+                span.set_error(execution_result.status)
+            elif job.shape is not None:
+                self.gas_model.record(job.shape, response.effects)
+
+        with self._lock:
+            self._in_flight.pop(job.client_order_id, None)
+            self.completed += 1
+        job.future.set_result(execution_result)
+
+    def _parse(self, client_order_id: str, result: SuiRpcResult) -> ExecutionResult:
+        response = result.result_data
+        events = transaction_events(response)
+        order_ids = []
+        for event in events:
+            name, fields = parse_event(event)
+            if name == ORDER_PLACED:
+                order_ids.append(fields.get("order_id"))
+        return ExecutionResult(
+            client_order_id=client_order_id,
+            digest=response.digest,
+            succeeded=response.succeeded,
+            status=response.status,
+            gas_charged=gas_charged(response.effects),
+            order_ids=order_ids,
+            events=events,
+            result=result,
+        )
+
+    def _fail(self, job: _Job, error: Exception):
+        if job.coin is not None:
+            # Signed transactions may have reached the network
+            job.gas_pool.release(job.coin, SuiRpcResult(False, str(error)) if job.signatures else None)
+            job.coin = None
+        with self._lock:
+            self._in_flight.pop(job.client_order_id, None)
+            self.failed += 1
+        job.future.set_exception(error)
+
+    # Shutdown
+    def close(self, wait: bool = True):
+        """
+        Stop accepting transactions and stop the workers
+
+        :param wait: if True the queued transactions are sent first, otherwise they fail
+        """
+        self._closed = True
+        # A stage is stopped once its workers are done, jobs they were handling reach the next stage before it is
+        for (source, _, workers), threads in zip(self._stages, self._threads):
+            if wait:
+                source.join()
+            else:
+                self._drain(source)
+            for _ in range(workers):
+                source.put(_STOP)
+            for thread in threads:
+                thread.join()
+        for pool in self._rebalanced:
+            pool.stop()
+
+    def _drain(self, source: queue.Queue):
+        while True:
+            try:
+                job = source.get_nowait()
+            except queue.Empty:
+                return
+            if job is not _STOP:
+                self._fail(job, ValueError("Executor closed before the transaction was sent"))
+            source.task_done()
@@ -0,0 +1,427 @@
+"""
+Gas coin pool for submitting several transactions of one address at once.
+
+A transaction locks the coin paying its gas until it is executed, so transactions of one address sharing a gas coin
+have to be sent one at a time. ``GasCoinPool`` splits a reserve coin into ``coins`` gas coins and leases one to each
+transaction in flight. A leased coin comes back with the version, digest and balance taken from the effects of its
+transaction, so the next lease pays with it without fetching it.
+
+Coins whose transaction failed without effects are refreshed from chain before being leased again. ``rebalance``,
+run in the background with ``run``, refreshes them, merges coins below ``min_balance`` back into the reserve and
+splits new coins from the reserve to keep the pool full. ``start`` runs it from a daemon thread.
+"""
+
+import base64
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_txn.sync_transaction import SuiTransaction
+from pysui.sui.sui_types import bcs
+from pysui.sui.sui_types.address import SuiAddress
+from pysui.sui.sui_types.scalars import ObjectID
+
+from deepbookpy.utils.normalizer import normalize_sui_address
+from deepbookpy.utils.tracing import NOOP_TRACER, traced_execute_bytes
+
+
+MIST_PER_SUI = 1_000_000_000
+
+
+@dataclass
+class GasCoin:
+    object_id: str
+    version: int
+    digest: str
+    balance: int
+    leased: bool = False
+    stale: bool = False
+
+    def reference(self) -> bcs.ObjectReference:
+        return bcs.ObjectReference(
+            bcs.Address.from_str(self.object_id), int(self.version), bcs.Digest.from_str(self.digest)
+        )
+
+
+def gas_charged(effects) -> int:
+    """
+    Get the amount taken from the gas coin by a transaction
+
+    :param effects: transaction effects
+    :returns: computation and storage cost less the storage rebate, in MIST
+    """
+    gas_used = effects.gas_used
+    return int(gas_used.computation_cost) + int(gas_used.storage_cost) - int(gas_used.storage_rebate)
+
+
+def _sender(tx: SuiTransaction) -> str:
+    sender = tx.signer_block.sender
+    if isinstance(sender, SuiAddress):
+        return sender.address
+    return sender.signing_address
+
+
+class GasCoinPool:
+    """SUI gas coins of one address leased to transactions in flight"""
+
+    def __init__(
+        self,
+        client,
+        coins: int = 8,
+        coin_balance: int = MIST_PER_SUI,
+        min_balance: Optional[int] = None,
+        gas_budget: int = 50_000_000,
+        owner: Optional[str] = None,
+    ):
+        """
+        Initializes the GasCoinPool class.
+
+        :param client: SyncClient instance, its active address owns the coins unless ``owner`` is set
+        :param coins: number of gas coins kept in the pool
+        :param coin_balance: balance of each new coin, in MIST
+        :param min_balance: coins below this balance are not leased and are merged back, defaults to a quarter of
+            ``coin_balance``
+        :param gas_budget: gas budget of the pool's own split and merge transactions, in MIST
+        :param owner: optional address owning the coins
+        """
+        self.client = client
+        self.coins = coins
+        self.coin_balance = coin_balance
+        self.min_balance = coin_balance // 4 if min_balance is None else min_balance
+        self.gas_budget = gas_budget
+        self.owner = normalize_sui_address(owner or client.config.active_address.address)
+        self.gas_price = int(client.current_gas_price)
+
+        self._condition = threading.Condition()
+        self._coins: Dict[str, GasCoin] = {}
+        self._free = deque()
+        self.reserve: Optional[GasCoin] = None
+        self.last_error: Optional[Exception] = None
+        self._runner: Optional[threading.Thread] = None
+        self._stop_runner = threading.Event()
+
+    def __len__(self) -> int:
+        return len(self._coins)
+
+    @property
+    def available(self) -> int:
+        return sum(
+            1
+            for coin in self._coins.values()
+            if not coin.leased and not coin.stale and coin.balance >= self.min_balance
+        )
+
+    @property
+    def in_flight(self) -> int:
+        return sum(1 for coin in self._coins.values() if coin.leased)
+
+    def get(self, object_id: str) -> Optional[GasCoin]:
+        return self._coins.get(normalize_sui_address(object_id))
+
+    # Chain state
+    def _fetch(self) -> List[GasCoin]:
+        result = self.client.get_gas(address=SuiAddress(self.owner), fetch_all=True)
+        if not result.is_ok():
+            raise ValueError(f"Unable to fetch gas coins of {self.owner}: {result.result_string}")
+        return [
+            GasCoin(
+                normalize_sui_address(coin.coin_object_id),
+                int(coin.version),
+                coin.digest,
+                int(coin.balance),
+            )
+            for coin in result.result_data.data
+        ]
+
+    def refresh(self) -> List[GasCoin]:
+        """
+        Fetch the gas coins of the owner and update the references of the pool's free and stale coins
+
+        :returns: list of the owner's coins outside the pool
+        """
+        outside = []
+        fetched_coins = self._fetch()
+        with self._condition:
+            for fetched in fetched_coins:
+                coin = self._coins.get(fetched.object_id)
+                if coin is None:
+                    outside.append(fetched)
+                    continue
+                if coin.leased:
+                    continue
+                coin.version, coin.digest, coin.balance = fetched.version, fetched.digest, fetched.balance
+                if coin.stale:
+                    coin.stale = False
+                    if coin.balance >= self.min_balance:
+                        self._free.append(coin)
+                        self._condition.notify()
+
+            # Coins gone from chain, e.g. merged elsewhere
+            fetched_ids = {coin.object_id for coin in fetched_coins}
+            for object_id, coin in list(self._coins.items()):
+                if object_id not in fetched_ids and not coin.leased:
+                    del self._coins[object_id]
+
+        outside.sort(key=lambda coin: coin.balance, reverse=True)
+        if outside:
+            self.reserve = outside[0]
+        return outside
+
+    def _add(self, coin: GasCoin):
+        self._coins[coin.object_id] = coin
+        if coin.balance >= self.min_balance:
+            self._free.append(coin)
+            self._condition.notify()
+
+    def provision(self) -> Optional[SuiRpcResult]:
+        """
+        Adopt the owner's coins holding at least ``coin_balance`` and split the missing coins from the largest one
+
+        :returns: SuiRpcResult of the split transaction, None if no coin was missing
+        """
+        outside = self.refresh()
+        with self._condition:
+            for coin in outside[1:]:
+                if len(self._coins) >= self.coins:
+                    break
+                if coin.balance >= self.coin_balance:
+                    self._add(coin)
+        return self.rebalance()
+
+    # Leases
+    def lease(self, timeout: Optional[float] = None) -> GasCoin:
+        """
+        Lease a free coin, waiting for one to be released
+
+        :param timeout: optional seconds to wait
+        :returns: GasCoin object, to be passed back to ``release``
+        """
+        with self._condition:
+            while True:
+                while self._free:
+                    coin = self._free.popleft()
+                    # Entries of coins dropped or merged since they were freed
+                    if self._coins.get(coin.object_id) is not coin or coin.stale:
+                        continue
+                    if coin.balance >= self.min_balance:
+                        coin.leased = True
+                        return coin
+                if not self._condition.wait(timeout):
+                    raise TimeoutError(f"No free gas coin after {timeout} seconds")
+
+    def release(self, coin: GasCoin, result=None):
+        """
+        Return a leased coin
+
+        :param coin: leased GasCoin object
+        :param result: SuiRpcResult or response of the transaction paid with the coin, None if it was not submitted
+        """
+        with self._condition:
+            coin.leased = False
+            if coin.object_id not in self._coins:
+                return
+
+            if result is not None:
+                response = result
+                if hasattr(result, "is_ok"):
+                    response = result.result_data if result.is_ok() else None
+                effects = getattr(response, "effects", None)
+                if not effects:
+                    # Submitted without known effects, the coin version is unknown
+                    coin.stale = True
+                    return
+                reference = effects.gas_object.reference
+                coin.version = int(reference.version)
+                coin.digest = reference.digest
+                coin.balance -= gas_charged(effects)
+
+            if coin.balance >= self.min_balance:
+                self._free.append(coin)
+                self._condition.notify()
+
+    # Execution
+    def transaction_data(self, tx: SuiTransaction, coin: GasCoin, gas_budget: int) -> str:
+        """
+        Serialize a transaction paid with a gas coin, without fetching the coin
+
+        :param tx: SuiTransaction object
+        :param coin: GasCoin object
+        :param gas_budget: gas budget in MIST
+        :returns: base64 encoded TransactionData
+        """
+        if coin.balance < int(gas_budget):
+            raise ValueError(f"Gas coin {coin.object_id} balance {coin.balance} is below the budget {gas_budget}")
+        data = bcs.TransactionData(
+            "V1",
+            bcs.TransactionDataV1(
+                tx.raw_kind(),
+                bcs.Address.from_str(_sender(tx)),
+                bcs.GasData(
+                    [coin.reference()],
+                    bcs.Address.from_str(self.owner),
+                    self.gas_price,
+                    int(gas_budget),
+                ),
+                bcs.TransactionExpiration("None"),
+            ),
+        )
+        return base64.b64encode(data.serialize()).decode()
+
+    def execute(
+        self,
+        tx: SuiTransaction,
+        gas_budget: int,
+        options: Optional[dict] = None,
+        request_type: SuiRequestType = SuiRequestType.WAITFORLOCALEXECUTION,
+        tracer=NOOP_TRACER,
+        timeout: Optional[float] = None,
+        **attributes,
+    ) -> SuiRpcResult:
+        """
+        Lease a coin, pay a transaction with it, sign and submit it and release the coin
+
+        Safe to call from several threads, each call holds its own coin.
+
+        :param tx: SuiTransaction object
+        :param gas_budget: gas budget in MIST
+        :param options: optional sui_executeTransactionBlock options
+        :param request_type: execution request type
+        :param tracer: Tracer object, NOOP_TRACER records nothing
+        :param timeout: optional seconds to wait for a free coin
+        :param attributes: span attributes
+        :returns: SuiRpcResult object
+        """
+        coin = self.lease(timeout)
+        try:
+            tx_bytes = self.transaction_data(tx, coin, gas_budget)
+        except Exception:
+            self.release(coin)
+            raise
+
+        try:
+            result = traced_execute_bytes(
+                tx.client, tx.signer_block, tx_bytes, tracer, options, request_type, **attributes
+            )
+        except Exception as e:
+            # Unknown whether the transaction reached the network
+            self.release(coin, SuiRpcResult(False, str(e)))
+            raise
+        self.release(coin, result)
+        return result
+
+    # Maintenance
+    def rebalance(self) -> Optional[SuiRpcResult]:
+        """
+        Refresh stale coins, merge free coins below ``min_balance`` into the reserve and split missing coins from it,
+        in one transaction paid with the reserve
+
+        :returns: SuiRpcResult of the transaction, None if nothing had to change
+        """
+        if any(coin.stale for coin in self._coins.values()) or self.reserve is None:
+            self.refresh()
+
+        with self._condition:
+            low = [
+                coin
+                for coin in self._coins.values()
+                if not coin.leased and not coin.stale and coin.balance < self.min_balance
+            ]
+            missing = self.coins - (len(self._coins) - len(low))
+            if not low and missing <= 0:
+                return None
+            if self.reserve is None:
+                raise ValueError(f"No reserve coin of {self.owner} to split gas coins from")
+
+            funds = self.reserve.balance + sum(coin.balance for coin in low) - self.gas_budget
+            missing = min(missing, funds // self.coin_balance)
+            if not low and missing <= 0:
+                return None
+
+            # Taken out of the pool while the transaction runs
+            for coin in low:
+                del self._coins[coin.object_id]
+
+        reserve = self.reserve
+        tx = SyncTransaction(client=self.client, initial_sender=SuiAddress(self.owner))
+        if low:
+            tx.merge_coins(merge_to=tx.gas, merge_from=[ObjectID(coin.object_id) for coin in low])
+        if missing > 0:
+            split = tx.split_coin(coin=tx.gas, amounts=[self.coin_balance] * missing)
+            tx.transfer_objects(
+                transfers=split if isinstance(split, list) else [split], recipient=SuiAddress(self.owner)
+            )
+
+        result = traced_execute_bytes(
+            self.client, tx.signer_block, self.transaction_data(tx, reserve, self.gas_budget)
+        )
+        response = result.result_data if result.is_ok() else None
+        if response is None or not response.effects.status.succeeded:
+            with self._condition:
+                for coin in low:
+                    coin.stale = True
+                    self._coins[coin.object_id] = coin
+            self.reserve = None
+            return result
+
+        effects = response.effects
+        reference = effects.gas_object.reference
+        reserve.version, reserve.digest = int(reference.version), reference.digest
+        reserve.balance += sum(coin.balance for coin in low) - gas_charged(effects)
+        reserve.balance -= self.coin_balance * max(missing, 0)
+
+        with self._condition:
+            for created in effects.created or []:
+                reference = created.reference
+                self._add(
+                    GasCoin(
+                        normalize_sui_address(reference.object_id),
+                        int(reference.version),
+                        reference.digest,
+                        self.coin_balance,
+                    )
+                )
+        return result
+
+    def run(self, interval: float = 10.0, stop: Optional[threading.Event] = None):
+        """
+        Rebalance on schedule until the stop event is set, e.g. from a background thread
+
+        :param interval: seconds between rebalances
+        :param stop: optional threading.Event ending the run
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.rebalance()
+                self.last_error = None
+            except Exception as e:
+                # Coins keep being leased and released, the next rebalance retries
+                self.last_error = e
+            stop.wait(interval)
+
+    def start(self, interval: float = 10.0) -> bool:
+        """
+        Rebalance on schedule from a daemon thread until ``stop``
+
+        :param interval: seconds between rebalances
+        :returns: True if the thread was started, False if one is already running
+        """
+        with self._condition:
+            if self._runner is not None and self._runner.is_alive():
+                return False
+            self._stop_runner = threading.Event()
+            self._runner = threading.Thread(target=self.run, args=(interval, self._stop_runner), daemon=True)
+            self._runner.start()
+        return True
+
+    def stop(self):
+        """Stop the rebalancing thread started by ``start``"""
+        with self._condition:
+            runner, self._runner = self._runner, None
+            self._stop_runner.set()
+        if runner is not None:
+            runner.join()
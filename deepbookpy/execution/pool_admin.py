@@ -0,0 +1,317 @@
+"""
+Declarative bulk administration of pools.
+
+``PoolAdmin`` takes a table of the desired book parameters of many pools, keyed by pool key::
+
+    {
+        "SUI_USDC": {"tick_size": 0.001, "lot_size": 0.1, "min_size": 1},
+        "WAL_USDC": {"base_coin": "WAL", "quote_coin": "USDC", "tick_size": 0.0001, "lot_size": 1, "min_size": 10},
+    }
+
+and diffs it against the on-chain ``pool_book_params`` of the pools, read for all of them in one devInspect call and
+cached. Only the admin commands needed are emitted: ``create_pool_admin`` for pools not in the config yet,
+``adjust_tick_size_admin`` when the tick size differs and ``adjust_min_lot_size_admin`` when the lot size or min size
+differs. Values are compared in chain units, so a float spelling of the same tick never triggers an update.
+
+The commands are packed ``max_commands`` to a transaction, the fewest PTBs for the AdminCap owner to send.
+Stable coins and package versions have no cheap on-chain read, their commands are emitted as listed.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.address import SuiAddress
+from pysui.sui.sui_types.scalars import ObjectID
+
+from deepbookpy.custom_types import CreatePoolAdminParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.config import FLOAT_SCALAR
+from deepbookpy.utils.normalizer import normalize_coin_type
+
+
+CREATE_POOL = "create_pool"
+ADJUST_TICK_SIZE = "adjust_tick_size"
+ADJUST_MIN_SIZE = "adjust_min_size"
+ADD_STABLE_COIN = "add_stable_coin"
+REMOVE_STABLE_COIN = "remove_stable_coin"
+ENABLE_VERSION = "enable_version"
+DISABLE_VERSION = "disable_version"
+
+
+@dataclass
+class AdminAction:
+    kind: str
+    key: object
+    params: dict = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        params = ", ".join(f"{name}={value}" for name, value in self.params.items())
+        return f"{self.kind} {self.key}" + (f" ({params})" if params else "")
+
+
+class PoolAdmin:
+    """Diffs a desired pool config table against the chain and packs the admin commands needed into PTBs"""
+
+    def __init__(self, deepbook_client: DeepBookClient, max_age: Optional[float] = None, max_commands: int = 512):
+        """
+        Initializes the PoolAdmin class.
+
+        :param deepbook_client: DeepBookClient whose address owns the AdminCap set in its config
+        :param max_age: seconds the cached book parameters of a pool are used, None keeps them until refreshed
+        :param max_commands: admin commands packed in one transaction
+        """
+        if not deepbook_client.config.admin_cap:
+            raise EnvironmentError("ADMIN_CAP environment variable not set")
+        self._client = deepbook_client
+        self.max_age = max_age
+        self.max_commands = max_commands
+        self._book_params: Dict[str, dict] = {}
+        self._fetched: Dict[str, float] = {}
+
+    # On-chain state
+    def book_params(self, pool_keys: Sequence[str], refresh: bool = False) -> Dict[str, dict]:
+        """
+        Get the book parameters of pools, reading the missing or stale ones in one devInspect call
+
+        :param pool_keys: keys of the pools
+        :param refresh: if True every pool is read again
+        :returns: dictionary of tick size, lot size and min size keyed by pool key
+        """
+        now = time.monotonic()
+        stale = [
+            pool_key
+            for pool_key in dict.fromkeys(pool_keys)
+            if refresh
+            or pool_key not in self._book_params
+            or (self.max_age is not None and now - self._fetched[pool_key] > self.max_age)
+        ]
+        if stale:
+            self._store(self._client.pool_book_params_many(stale))
+        return {pool_key: self._book_params[pool_key] for pool_key in pool_keys}
+
+    def _store(self, book_params: Dict[str, dict]):
+        now = time.monotonic()
+        for pool_key, params in book_params.items():
+            self._book_params[pool_key] = dict(params)
+            self._fetched[pool_key] = now
+
+    def invalidate(self, pool_keys: Optional[Sequence[str]] = None):
+        """
+        Drop cached book parameters
+
+        :param pool_keys: keys of the pools, all pools when None
+        """
+        for pool_key in list(self._book_params) if pool_keys is None else pool_keys:
+            self._book_params.pop(pool_key, None)
+            self._fetched.pop(pool_key, None)
+
+    # Diffing
+    def _chain_units(self, base_coin_key: str, quote_coin_key: str, params: dict) -> dict:
+        """Book parameters as the u64 values stored on chain"""
+        base_scalar = self._client.config.get_coin(base_coin_key)["scalar"]
+        quote_scalar = self._client.config.get_coin(quote_coin_key)["scalar"]
+        units = {}
+        if params.get("tick_size") is not None:
+            units["tick_size"] = round(params["tick_size"] * FLOAT_SCALAR * quote_scalar / base_scalar)
+        for name in ("lot_size", "min_size"):
+            if params.get(name) is not None:
+                units[name] = round(params[name] * base_scalar)
+        return units
+
+    def plan(
+        self,
+        pools: Dict[str, dict],
+        add_stable_coins: Sequence[str] = (),
+        remove_stable_coins: Sequence[str] = (),
+        enable_versions: Sequence[int] = (),
+        disable_versions: Sequence[int] = (),
+        refresh: bool = False,
+    ) -> List[AdminAction]:
+        """
+        Work out the admin commands moving the pools to their desired book parameters
+
+        :param pools: desired ``tick_size``, ``lot_size`` and ``min_size`` keyed by pool key, a pool missing from the
+            config is created and also needs ``base_coin``, ``quote_coin`` and optionally ``whitelisted`` and
+            ``stable_pool``
+        :param add_stable_coins: keys of coins to add to the stable coins
+        :param remove_stable_coins: keys of coins to remove from the stable coins
+        :param enable_versions: package versions to enable
+        :param disable_versions: package versions to disable
+        :param refresh: if True the book parameters are read again instead of taken from the cache
+        :returns: list of AdminAction objects, stable coin additions and pool creations first
+        """
+        config = self._client.config
+        existing, created = [], []
+        for pool_key in pools:
+            try:
+                config.get_pool(pool_key)
+                existing.append(pool_key)
+            except KeyError:
+                created.append(pool_key)
+
+        # Stable pools can only be created once their coins are stable coins
+        actions = [AdminAction(ADD_STABLE_COIN, coin_key) for coin_key in add_stable_coins]
+        for pool_key in created:
+            desired = pools[pool_key]
+            missing = [
+                name for name in ("base_coin", "quote_coin", "tick_size", "lot_size", "min_size") if name not in desired
+            ]
+            if missing:
+                raise ValueError(f"Pool {pool_key} does not exist, creating it requires {', '.join(missing)}")
+            actions.append(
+                AdminAction(
+                    CREATE_POOL,
+                    pool_key,
+                    {
+                        "base_coin": desired["base_coin"],
+                        "quote_coin": desired["quote_coin"],
+                        "tick_size": desired["tick_size"],
+                        "lot_size": desired["lot_size"],
+                        "min_size": desired["min_size"],
+                        "whitelisted": desired.get("whitelisted", False),
+                        "stable_pool": desired.get("stable_pool", False),
+                    },
+                )
+            )
+
+        current = self.book_params(existing, refresh=refresh) if existing else {}
+        for pool_key in existing:
+            pool = config.get_pool(pool_key)
+            desired = self._chain_units(pool["base_coin"], pool["quote_coin"], pools[pool_key])
+            on_chain = self._chain_units(pool["base_coin"], pool["quote_coin"], current[pool_key])
+            if "tick_size" in desired and desired["tick_size"] != on_chain["tick_size"]:
+                actions.append(AdminAction(ADJUST_TICK_SIZE, pool_key, {"tick_size": pools[pool_key]["tick_size"]}))
+            if any(name in desired and desired[name] != on_chain[name] for name in ("lot_size", "min_size")):
+                # One call sets both, the one left out of the table keeps its current value
+                actions.append(
+                    AdminAction(
+                        ADJUST_MIN_SIZE,
+                        pool_key,
+                        {
+                            name: pools[pool_key].get(name, current[pool_key][name])
+                            for name in ("lot_size", "min_size")
+                        },
+                    )
+                )
+
+        actions.extend(AdminAction(REMOVE_STABLE_COIN, coin_key) for coin_key in remove_stable_coins)
+        actions.extend(AdminAction(ENABLE_VERSION, version) for version in enable_versions)
+        actions.extend(AdminAction(DISABLE_VERSION, version) for version in disable_versions)
+        return actions
+
+    # Building
+    def _build(self, action: AdminAction, tx: SyncTransaction):
+        admin = self._client.deepbook_admin
+        admin_cap = self._client.config.admin_cap
+        params = action.params
+        if action.kind == CREATE_POOL:
+            admin.create_pool_admin(
+                CreatePoolAdminParams(
+                    base_coin_key=params["base_coin"],
+                    quote_coin_key=params["quote_coin"],
+                    tick_size=params["tick_size"],
+                    lot_size=params["lot_size"],
+                    min_size=params["min_size"],
+                    whitelisted=params["whitelisted"],
+                    stable_pool=params["stable_pool"],
+                ),
+                admin_cap,
+                tx,
+            )
+        elif action.kind == ADJUST_TICK_SIZE:
+            admin.adjust_tick_size(action.key, params["tick_size"], tx)
+        elif action.kind == ADJUST_MIN_SIZE:
+            admin.adjust_min_size(action.key, params["lot_size"], params["min_size"], tx)
+        elif action.kind == ADD_STABLE_COIN:
+            admin.add_stable_coin(action.key, tx)
+        elif action.kind == REMOVE_STABLE_COIN:
+            admin.remove_stable_coin(action.key, tx)
+        elif action.kind == ENABLE_VERSION:
+            admin.enable_version(action.key, admin_cap, tx)
+        elif action.kind == DISABLE_VERSION:
+            admin.disable_version(action.key, admin_cap, tx)
+        else:
+            raise ValueError(f"Unknown admin action {action.kind}")
+
+    def _batches(self, actions: Sequence[AdminAction]) -> List[List[AdminAction]]:
+        return [list(actions[start : start + self.max_commands]) for start in range(0, len(actions), self.max_commands)]
+
+    def transactions(self, actions: Sequence[AdminAction]) -> List[SyncTransaction]:
+        """
+        Pack admin actions into the fewest transactions sent by the client address
+
+        :param actions: AdminAction objects returned by ``plan``
+        :returns: list of SyncTransaction objects
+        """
+        return [self._transaction(batch) for batch in self._batches(actions)]
+
+    def _transaction(self, batch: Sequence[AdminAction]) -> SyncTransaction:
+        tx = SyncTransaction(client=self._client.client, initial_sender=SuiAddress(self._client.config.address))
+        for action in batch:
+            self._build(action, tx)
+        return tx
+
+    # Execution
+    def apply(self, pools: Dict[str, dict], gas_budget: str = "", **changes) -> List[SuiRpcResult]:
+        """
+        Plan, build and execute the admin commands of a desired pool config table, updating the cache and
+        registering created pools in the config
+
+        :param pools: desired pool config table, see ``plan``
+        :param gas_budget: gas budget of each transaction, a dry-run sets it when empty
+        :param changes: stable coin and version changes, see ``plan``
+        :returns: list of SuiRpcResult of the transactions sent, empty when nothing changes
+        """
+        results = []
+        for batch in self._batches(self.plan(pools, **changes)):
+            tx = self._transaction(batch)
+            result = self._client.execute_transaction(tx, gas_budget=gas_budget, admin_commands=len(batch))
+            results.append(result)
+            if not result.is_ok() or not result.result_data.effects.status.succeeded:
+                error = result.result_string if not result.is_ok() else result.result_data.effects.status.error
+                raise ValueError(f"Admin transaction {len(results)} of the plan failed: {error}")
+            self._applied(batch, result.result_data.effects)
+        return results
+
+    def _applied(self, batch: Sequence[AdminAction], effects):
+        """Update the cache with the parameters set and register the pools created"""
+        created_pools = [action for action in batch if action.kind == CREATE_POOL]
+        if created_pools:
+            self._register(created_pools, effects)
+        for action in batch:
+            if action.kind == CREATE_POOL:
+                self._store({action.key: {name: action.params[name] for name in ("tick_size", "lot_size", "min_size")}})
+            elif action.kind in (ADJUST_TICK_SIZE, ADJUST_MIN_SIZE) and action.key in self._book_params:
+                self._book_params[action.key].update(action.params)
+
+    def _register(self, actions: Sequence[AdminAction], effects):
+        """Match the shared Pool objects created to their actions by coin types"""
+        config = self._client.config
+        shared = []
+        for item in effects.created or []:
+            owner = item.owner
+            if isinstance(owner, dict) and "initial_shared_version" in owner:
+                config.objects.add_shared(item.reference.object_id, owner["initial_shared_version"])
+                shared.append(item.reference.object_id)
+        result = self._client.client.get_objects_for([ObjectID(object_id) for object_id in shared])
+        if not result.is_ok():
+            raise ValueError(f"Unable to fetch the created pools: {result.result_string}")
+
+        pools = {}
+        for item in result.result_data:
+            object_type = item.object_type or ""
+            if "::pool::Pool<" in object_type:
+                base_type, quote_type = [part.strip() for part in object_type.split("<", 1)[1][:-1].split(",", 1)]
+                pools[(normalize_coin_type(base_type), normalize_coin_type(quote_type))] = item.object_id
+
+        for action in actions:
+            base_coin = config.get_coin(action.params["base_coin"])
+            quote_coin = config.get_coin(action.params["quote_coin"])
+            address = pools.get((normalize_coin_type(base_coin["type"]), normalize_coin_type(quote_coin["type"])))
+            if address is None:
+                raise ValueError(f"Created pool {action.key} not found in the transaction effects")
+            config.add_pool(action.key, address, action.params["base_coin"], action.params["quote_coin"])
+
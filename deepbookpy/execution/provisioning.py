@@ -0,0 +1,123 @@
+"""
+Fleet provisioning of balance managers and their caps.
+
+``provision_balance_managers`` creates many balance managers owned by the client address, mints their TradeCaps,
+DepositCap and WithdrawCap and shares them, ``managers_per_transaction`` managers to a transaction. The created
+objects are fetched once per transaction and matched to their manager by the cap's ``balance_manager_id``, so the
+result is a ``balance_managers`` mapping ready for ``DeepBookConfig``::
+
+    {"MM_0": {"address": ..., "trade_cap": ..., "deposit_cap": ..., "withdraw_cap": ..., "trade_caps": {...}}}
+
+``trade_caps`` maps every TradeCap recipient to its cap, e.g. for a ``SignerPool``. ``trade_cap`` is only set when
+the client address received one of them, since the builders prove as trader whenever it is set.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.address import SuiAddress
+from pysui.sui.sui_types.scalars import ObjectID
+
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.normalizer import normalize_sui_address, normalize_sui_object_id
+
+
+_CAP_KEYS = {"TradeCap": "trade_cap", "DepositCap": "deposit_cap", "WithdrawCap": "withdraw_cap"}
+
+
+def _struct_name(object_type: Optional[str]) -> str:
+    return (object_type or "").split("<", 1)[0].rsplit("::", 1)[-1]
+
+
+def _collect(deepbook_client: DeepBookClient, keys: Sequence[str], effects) -> Dict[str, dict]:
+    """Fetch the objects created by one provisioning transaction and build the entries of its managers"""
+    config = deepbook_client.config
+    created = effects.created or []
+    for item in created:
+        owner = item.owner
+        # Shared objects come with their initial shared version
+        if isinstance(owner, dict) and "initial_shared_version" in owner:
+            config.objects.add_shared(item.reference.object_id, owner["initial_shared_version"])
+
+    result = deepbook_client.client.get_objects_for([ObjectID(item.reference.object_id) for item in created])
+    if not result.is_ok():
+        raise ValueError(f"Unable to fetch the provisioned objects: {result.result_string}")
+
+    managers: List[str] = []
+    caps: Dict[str, List[tuple]] = {}
+    for item in result.result_data:
+        name = _struct_name(item.object_type)
+        if name == "BalanceManager":
+            managers.append(normalize_sui_object_id(item.object_id))
+        elif name in _CAP_KEYS:
+            manager_id = normalize_sui_object_id(item.content.fields["balance_manager_id"])
+            owner = getattr(item.owner, "address_owner", None)
+            caps.setdefault(manager_id, []).append((name, normalize_sui_object_id(item.object_id), owner))
+
+    if len(managers) != len(keys):
+        raise ValueError(f"Expected {len(keys)} balance managers, the transaction created {len(managers)}")
+
+    entries = {}
+    for key, manager_id in zip(keys, managers):
+        entry = {"address": manager_id, "trade_cap": "", "deposit_cap": "", "withdraw_cap": "", "trade_caps": {}}
+        for name, cap_id, owner in caps.get(manager_id, []):
+            if name == "TradeCap":
+                owner = normalize_sui_address(owner) if owner else ""
+                entry["trade_caps"][owner] = cap_id
+                if owner == config.address:
+                    entry["trade_cap"] = cap_id
+            else:
+                entry[_CAP_KEYS[name]] = cap_id
+        entries[key] = entry
+    return entries
+
+
+def provision_balance_managers(
+    deepbook_client: DeepBookClient,
+    keys: Sequence[str],
+    trade_cap_recipients: Sequence[str] = (),
+    deposit_cap_recipient: Optional[str] = None,
+    withdraw_cap_recipient: Optional[str] = None,
+    managers_per_transaction: int = 25,
+    gas_budget: str = "",
+    register: bool = True,
+) -> Dict[str, dict]:
+    """
+    Create balance managers with their caps in batched transactions
+
+    :param deepbook_client: DeepBookClient whose address owns the new balance managers
+    :param keys: keys of the new balance managers
+    :param trade_cap_recipients: addresses that each receive a TradeCap of every manager
+    :param deposit_cap_recipient: optional address receiving a DepositCap of every manager
+    :param withdraw_cap_recipient: optional address receiving a WithdrawCap of every manager
+    :param managers_per_transaction: balance managers created by each transaction
+    :param gas_budget: gas budget of each transaction, a dry-run sets it when empty
+    :param register: if True the managers are added to the client's config as they are created
+    :returns: balance_managers mapping of the new managers
+    """
+    config = deepbook_client.config
+    if len(set(keys)) != len(keys):
+        raise ValueError("Balance manager keys must be unique")
+    existing = [key for key in keys if key in config.balance_managers]
+    if existing:
+        raise ValueError(f"Balance managers {', '.join(existing)} already exist")
+
+    provisioned: Dict[str, dict] = {}
+    for start in range(0, len(keys), managers_per_transaction):
+        chunk = list(keys[start : start + managers_per_transaction])
+        tx = SyncTransaction(client=deepbook_client.client, initial_sender=SuiAddress(config.address))
+        for _ in chunk:
+            deepbook_client.balance_manager.create_and_share_balance_manager_with_caps(
+                tx, trade_cap_recipients, deposit_cap_recipient, withdraw_cap_recipient
+            )
+
+        result = deepbook_client.execute_transaction(tx, gas_budget=gas_budget, balance_managers=len(chunk))
+        if not result.is_ok() or not result.result_data.effects.status.succeeded:
+            error = result.result_string if not result.is_ok() else result.result_data.effects.status.error
+            raise ValueError(f"Provisioning failed after {len(provisioned)} balance managers: {error}")
+
+        entries = _collect(deepbook_client, chunk, result.result_data.effects)
+        provisioned.update(entries)
+        if register:
+            config.balance_managers.update(entries)
+    return provisioned
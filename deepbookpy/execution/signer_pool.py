@@ -0,0 +1,270 @@
+"""
+Order flow sharded across several trader addresses of one BalanceManager.
+
+Transactions of one sender queue behind each other on its owned objects, its gas coins first. ``SignerPool`` spreads
+orders across trader addresses, each holding its own TradeCap on the same BalanceManager and paying with its own gas
+coins, so their transactions run side by side.
+
+Each signer is registered in the config as an alias balance manager key, ``"<manager key>@<address>"``, holding the
+BalanceManager address and the signer's TradeCap, so the regular builders generate the trader proof. The signer's
+address is the sender of its transactions, its key has to be in the keystore of the ``SyncClient``.
+
+Missing TradeCaps are minted by the BalanceManager owner in one transaction with ``mint_trade_caps``. Orders are
+assigned to signers in turn with ``ROUND_ROBIN``, or with ``BY_POOL`` every pool sticks to one signer, the signer
+trading the fewest pools when the pool is first seen, which keeps the orders of a pool in sequence.
+"""
+
+import itertools
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional, Sequence, Union
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.address import SuiAddress
+
+from deepbookpy.custom_types import PlaceLimitOrderParams, PlaceMarketOrderParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.execution.gas_pool import MIST_PER_SUI, GasCoinPool
+from deepbookpy.utils.normalizer import normalize_sui_address, normalize_sui_object_id
+
+
+ROUND_ROBIN = "round_robin"
+BY_POOL = "by_pool"
+
+
+@dataclass
+class Signer:
+    address: str
+    balance_manager_key: str
+    trade_cap: Optional[str] = None
+    gas_pool: Optional[GasCoinPool] = None
+    pool_keys: List[str] = field(default_factory=list)
+    orders: int = 0
+
+
+class SignerPool:
+    """Trader addresses with their own TradeCap on one BalanceManager, orders are assigned across them"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        balance_manager_key: str,
+        addresses: Sequence[str],
+        trade_caps: Optional[Dict[str, str]] = None,
+        assignment: str = ROUND_ROBIN,
+        gas_coins: int = 0,
+        coin_balance: int = MIST_PER_SUI,
+    ):
+        """
+        Initializes the SignerPool class.
+
+        :param deepbook_client: DeepBookClient whose SyncClient holds the keys of every signer
+        :param balance_manager_key: key of the shared BalanceManager
+        :param addresses: trader addresses
+        :param trade_caps: optional dictionary of addresses to the IDs of the TradeCaps they already hold
+        :param assignment: ``ROUND_ROBIN`` or ``BY_POOL``
+        :param gas_coins: number of gas coins of each signer's GasCoinPool, 0 pays with a dry-run and coin selection
+        :param coin_balance: balance of each gas coin, in MIST
+        """
+        if assignment not in (ROUND_ROBIN, BY_POOL):
+            raise ValueError(f"Unknown assignment {assignment}")
+        if not addresses:
+            raise ValueError("At least one signer address is required")
+
+        self._client = deepbook_client
+        self.balance_manager_key = balance_manager_key
+        self.assignment = assignment
+        deepbook_client.config.get_balance_manager(balance_manager_key)
+        trade_caps = {normalize_sui_address(address): cap for address, cap in (trade_caps or {}).items()}
+
+        self.signers: Dict[str, Signer] = {}
+        for address in addresses:
+            address = normalize_sui_address(address)
+            if address in self.signers:
+                raise ValueError(f"Signer {address} is listed twice")
+            signer = Signer(address=address, balance_manager_key=f"{balance_manager_key}@{address}")
+            if gas_coins:
+                signer.gas_pool = GasCoinPool(
+                    deepbook_client.client, coins=gas_coins, coin_balance=coin_balance, owner=address
+                )
+            self.signers[address] = signer
+            self._set_trade_cap(signer, trade_caps.get(address))
+
+        self._lock = threading.Lock()
+        self._cycle = itertools.cycle(list(self.signers.values()))
+        self._pools: Dict[str, Signer] = {}
+
+    def __len__(self) -> int:
+        return len(self.signers)
+
+    def __iter__(self):
+        return iter(self.signers.values())
+
+    def _set_trade_cap(self, signer: Signer, trade_cap: Optional[str]):
+        """Register the alias balance manager key of a signer with its TradeCap"""
+        config = self._client.config
+        manager = config.get_balance_manager(self.balance_manager_key)
+        signer.trade_cap = normalize_sui_object_id(trade_cap) if trade_cap else None
+        config.balance_managers[signer.balance_manager_key] = {
+            "address": manager["address"],
+            "trade_cap": signer.trade_cap or "",
+        }
+
+    @property
+    def missing_trade_caps(self) -> List[Signer]:
+        """Signers without a TradeCap, other than the BalanceManager owner proving as owner"""
+        owner = self._client.config.address
+        return [signer for signer in self if signer.trade_cap is None and signer.address != owner]
+
+    # Provisioning
+    def mint_trade_caps(self, gas_budget: str = "") -> Optional[SuiRpcResult]:
+        """
+        Mint a TradeCap for every signer missing one, in one transaction sent by the BalanceManager owner
+
+        :param gas_budget: gas budget, a dry-run sets it when empty
+        :returns: SuiRpcResult of the transaction, None if every signer holds a TradeCap
+        """
+        missing = self.missing_trade_caps
+        if not missing:
+            return None
+
+        tx = SyncTransaction(client=self._client.client, initial_sender=SuiAddress(self._client.config.address))
+        for signer in missing:
+            self._client.balance_manager.mint_trade_cap(self.balance_manager_key, signer.address, tx)
+        result = self._client.execute_transaction(
+            tx, gas_budget=gas_budget, balance_manager_key=self.balance_manager_key
+        )
+        if not result.is_ok():
+            raise ValueError(f"Unable to mint trade caps: {result.result_string}")
+        effects = result.result_data.effects
+        if not effects.status.succeeded:
+            return result
+
+        # One TradeCap was sent to each signer, matched by the address owning it
+        for created in effects.created or []:
+            owner = getattr(created.owner, "address_owner", created.owner)
+            signer = self.signers.get(normalize_sui_address(owner)) if isinstance(owner, str) else None
+            if signer is not None and signer.trade_cap is None:
+                self._set_trade_cap(signer, created.reference.object_id)
+        return result
+
+    def provision_gas(self) -> List[SuiRpcResult]:
+        """
+        Provision the GasCoinPool of every signer
+
+        :returns: list of SuiRpcResult of the split transactions sent
+        """
+        results = []
+        for signer in self:
+            if signer.gas_pool is not None:
+                result = signer.gas_pool.provision()
+                if result is not None:
+                    results.append(result)
+        return results
+
+    # Assignment
+    def signer_for(self, pool_key: Optional[str] = None) -> Signer:
+        """
+        Pick the signer of the next order
+
+        :param pool_key: key of the pool traded, required with ``BY_POOL``
+        :returns: Signer object
+        """
+        with self._lock:
+            if self.assignment == ROUND_ROBIN:
+                signer = next(self._cycle)
+            else:
+                if pool_key is None:
+                    raise ValueError("pool_key is required with BY_POOL assignment")
+                signer = self._pools.get(pool_key)
+                if signer is None:
+                    signer = min(self, key=lambda candidate: len(candidate.pool_keys))
+                    signer.pool_keys.append(pool_key)
+                    self._pools[pool_key] = signer
+            signer.orders += 1
+        return signer
+
+    def assign(self, pool_key: str, address: str):
+        """
+        Pin a pool to a signer
+
+        :param pool_key: key of the pool
+        :param address: address of the signer
+        """
+        signer = self.signers[normalize_sui_address(address)]
+        with self._lock:
+            previous = self._pools.get(pool_key)
+            if previous is not None:
+                previous.pool_keys.remove(pool_key)
+            signer.pool_keys.append(pool_key)
+            self._pools[pool_key] = signer
+
+    # Building
+    def new_transaction(self, signer: Signer) -> SyncTransaction:
+        """
+        Create a transaction sent by a signer
+
+        :param signer: Signer object
+        :returns: SyncTransaction object
+        """
+        return SyncTransaction(client=self._client.client, initial_sender=SuiAddress(signer.address))
+
+    def order_params(
+        self, signer: Signer, params: Union[PlaceLimitOrderParams, PlaceMarketOrderParams]
+    ) -> Union[PlaceLimitOrderParams, PlaceMarketOrderParams]:
+        """
+        Point the order parameters at the signer's alias balance manager key, so the trader proof is generated
+
+        :param signer: Signer object
+        :param params: PlaceLimitOrderParams or PlaceMarketOrderParams object
+        :returns: copy of the parameters
+        """
+        return replace(params, balance_manager_key=signer.balance_manager_key)
+
+    def _execute(self, signer: Signer, tx: SyncTransaction, gas_budget: Union[str, int], **attributes):
+        if signer.gas_pool is not None:
+            return signer.gas_pool.execute(
+                tx, int(gas_budget or 50_000_000), tracer=self._client.config.tracer, **attributes
+            )
+        return self._client.execute_transaction(tx, gas_budget=str(gas_budget or ""), **attributes)
+
+    def place_limit_order(self, params: PlaceLimitOrderParams, gas_budget: Union[str, int] = "") -> SuiRpcResult:
+        """
+        Place a limit order from the signer assigned to its pool
+
+        :param params: PlaceLimitOrderParams object, its balance manager key is replaced by the signer's
+        :param gas_budget: gas budget, a dry-run sets it when empty and the signer has no GasCoinPool
+        :returns: SuiRpcResult object
+        """
+        signer = self.signer_for(params.pool_key)
+        tx = self.new_transaction(signer)
+        self._client.deepbook.place_limit_order(self.order_params(signer, params), tx)
+        return self._execute(
+            signer,
+            tx,
+            gas_budget,
+            client_order_id=params.client_order_id,
+            pool_key=params.pool_key,
+            signer=signer.address,
+        )
+
+    def place_market_order(self, params: PlaceMarketOrderParams, gas_budget: Union[str, int] = "") -> SuiRpcResult:
+        """
+        Place a market order from the signer assigned to its pool
+
+        :param params: PlaceMarketOrderParams object, its balance manager key is replaced by the signer's
+        :param gas_budget: gas budget, a dry-run sets it when empty and the signer has no GasCoinPool
+        :returns: SuiRpcResult object
+        """
+        signer = self.signer_for(params.pool_key)
+        tx = self.new_transaction(signer)
+        self._client.deepbook.place_market_order(self.order_params(signer, params), tx)
+        return self._execute(
+            signer,
+            tx,
+            gas_budget,
+            client_order_id=params.client_order_id,
+            pool_key=params.pool_key,
+            signer=signer.address,
+        )
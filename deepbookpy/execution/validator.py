@@ -0,0 +1,248 @@
+"""
+Parallel validation of built transactions before they are sent.
+
+``BatchValidator`` dry-runs or dev-inspects many built transactions at once from a thread pool and reports, for each
+one, whether it would abort and why. Move aborts of the DeepBook modules are mapped to readable errors with
+``ABORT_CODES``, e.g. an order price off the tick size or a balance manager short of funds.
+
+The gas used by every transaction passing validation is recorded per transaction shape in a ``GasModel``, the
+client's own when it was created with one, so the transactions sent afterwards get tight budgets.
+
+- ``DEV_INSPECT`` runs the commands without gas coins or signatures, the checks of the Move code only
+- ``DRY_RUN`` serializes the full transaction with its gas payment and budget, also checking the gas coins
+"""
+
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from pysui.sui.sui_builders.exec_builders import DryRunTransaction
+from pysui.sui.sui_txn.sync_transaction import SuiTransaction
+
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.gas_model import GasModel, transaction_shape
+
+
+DEV_INSPECT = "dev_inspect"
+DRY_RUN = "dry_run"
+
+# Abort codes of the DeepBook v3 modules
+ABORT_CODES = {
+    "balance_manager": {
+        0: "Sender is not the balance manager owner",
+        1: "Trade proof does not belong to the balance manager",
+        2: "Trade cap, deposit cap or withdraw cap was revoked or belongs to another balance manager",
+        3: "Balance manager balance too low",
+        4: "Balance manager has the maximum number of trade caps",
+        5: "Trade cap is not in the balance manager's list",
+    },
+    "order_info": {
+        0: "Order price is out of range or not a multiple of the tick size",
+        1: "Order quantity is below the pool minimum size",
+        2: "Order quantity is not a multiple of the lot size",
+        3: "Order expiration is in the past",
+        4: "Invalid order type",
+        5: "Post only order crosses the order book",
+        6: "Fill or kill order cannot be fully filled",
+        7: "Market order cannot be post only",
+        8: "Self matching option cancel taker matched an own order",
+    },
+    "book": {
+        1: "Invalid input quantity",
+        2: "Order book is empty",
+        3: "Invalid price range",
+        4: "Invalid number of ticks",
+        5: "Order quantity is below the pool minimum size",
+        6: "Order quantity is not a multiple of the lot size",
+        7: "New quantity must be less than the original quantity",
+    },
+    "pool": {
+        1: "Invalid fee",
+        2: "Base and quote assets are the same",
+        3: "Invalid tick size",
+        4: "Invalid lot size",
+        5: "Invalid minimum size",
+        6: "Invalid input quantity",
+        7: "Reference pool is not eligible",
+        9: "Order does not belong to the balance manager",
+        10: "Target pool is not eligible",
+        11: "Package version is disabled for the pool",
+        12: "Minimum output quantity not met",
+        13: "Invalid stake amount",
+        14: "Pool is not registered",
+        15: "Pool cannot be both whitelisted and stable",
+    },
+    "vault": {
+        1: "Not enough base asset in the pool for the loan",
+        2: "Not enough quote asset in the pool for the loan",
+        3: "Invalid loan quantity",
+        4: "Flash loan returned to the wrong pool",
+        5: "Flash loan returned with the wrong asset type",
+        6: "Flash loan returned with the wrong quantity",
+    },
+    "balance": {
+        2: "Insufficient balance",
+    },
+}
+
+_MOVE_ABORT = re.compile(
+    r'MoveAbort\(MoveLocation \{ module: ModuleId \{ address: (?P<address>\w+), '
+    r'name: Identifier\("(?P<module>\w+)"\) \}.*?function_name: (?:Some\("(?P<function>\w+)"\)|None) \}, '
+    r"(?P<code>\d+)\)(?: in command (?P<command>\d+))?"
+)
+
+
+@dataclass
+class MoveAbort:
+    module: str
+    function: Optional[str]
+    code: int
+    command: Optional[int]
+    message: str
+
+
+def parse_abort(error: Optional[str]) -> Optional[MoveAbort]:
+    """
+    Parse the Move abort of a transaction error
+
+    :param error: error of the transaction effects status
+    :returns: MoveAbort object, None if the error is not a Move abort
+    """
+    match = _MOVE_ABORT.search(error or "")
+    if match is None:
+        return None
+    module, code = match["module"], int(match["code"])
+    message = ABORT_CODES.get(module, {}).get(code, f"Abort code {code} in module {module}")
+    return MoveAbort(
+        module=module,
+        function=match["function"],
+        code=code,
+        command=int(match["command"]) if match["command"] is not None else None,
+        message=message,
+    )
+
+
+@dataclass
+class ValidationResult:
+    index: int
+    shape: str
+    succeeded: bool
+    error: Optional[str] = None
+    abort: Optional[MoveAbort] = None
+    computation_cost: int = 0
+    storage_cost: int = 0
+    storage_rebate: int = 0
+    result: object = None
+
+    @property
+    def gas_used(self) -> int:
+        return self.computation_cost + self.storage_cost - self.storage_rebate
+
+    @property
+    def reason(self) -> Optional[str]:
+        """Readable failure reason, the abort message when the transaction aborted"""
+        if self.abort is not None:
+            return self.abort.message
+        return self.error
+
+
+class BatchValidator:
+    """Dry-runs or dev-inspects built transactions concurrently"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        gas_model: Optional[GasModel] = None,
+        mode: str = DEV_INSPECT,
+        workers: int = 8,
+        gas_budget: Optional[int] = None,
+    ):
+        """
+        Initializes the BatchValidator class.
+
+        :param deepbook_client: DeepBookClient whose SyncClient runs the requests
+        :param gas_model: GasModel fed with the gas used, defaults to the client's, or a new one when it has none
+        :param mode: ``DEV_INSPECT`` or ``DRY_RUN``
+        :param workers: number of concurrent requests
+        :param gas_budget: budget of dry-run transactions, defaults to the gas model's budget of their shape
+        """
+        if mode not in (DEV_INSPECT, DRY_RUN):
+            raise ValueError(f"Unknown validation mode {mode}")
+        self._client = deepbook_client
+        if gas_model is None:
+            gas_model = deepbook_client.config.gas_model
+        if gas_model is None:
+            gas_model = GasModel()
+        self.gas_model = gas_model
+        self.mode = mode
+        self.workers = workers
+        self.gas_budget = gas_budget
+
+    def validate_one(self, tx: SuiTransaction, index: int = 0) -> ValidationResult:
+        """
+        Validate one transaction
+
+        :param tx: SuiTransaction object
+        :param index: position of the transaction in its batch
+        :returns: ValidationResult object
+        """
+        shape = transaction_shape(tx)
+        try:
+            response = self._run(tx, shape)
+        except Exception as e:
+            return ValidationResult(index=index, shape=shape, succeeded=False, error=str(e))
+        if not hasattr(response, "effects"):
+            # SuiRpcResult of a failed request
+            return ValidationResult(
+                index=index, shape=shape, succeeded=False, error=response.result_string, result=response
+            )
+
+        effects = response.effects
+        gas_used = effects.gas_used
+        error = effects.status.error or getattr(response, "error", None) or None
+        validation = ValidationResult(
+            index=index,
+            shape=shape,
+            succeeded=effects.status.succeeded,
+            error=error,
+            abort=parse_abort(error),
+            computation_cost=int(gas_used.computation_cost),
+            storage_cost=int(gas_used.storage_cost),
+            storage_rebate=int(gas_used.storage_rebate),
+            result=response,
+        )
+        if validation.succeeded:
+            self.gas_model.record(shape, effects)
+        return validation
+
+    def _run(self, tx: SuiTransaction, shape: str):
+        if self.mode == DEV_INSPECT:
+            return tx.inspect_all()
+
+        gas_budget = self.gas_budget or self.gas_model.budget(shape)
+        tx_bytes = tx.deferred_execution(gas_budget=str(gas_budget))
+        result = tx.client.execute(DryRunTransaction(tx_bytes=tx_bytes))
+        return result.result_data if result.is_ok() else result
+
+    def validate(self, transactions: Sequence[SuiTransaction]) -> List[ValidationResult]:
+        """
+        Validate a batch of transactions concurrently
+
+        :param transactions: built SuiTransaction objects
+        :returns: list of ValidationResult objects, in the order of the transactions
+        """
+        if len(transactions) <= 1 or self.workers <= 1:
+            return [self.validate_one(tx, index) for index, tx in enumerate(transactions)]
+        with ThreadPoolExecutor(max_workers=min(self.workers, len(transactions))) as pool:
+            return list(pool.map(self.validate_one, transactions, range(len(transactions))))
+
+    @staticmethod
+    def failures(results: Sequence[ValidationResult]) -> List[ValidationResult]:
+        """
+        Get the transactions that would fail
+
+        :param results: ValidationResult objects returned by ``validate``
+        :returns: list of failed ValidationResult objects
+        """
+        return [result for result in results if not result.succeeded]
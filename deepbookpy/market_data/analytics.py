@@ -0,0 +1,184 @@
+"""
+Order book analytics on the array form of Level 2 data.
+
+Books are price and quantity sequences per side sorted from the best level, bids descending and asks ascending, in
+any consistent units: the on-chain integers of ``get_level2_snapshots`` or human readable values.
+
+The functions compute one metric for one book. ``BookAnalytics`` computes every metric for a batch of pools into
+preallocated ``array("d")`` columns indexed like the batch, so a strategy loop reads the results without allocating
+on every tick. Undefined values, such as a microprice with an empty side, are NaN, as are the rows past the last
+batch, whose size is kept in ``count``.
+"""
+
+from array import array
+from math import nan
+from typing import Sequence
+
+from deepbookpy.market_data.level2 import book_sides
+
+
+def microprice(
+    bid_prices: Sequence, bid_quantities: Sequence, ask_prices: Sequence, ask_quantities: Sequence
+) -> float:
+    """
+    Get the size weighted mid price of the best levels
+
+    :param bid_prices: bid prices, best first
+    :param bid_quantities: bid quantities
+    :param ask_prices: ask prices, best first
+    :param ask_quantities: ask quantities
+    :returns: microprice, NaN if a side is empty
+    """
+    if not bid_prices or not ask_prices:
+        return nan
+    bid_quantity, ask_quantity = bid_quantities[0], ask_quantities[0]
+    total = bid_quantity + ask_quantity
+    if not total:
+        return (bid_prices[0] + ask_prices[0]) / 2
+    return (bid_prices[0] * ask_quantity + ask_prices[0] * bid_quantity) / total
+
+
+def imbalance(bid_quantities: Sequence, ask_quantities: Sequence, levels: int = 5) -> float:
+    """
+    Get the quantity imbalance of the top levels
+
+    :param bid_quantities: bid quantities, best first
+    :param ask_quantities: ask quantities, best first
+    :param levels: number of levels per side
+    :returns: imbalance between -1 (only asks) and 1 (only bids), NaN if both sides are empty
+    """
+    bid_quantity = sum(bid_quantities[:levels])
+    ask_quantity = sum(ask_quantities[:levels])
+    total = bid_quantity + ask_quantity
+    return (bid_quantity - ask_quantity) / total if total else nan
+
+
+def depth_within(
+    prices: Sequence, quantities: Sequence, reference_price: float, bps: float, is_bid: bool
+) -> float:
+    """
+    Get the quantity of one side within a distance of a reference price
+
+    :param prices: prices of the side, best first
+    :param quantities: quantities of the side
+    :param reference_price: reference price, usually the mid price
+    :param bps: distance in basis points
+    :param is_bid: side of the levels
+    :returns: quantity within the distance
+    """
+    if is_bid:
+        limit = reference_price * (1 - bps / 10_000)
+    else:
+        limit = reference_price * (1 + bps / 10_000)
+
+    depth = 0
+    for price, quantity in zip(prices, quantities):
+        if price < limit if is_bid else price > limit:
+            break
+        depth += quantity
+    return depth
+
+
+def vwap_to_size(prices: Sequence, quantities: Sequence, size: float) -> float:
+    """
+    Get the average price of taking a size from one side
+
+    :param prices: prices of the side, best first
+    :param quantities: quantities of the side
+    :param size: quantity to take
+    :returns: volume weighted average price, NaN if the side holds less than the size
+    """
+    remaining = size
+    notional = 0
+    for price, quantity in zip(prices, quantities):
+        if quantity >= remaining:
+            return (notional + price * remaining) / size
+        notional += price * quantity
+        remaining -= quantity
+    return nan
+
+
+class BookAnalytics:
+    """Metrics of a batch of books written into preallocated columns"""
+
+    COLUMNS = (
+        "mid_price",
+        "spread",
+        "microprice",
+        "imbalance",
+        "bid_depth",
+        "ask_depth",
+        "buy_vwap",
+        "sell_vwap",
+    )
+
+    def __init__(self, pools: int, levels: int = 5, depth_bps: float = 10, vwap_size: float = 0):
+        """
+        Initializes the BookAnalytics class.
+
+        :param pools: number of books per batch
+        :param levels: number of levels per side used for the imbalance
+        :param depth_bps: distance from mid in basis points used for the depth
+        :param vwap_size: size used for the buy and sell VWAP, skipped and NaN when 0
+        """
+        self.pools = pools
+        self.levels = levels
+        self.depth_bps = depth_bps
+        self.vwap_size = vwap_size
+        self.count = 0
+        for name in self.COLUMNS:
+            setattr(self, name, array("d", [nan]) * pools)
+
+    def update(self, books: Sequence) -> "BookAnalytics":
+        """
+        Compute every metric for a batch of books, in place
+
+        :param books: sequence of at most ``pools`` books, dictionaries or objects with level 2 price and quantity
+            sequences
+        :returns: self, results are read from the columns, e.g. ``analytics.microprice[index]``, rows past
+            ``len(books)`` are NaN
+        """
+        if len(books) > self.pools:
+            raise ValueError(f"Batch of {len(books)} books exceeds the {self.pools} preallocated rows")
+
+        mid_column, spread_column = self.mid_price, self.spread
+        microprice_column, imbalance_column = self.microprice, self.imbalance
+        bid_depth_column, ask_depth_column = self.bid_depth, self.ask_depth
+        buy_vwap_column, sell_vwap_column = self.buy_vwap, self.sell_vwap
+        levels, depth_bps, vwap_size = self.levels, self.depth_bps, self.vwap_size
+
+        for index, book in enumerate(books):
+            bid_prices, bid_quantities, ask_prices, ask_quantities = book_sides(book)
+
+            if bid_prices and ask_prices:
+                mid = (bid_prices[0] + ask_prices[0]) / 2
+                mid_column[index] = mid
+                spread_column[index] = ask_prices[0] - bid_prices[0]
+                bid_depth_column[index] = depth_within(bid_prices, bid_quantities, mid, depth_bps, True)
+                ask_depth_column[index] = depth_within(ask_prices, ask_quantities, mid, depth_bps, False)
+            else:
+                mid_column[index] = spread_column[index] = nan
+                bid_depth_column[index] = ask_depth_column[index] = nan
+
+            microprice_column[index] = microprice(bid_prices, bid_quantities, ask_prices, ask_quantities)
+            imbalance_column[index] = imbalance(bid_quantities, ask_quantities, levels)
+            if vwap_size:
+                buy_vwap_column[index] = vwap_to_size(ask_prices, ask_quantities, vwap_size)
+                sell_vwap_column[index] = vwap_to_size(bid_prices, bid_quantities, vwap_size)
+
+        # Clear the rows the previous batch filled beyond this one
+        for index in range(len(books), self.count):
+            for name in self.COLUMNS:
+                getattr(self, name)[index] = nan
+        self.count = len(books)
+
+        return self
+
+    def row(self, index: int) -> dict:
+        """
+        Get every metric of one book
+
+        :param index: position of the book in the batch
+        :returns: dictionary of metric values
+        """
+        return {name: getattr(self, name)[index] for name in self.COLUMNS}
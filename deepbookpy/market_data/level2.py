@@ -0,0 +1,267 @@
+"""
+Level 2 deltas between successive snapshots of a pool.
+
+Each side is a pair of price and quantity sequences sorted from the best level, bids descending and asks ascending,
+as returned by ``get_level2_ticks_from_mid`` and ``DeepBookClient.get_level2_snapshots``. Sides are compared with
+a single merge pass over the sorted prices. A delta lists the added and changed levels with their new quantity and
+the removed levels with a quantity of 0.
+
+``Level2DeltaStream`` turns successive snapshots into delta messages with a full checkpoint every
+``checkpoint_interval`` messages, and ``Level2Rebuilder`` rebuilds full books from those messages.
+"""
+
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+
+class Level2Update(NamedTuple):
+    pool_key: str
+    sequence: int
+    timestamp: int
+    is_checkpoint: bool
+    bid_prices: List
+    bid_quantities: List
+    ask_prices: List
+    ask_quantities: List
+
+    @property
+    def levels(self) -> int:
+        return len(self.bid_prices) + len(self.ask_prices)
+
+
+def book_sides(snapshot) -> tuple:
+    """
+    Get the price and quantity sequences of a snapshot
+
+    :param snapshot: dictionary or object with ``bid_prices``, ``bid_quantities``, ``ask_prices`` and ``ask_quantities``
+    :returns: tuple of bid prices, bid quantities, ask prices and ask quantities
+    """
+    if isinstance(snapshot, dict):
+        return (
+            snapshot["bid_prices"],
+            snapshot["bid_quantities"],
+            snapshot["ask_prices"],
+            snapshot["ask_quantities"],
+        )
+    return snapshot.bid_prices, snapshot.bid_quantities, snapshot.ask_prices, snapshot.ask_quantities
+
+
+def diff_side(
+    previous_prices: Sequence,
+    previous_quantities: Sequence,
+    prices: Sequence,
+    quantities: Sequence,
+    descending: bool,
+) -> Tuple[List, List]:
+    """
+    Get the levels of one side that changed between two snapshots
+
+    :param previous_prices: prices of the previous snapshot, sorted from the best level
+    :param previous_quantities: quantities of the previous snapshot
+    :param prices: prices of the current snapshot, sorted from the best level
+    :param quantities: quantities of the current snapshot
+    :param descending: True for bids, False for asks
+    :returns: tuple of changed prices and their new quantities, 0 for removed levels
+    """
+    changed_prices, changed_quantities = [], []
+    i, j = 0, 0
+    previous_count, count = len(previous_prices), len(prices)
+
+    while i < previous_count and j < count:
+        previous_price, price = previous_prices[i], prices[j]
+        if previous_price == price:
+            if previous_quantities[i] != quantities[j]:
+                changed_prices.append(price)
+                changed_quantities.append(quantities[j])
+            i += 1
+            j += 1
+        elif (previous_price > price) == descending:
+            # Level only in the previous snapshot
+            changed_prices.append(previous_price)
+            changed_quantities.append(0)
+            i += 1
+        else:
+            changed_prices.append(price)
+            changed_quantities.append(quantities[j])
+            j += 1
+
+    for index in range(i, previous_count):
+        changed_prices.append(previous_prices[index])
+        changed_quantities.append(0)
+    changed_prices.extend(prices[j:])
+    changed_quantities.extend(quantities[j:])
+
+    return changed_prices, changed_quantities
+
+
+def apply_side(
+    prices: Sequence,
+    quantities: Sequence,
+    delta_prices: Sequence,
+    delta_quantities: Sequence,
+    descending: bool,
+) -> Tuple[List, List]:
+    """
+    Apply the changed levels of one side, as returned by ``diff_side``
+
+    :param prices: current prices, sorted from the best level
+    :param quantities: current quantities
+    :param delta_prices: changed prices, sorted from the best level
+    :param delta_quantities: new quantities, 0 removes the level
+    :param descending: True for bids, False for asks
+    :returns: tuple of updated prices and quantities
+    """
+    new_prices, new_quantities = [], []
+    i, j = 0, 0
+    count, delta_count = len(prices), len(delta_prices)
+
+    while i < count and j < delta_count:
+        price, delta_price = prices[i], delta_prices[j]
+        if price == delta_price:
+            if delta_quantities[j]:
+                new_prices.append(price)
+                new_quantities.append(delta_quantities[j])
+            i += 1
+            j += 1
+        elif (price > delta_price) == descending:
+            new_prices.append(price)
+            new_quantities.append(quantities[i])
+            i += 1
+        else:
+            if delta_quantities[j]:
+                new_prices.append(delta_price)
+                new_quantities.append(delta_quantities[j])
+            j += 1
+
+    new_prices.extend(prices[i:])
+    new_quantities.extend(quantities[i:])
+    for index in range(j, delta_count):
+        if delta_quantities[index]:
+            new_prices.append(delta_prices[index])
+            new_quantities.append(delta_quantities[index])
+
+    return new_prices, new_quantities
+
+
+def diff(previous, current) -> tuple:
+    """
+    Get the levels that changed between two snapshots of a pool
+
+    :param previous: previous snapshot, a dictionary or object with level 2 price and quantity sequences
+    :param current: current snapshot
+    :returns: tuple of changed bid prices, bid quantities, ask prices and ask quantities
+    """
+    previous_bid_prices, previous_bid_quantities, previous_ask_prices, previous_ask_quantities = book_sides(previous)
+    bid_prices, bid_quantities, ask_prices, ask_quantities = book_sides(current)
+    return diff_side(
+        previous_bid_prices, previous_bid_quantities, bid_prices, bid_quantities, True
+    ) + diff_side(previous_ask_prices, previous_ask_quantities, ask_prices, ask_quantities, False)
+
+
+class Level2DeltaStream:
+    """Turns successive snapshots of pools into delta messages with periodic checkpoints"""
+
+    def __init__(self, checkpoint_interval: int = 100, skip_empty: bool = True):
+        """
+        Initializes the Level2DeltaStream class.
+
+        :param checkpoint_interval: a full snapshot is emitted every this many messages of a pool
+        :param skip_empty: if True snapshots without any change emit no message
+        """
+        self.checkpoint_interval = checkpoint_interval
+        self.skip_empty = skip_empty
+        self._books: Dict[str, tuple] = {}
+        self._sequences: Dict[str, int] = {}
+
+    def update(self, pool_key: str, snapshot, timestamp: int = 0) -> Optional[Level2Update]:
+        """
+        Get the message for a new snapshot of a pool
+
+        :param pool_key: key of the pool
+        :param snapshot: dictionary or object with level 2 price and quantity sequences
+        :param timestamp: timestamp of the snapshot
+        :returns: Level2Update object, or None if nothing changed and empty messages are skipped
+        """
+        sides = tuple(list(side) for side in book_sides(snapshot))
+        previous = self._books.get(pool_key)
+        sequence = self._sequences.get(pool_key, -1) + 1
+        self._books[pool_key] = sides
+
+        if previous is None or sequence % self.checkpoint_interval == 0:
+            self._sequences[pool_key] = sequence
+            return Level2Update(pool_key, sequence, timestamp, True, *sides)
+
+        changes = diff_side(previous[0], previous[1], sides[0], sides[1], True) + diff_side(
+            previous[2], previous[3], sides[2], sides[3], False
+        )
+        if self.skip_empty and not changes[0] and not changes[2]:
+            return None
+
+        self._sequences[pool_key] = sequence
+        return Level2Update(pool_key, sequence, timestamp, False, *changes)
+
+    def stream(self, pool_key: str, snapshots: Iterable) -> Iterator[Level2Update]:
+        """
+        Turn a stream of snapshots of a pool into messages
+
+        :param pool_key: key of the pool
+        :param snapshots: iterable of snapshots with a ``timestamp`` member, e.g. from the backtest column readers
+        :returns: iterator of Level2Update objects
+        """
+        for snapshot in snapshots:
+            update = self.update(pool_key, snapshot, snapshot.timestamp)
+            if update is not None:
+                yield update
+
+
+class Level2Rebuilder:
+    """Rebuilds full books from delta messages"""
+
+    def __init__(self):
+        self._books: Dict[str, tuple] = {}
+        self._sequences: Dict[str, int] = {}
+
+    def apply(self, update: Level2Update) -> bool:
+        """
+        Apply a message
+
+        A gap in the sequence of a pool drops its book until the next checkpoint.
+
+        :param update: Level2Update object
+        :returns: True if the book of the pool is up to date
+        """
+        pool_key = update.pool_key
+        if update.is_checkpoint:
+            self._books[pool_key] = (
+                list(update.bid_prices),
+                list(update.bid_quantities),
+                list(update.ask_prices),
+                list(update.ask_quantities),
+            )
+        else:
+            book = self._books.get(pool_key)
+            if book is None or update.sequence != self._sequences[pool_key] + 1:
+                self._books.pop(pool_key, None)
+                return False
+            self._books[pool_key] = apply_side(
+                book[0], book[1], update.bid_prices, update.bid_quantities, True
+            ) + apply_side(book[2], book[3], update.ask_prices, update.ask_quantities, False)
+
+        self._sequences[pool_key] = update.sequence
+        return True
+
+    def book(self, pool_key: str) -> Optional[dict]:
+        """
+        Get the rebuilt book of a pool
+
+        :param pool_key: key of the pool
+        :returns: dictionary with bid and ask prices and quantities, None until a checkpoint was applied
+        """
+        book = self._books.get(pool_key)
+        if book is None:
+            return None
+        return dict(
+            bid_prices=book[0],
+            bid_quantities=book[1],
+            ask_prices=book[2],
+            ask_quantities=book[3],
+        )
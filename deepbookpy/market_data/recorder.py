@@ -0,0 +1,479 @@
+"""
+Columnar recorder of pool mid prices and Level 2 ticks from mid.
+
+``Level2Recorder`` polls ``get_level2_snapshots`` for several pools on a schedule, or is pushed snapshots from a
+subscription with ``record``. It writes one file stream per pool holding the exact on-chain integers. Pools with an
+empty side have no mid price and are left out of a poll, a failed poll is counted and the recording goes on.
+
+Columns follow the layout read by ``deepbookpy.simulator.backtest.snapshots_from_columns``: one row per snapshot
+with ``timestamp`` and ``mid_price``, plus ``bid_offsets`` and ``ask_offsets`` (``n + 1`` offsets into the flattened
+``bid_prices`` / ``bid_quantities`` and ``ask_prices`` / ``ask_quantities`` columns).
+
+Files are written as Parquet when ``pyarrow`` is installed, otherwise in the chunked binary format below. Both roll
+over after ``max_file_bytes`` or ``roll_interval_ms`` and are named ``<pool key>-<first timestamp>.<extension>``.
+
+Chunked binary format (``.dbl2``), all integers little endian:
+
+* file header: ``b"DBL2"``, u8 version, 3 padding bytes
+* per chunk: ``b"CHNK"``, u32 rows, u32 bid levels, u32 ask levels, u32 compression (0 none, 1 zlib),
+  u32 payload length, then the payload: every column in ``COLUMNS`` order as u64 values
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from mmap import ACCESS_READ, mmap
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from deepbookpy.deepbook_client import DeepBookClient
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+COLUMNS = (
+    "timestamp",
+    "mid_price",
+    "bid_offsets",
+    "bid_prices",
+    "bid_quantities",
+    "ask_offsets",
+    "ask_prices",
+    "ask_quantities",
+)
+LEVEL_COLUMNS = ("bid_prices", "bid_quantities", "ask_prices", "ask_quantities")
+
+FILE_MAGIC = b"DBL2"
+FILE_VERSION = 1
+FILE_HEADER = struct.Struct("<4sB3x")
+CHUNK_MAGIC = b"CHNK"
+CHUNK_HEADER = struct.Struct("<4sIIIII")
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+
+FORMAT_BINARY = "dbl2"
+FORMAT_PARQUET = "parquet"
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array("Q", values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_buffer(buffer) -> array:
+    values = array("Q")
+    values.frombytes(buffer)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+class ChunkBuffer:
+    """Rows of one pool waiting to be written as a chunk"""
+
+    def __init__(self):
+        self.columns = {name: array("Q") for name in COLUMNS}
+        self.columns["bid_offsets"].append(0)
+        self.columns["ask_offsets"].append(0)
+
+    def __len__(self) -> int:
+        return len(self.columns["timestamp"])
+
+    def append(self, timestamp: int, snapshot: dict):
+        """
+        Add a snapshot row
+
+        :param timestamp: timestamp in milliseconds
+        :param snapshot: dictionary as returned by ``DeepBookClient.get_level2_snapshots`` for one pool
+        """
+        columns = self.columns
+        columns["timestamp"].append(timestamp)
+        columns["mid_price"].append(snapshot["mid_price"])
+        for name in LEVEL_COLUMNS:
+            columns[name].extend(snapshot[name])
+        columns["bid_offsets"].append(len(columns["bid_prices"]))
+        columns["ask_offsets"].append(len(columns["ask_prices"]))
+
+
+class BinaryWriter:
+    """Writes chunks to a ``.dbl2`` file"""
+
+    extension = FORMAT_BINARY
+
+    def __init__(self, path: str, compression_level: int = 6):
+        """
+        Initializes the BinaryWriter class.
+
+        :param path: file path
+        :param compression_level: zlib level, 0 stores chunks uncompressed so readers map them without copying
+        """
+        self.path = path
+        self.compression_level = compression_level
+        self._file = open(path, "wb")
+        self._file.write(FILE_HEADER.pack(FILE_MAGIC, FILE_VERSION))
+
+    @property
+    def size(self) -> int:
+        return self._file.tell()
+
+    def write(self, chunk: ChunkBuffer):
+        columns = chunk.columns
+        payload = b"".join(_to_bytes(columns[name]) for name in COLUMNS)
+        compression = COMPRESSION_NONE
+        if self.compression_level:
+            payload = zlib.compress(payload, self.compression_level)
+            compression = COMPRESSION_ZLIB
+        self._file.write(
+            CHUNK_HEADER.pack(
+                CHUNK_MAGIC,
+                len(chunk),
+                len(columns["bid_prices"]),
+                len(columns["ask_prices"]),
+                compression,
+                len(payload),
+            )
+        )
+        self._file.write(payload)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Writes chunks to a Parquet file, one row group per chunk with list columns for the levels"""
+
+    extension = FORMAT_PARQUET
+
+    def __init__(self, path: str, compression: str = "zstd"):
+        """
+        Initializes the ParquetWriter class.
+
+        :param path: file path
+        :param compression: Parquet compression codec
+        """
+        self.path = path
+        levels = pyarrow.list_(pyarrow.uint64())
+        self.schema = pyarrow.schema(
+            [("timestamp", pyarrow.uint64()), ("mid_price", pyarrow.uint64())]
+            + [(name, levels) for name in LEVEL_COLUMNS]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema, compression=compression)
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+    def write(self, chunk: ChunkBuffer):
+        columns = chunk.columns
+        arrays = [
+            pyarrow.array(columns["timestamp"], pyarrow.uint64()),
+            pyarrow.array(columns["mid_price"], pyarrow.uint64()),
+        ]
+        for name in LEVEL_COLUMNS:
+            offsets = columns["bid_offsets" if name.startswith("bid") else "ask_offsets"]
+            arrays.append(
+                pyarrow.ListArray.from_arrays(
+                    pyarrow.array(offsets, pyarrow.int32()),
+                    pyarrow.array(columns[name], pyarrow.uint64()),
+                )
+            )
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+class Level2Recorder:
+    """Records mid prices and Level 2 ticks from mid of several pools into rolling columnar files"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        pool_keys: List[str],
+        directory: str,
+        ticks: int = 10,
+        interval: float = 1.0,
+        chunk_rows: int = 1000,
+        max_file_bytes: int = 64 * 1024 * 1024,
+        roll_interval_ms: int = 3_600_000,
+        file_format: Optional[str] = None,
+        compression_level: int = 6,
+    ):
+        """
+        Initializes the Level2Recorder class.
+
+        :param deepbook_client: DeepBookClient used for polling
+        :param pool_keys: keys of the recorded pools
+        :param directory: output directory, created if missing
+        :param ticks: number of ticks from mid recorded on each side
+        :param interval: polling interval in seconds
+        :param chunk_rows: snapshots buffered per pool before a chunk is written
+        :param max_file_bytes: size after which a file is rolled
+        :param roll_interval_ms: age after which a file is rolled
+        :param file_format: ``"parquet"`` or ``"dbl2"``, defaults to Parquet when pyarrow is installed
+        :param compression_level: zlib level of ``.dbl2`` chunks, 0 disables compression
+        """
+        if file_format is None:
+            file_format = FORMAT_PARQUET if pyarrow is not None else FORMAT_BINARY
+        if file_format == FORMAT_PARQUET and pyarrow is None:
+            raise ValueError("Parquet output requires pyarrow")
+        if file_format not in (FORMAT_PARQUET, FORMAT_BINARY):
+            raise ValueError(f"Unknown file format {file_format}")
+
+        self._client = deepbook_client
+        self.pool_keys = list(pool_keys)
+        self.directory = directory
+        self.ticks = ticks
+        self.interval = interval
+        self.chunk_rows = chunk_rows
+        self.max_file_bytes = max_file_bytes
+        self.roll_interval_ms = roll_interval_ms
+        self.file_format = file_format
+        self.compression_level = compression_level
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._buffers: Dict[str, ChunkBuffer] = {}
+        self._writers: Dict[str, tuple] = {}
+        self.errors = 0
+        self.last_error: Optional[Exception] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, pool_key: str, timestamp: int):
+        path = os.path.join(self.directory, f"{pool_key}-{timestamp}.{self.file_format}")
+        if self.file_format == FORMAT_PARQUET:
+            writer = ParquetWriter(path)
+        else:
+            writer = BinaryWriter(path, self.compression_level)
+        self._writers[pool_key] = (writer, timestamp)
+        return writer
+
+    def _write(self, pool_key: str, chunk: ChunkBuffer):
+        first_timestamp = chunk.columns["timestamp"][0]
+        writer, opened_at = self._writers.get(pool_key, (None, 0))
+        if writer is not None and (
+            writer.size >= self.max_file_bytes or first_timestamp - opened_at >= self.roll_interval_ms
+        ):
+            writer.close()
+            writer = None
+        if writer is None:
+            writer = self._open(pool_key, first_timestamp)
+        writer.write(chunk)
+
+    def record(self, pool_key: str, snapshot: dict, timestamp: Optional[int] = None):
+        """
+        Add a snapshot of a pool, e.g. pushed by a subscription
+
+        :param pool_key: key of the pool
+        :param snapshot: dictionary with ``mid_price`` and level 2 integer lists
+        :param timestamp: timestamp in milliseconds, defaults to now
+        """
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        with self._lock:
+            buffer = self._buffers.get(pool_key)
+            if buffer is None:
+                buffer = self._buffers[pool_key] = ChunkBuffer()
+            buffer.append(timestamp, snapshot)
+            if len(buffer) >= self.chunk_rows:
+                self._write(pool_key, self._buffers.pop(pool_key))
+
+    def record_once(self, timestamp: Optional[int] = None) -> int:
+        """
+        Poll every pool once, in a single devInspect call, pools with an empty side are skipped
+
+        :param timestamp: timestamp in milliseconds, defaults to now
+        :returns: number of snapshots recorded
+        """
+        snapshots = self._client.get_level2_snapshots(self.pool_keys, self.ticks, skip_empty=True)
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        for pool_key, snapshot in snapshots.items():
+            self.record(pool_key, snapshot, timestamp)
+        return len(snapshots)
+
+    def run(self, duration: Optional[float] = None, stop: Optional[threading.Event] = None):
+        """
+        Poll on schedule until the duration elapses or the stop event is set, then flush
+
+        Polls are scheduled on a fixed grid so slow calls do not make the recording drift. A failed poll is counted
+        in ``errors`` and kept in ``last_error``, the next one is made on schedule.
+
+        :param duration: optional run time in seconds
+        :param stop: optional threading.Event ending the run
+        """
+        stop = stop or threading.Event()
+        started = time.monotonic()
+        next_poll = started
+        try:
+            while duration is None or time.monotonic() - started < duration:
+                try:
+                    self.record_once()
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = e
+                next_poll += self.interval
+                if stop.wait(max(next_poll - time.monotonic(), 0)):
+                    break
+        finally:
+            self.flush()
+
+    def flush(self):
+        """Write every buffered snapshot"""
+        with self._lock:
+            for pool_key, buffer in list(self._buffers.items()):
+                if len(buffer):
+                    self._write(pool_key, buffer)
+            self._buffers.clear()
+
+    def close(self):
+        """Flush and close every file"""
+        self.flush()
+        with self._lock:
+            for writer, _ in self._writers.values():
+                writer.close()
+            self._writers.clear()
+
+
+class Level2Reader:
+    """Memory-maps a recorded file and yields its chunks as columns"""
+
+    def __init__(self, path: str):
+        """
+        Initializes the Level2Reader class.
+
+        Columns of uncompressed ``.dbl2`` chunks are views into the mapped file, valid until ``close``.
+
+        :param path: path of a ``.dbl2`` or ``.parquet`` file
+        """
+        self.path = path
+        self._file = None
+        self._map = None
+        if path.endswith(f".{FORMAT_PARQUET}"):
+            if pyarrow is None:
+                raise ValueError("Reading Parquet recordings requires pyarrow")
+            return
+
+        self._file = open(path, "rb")
+        self._map = mmap(self._file.fileno(), 0, access=ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self._map, 0)
+        if magic != FILE_MAGIC or version != FILE_VERSION:
+            raise ValueError(f"{path} is not a version {FILE_VERSION} recording")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def chunks(self) -> Iterator[dict]:
+        """
+        Iterate over the chunks of the file
+
+        :returns: iterator of dictionaries of columns
+        """
+        if self._map is None:
+            yield from self._parquet_chunks()
+            return
+
+        view = memoryview(self._map)
+        position = FILE_HEADER.size
+        while position < len(self._map):
+            magic, rows, bid_levels, ask_levels, compression, length = CHUNK_HEADER.unpack_from(
+                self._map, position
+            )
+            if magic != CHUNK_MAGIC:
+                raise ValueError(f"Corrupt chunk at offset {position} of {self.path}")
+            position += CHUNK_HEADER.size
+            if position + length > len(self._map):
+                # Chunk still being written by a live recorder
+                return
+
+            payload = view[position:position + length]
+            if compression == COMPRESSION_ZLIB:
+                payload = memoryview(zlib.decompress(payload))
+            position += length
+
+            lengths = (rows, rows, rows + 1, bid_levels, bid_levels, rows + 1, ask_levels, ask_levels)
+            columns = {}
+            start = 0
+            for name, count in zip(COLUMNS, lengths):
+                column = payload[start:start + count * 8]
+                columns[name] = column.cast("Q") if sys.byteorder == "little" else _from_buffer(column)
+                start += count * 8
+            yield columns
+
+    def _parquet_chunks(self) -> Iterator[dict]:
+        parquet_file = pyarrow.parquet.ParquetFile(self.path, memory_map=True)
+        for index in range(parquet_file.num_row_groups):
+            table = parquet_file.read_row_group(index)
+            columns = {
+                "timestamp": table.column("timestamp").to_pylist(),
+                "mid_price": table.column("mid_price").to_pylist(),
+            }
+            for name in LEVEL_COLUMNS:
+                levels = table.column(name).combine_chunks()
+                columns[name] = levels.values.to_pylist()
+                offsets = levels.offsets.to_pylist()
+                columns["bid_offsets" if name.startswith("bid") else "ask_offsets"] = [
+                    offset - offsets[0] for offset in offsets
+                ]
+            yield columns
+
+    def close(self):
+        if self._map is not None:
+            try:
+                self._map.close()
+            except BufferError:
+                # Columns handed out are still referenced, the map closes once they are released
+                pass
+            self._file.close()
+            self._map = None
+
+
+def recording_files(directory: str, pool_key: str) -> List[str]:
+    """
+    Get the recorded files of a pool in time order
+
+    :param directory: recorder output directory
+    :param pool_key: key of the pool
+    :returns: list of file paths
+    """
+    files = []
+    for name in os.listdir(directory):
+        stem, _, extension = name.rpartition(".")
+        key, _, timestamp = stem.rpartition("-")
+        if key == pool_key and timestamp.isdigit() and extension in (FORMAT_BINARY, FORMAT_PARQUET):
+            files.append((int(timestamp), os.path.join(directory, name)))
+    return [path for _, path in sorted(files)]
+
+
+def read_chunks(paths: Iterable[str]) -> Iterator[dict]:
+    """
+    Stream the chunks of several recorded files, one file mapped at a time
+
+    :param paths: file paths, e.g. from ``recording_files``
+    :returns: iterator of dictionaries of columns
+    """
+    for path in paths:
+        reader = Level2Reader(path)
+        try:
+            yield from reader.chunks()
+        finally:
+            reader.close()
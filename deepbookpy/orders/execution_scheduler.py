@@ -0,0 +1,488 @@
+"""
+Client-side iceberg and TWAP execution of parent orders.
+
+A parent order is worked through child orders. With a ``duration`` the parent is released linearly over time (TWAP),
+and ``display_quantity`` caps how much of it works at once (iceberg): a new child is placed when the previous one is
+depleted. Without a ``limit_price`` children are market orders.
+
+``ExecutionScheduler.tick`` plans the child actions of every active parent and sends them in as few transactions as
+possible, one PTB holding the orders and cancels of many parents and pools. Fills are tracked from the events of
+those transactions and from ``poll``. A single thread, or an asyncio task with ``run_async``, drives any number of
+parent orders.
+
+Quantities and prices are human readable values, as in ``PlaceLimitOrderParams``.
+"""
+
+import asyncio
+import itertools
+import math
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from pysui.sui.sui_txn import SyncTransaction
+
+from deepbookpy.custom_types import PlaceLimitOrderParams, PlaceMarketOrderParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.events import (
+    ORDER_CANCELED,
+    ORDER_EXPIRED,
+    ORDER_FILLED,
+    ORDER_PLACED,
+    EventPoller,
+    event_id,
+    parse_event,
+    transaction_events,
+)
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+STATUS_ACTIVE = "active"
+STATUS_CANCELING = "canceling"
+STATUS_FILLED = "filled"
+STATUS_CANCELED = "canceled"
+
+
+@dataclass
+class ChildOrder:
+    client_order_id: int
+    parent_id: int
+    quantity: float
+    filled_quantity: float = 0.0
+    order_id: Optional[int] = None
+    open: bool = True
+
+    @property
+    def remaining_quantity(self) -> float:
+        return max(self.quantity - self.filled_quantity, 0.0)
+
+
+@dataclass
+class ParentOrder:
+    parent_id: int
+    pool_key: str
+    balance_manager_key: str
+    is_bid: bool
+    quantity: float
+    limit_price: Optional[float] = None
+    duration: float = 0.0
+    display_quantity: Optional[float] = None
+    lot_size: float = 0.0
+    min_child_quantity: float = 0.0
+    start_time: float = 0.0
+    filled_quantity: float = 0.0
+    status: str = STATUS_ACTIVE
+    children: Dict[int, ChildOrder] = field(default_factory=dict)
+
+    @property
+    def remaining_quantity(self) -> float:
+        return max(self.quantity - self.filled_quantity, 0.0)
+
+    @property
+    def working_quantity(self) -> float:
+        return sum(child.remaining_quantity for child in self.children.values() if child.open)
+
+    def target_quantity(self, now: float) -> float:
+        """
+        Get the quantity the schedule releases by a time
+
+        :param now: time in seconds
+        :returns: released quantity
+        """
+        if not self.duration:
+            return self.quantity
+        return self.quantity * min(max(now - self.start_time, 0.0) / self.duration, 1.0)
+
+
+class ExecutionScheduler:
+    """Works iceberg and TWAP parent orders of any number of pools from one loop"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        gas_budget: str = "",
+        max_actions_per_transaction: int = 50,
+        client_order_id_start: Optional[int] = None,
+        on_error: Optional[Callable[[List[tuple], str], None]] = None,
+        clock: Callable[[], float] = time.time,
+        max_seen_events: int = 100_000,
+        client_order_ids: Optional[Iterator[int]] = None,
+    ):
+        """
+        Initializes the ExecutionScheduler class.
+
+        :param deepbook_client: DeepBookClient building and executing the child orders
+        :param gas_budget: gas budget of each transaction, a dry-run sets it when empty
+        :param max_actions_per_transaction: child orders and cancels batched in one PTB
+        :param client_order_id_start: first client order ID given to children, defaults to the current time in ms
+        :param on_error: optional hook called with the actions of a failed transaction and the error, errors raise
+            ValueError when not set
+        :param clock: time source in seconds
+        :param max_seen_events: number of recent event IDs remembered to drop duplicates
+        :param client_order_ids: optional source of the children's client order IDs, e.g.
+            ``ClientOrderIdAllocator.strategy()``, replaces ``client_order_id_start``
+        """
+        self._client = deepbook_client
+        self._config = deepbook_client.config
+        self.gas_budget = gas_budget
+        self.max_actions_per_transaction = max_actions_per_transaction
+        self.on_error = on_error
+        self.clock = clock
+        self.max_seen_events = max_seen_events
+
+        self._client_order_ids = client_order_ids or itertools.count(
+            client_order_id_start if client_order_id_start is not None else int(time.time() * 1000)
+        )
+        self._parent_ids = itertools.count(1)
+        self._lock = threading.RLock()
+        self._parents: Dict[int, ParentOrder] = {}
+        self._children: Dict[int, ChildOrder] = {}
+        self._children_by_order_id: Dict[int, ChildOrder] = {}
+        self._managers: Dict[str, str] = {}
+        self._base_scalars: Dict[str, int] = {}
+        self._seen = OrderedDict()
+        self._poller = None
+
+    @property
+    def active(self) -> bool:
+        return any(
+            parent.status in (STATUS_ACTIVE, STATUS_CANCELING) for parent in self._parents.values()
+        )
+
+    def get(self, parent_id: int) -> Optional[ParentOrder]:
+        return self._parents.get(parent_id)
+
+    def parents(self) -> List[ParentOrder]:
+        return list(self._parents.values())
+
+    def submit(
+        self,
+        pool_key: str,
+        balance_manager_key: str,
+        is_bid: bool,
+        quantity: float,
+        limit_price: Optional[float] = None,
+        duration: float = 0.0,
+        display_quantity: Optional[float] = None,
+        lot_size: float = 0.0,
+        min_child_quantity: float = 0.0,
+    ) -> ParentOrder:
+        """
+        Add a parent order, its first children go out on the next tick
+
+        :param pool_key: key of the pool
+        :param balance_manager_key: key of the BalanceManager
+        :param is_bid: True to buy, False to sell
+        :param quantity: total base quantity
+        :param limit_price: price of the child limit orders, children are market orders when not set
+        :param duration: seconds over which the quantity is released, 0 releases it at once
+        :param display_quantity: maximum quantity working at once, the whole released quantity when not set
+        :param lot_size: child quantities are rounded down to a multiple of it
+        :param min_child_quantity: smaller children wait until more quantity is released
+        :returns: ParentOrder object
+        """
+        balance_manager_id = normalize_sui_object_id(
+            self._config.get_balance_manager(balance_manager_key)["address"]
+        )
+        pool = self._config.get_pool(pool_key)
+
+        with self._lock:
+            self._managers[balance_manager_id] = balance_manager_key
+            self._base_scalars[normalize_sui_object_id(pool["address"])] = self._config.get_coin(
+                pool["base_coin"]
+            )["scalar"]
+            parent = ParentOrder(
+                parent_id=next(self._parent_ids),
+                pool_key=pool_key,
+                balance_manager_key=balance_manager_key,
+                is_bid=is_bid,
+                quantity=quantity,
+                limit_price=limit_price,
+                duration=duration,
+                display_quantity=display_quantity,
+                lot_size=lot_size,
+                min_child_quantity=min_child_quantity,
+                start_time=self.clock(),
+            )
+            self._parents[parent.parent_id] = parent
+        return parent
+
+    def cancel(self, parent_id: int):
+        """
+        Stop a parent order, its resting children are canceled on the next tick
+
+        :param parent_id: ID of the parent order
+        """
+        with self._lock:
+            parent = self._parents[parent_id]
+            if parent.status == STATUS_ACTIVE:
+                parent.status = STATUS_CANCELING
+
+    # Scheduling
+    def _child_quantity(self, parent: ParentOrder, now: float) -> float:
+        working = parent.working_quantity
+        quantity = min(
+            parent.remaining_quantity - working,
+            parent.target_quantity(now) - parent.filled_quantity - working,
+        )
+        if parent.display_quantity is not None:
+            quantity = min(quantity, parent.display_quantity - working)
+        if parent.lot_size:
+            quantity = round(math.floor(quantity / parent.lot_size + 1e-9) * parent.lot_size, 9)
+        if quantity <= 0 or quantity < parent.min_child_quantity:
+            return 0.0
+        return quantity
+
+    def _plan(self, now: float) -> List[tuple]:
+        actions = []
+        for parent in self._parents.values():
+            if parent.status == STATUS_CANCELING:
+                working = [child for child in parent.children.values() if child.open]
+                for child in working:
+                    if child.order_id is not None:
+                        actions.append(("cancel", parent, child))
+                if not working:
+                    parent.status = STATUS_CANCELED
+                continue
+            if parent.status != STATUS_ACTIVE:
+                continue
+
+            quantity = self._child_quantity(parent, now)
+            if quantity:
+                child = ChildOrder(
+                    client_order_id=next(self._client_order_ids),
+                    parent_id=parent.parent_id,
+                    quantity=quantity,
+                )
+                parent.children[child.client_order_id] = child
+                self._children[child.client_order_id] = child
+                actions.append(("place", parent, child))
+        return actions
+
+    def _build(self, actions: List[tuple]) -> SyncTransaction:
+        tx = SyncTransaction(client=self._client.client)
+        deepbook = self._client.deepbook
+        for action, parent, child in actions:
+            if action == "cancel":
+                deepbook.cancel_order(parent.pool_key, parent.balance_manager_key, child.order_id, tx)
+            elif parent.limit_price is None:
+                deepbook.place_market_order(
+                    PlaceMarketOrderParams(
+                        pool_key=parent.pool_key,
+                        balance_manager_key=parent.balance_manager_key,
+                        client_order_id=str(child.client_order_id),
+                        quantity=child.quantity,
+                        is_bid=parent.is_bid,
+                    ),
+                    tx,
+                )
+            else:
+                deepbook.place_limit_order(
+                    PlaceLimitOrderParams(
+                        pool_key=parent.pool_key,
+                        balance_manager_key=parent.balance_manager_key,
+                        client_order_id=str(child.client_order_id),
+                        price=parent.limit_price,
+                        quantity=child.quantity,
+                        is_bid=parent.is_bid,
+                    ),
+                    tx,
+                )
+        return tx
+
+    def _send(self, actions: List[tuple]):
+        try:
+            result = self._client.execute_transaction(self._build(actions), gas_budget=self.gas_budget)
+        except Exception:
+            # Nothing was placed, the children would otherwise stay open without an order ID
+            with self._lock:
+                self._close_unsent(actions)
+            raise
+        error = None
+        if result.is_err():
+            error = result.result_string
+        elif not result.result_data.succeeded:
+            error = result.result_data.status
+
+        with self._lock:
+            if error is None:
+                self.apply_transaction(result.result_data)
+            for action, parent, child in actions:
+                # Children that did not rest are done, market orders and limit orders filled on placement
+                if action == "place" and child.open and child.order_id is None:
+                    self._close(child)
+                elif action == "cancel" and error is None:
+                    self._close(child)
+            for parent in {parent.parent_id: parent for _, parent, _ in actions}.values():
+                if parent.status == STATUS_CANCELING and not parent.working_quantity:
+                    parent.status = STATUS_CANCELED
+
+        if error is not None:
+            if self.on_error is None:
+                raise ValueError(f"Child order transaction failed: {error}")
+            self.on_error(actions, error)
+
+    def _close_unsent(self, actions: List[tuple]):
+        """Close the children of place actions that were never sent, cancels are planned again on the next tick"""
+        for action, parent, child in actions:
+            if action == "place" and child.open and child.order_id is None:
+                self._close(child)
+        for parent in {parent.parent_id: parent for _, parent, _ in actions}.values():
+            if parent.status == STATUS_CANCELING and not parent.working_quantity:
+                parent.status = STATUS_CANCELED
+
+    def tick(self, now: Optional[float] = None) -> int:
+        """
+        Place and cancel the children due at a time. Every batch is sent even when one fails, the first error is
+        raised once all of them were sent
+
+        :param now: time in seconds, defaults to the scheduler clock
+        :returns: number of child actions sent
+        """
+        with self._lock:
+            actions = self._plan(self.clock() if now is None else now)
+        first_error = None
+        for start in range(0, len(actions), self.max_actions_per_transaction):
+            try:
+                self._send(actions[start:start + self.max_actions_per_transaction])
+            except Exception as e:
+                if first_error is None:
+                    first_error = e
+        if first_error is not None:
+            raise first_error
+        return len(actions)
+
+    def run(self, interval: float = 1.0, stop: Optional[threading.Event] = None):
+        """
+        Tick on schedule until every parent order is done or the stop event is set
+
+        :param interval: seconds between ticks
+        :param stop: optional threading.Event ending the run
+        """
+        stop = stop or threading.Event()
+        # Position the event cursor before the first children are placed, so their fills are not skipped
+        self.poll()
+        while self.active:
+            self.tick()
+            self.poll()
+            if stop.wait(interval):
+                break
+
+    async def run_async(self, interval: float = 1.0):
+        """
+        Tick on schedule until every parent order is done, blocking calls run in a worker thread
+
+        :param interval: seconds between ticks
+        """
+        await asyncio.to_thread(self.poll)
+        while self.active:
+            await asyncio.to_thread(self.tick)
+            await asyncio.to_thread(self.poll)
+            await asyncio.sleep(interval)
+
+    # Fill tracking
+    def _close(self, child: ChildOrder):
+        child.open = False
+        if child.order_id is not None:
+            self._children_by_order_id.pop(child.order_id, None)
+
+    def _fill(self, child: ChildOrder, quantity: float):
+        parent = self._parents[child.parent_id]
+        child.filled_quantity += quantity
+        parent.filled_quantity += quantity
+        if child.remaining_quantity <= 1e-12:
+            self._close(child)
+        if parent.remaining_quantity <= 1e-12 and parent.status == STATUS_ACTIVE:
+            parent.status = STATUS_FILLED
+
+    def _is_duplicate(self, event) -> bool:
+        key = event_id(event)
+        if key is None:
+            return False
+        if key in self._seen:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.max_seen_events:
+            self._seen.popitem(last=False)
+        return False
+
+    def apply_event(self, event) -> bool:
+        """
+        Update children and parents from a DeepBook order event
+
+        :param event: pysui Event object or dictionary with ``type`` and ``parsedJson`` members
+        :returns: True if the event concerned a child order
+        """
+        name, fields = parse_event(event)
+        if name is None:
+            return False
+
+        with self._lock:
+            if self._is_duplicate(event):
+                return False
+
+            if name == ORDER_FILLED:
+                matched = False
+                for side in ("maker", "taker"):
+                    if fields[f"{side}_balance_manager_id"] not in self._managers:
+                        continue
+                    child = self._children_by_order_id.get(fields[f"{side}_order_id"])
+                    if child is None:
+                        child = self._children.get(fields[f"{side}_client_order_id"])
+                    if child is not None and child.open:
+                        scalar = self._base_scalars[fields["pool_id"]]
+                        self._fill(child, fields["base_quantity"] / scalar)
+                        matched = True
+                return matched
+
+            if fields.get("balance_manager_id") not in self._managers:
+                return False
+            child = self._children.get(fields["client_order_id"])
+            if child is None:
+                return False
+            if name == ORDER_PLACED and child.open:
+                child.order_id = fields["order_id"]
+                self._children_by_order_id[child.order_id] = child
+            elif name in (ORDER_CANCELED, ORDER_EXPIRED):
+                self._close(child)
+            return True
+
+    def apply_events(self, events: Iterable) -> int:
+        """
+        Update children and parents from several events, in emission order
+
+        :param events: iterable of events
+        :returns: number of events concerning a child order
+        """
+        return sum(1 for event in events if self.apply_event(event))
+
+    def apply_transaction(self, tx_response) -> int:
+        """
+        Update children and parents from the events of a transaction
+
+        :param tx_response: pysui TxResponse object or JSON-RPC response dictionary
+        :returns: number of events concerning a child order
+        """
+        return self.apply_events(transaction_events(tx_response))
+
+    def poll(self, package_id: Optional[str] = None, limit: int = 50) -> int:
+        """
+        Fetch and apply fills and cancels of resting children
+
+        The first poll only marks the newest events, call it before submitting parent orders.
+
+        :param package_id: package that declared the event structs, defaults to the configured DeepBook package
+        :param limit: page size of each event query
+        :returns: number of events concerning a child order
+        """
+        if self._poller is None:
+            self._poller = EventPoller(
+                self._client.client,
+                package_id or self._config.DEEPBOOK_PACKAGE_ID,
+                names=(ORDER_FILLED, ORDER_CANCELED, ORDER_EXPIRED),
+                limit=limit,
+                start_at_latest=True,
+            )
+        return self.apply_events(self._poller.poll())
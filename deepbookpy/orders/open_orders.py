@@ -0,0 +1,426 @@
+"""
+In-memory index of the open orders of a balance manager.
+
+``OpenOrderTracker`` is fed DeepBook order events (placed, filled, modified, canceled, expired), either polled from
+the fullnode, taken from the effects of our own transactions or passed in directly. The same event may arrive from
+several of them, events already applied are recognized by their ID and skipped. ``reconcile`` periodically replaces
+the local view of a pool with the on-chain one.
+
+Prices and quantities are kept as on-chain integers.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.events import (
+    ORDER_CANCELED,
+    ORDER_EXPIRED,
+    ORDER_FILLED,
+    ORDER_MODIFIED,
+    ORDER_PLACED,
+    EventPoller,
+    event_id,
+    parse_event,
+    transaction_events,
+)
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+STATUS_OPEN = "open"
+STATUS_PARTIALLY_FILLED = "partially_filled"
+STATUS_FILLED = "filled"
+STATUS_CANCELED = "canceled"
+STATUS_EXPIRED = "expired"
+STATUS_CLOSED = "closed"
+
+
+@dataclass
+class TrackedOrder:
+    order_id: int
+    client_order_id: int
+    pool_id: str
+    is_bid: bool
+    price: int
+    quantity: int
+    filled_quantity: int = 0
+    expire_timestamp: int = 0
+    timestamp: int = 0
+    status: str = STATUS_OPEN
+
+    @property
+    def remaining_quantity(self) -> int:
+        return max(self.quantity - self.filled_quantity, 0)
+
+
+class OpenOrderTracker:
+    """Open orders of one balance manager indexed by order ID, client order ID and price level"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        manager_key: str,
+        on_close: Optional[Callable[[TrackedOrder], None]] = None,
+        max_seen_events: int = 100_000,
+    ):
+        """
+        Initializes the OpenOrderTracker class.
+
+        :param deepbook_client: DeepBookClient used for polling and reconciliation
+        :param manager_key: key of the tracked BalanceManager
+        :param on_close: optional hook called with every order leaving the book, its status tells why
+        :param max_seen_events: number of recent event IDs remembered to drop duplicates
+        """
+        self._client = deepbook_client
+        self.manager_key = manager_key
+        self.balance_manager_id = normalize_sui_object_id(
+            deepbook_client.config.get_balance_manager(manager_key)["address"]
+        )
+        self.on_close = on_close
+        self.max_seen_events = max_seen_events
+
+        self._lock = threading.RLock()
+        self._orders: Dict[int, TrackedOrder] = {}
+        self._by_client_order_id: Dict[int, TrackedOrder] = {}
+        self._levels: Dict[tuple, Dict[int, TrackedOrder]] = {}
+        self._level_quantity: Dict[tuple, int] = {}
+        self._poller = None
+        self._seen = OrderedDict()
+        # Order ID to [filled quantity at the poll cursor, reconciled filled quantity, fills applied since], for the
+        # orders of a reconcile until the next poll has caught up with the events emitted during it
+        self._fill_windows: Dict[int, list] = {}
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: int) -> bool:
+        return int(order_id) in self._orders
+
+    def _pool_id(self, pool_key: str) -> str:
+        return normalize_sui_object_id(self._client.config.get_pool(pool_key)["address"])
+
+    # Lookups
+    def get(self, order_id: int) -> Optional[TrackedOrder]:
+        """
+        Get an open order
+
+        :param order_id: on-chain order ID
+        :returns: TrackedOrder object or None
+        """
+        return self._orders.get(int(order_id))
+
+    def get_by_client_order_id(self, client_order_id: int) -> Optional[TrackedOrder]:
+        """
+        Get an open order by the ID given when placing it
+
+        :param client_order_id: client order ID
+        :returns: TrackedOrder object or None
+        """
+        return self._by_client_order_id.get(int(client_order_id))
+
+    def orders(self, pool_key: Optional[str] = None) -> List[TrackedOrder]:
+        """
+        Get open orders
+
+        :param pool_key: optional key of the pool
+        :returns: list of TrackedOrder objects
+        """
+        with self._lock:
+            if pool_key is None:
+                return list(self._orders.values())
+            pool_id = self._pool_id(pool_key)
+            return [order for order in self._orders.values() if order.pool_id == pool_id]
+
+    def orders_at(self, pool_key: str, is_bid: bool, price: int) -> List[TrackedOrder]:
+        """
+        Get open orders resting at a price level, oldest first
+
+        :param pool_key: key of the pool
+        :param is_bid: side of the level
+        :param price: on-chain price
+        :returns: list of TrackedOrder objects
+        """
+        level = self._levels.get((self._pool_id(pool_key), is_bid, price))
+        return list(level.values()) if level else []
+
+    def level_quantity(self, pool_key: str, is_bid: bool, price: int) -> int:
+        """
+        Get the remaining quantity of our orders at a price level
+
+        :param pool_key: key of the pool
+        :param is_bid: side of the level
+        :param price: on-chain price
+        :returns: remaining base quantity
+        """
+        return self._level_quantity.get((self._pool_id(pool_key), is_bid, price), 0)
+
+    # Index maintenance
+    def _add(self, order: TrackedOrder):
+        self._orders[order.order_id] = order
+        self._by_client_order_id[order.client_order_id] = order
+        level_key = (order.pool_id, order.is_bid, order.price)
+        self._levels.setdefault(level_key, {})[order.order_id] = order
+        self._level_quantity[level_key] = (
+            self._level_quantity.get(level_key, 0) + order.remaining_quantity
+        )
+
+    def _remove(self, order: TrackedOrder, status: str):
+        self._orders.pop(order.order_id, None)
+        self._fill_windows.pop(order.order_id, None)
+        if self._by_client_order_id.get(order.client_order_id) is order:
+            del self._by_client_order_id[order.client_order_id]
+
+        level_key = (order.pool_id, order.is_bid, order.price)
+        level = self._levels.get(level_key)
+        if level is not None:
+            level.pop(order.order_id, None)
+            remaining = self._level_quantity.get(level_key, 0) - order.remaining_quantity
+            if level:
+                self._level_quantity[level_key] = remaining
+            else:
+                del self._levels[level_key]
+                self._level_quantity.pop(level_key, None)
+
+        order.status = status
+        if self.on_close is not None:
+            self.on_close(order)
+
+    def _update(self, order: TrackedOrder, quantity: int, filled_quantity: int):
+        level_key = (order.pool_id, order.is_bid, order.price)
+        previous_remaining = order.remaining_quantity
+        order.quantity = quantity
+        order.filled_quantity = filled_quantity
+        self._level_quantity[level_key] += order.remaining_quantity - previous_remaining
+
+        if order.remaining_quantity == 0:
+            self._remove(order, STATUS_FILLED)
+            return
+
+        order.status = STATUS_PARTIALLY_FILLED if filled_quantity else STATUS_OPEN
+
+    # Event ingestion
+    def _is_duplicate(self, event) -> bool:
+        key = event_id(event)
+        if key is None:
+            return False
+        if key in self._seen:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.max_seen_events:
+            self._seen.popitem(last=False)
+        return False
+
+    def apply_event(self, event) -> bool:
+        """
+        Update the index from a DeepBook order event
+
+        :param event: pysui Event object or dictionary with ``type`` and ``parsedJson`` members
+        :returns: True if the event concerned the tracked balance manager, False for other and already applied events
+        """
+        name, fields = parse_event(event)
+        if name is None:
+            return False
+
+        with self._lock:
+            if self._is_duplicate(event):
+                return False
+
+            if name == ORDER_FILLED:
+                return self._apply_fill(fields)
+
+            if fields.get("balance_manager_id") != self.balance_manager_id:
+                return False
+
+            order = self._orders.get(fields["order_id"])
+
+            if name == ORDER_PLACED and order is None:
+                self._add(
+                    TrackedOrder(
+                        order_id=fields["order_id"],
+                        client_order_id=fields["client_order_id"],
+                        pool_id=fields["pool_id"],
+                        is_bid=fields["is_bid"],
+                        price=fields["price"],
+                        quantity=fields["placed_quantity"],
+                        expire_timestamp=fields["expire_timestamp"],
+                        timestamp=fields["timestamp"],
+                    )
+                )
+            elif order is None:
+                # Placed before tracking started, picked up by the next reconcile
+                return True
+            elif name == ORDER_MODIFIED:
+                # The event carries the filled quantity, later fills add to it
+                self._fill_windows.pop(order.order_id, None)
+                self._update(order, fields["new_quantity"], fields["filled_quantity"])
+            elif name == ORDER_CANCELED:
+                self._remove(order, STATUS_CANCELED)
+            elif name == ORDER_EXPIRED:
+                self._remove(order, STATUS_EXPIRED)
+
+        return True
+
+    def _apply_fill(self, fields: dict) -> bool:
+        if fields["maker_balance_manager_id"] == self.balance_manager_id:
+            order_id = fields["maker_order_id"]
+        elif fields["taker_balance_manager_id"] == self.balance_manager_id:
+            order_id = fields["taker_order_id"]
+        else:
+            return False
+
+        order = self._orders.get(order_id)
+        if order is None:
+            return True
+        window = self._fill_windows.get(order_id)
+        if window is None:
+            filled_quantity = order.filled_quantity + fields["base_quantity"]
+        else:
+            # The reconciled quantity may already include this fill, it is at least the quantity at the cursor plus
+            # the fills since and at most that
+            window[2] += fields["base_quantity"]
+            filled_quantity = max(window[1], window[0] + window[2])
+        self._update(order, order.quantity, filled_quantity)
+        return True
+
+    def apply_events(self, events: Iterable) -> int:
+        """
+        Update the index from several events, in emission order
+
+        :param events: iterable of events
+        :returns: number of events concerning the tracked balance manager
+        """
+        return sum(1 for event in events if self.apply_event(event))
+
+    def apply_transaction(self, tx_response) -> int:
+        """
+        Update the index from the events of one of our own transactions
+
+        :param tx_response: pysui TxResponse object or JSON-RPC response dictionary
+        :returns: number of events concerning the tracked balance manager
+        """
+        return self.apply_events(transaction_events(tx_response))
+
+    def _event_poller(
+        self, package_id: Optional[str] = None, limit: int = 50, start_at_latest: bool = False
+    ) -> EventPoller:
+        if self._poller is None:
+            self._poller = EventPoller(
+                self._client.client,
+                package_id or self._client.config.DEEPBOOK_PACKAGE_ID,
+                limit=limit,
+                start_at_latest=start_at_latest,
+            )
+        return self._poller
+
+    def poll(
+        self, package_id: Optional[str] = None, limit: int = 50, start_at_latest: bool = False
+    ) -> int:
+        """
+        Fetch and apply order events emitted since the previous poll
+
+        The first poll of each event type starts at the oldest event unless ``start_at_latest`` is set. Once
+        ``reconcile`` has run, polling starts after the newest events at the time of the reconciliation, the
+        package and page size of the first poll are then the defaults.
+
+        :param package_id: package that declared the event structs, defaults to the configured DeepBook package
+        :param limit: page size of each event query
+        :param start_at_latest: if True the first poll only returns events emitted after the newest ones
+        :returns: number of events concerning the tracked balance manager
+        """
+        applied = self.apply_events(
+            self._event_poller(package_id, limit, start_at_latest).poll()
+        )
+        with self._lock:
+            # Caught up with the events emitted during the last reconcile
+            self._fill_windows.clear()
+        return applied
+
+    def reconcile(self, pool_key: str) -> int:
+        """
+        Replace the local view of a pool with the orders currently on chain
+
+        Events are polled up to now before the chain is read, or polling is set to start after the newest ones on the
+        first reconcile, so no event is lost between the read and the next poll. Fills emitted during the read may be
+        part of the on-chain view, they are applied by the next poll without being counted twice.
+
+        :param pool_key: key of the pool
+        :returns: number of open orders in the pool
+        """
+        pool_id = self._pool_id(pool_key)
+        if self._poller is None:
+            self._event_poller(start_at_latest=True).seek_latest()
+        else:
+            self.poll()
+        with self._lock:
+            filled_at_cursor = {
+                order.order_id: order.filled_quantity
+                for order in self._orders.values()
+                if order.pool_id == pool_id
+            }
+
+        open_order_ids = self._client.account_open_orders(pool_key, self.manager_key)
+        on_chain = (
+            self._client.get_orders(pool_key, [str(order_id) for order_id in open_order_ids])
+            if open_order_ids
+            else []
+        )
+
+        with self._lock:
+            seen = set()
+            for chain_order in on_chain:
+                order_id = int(chain_order.order_id)
+                seen.add(order_id)
+                order = self._orders.get(order_id)
+                if order is None:
+                    decoded = self._client.decode_order_id(order_id)
+                    self._add(
+                        TrackedOrder(
+                            order_id=order_id,
+                            client_order_id=int(chain_order.client_order_id),
+                            pool_id=pool_id,
+                            is_bid=decoded["is_bid"],
+                            price=decoded["price"],
+                            quantity=int(chain_order.quantity),
+                            filled_quantity=int(chain_order.filled_quantity),
+                            expire_timestamp=int(chain_order.expire_timestamp),
+                        )
+                    )
+                else:
+                    self._update(
+                        order, int(chain_order.quantity), int(chain_order.filled_quantity)
+                    )
+                if order_id in self._orders:
+                    # Orders unknown at the cursor count their fills from zero
+                    self._fill_windows[order_id] = [
+                        filled_at_cursor.get(order_id, 0),
+                        int(chain_order.filled_quantity),
+                        0,
+                    ]
+
+            for order in [
+                order
+                for order in self._orders.values()
+                if order.pool_id == pool_id and order.order_id not in seen
+            ]:
+                self._remove(order, STATUS_CLOSED)
+
+        return len(seen)
+
+    def prune_expired(self, timestamp_ms: int) -> int:
+        """
+        Drop orders whose expiration timestamp has passed
+
+        :param timestamp_ms: current time in milliseconds
+        :returns: number of orders dropped
+        """
+        with self._lock:
+            expired = [
+                order
+                for order in self._orders.values()
+                if order.expire_timestamp and order.expire_timestamp <= timestamp_ms
+            ]
+            for order in expired:
+                self._remove(order, STATUS_EXPIRED)
+        return len(expired)
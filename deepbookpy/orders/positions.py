@@ -0,0 +1,338 @@
+"""
+Incremental positions and PnL from fill events.
+
+``PositionEngine`` consumes ``OrderFilled`` events of our balance managers and keeps, per balance manager and pool,
+the base position, its average entry price, realized PnL and fees, each updated in O(1) per fill. Unrealized PnL is
+marked to a cached mid price set with ``set_mark`` or refreshed with ``refresh_marks``.
+
+Every update publishes an immutable ``PositionSnapshot``, so ``snapshot()`` only copies a dictionary of references
+and can be called from a risk loop at any frequency. Amounts are in human readable units: base quantities in base
+coin, prices and PnL in quote coin, fees in the coin they were paid in.
+
+Fills in pools missing from the config are counted in ``skipped_fills`` and their pool IDs kept in ``unknown_pools``,
+they are picked up once the pool is added, e.g. by ``RegistryDiscovery``.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.config import DEEP_SCALAR, FLOAT_SCALAR
+from deepbookpy.utils.events import (
+    ORDER_FILLED,
+    EventPoller,
+    event_id,
+    parse_event,
+    transaction_events,
+)
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+class PositionSnapshot(NamedTuple):
+    manager_key: str
+    pool_key: str
+    base_position: float
+    average_entry_price: float
+    realized_pnl: float
+    mark_price: Optional[float]
+    fees_deep: float
+    fees_base: float
+    fees_quote: float
+    fills: int
+    last_fill_timestamp: int
+
+    @property
+    def unrealized_pnl(self) -> float:
+        if self.mark_price is None or not self.base_position:
+            return 0.0
+        return self.base_position * (self.mark_price - self.average_entry_price)
+
+    @property
+    def total_pnl(self) -> float:
+        return self.realized_pnl + self.unrealized_pnl
+
+
+class Position:
+    """Mutable position state with average cost accounting"""
+
+    __slots__ = (
+        "base_position",
+        "average_entry_price",
+        "realized_pnl",
+        "fees_deep",
+        "fees_base",
+        "fees_quote",
+        "fills",
+        "last_fill_timestamp",
+    )
+
+    def __init__(self):
+        self.base_position = 0.0
+        self.average_entry_price = 0.0
+        self.realized_pnl = 0.0
+        self.fees_deep = 0.0
+        self.fees_base = 0.0
+        self.fees_quote = 0.0
+        self.fills = 0
+        self.last_fill_timestamp = 0
+
+    def fill(self, quantity: float, price: float):
+        """
+        Apply a fill with average cost accounting
+
+        :param quantity: signed base quantity, positive when buying
+        :param price: fill price
+        """
+        position = self.base_position
+        if quantity == 0:
+            return
+        if position == 0 or (position > 0) == (quantity > 0):
+            new_position = position + quantity
+            self.average_entry_price = (
+                self.average_entry_price * abs(position) + price * abs(quantity)
+            ) / abs(new_position)
+            self.base_position = new_position
+            return
+
+        closed = min(abs(quantity), abs(position))
+        direction = 1 if position > 0 else -1
+        self.realized_pnl += closed * (price - self.average_entry_price) * direction
+        self.base_position = position + quantity
+
+        if self.base_position == 0:
+            self.average_entry_price = 0.0
+        elif (self.base_position > 0) != (position > 0):
+            # Flipped side, the remainder was opened at the fill price
+            self.average_entry_price = price
+
+
+class PositionEngine:
+    """Positions, PnL and fees of balance managers built from fill events"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        manager_keys: List[str],
+        max_seen_fills: int = 100_000,
+    ):
+        """
+        Initializes the PositionEngine class.
+
+        :param deepbook_client: DeepBookClient used for pool metadata, mid prices and polling
+        :param manager_keys: keys of the tracked BalanceManagers
+        :param max_seen_fills: number of recent fill IDs remembered to drop duplicates
+        """
+        self._client = deepbook_client
+        self._config = deepbook_client.config
+        self._managers = {
+            normalize_sui_object_id(self._config.get_balance_manager(key)["address"]): key
+            for key in manager_keys
+        }
+        self.max_seen_fills = max_seen_fills
+        self.skipped_fills = 0
+        self.unknown_pools = set()
+
+        self._lock = threading.Lock()
+        self._positions: Dict[tuple, Position] = {}
+        self._snapshots: Dict[tuple, PositionSnapshot] = {}
+        self._marks: Dict[str, float] = {}
+        self._pools: Dict[str, tuple] = {}
+        self._seen = OrderedDict()
+        self._poller = None
+
+    def _pool(self, pool_id: str) -> Optional[tuple]:
+        pool = self._pools.get(pool_id)
+        if pool is None:
+            try:
+                pool_key = self._config.get_pool_key(pool_id)
+            except KeyError:
+                return None
+            pool_config = self._config.get_pool(pool_key)
+            base_scalar = self._config.get_coin(pool_config["base_coin"])["scalar"]
+            quote_scalar = self._config.get_coin(pool_config["quote_coin"])["scalar"]
+            pool = self._pools[pool_id] = (pool_key, base_scalar, quote_scalar)
+        return pool
+
+    def _publish(self, key: tuple, position: Position):
+        manager_key, pool_key = key
+        self._snapshots[key] = PositionSnapshot(
+            manager_key=manager_key,
+            pool_key=pool_key,
+            base_position=position.base_position,
+            average_entry_price=position.average_entry_price,
+            realized_pnl=position.realized_pnl,
+            mark_price=self._marks.get(pool_key),
+            fees_deep=position.fees_deep,
+            fees_base=position.fees_base,
+            fees_quote=position.fees_quote,
+            fills=position.fills,
+            last_fill_timestamp=position.last_fill_timestamp,
+        )
+
+    def _is_duplicate(self, event, fields: dict) -> bool:
+        key = event_id(event) or (
+            fields["maker_order_id"],
+            fields["taker_order_id"],
+            fields["timestamp"],
+            fields["base_quantity"],
+        )
+        if key in self._seen:
+            return True
+        self._seen[key] = None
+        if len(self._seen) > self.max_seen_fills:
+            self._seen.popitem(last=False)
+        return False
+
+    def apply_event(self, event) -> bool:
+        """
+        Update positions from a fill event
+
+        :param event: pysui Event object or dictionary with ``type`` and ``parsedJson`` members
+        :returns: True if the fill involved a tracked balance manager, False for other fills and fills in pools
+            missing from the config
+        """
+        name, fields = parse_event(event)
+        if name != ORDER_FILLED:
+            return False
+
+        sides = []
+        maker_key = self._managers.get(fields["maker_balance_manager_id"])
+        if maker_key is not None:
+            sides.append(
+                (maker_key, not fields["taker_is_bid"], fields["maker_fee"], fields["maker_fee_is_deep"])
+            )
+        taker_key = self._managers.get(fields["taker_balance_manager_id"])
+        if taker_key is not None:
+            sides.append(
+                (taker_key, fields["taker_is_bid"], fields["taker_fee"], fields["taker_fee_is_deep"])
+            )
+        if not sides:
+            return False
+
+        with self._lock:
+            if self._is_duplicate(event, fields):
+                return True
+
+            pool = self._pool(fields["pool_id"])
+            if pool is None:
+                self.skipped_fills += 1
+                self.unknown_pools.add(fields["pool_id"])
+                return False
+            pool_key, base_scalar, quote_scalar = pool
+            quantity = fields["base_quantity"] / base_scalar
+            price = fields["price"] * base_scalar / quote_scalar / FLOAT_SCALAR
+
+            for manager_key, is_bid, fee, fee_is_deep in sides:
+                key = (manager_key, pool_key)
+                position = self._positions.get(key)
+                if position is None:
+                    position = self._positions[key] = Position()
+
+                position.fill(quantity if is_bid else -quantity, price)
+                # Fees not paid in DEEP are taken from the input coin, quote for bids and base for asks
+                if fee_is_deep:
+                    position.fees_deep += fee / DEEP_SCALAR
+                elif is_bid:
+                    position.fees_quote += fee / quote_scalar
+                else:
+                    position.fees_base += fee / base_scalar
+                position.fills += 1
+                position.last_fill_timestamp = fields["timestamp"]
+
+                self._publish(key, position)
+
+        return True
+
+    def apply_events(self, events: Iterable) -> int:
+        """
+        Update positions from several events, in emission order
+
+        :param events: iterable of events
+        :returns: number of fills involving a tracked balance manager
+        """
+        return sum(1 for event in events if self.apply_event(event))
+
+    def apply_transaction(self, tx_response) -> int:
+        """
+        Update positions from the fills of one of our own transactions
+
+        :param tx_response: pysui TxResponse object or JSON-RPC response dictionary
+        :returns: number of fills involving a tracked balance manager
+        """
+        return self.apply_events(transaction_events(tx_response))
+
+    @property
+    def cursor(self) -> Optional[tuple]:
+        """Event ID of the last fill event polled, to resume polling with ``poll(cursor=...)``"""
+        if self._poller is None:
+            return None
+        return self._poller.cursors.get(ORDER_FILLED)
+
+    def poll(
+        self,
+        package_id: Optional[str] = None,
+        limit: int = 50,
+        start_at_latest: bool = False,
+        cursor: Optional[tuple] = None,
+    ) -> int:
+        """
+        Fetch and apply fill events emitted since the previous poll
+
+        The first poll starts at the oldest fill, after the newest one with ``start_at_latest``, or after
+        ``cursor``. Later polls ignore the three arguments.
+
+        :param package_id: package that declared the event structs, defaults to the configured DeepBook package
+        :param limit: page size of each event query
+        :param start_at_latest: if True the first poll only returns fills emitted after the newest one, e.g. when
+            positions are loaded from elsewhere
+        :param cursor: event ID of the last fill already applied, tuple of transaction digest and event sequence,
+            e.g. ``cursor`` saved before a restart
+        :returns: number of fills involving a tracked balance manager
+        """
+        if self._poller is None:
+            self._poller = EventPoller(
+                self._client.client,
+                package_id or self._config.DEEPBOOK_PACKAGE_ID,
+                names=(ORDER_FILLED,),
+                limit=limit,
+                start_at_latest=start_at_latest,
+                cursors={ORDER_FILLED: tuple(cursor)} if cursor else None,
+            )
+        return self.apply_events(self._poller.poll())
+
+    def set_mark(self, pool_key: str, price: float):
+        """
+        Set the price unrealized PnL of a pool is marked to
+
+        :param pool_key: key of the pool
+        :param price: mark price
+        """
+        with self._lock:
+            self._marks[pool_key] = price
+            for key, position in self._positions.items():
+                if key[1] == pool_key:
+                    self._publish(key, position)
+
+    def refresh_marks(self):
+        """Mark every pool with a position to its current mid price"""
+        for pool_key in {key[1] for key in self._positions}:
+            self.set_mark(pool_key, self._client.mid_price(pool_key))
+
+    def get(self, manager_key: str, pool_key: str) -> Optional[PositionSnapshot]:
+        """
+        Get the latest snapshot of a position
+
+        :param manager_key: key of the BalanceManager
+        :param pool_key: key of the pool
+        :returns: PositionSnapshot object or None if the manager never traded in the pool
+        """
+        return self._snapshots.get((manager_key, pool_key))
+
+    def snapshot(self) -> Dict[tuple, PositionSnapshot]:
+        """
+        Get the latest snapshot of every position
+
+        :returns: dictionary of PositionSnapshot objects keyed by (manager key, pool key)
+        """
+        return dict(self._snapshots)
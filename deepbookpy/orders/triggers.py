@@ -0,0 +1,369 @@
+"""
+Client-side stop, take profit and trailing triggers on pool mid prices.
+
+DeepBook has no native stop orders. ``TriggerEngine`` holds triggers per pool in heaps ordered by trigger price, one
+for triggers firing when the price falls to them and one for triggers firing when it rises to them, so a price
+update only pops the triggers it crossed. Trailing triggers sit in a third heap ordered by their reference price
+and are re-armed only when the price moves past it.
+
+Prices come from one batched ``mid_prices`` call per poll across every watched pool, pools with an empty side are
+skipped until they quote again. Triggers firing on the same update are sent together in one transaction, each running
+its ``PlaceMarketOrderParams`` or ``SwapParams`` order. When that transaction raises or its effects fail the triggers
+are armed again and fire on the next price crossing them, after ``max_attempts`` failed sends they are marked failed.
+"""
+
+import heapq
+import itertools
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Union
+
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_types.address import SuiAddress
+
+from deepbookpy.custom_types import PlaceMarketOrderParams, SwapParams
+from deepbookpy.deepbook_client import DeepBookClient
+
+
+STOP = "stop"
+TAKE_PROFIT = "take_profit"
+TRAILING_STOP = "trailing_stop"
+
+STATUS_ARMED = "armed"
+STATUS_FIRED = "fired"
+STATUS_CANCELED = "canceled"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class Trigger:
+    trigger_id: int
+    pool_key: str
+    kind: str
+    is_bid: bool
+    order: Union[PlaceMarketOrderParams, SwapParams]
+    trigger_price: float
+    trail: float = 0.0
+    reference_price: float = 0.0
+    status: str = STATUS_ARMED
+    fired_price: Optional[float] = None
+    version: int = 0
+    attempts: int = 0
+    error: Optional[str] = None
+
+    @property
+    def fires_on_fall(self) -> bool:
+        """True when the trigger fires as the price falls to the trigger price"""
+        if self.kind == TAKE_PROFIT:
+            return self.is_bid
+        return not self.is_bid
+
+
+class _PoolTriggers:
+    """Heaps of the armed triggers of one pool, stale entries are skipped on pop"""
+
+    def __init__(self):
+        # (-trigger price, ...) fire when price <= trigger price
+        self.falling = []
+        # (trigger price, ...) fire when price >= trigger price
+        self.rising = []
+        # (reference price, ...) trailing sells re-armed when price > reference
+        self.peaks = []
+        # (-reference price, ...) trailing buys re-armed when price < reference
+        self.troughs = []
+        self.armed = 0
+
+    @property
+    def entries(self) -> int:
+        return len(self.falling) + len(self.rising) + len(self.peaks) + len(self.troughs)
+
+
+class TriggerEngine:
+    """Stop, take profit and trailing triggers of many pools indexed by price"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        gas_budget: str = "",
+        on_fire: Optional[Callable[[List[Trigger], object], None]] = None,
+        execute: bool = True,
+        max_attempts: int = 3,
+    ):
+        """
+        Initializes the TriggerEngine class.
+
+        :param deepbook_client: DeepBookClient polling mid prices and executing the orders
+        :param gas_budget: gas budget of each transaction, a dry-run sets it when empty
+        :param on_fire: optional hook called with the triggers fired by an update and the execution result
+        :param execute: if False fired triggers are only passed to ``on_fire``
+        :param max_attempts: sends of a trigger's order before a failing trigger is marked failed
+        """
+        self._client = deepbook_client
+        self.gas_budget = gas_budget
+        self.on_fire = on_fire
+        self.execute = execute
+        self.max_attempts = max_attempts
+
+        self._lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._sequence = itertools.count()
+        self._triggers: Dict[int, Trigger] = {}
+        self._pools: Dict[str, _PoolTriggers] = {}
+        self.prices: Dict[str, float] = {}
+        self.last_error: Optional[Exception] = None
+
+    def __len__(self) -> int:
+        return sum(pool.armed for pool in self._pools.values())
+
+    def get(self, trigger_id: int) -> Optional[Trigger]:
+        return self._triggers.get(trigger_id)
+
+    # Index maintenance
+    def _push(self, trigger: Trigger):
+        pool = self._pools.setdefault(trigger.pool_key, _PoolTriggers())
+        entry = (next(self._sequence), trigger.trigger_id, trigger.version)
+        if trigger.fires_on_fall:
+            heapq.heappush(pool.falling, (-trigger.trigger_price,) + entry)
+        else:
+            heapq.heappush(pool.rising, (trigger.trigger_price,) + entry)
+
+        if trigger.kind == TRAILING_STOP:
+            if trigger.is_bid:
+                heapq.heappush(pool.troughs, (-trigger.reference_price,) + entry)
+            else:
+                heapq.heappush(pool.peaks, (trigger.reference_price,) + entry)
+
+    def _live(self, trigger_id: int, version: int) -> Optional[Trigger]:
+        trigger = self._triggers.get(trigger_id)
+        if trigger is None or trigger.version != version or trigger.status != STATUS_ARMED:
+            return None
+        return trigger
+
+    def add(
+        self,
+        pool_key: str,
+        kind: str,
+        order: Union[PlaceMarketOrderParams, SwapParams],
+        trigger_price: Optional[float] = None,
+        trail: float = 0.0,
+        is_bid: Optional[bool] = None,
+        reference_price: Optional[float] = None,
+    ) -> Trigger:
+        """
+        Arm a trigger
+
+        :param pool_key: key of the watched pool
+        :param kind: ``STOP``, ``TAKE_PROFIT`` or ``TRAILING_STOP``
+        :param order: order sent when the trigger fires, a market order or a swap
+        :param trigger_price: price firing the trigger, not used by trailing stops
+        :param trail: distance of a trailing stop from the best price seen, as a fraction, e.g. 0.02
+        :param is_bid: True if the order buys, taken from ``order.is_bid`` for market orders, required for swaps
+        :param reference_price: starting best price of a trailing stop, defaults to the last polled price
+        :returns: Trigger object
+        """
+        if is_bid is None:
+            if not isinstance(order, PlaceMarketOrderParams):
+                raise ValueError("is_bid is required for swap triggers")
+            is_bid = order.is_bid
+        if kind not in (STOP, TAKE_PROFIT, TRAILING_STOP):
+            raise ValueError(f"Unknown trigger kind {kind}")
+
+        if kind == TRAILING_STOP:
+            if not 0 < trail < 1:
+                raise ValueError("trail must be between 0 and 1")
+            if reference_price is None:
+                reference_price = self.prices.get(pool_key)
+            if reference_price is None:
+                raise ValueError(f"No price for {pool_key} yet, pass reference_price")
+            trigger_price = reference_price * (1 + trail if is_bid else 1 - trail)
+        elif trigger_price is None:
+            raise ValueError("trigger_price is required")
+
+        with self._lock:
+            trigger = Trigger(
+                trigger_id=next(self._ids),
+                pool_key=pool_key,
+                kind=kind,
+                is_bid=is_bid,
+                order=order,
+                trigger_price=trigger_price,
+                trail=trail,
+                reference_price=reference_price or 0.0,
+            )
+            self._triggers[trigger.trigger_id] = trigger
+            self._push(trigger)
+            self._pools[pool_key].armed += 1
+        return trigger
+
+    def cancel(self, trigger_id: int) -> bool:
+        """
+        Disarm a trigger
+
+        :param trigger_id: ID of the trigger
+        :returns: True if the trigger was armed
+        """
+        with self._lock:
+            trigger = self._triggers.get(trigger_id)
+            if trigger is None or trigger.status != STATUS_ARMED:
+                return False
+            trigger.status = STATUS_CANCELED
+            self._pools[trigger.pool_key].armed -= 1
+            del self._triggers[trigger_id]
+            return True
+
+    def _compact(self, pool: _PoolTriggers):
+        """Drop the entries of canceled, fired and moved triggers"""
+        for name in ("falling", "rising", "peaks", "troughs"):
+            heap = [entry for entry in getattr(pool, name) if self._live(entry[2], entry[3]) is not None]
+            heapq.heapify(heap)
+            setattr(pool, name, heap)
+
+    # Price updates
+    def _trail(self, pool: _PoolTriggers, price: float):
+        """Move trailing stops whose best price was passed, each moved stop is pushed again"""
+        while pool.peaks and pool.peaks[0][0] < price:
+            _, _, trigger_id, version = heapq.heappop(pool.peaks)
+            trigger = self._live(trigger_id, version)
+            if trigger is not None:
+                trigger.version += 1
+                trigger.reference_price = price
+                trigger.trigger_price = price * (1 - trigger.trail)
+                self._push(trigger)
+
+        while pool.troughs and -pool.troughs[0][0] > price:
+            _, _, trigger_id, version = heapq.heappop(pool.troughs)
+            trigger = self._live(trigger_id, version)
+            if trigger is not None:
+                trigger.version += 1
+                trigger.reference_price = price
+                trigger.trigger_price = price * (1 + trigger.trail)
+                self._push(trigger)
+
+    def update(self, pool_key: str, price: float) -> List[Trigger]:
+        """
+        Apply a new price of a pool and fire the triggers it crossed
+
+        :param pool_key: key of the pool
+        :param price: mid price
+        :returns: list of fired Trigger objects
+        """
+        with self._lock:
+            self.prices[pool_key] = price
+            pool = self._pools.get(pool_key)
+            if pool is None or not pool.armed:
+                return []
+
+            self._trail(pool, price)
+            if pool.entries > 4 * pool.armed + 64:
+                self._compact(pool)
+
+            fired = []
+            while pool.falling and -pool.falling[0][0] >= price:
+                _, _, trigger_id, version = heapq.heappop(pool.falling)
+                trigger = self._live(trigger_id, version)
+                if trigger is not None:
+                    fired.append(trigger)
+            while pool.rising and pool.rising[0][0] <= price:
+                _, _, trigger_id, version = heapq.heappop(pool.rising)
+                trigger = self._live(trigger_id, version)
+                if trigger is not None:
+                    fired.append(trigger)
+
+            for trigger in fired:
+                trigger.status = STATUS_FIRED
+                trigger.fired_price = price
+                del self._triggers[trigger.trigger_id]
+            pool.armed -= len(fired)
+
+        if fired:
+            self._fire(fired)
+        return fired
+
+    def poll(self) -> List[Trigger]:
+        """
+        Fetch the mid price of every pool with armed triggers in one call and apply them
+
+        Pools with an empty side have no mid price and are skipped. Every pool is updated even when firing the
+        triggers of one raises, the first error is raised once all are updated.
+
+        :returns: list of fired Trigger objects
+        """
+        pool_keys = [pool_key for pool_key, pool in self._pools.items() if pool.armed]
+        if not pool_keys:
+            return []
+        fired, error = [], None
+        for pool_key, price in self._client.mid_prices(pool_keys, skip_empty=True).items():
+            try:
+                fired.extend(self.update(pool_key, price))
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return fired
+
+    def run(self, interval: float = 1.0, stop: Optional[threading.Event] = None):
+        """
+        Poll on schedule until the stop event is set
+
+        :param interval: seconds between polls
+        :param stop: optional threading.Event ending the run
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.poll()
+                self.last_error = None
+            except Exception as e:
+                # A failed poll or send keeps the triggers armed, the next poll retries
+                self.last_error = e
+            stop.wait(interval)
+
+    # Execution
+    def _build(self, triggers: List[Trigger]) -> SyncTransaction:
+        tx = SyncTransaction(client=self._client.client)
+        deepbook = self._client.deepbook
+        owned_objects = None
+        for trigger in triggers:
+            if isinstance(trigger.order, PlaceMarketOrderParams):
+                deepbook.place_market_order(trigger.order, tx)
+                continue
+
+            if owned_objects is None:
+                owned_objects = self._client.client.get_objects()
+            swap = deepbook.swap_exact_quote_for_base if trigger.is_bid else deepbook.swap_exact_base_for_quote
+            coins = swap(sender_with_result=owned_objects, params=trigger.order, tx=tx)
+            tx.transfer_objects(
+                transfers=list(coins), recipient=SuiAddress(self._client.config.address)
+            )
+        return tx
+
+    def _rearm(self, triggers: List[Trigger], error: str):
+        """Arm again triggers whose order was not executed, or mark them failed after ``max_attempts`` sends"""
+        with self._lock:
+            for trigger in triggers:
+                trigger.error = error
+                if trigger.attempts >= self.max_attempts:
+                    trigger.status = STATUS_FAILED
+                    continue
+                trigger.status = STATUS_ARMED
+                trigger.version += 1
+                self._triggers[trigger.trigger_id] = trigger
+                self._push(trigger)
+                self._pools[trigger.pool_key].armed += 1
+
+    def _fire(self, triggers: List[Trigger]):
+        result = None
+        if self.execute:
+            for trigger in triggers:
+                trigger.attempts += 1
+            try:
+                result = self._client.execute_transaction(self._build(triggers), gas_budget=self.gas_budget)
+            except Exception as e:
+                self._rearm(triggers, str(e))
+                raise
+            if result.is_err():
+                self._rearm(triggers, result.result_string)
+            elif not result.result_data.succeeded:
+                self._rearm(triggers, result.result_data.status)
+        if self.on_fire is not None:
+            self.on_fire(triggers, result)
@@ -0,0 +1,525 @@
+"""
+Backtest harness replaying recorded Level 2 snapshots and trades of a pool.
+
+Market data is streamed: sources turn chunks of columns (sequences of exact on-chain integers) into events one at a
+time, and ``merge_events`` interleaves sources in timestamp order, so nothing is loaded into memory as a whole.
+
+Level 2 columns hold one row per snapshot with ``timestamp``, ``bid_offsets`` and ``ask_offsets`` (``n + 1`` offsets
+into the flattened ``bid_prices`` / ``bid_quantities`` and ``ask_prices`` / ``ask_quantities`` columns, best level
+first). Trade columns hold ``timestamp``, ``price``, ``quantity`` and ``taker_is_bid``.
+
+``Backtest`` drives a strategy callback with every event. The strategy places orders with the SDK parameter types.
+Orders reach the simulated book after a configurable latency. Marketable orders take liquidity from the latest
+snapshot, resting orders wait behind the quantity that was already at their price and are filled by recorded trades.
+Our orders never change the recorded market.
+"""
+
+import heapq
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+
+from deepbookpy.custom_types import OrderType, PlaceLimitOrderParams, PlaceMarketOrderParams, SwapParams
+from deepbookpy.orders.positions import Position
+from deepbookpy.simulator.matching_engine import FEE_PENALTY_MULTIPLIER
+from deepbookpy.utils.config import DeepBookConfig, FLOAT_SCALAR
+
+
+class BookSnapshot(NamedTuple):
+    timestamp: int
+    bid_prices: List[int]
+    bid_quantities: List[int]
+    ask_prices: List[int]
+    ask_quantities: List[int]
+
+
+class Trade(NamedTuple):
+    timestamp: int
+    price: int
+    quantity: int
+    taker_is_bid: bool
+
+
+def snapshots_from_columns(chunks: Iterable[dict]) -> Iterator[BookSnapshot]:
+    """
+    Stream Level 2 snapshots from column chunks
+
+    :param chunks: iterable of dictionaries of Level 2 columns
+    :returns: iterator of BookSnapshot objects
+    """
+    for columns in chunks:
+        bid_offsets = columns["bid_offsets"]
+        ask_offsets = columns["ask_offsets"]
+        bid_prices, bid_quantities = columns["bid_prices"], columns["bid_quantities"]
+        ask_prices, ask_quantities = columns["ask_prices"], columns["ask_quantities"]
+        for row, timestamp in enumerate(columns["timestamp"]):
+            bid_start, bid_end = bid_offsets[row], bid_offsets[row + 1]
+            ask_start, ask_end = ask_offsets[row], ask_offsets[row + 1]
+            yield BookSnapshot(
+                timestamp,
+                list(bid_prices[bid_start:bid_end]),
+                list(bid_quantities[bid_start:bid_end]),
+                list(ask_prices[ask_start:ask_end]),
+                list(ask_quantities[ask_start:ask_end]),
+            )
+
+
+def trades_from_columns(chunks: Iterable[dict]) -> Iterator[Trade]:
+    """
+    Stream trades from column chunks
+
+    :param chunks: iterable of dictionaries of trade columns
+    :returns: iterator of Trade objects
+    """
+    for columns in chunks:
+        for row in zip(
+            columns["timestamp"], columns["price"], columns["quantity"], columns["taker_is_bid"]
+        ):
+            yield Trade(row[0], row[1], row[2], bool(row[3]))
+
+
+def merge_events(*streams: Iterable) -> Iterator:
+    """
+    Interleave time ordered event streams
+
+    :param streams: iterables of events with a ``timestamp`` member
+    :returns: iterator of events in timestamp order
+    """
+    return heapq.merge(*streams, key=lambda event: event.timestamp)
+
+
+@dataclass
+class SimulatedOrder:
+    order_id: int
+    client_order_id: int
+    is_bid: bool
+    price: int
+    quantity: int
+    pay_with_deep: bool
+    filled_quantity: int = 0
+    quote_quantity: int = 0
+    queue_ahead: int = 0
+    active: bool = False
+    canceled: bool = False
+
+    @property
+    def remaining_quantity(self) -> int:
+        return self.quantity - self.filled_quantity
+
+
+@dataclass
+class BacktestReport:
+    events: int
+    snapshots: int
+    trades: int
+    orders: int
+    filled_orders: int
+    placed_quantity: float
+    filled_quantity: float
+    maker_quantity: float
+    taker_quantity: float
+    base_position: float
+    realized_pnl: float
+    unrealized_pnl: float
+    fees_deep: float
+    fees_quote: float
+    elapsed: float
+    fees_base: float = 0.0
+
+    @property
+    def fill_rate(self) -> float:
+        return self.filled_quantity / self.placed_quantity if self.placed_quantity else 0.0
+
+    @property
+    def total_pnl(self) -> float:
+        return self.realized_pnl + self.unrealized_pnl
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.elapsed if self.elapsed else 0.0
+
+
+class Backtest:
+    """Replays market data of one pool through a strategy callback"""
+
+    def __init__(
+        self,
+        config: DeepBookConfig,
+        pool_key: str,
+        strategy: Callable[["Backtest", Union[BookSnapshot, Trade]], None],
+        latency_ms: int = 0,
+        queue_position: bool = True,
+        taker_fee: float = 0.0,
+        maker_fee: float = 0.0,
+        deep_per_base: float = 0.0,
+    ):
+        """
+        Initializes the Backtest class.
+
+        :param config: DeepBookConfig providing pool and coin scalars
+        :param pool_key: key of the replayed pool
+        :param strategy: callback called as ``strategy(backtest, event)`` after each event is applied
+        :param latency_ms: delay before placed and canceled orders reach the book
+        :param queue_position: if True resting orders only fill after the quantity ahead of them at their price trades
+        :param taker_fee: taker fee rate, e.g. 0.001
+        :param maker_fee: maker fee rate
+        :param deep_per_base: DEEP paid per base coin, used for orders paying fees in DEEP
+        """
+        pool = config.get_pool(pool_key)
+        self.base_scalar = config.get_coin(pool["base_coin"])["scalar"]
+        self.quote_scalar = config.get_coin(pool["quote_coin"])["scalar"]
+        self.pool_key = pool_key
+        self.strategy = strategy
+        self.latency_ms = latency_ms
+        self.queue_position = queue_position
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.deep_per_base = deep_per_base
+
+        self.timestamp = 0
+        self.book: Optional[BookSnapshot] = None
+        self.position = Position()
+        self.orders: Dict[int, SimulatedOrder] = {}
+
+        self._pending = []
+        self._sequence = 0
+        self._bid_liquidity = {}
+        self._ask_liquidity = {}
+        self._counts = dict(
+            events=0, snapshots=0, trades=0, orders=0, filled_orders=0,
+            placed_quantity=0, maker_quantity=0, taker_quantity=0,
+        )
+        self.fees_deep = 0.0
+        self.fees_quote = 0.0
+        self.fees_base = 0.0
+
+    # Unit conversions
+    def to_price(self, price: float) -> int:
+        return round(price * FLOAT_SCALAR * self.quote_scalar / self.base_scalar)
+
+    def from_price(self, price: int) -> float:
+        return price * self.base_scalar / self.quote_scalar / FLOAT_SCALAR
+
+    def to_quantity(self, quantity: float) -> int:
+        return round(quantity * self.base_scalar)
+
+    def from_quantity(self, quantity: int) -> float:
+        return quantity / self.base_scalar
+
+    # Strategy API
+    def mid_price(self) -> Optional[float]:
+        """
+        Get the mid price of the latest snapshot
+
+        :returns: mid price or None when a side is empty
+        """
+        if self.book is None or not self.book.bid_prices or not self.book.ask_prices:
+            return None
+        return self.from_price((self.book.bid_prices[0] + self.book.ask_prices[0]) // 2)
+
+    def open_orders(self) -> List[SimulatedOrder]:
+        return [order for order in self.orders.values() if not order.canceled]
+
+    def place_limit_order(self, params: PlaceLimitOrderParams) -> int:
+        """
+        Submit a limit order, it reaches the book after the configured latency
+
+        :param params: PlaceLimitOrder parameters, ``pool_key`` and ``balance_manager_key`` are not used
+        :returns: simulated order ID
+        """
+        order_type = params.order_type.value if isinstance(params.order_type, OrderType) else (params.order_type or 0)
+        return self._submit(
+            params.client_order_id,
+            params.is_bid,
+            self.to_price(params.price),
+            self.to_quantity(params.quantity),
+            order_type,
+            True if params.pay_with_deep is None else params.pay_with_deep,
+        )
+
+    def place_market_order(self, params: PlaceMarketOrderParams) -> int:
+        """
+        Submit a market order, it reaches the book after the configured latency
+
+        :param params: PlaceMarketOrderParams parameters
+        :returns: simulated order ID
+        """
+        return self._submit(
+            params.client_order_id,
+            params.is_bid,
+            None,
+            self.to_quantity(params.quantity),
+            OrderType.IMMEDIATE_OR_CANCEL.value,
+            True if params.pay_with_deep is None else params.pay_with_deep,
+        )
+
+    def swap_exact_base_for_quote(self, params: SwapParams) -> int:
+        """
+        Submit a swap selling ``params.amount`` base coin, it reaches the book after the configured latency
+
+        :param params: SwapParams parameters, ``min_out`` is not enforced
+        :returns: simulated order ID
+        """
+        return self._submit(
+            0, False, None, self.to_quantity(params.amount), OrderType.IMMEDIATE_OR_CANCEL.value, params.deep_amount > 0
+        )
+
+    def swap_exact_quote_for_base(self, params: SwapParams) -> int:
+        """
+        Submit a swap spending ``params.amount`` quote coin, it reaches the book after the configured latency
+
+        :param params: SwapParams parameters, ``min_out`` is not enforced
+        :returns: simulated order ID
+        """
+        return self._submit(
+            0,
+            True,
+            None,
+            0,
+            OrderType.IMMEDIATE_OR_CANCEL.value,
+            params.deep_amount > 0,
+            quote_quantity=round(params.amount * self.quote_scalar),
+        )
+
+    def cancel_order(self, order_id: int):
+        """
+        Cancel an order, the cancel reaches the book after the configured latency
+
+        :param order_id: simulated order ID
+        """
+        heapq.heappush(self._pending, (self.timestamp + self.latency_ms, self._next_sequence(), "cancel", order_id))
+
+    def cancel_all_orders(self):
+        for order_id in list(self.orders):
+            self.cancel_order(order_id)
+
+    def _next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def _submit(self, client_order_id, is_bid, price, quantity, order_type, pay_with_deep, quote_quantity=0) -> int:
+        order_id = self._next_sequence()
+        order = SimulatedOrder(
+            order_id=order_id,
+            client_order_id=int(client_order_id),
+            is_bid=is_bid,
+            price=price,
+            quantity=quantity,
+            pay_with_deep=pay_with_deep,
+            quote_quantity=quote_quantity,
+        )
+        self._counts["orders"] += 1
+        self._counts["placed_quantity"] += quantity
+        heapq.heappush(
+            self._pending,
+            (self.timestamp + self.latency_ms, order_id, "place", (order, order_type)),
+        )
+        return order_id
+
+    # Matching
+    def _fill(self, order: SimulatedOrder, price: int, quantity: int, is_maker: bool):
+        order.filled_quantity += quantity
+        base = self.from_quantity(quantity)
+        fill_price = self.from_price(price)
+        self.position.fill(base if order.is_bid else -base, fill_price)
+
+        rate = self.maker_fee if is_maker else self.taker_fee
+        if order.pay_with_deep:
+            self.fees_deep += base * self.deep_per_base * rate
+        elif order.is_bid:
+            # Fees not paid in DEEP are taken from the input coin with the fee penalty, as in MatchingEngine
+            self.fees_quote += base * fill_price * rate * FEE_PENALTY_MULTIPLIER
+        else:
+            self.fees_base += base * rate * FEE_PENALTY_MULTIPLIER
+        self._counts["maker_quantity" if is_maker else "taker_quantity"] += quantity
+
+        if order.remaining_quantity == 0:
+            self._counts["filled_orders"] += 1
+            self.orders.pop(order.order_id, None)
+
+    def _take(self, order: SimulatedOrder):
+        """Fill a marketable order against the latest snapshot, consuming its liquidity until the next one"""
+        if self.book is None:
+            return
+        if order.is_bid:
+            prices, quantities, taken = self.book.ask_prices, self.book.ask_quantities, self._ask_liquidity
+        else:
+            prices, quantities, taken = self.book.bid_prices, self.book.bid_quantities, self._bid_liquidity
+
+        if order.quote_quantity:
+            # Quote in, the base quantity bought is whatever the quote amount affords walking the book
+            budget = order.quote_quantity * FLOAT_SCALAR
+            for price, quantity in zip(prices, quantities):
+                affordable = min(quantity - taken.get(price, 0), budget // price)
+                if affordable <= 0:
+                    break
+                order.quantity += affordable
+                budget -= affordable * price
+            self._counts["placed_quantity"] += order.quantity
+
+        for price, quantity in zip(prices, quantities):
+            if order.remaining_quantity == 0:
+                return
+            if order.price is not None and (price > order.price if order.is_bid else price < order.price):
+                return
+            available = quantity - taken.get(price, 0)
+            if available <= 0:
+                continue
+            fill = min(available, order.remaining_quantity)
+            taken[price] = taken.get(price, 0) + fill
+            self._fill(order, price, fill, is_maker=False)
+
+    def _activate(self, order: SimulatedOrder, order_type: int):
+        if order_type == OrderType.POST_ONLY.value:
+            if self._crosses(order):
+                return
+        elif order_type == OrderType.FILL_OR_KILL.value:
+            if self._available(order) < order.quantity:
+                return
+            self._take(order)
+        else:
+            self._take(order)
+        if order.remaining_quantity == 0 or order_type in (
+            OrderType.IMMEDIATE_OR_CANCEL.value,
+            OrderType.FILL_OR_KILL.value,
+        ):
+            return
+
+        order.active = True
+        if self.queue_position and self.book is not None:
+            prices = self.book.bid_prices if order.is_bid else self.book.ask_prices
+            quantities = self.book.bid_quantities if order.is_bid else self.book.ask_quantities
+            for price, quantity in zip(prices, quantities):
+                if price == order.price:
+                    order.queue_ahead = quantity
+                    break
+        self.orders[order.order_id] = order
+
+    def _available(self, order: SimulatedOrder) -> int:
+        if self.book is None:
+            return 0
+        if order.is_bid:
+            prices, quantities, taken = self.book.ask_prices, self.book.ask_quantities, self._ask_liquidity
+        else:
+            prices, quantities, taken = self.book.bid_prices, self.book.bid_quantities, self._bid_liquidity
+
+        available = 0
+        for price, quantity in zip(prices, quantities):
+            if price > order.price if order.is_bid else price < order.price:
+                break
+            available += quantity - taken.get(price, 0)
+        return available
+
+    def _crosses(self, order: SimulatedOrder) -> bool:
+        if self.book is None:
+            return False
+        if order.is_bid:
+            return bool(self.book.ask_prices) and self.book.ask_prices[0] <= order.price
+        return bool(self.book.bid_prices) and self.book.bid_prices[0] >= order.price
+
+    def _process_pending(self, timestamp: int):
+        while self._pending and self._pending[0][0] <= timestamp:
+            _, _, action, payload = heapq.heappop(self._pending)
+            if action == "place":
+                self._activate(*payload)
+            else:
+                order = self.orders.pop(payload, None)
+                if order is not None:
+                    order.canceled = True
+
+    def _on_snapshot(self, snapshot: BookSnapshot):
+        self.book = snapshot
+        self._bid_liquidity.clear()
+        self._ask_liquidity.clear()
+
+        # The market moved through resting orders, they were filled at their price
+        for order in list(self.orders.values()):
+            if self._crosses(order):
+                self._fill(order, order.price, order.remaining_quantity, is_maker=True)
+
+    def _on_trade(self, trade: Trade):
+        # A trade hits our side when the taker is on the other side, at our price or better for the taker
+        if trade.taker_is_bid:
+            orders = [order for order in self.orders.values() if not order.is_bid and order.price <= trade.price]
+            orders.sort(key=lambda order: (order.price, order.order_id))
+        else:
+            orders = [order for order in self.orders.values() if order.is_bid and order.price >= trade.price]
+            orders.sort(key=lambda order: (-order.price, order.order_id))
+
+        # One trade quantity is shared by the queue ahead and our orders, in price-time priority
+        remaining = trade.quantity
+        queue_consumed = 0
+        for order in orders:
+            if remaining <= 0:
+                break
+            if trade.price == order.price and order.queue_ahead:
+                # The queue already traded through by this trade is ahead of every order at the price
+                order.queue_ahead -= min(order.queue_ahead, queue_consumed)
+                consumed = min(order.queue_ahead, remaining)
+                order.queue_ahead -= consumed
+                queue_consumed += consumed
+                remaining -= consumed
+            if remaining > 0:
+                fill = min(remaining, order.remaining_quantity)
+                remaining -= fill
+                self._fill(order, order.price, fill, is_maker=True)
+
+    def run(self, events: Iterable[Union[BookSnapshot, Trade]]) -> BacktestReport:
+        """
+        Replay events through the strategy
+
+        :param events: time ordered iterable of BookSnapshot and Trade events, e.g. from ``merge_events``
+        :returns: BacktestReport object
+        """
+        started = time.perf_counter()
+        counts = self._counts
+
+        for event in events:
+            self.timestamp = event.timestamp
+            if self._pending:
+                self._process_pending(event.timestamp)
+
+            if isinstance(event, Trade):
+                counts["trades"] += 1
+                if self.orders:
+                    self._on_trade(event)
+            else:
+                counts["snapshots"] += 1
+                self._on_snapshot(event)
+
+            counts["events"] += 1
+            self.strategy(self, event)
+
+        return self.report(time.perf_counter() - started)
+
+    def report(self, elapsed: float = 0.0) -> BacktestReport:
+        """
+        Summarize the run
+
+        :param elapsed: wall clock duration of the run in seconds
+        :returns: BacktestReport object
+        """
+        counts = self._counts
+        mid_price = self.mid_price()
+        unrealized = 0.0
+        if mid_price is not None and self.position.base_position:
+            unrealized = self.position.base_position * (mid_price - self.position.average_entry_price)
+
+        return BacktestReport(
+            events=counts["events"],
+            snapshots=counts["snapshots"],
+            trades=counts["trades"],
+            orders=counts["orders"],
+            filled_orders=counts["filled_orders"],
+            placed_quantity=self.from_quantity(counts["placed_quantity"]),
+            filled_quantity=self.from_quantity(counts["maker_quantity"] + counts["taker_quantity"]),
+            maker_quantity=self.from_quantity(counts["maker_quantity"]),
+            taker_quantity=self.from_quantity(counts["taker_quantity"]),
+            base_position=self.position.base_position,
+            realized_pnl=self.position.realized_pnl,
+            unrealized_pnl=unrealized,
+            fees_deep=self.fees_deep,
+            fees_quote=self.fees_quote,
+            elapsed=elapsed,
+            fees_base=self.fees_base,
+        )
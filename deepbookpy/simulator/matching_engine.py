@@ -0,0 +1,753 @@
+"""
+Local DeepBook v3 matching engine.
+
+``MatchingEngine`` models a single pool's order book with on-chain integer prices and quantities, price-time priority
+and the validation DeepBook performs: tick size, lot size, min size, expiration, order types (no restriction, immediate
+or cancel, fill or kill, post only) and self matching options. Taker and maker fees are charged per fill, in DEEP when
+``pay_with_deep`` is set and otherwise in the input coin with DeepBook's fee penalty.
+
+``SimulatedDeepBook`` wraps one engine per pool and accepts the same ``PlaceLimitOrderParams`` /
+``PlaceMarketOrderParams`` as ``DeepBookContract``, so a strategy can switch between the simulator and the chain.
+
+Balance manager funds are not modelled, orders are never rejected for insufficient balance.
+"""
+
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Union
+
+from deepbookpy.custom_types import (
+    OrderType,
+    PlaceLimitOrderParams,
+    PlaceMarketOrderParams,
+    SelfMatchingOptions,
+)
+from deepbookpy.utils.config import DeepBookConfig, FLOAT_SCALAR
+from deepbookpy.utils.constants import DEFAULT_EXPIRATION_TIMESTAMP
+
+
+MIN_PRICE = 1
+MAX_PRICE = (1 << 63) - 1
+MAX_U64 = (1 << 64) - 1
+# Fees paid in the input coin instead of DEEP cost this much more
+FEE_PENALTY_MULTIPLIER = 1.25
+
+STATUS_LIVE = "live"
+STATUS_PARTIALLY_FILLED = "partially_filled"
+STATUS_FILLED = "filled"
+STATUS_CANCELED = "canceled"
+STATUS_EXPIRED = "expired"
+
+
+class MatchingEngineError(Exception):
+    """Order rejected, ``code`` is the name of the matching on-chain abort"""
+
+    def __init__(self, code: str, message: str = ""):
+        self.code = code
+        super().__init__(f"{code}: {message}" if message else code)
+
+
+def encode_order_id(is_bid: bool, price: int, sequence: int) -> int:
+    """
+    Encode an order ID the way DeepBook does
+
+    :param is_bid: order side
+    :param price: on-chain price
+    :param sequence: order sequence number
+    :returns: 128-bit order ID
+    """
+    if is_bid:
+        return (price << 64) + sequence
+    return (1 << 127) + (price << 64) + sequence
+
+
+def _option_value(value, default: int = 0) -> int:
+    if value is None:
+        return default
+    if isinstance(value, Enum):
+        return value.value
+    return int(value)
+
+
+@dataclass
+class BookOrder:
+    order_id: int
+    client_order_id: int
+    balance_manager_key: str
+    is_bid: bool
+    price: int
+    quantity: int
+    filled_quantity: int = 0
+    fee_is_deep: bool = True
+    expire_timestamp: int = DEFAULT_EXPIRATION_TIMESTAMP
+    timestamp: int = 0
+    status: str = STATUS_LIVE
+
+    @property
+    def remaining_quantity(self) -> int:
+        return self.quantity - self.filled_quantity
+
+
+@dataclass
+class Fill:
+    maker_order_id: int
+    maker_client_order_id: int
+    maker_balance_manager_key: str
+    price: int
+    base_quantity: int
+    quote_quantity: int
+    taker_is_bid: bool
+    taker_fee: int
+    taker_fee_is_deep: bool
+    maker_fee: int
+    maker_fee_is_deep: bool
+    timestamp: int
+
+
+@dataclass
+class OrderResult:
+    order_id: int
+    client_order_id: int
+    balance_manager_key: str
+    is_bid: bool
+    price: int
+    original_quantity: int
+    executed_quantity: int = 0
+    cumulative_quote_quantity: int = 0
+    paid_fees: int = 0
+    fee_is_deep: bool = True
+    status: str = STATUS_LIVE
+    order_inserted: bool = False
+    fills: List[Fill] = field(default_factory=list)
+    expired_order_ids: List[int] = field(default_factory=list)
+    canceled_maker_order_ids: List[int] = field(default_factory=list)
+
+
+class _Level:
+    """Orders resting at one price, oldest first"""
+
+    __slots__ = ("orders", "quantity")
+
+    def __init__(self):
+        self.orders = deque()
+        self.quantity = 0
+
+
+class _Side:
+    """One side of the book: a heap of prices over levels with lazy removal"""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: Dict[int, _Level] = {}
+        self._heap = []
+
+    def _heap_key(self, price: int) -> int:
+        return -price if self.is_bid else price
+
+    def best_price(self) -> Optional[int]:
+        while self._heap:
+            price = self._heap_key(self._heap[0])
+            level = self.levels.get(price)
+            if level is not None and level.quantity > 0:
+                return price
+            # Empty level, whatever is left in its queue was canceled or filled
+            heapq.heappop(self._heap)
+            self.levels.pop(price, None)
+        return None
+
+    def add(self, order: BookOrder):
+        level = self.levels.get(order.price)
+        if level is None:
+            level = self.levels[order.price] = _Level()
+            heapq.heappush(self._heap, self._heap_key(order.price))
+        level.orders.append(order)
+        level.quantity += order.remaining_quantity
+
+    def prices(self) -> List[int]:
+        """Live prices from best to worst"""
+        prices = [price for price, level in self.levels.items() if level.quantity > 0]
+        return sorted(prices, reverse=self.is_bid)
+
+
+class MatchingEngine:
+    """Order book of a single pool in on-chain units"""
+
+    def __init__(
+        self,
+        tick_size: int,
+        lot_size: int,
+        min_size: int,
+        taker_fee: int = 0,
+        maker_fee: int = 0,
+        deep_per_base: int = 0,
+    ):
+        """
+        Initializes the MatchingEngine class.
+
+        :param tick_size: price tick size, as returned by ``pool_book_params`` scaled to on-chain units
+        :param lot_size: quantity lot size in base coin units
+        :param min_size: minimum order quantity in base coin units
+        :param taker_fee: taker fee rate scaled by ``FLOAT_SCALAR``
+        :param maker_fee: maker fee rate scaled by ``FLOAT_SCALAR``
+        :param deep_per_base: DEEP units per base coin unit scaled by ``FLOAT_SCALAR``, used for DEEP fees
+        """
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self.min_size = min_size
+        self.taker_fee = taker_fee
+        self.maker_fee = maker_fee
+        self.deep_per_base = deep_per_base
+
+        self.bids = _Side(is_bid=True)
+        self.asks = _Side(is_bid=False)
+        self.orders: Dict[int, BookOrder] = {}
+        self._next_bid_sequence = 0
+        self._next_ask_sequence = 0
+
+    # Fees
+    def _fee(self, rate: int, base_quantity: int, quote_quantity: int, is_bid: bool, pay_with_deep: bool) -> int:
+        if pay_with_deep:
+            deep_quantity = base_quantity * self.deep_per_base // FLOAT_SCALAR
+            return deep_quantity * rate // FLOAT_SCALAR
+        input_quantity = quote_quantity if is_bid else base_quantity
+        return int(input_quantity * rate * FEE_PENALTY_MULTIPLIER) // FLOAT_SCALAR
+
+    # Validation
+    def _validate(self, price: int, quantity: int, expire_timestamp: int, timestamp: int):
+        if not MIN_PRICE <= price <= MAX_PRICE or price % self.tick_size:
+            raise MatchingEngineError("EOrderInvalidPrice", f"price {price}, tick size {self.tick_size}")
+        if quantity < self.min_size:
+            raise MatchingEngineError("EOrderBelowMinimumSize", f"quantity {quantity}, min size {self.min_size}")
+        if quantity % self.lot_size:
+            raise MatchingEngineError("EOrderInvalidLotSize", f"quantity {quantity}, lot size {self.lot_size}")
+        if expire_timestamp <= timestamp:
+            raise MatchingEngineError("EInvalidExpireTimestamp", f"expiration {expire_timestamp}")
+
+    def _next_order_id(self, is_bid: bool, price: int) -> int:
+        if is_bid:
+            # Earlier bids get larger sequences, as on chain
+            self._next_bid_sequence += 1
+            return encode_order_id(True, price, MAX_U64 - self._next_bid_sequence)
+        self._next_ask_sequence += 1
+        return encode_order_id(False, price, self._next_ask_sequence)
+
+    def _crosses(self, is_bid: bool, price: int, best: Optional[int]) -> bool:
+        if best is None:
+            return False
+        return best <= price if is_bid else best >= price
+
+    def _scan(
+        self,
+        is_bid: bool,
+        price: int,
+        quantity: int,
+        balance_manager_key: str,
+        self_matching_option: int,
+        timestamp: int,
+    ) -> tuple:
+        """
+        Walk the book like a match would, without changing it
+
+        Lets fill or kill and cancel taker orders abort before any fill, as the whole transaction would on chain.
+
+        :returns: tuple of fillable quantity and whether the order would match one of its own balance manager
+        """
+        book = self.asks if is_bid else self.bids
+        fillable = 0
+        for level_price in book.prices():
+            if not self._crosses(is_bid, price, level_price):
+                break
+            for maker in book.levels[level_price].orders:
+                if maker.status != STATUS_LIVE or maker.expire_timestamp < timestamp:
+                    continue
+                if maker.balance_manager_key == balance_manager_key:
+                    if self_matching_option == SelfMatchingOptions.CANCEL_TAKER.value:
+                        return fillable, True
+                    if self_matching_option == SelfMatchingOptions.CANCEL_MAKER.value:
+                        continue
+                fillable += maker.remaining_quantity
+                if fillable >= quantity:
+                    return fillable, False
+        return fillable, False
+
+    def _close(self, order: BookOrder, status: str):
+        order.status = status
+        book = self.bids if order.is_bid else self.asks
+        level = book.levels.get(order.price)
+        if level is not None:
+            level.quantity -= order.remaining_quantity
+        self.orders.pop(order.order_id, None)
+
+    def place_limit_order(
+        self,
+        balance_manager_key: str,
+        client_order_id: int,
+        price: int,
+        quantity: int,
+        is_bid: bool,
+        order_type: Union[OrderType, int] = OrderType.NO_RESTRICTION,
+        self_matching_option: Union[SelfMatchingOptions, int] = SelfMatchingOptions.SELF_MATCHING_ALLOWED,
+        pay_with_deep: bool = True,
+        expire_timestamp: int = DEFAULT_EXPIRATION_TIMESTAMP,
+        timestamp: Optional[int] = None,
+    ) -> OrderResult:
+        """
+        Match an order against the book and rest the remainder if its type allows it
+
+        :param balance_manager_key: key of the placing BalanceManager
+        :param client_order_id: client order ID
+        :param price: on-chain price
+        :param quantity: base quantity in base coin units
+        :param is_bid: order side
+        :param order_type: OrderType value
+        :param self_matching_option: SelfMatchingOptions value
+        :param pay_with_deep: pay fees in DEEP
+        :param expire_timestamp: expiration in milliseconds
+        :param timestamp: current time in milliseconds, defaults to the wall clock
+        :raises MatchingEngineError: when DeepBook would abort the transaction
+        :returns: OrderResult object
+        """
+        timestamp = int(time.time() * 1000) if timestamp is None else timestamp
+        order_type = _option_value(order_type)
+        self_matching_option = _option_value(self_matching_option)
+        self._validate(price, quantity, expire_timestamp, timestamp)
+
+        book = self.asks if is_bid else self.bids
+        if order_type == OrderType.POST_ONLY.value and self._crosses(is_bid, price, book.best_price()):
+            raise MatchingEngineError("EPOSTOrderCrossesOrderbook")
+        if (
+            order_type == OrderType.FILL_OR_KILL.value
+            or self_matching_option == SelfMatchingOptions.CANCEL_TAKER.value
+        ):
+            fillable, self_match = self._scan(
+                is_bid, price, quantity, balance_manager_key, self_matching_option, timestamp
+            )
+            if self_match:
+                raise MatchingEngineError("ESelfMatchingCancelTaker")
+            if order_type == OrderType.FILL_OR_KILL.value and fillable < quantity:
+                raise MatchingEngineError("EFOKOrderCannotBeFullyFilled")
+
+        order_id = self._next_order_id(is_bid, price)
+        result = OrderResult(
+            order_id=order_id,
+            client_order_id=client_order_id,
+            balance_manager_key=balance_manager_key,
+            is_bid=is_bid,
+            price=price,
+            original_quantity=quantity,
+            fee_is_deep=pay_with_deep,
+        )
+
+        self._match(result, self_matching_option, timestamp)
+
+        remaining = quantity - result.executed_quantity
+        if remaining == 0:
+            result.status = STATUS_FILLED
+        elif order_type in (OrderType.IMMEDIATE_OR_CANCEL.value, OrderType.FILL_OR_KILL.value):
+            result.status = STATUS_CANCELED
+        else:
+            order = BookOrder(
+                order_id=order_id,
+                client_order_id=client_order_id,
+                balance_manager_key=balance_manager_key,
+                is_bid=is_bid,
+                price=price,
+                quantity=quantity,
+                filled_quantity=result.executed_quantity,
+                fee_is_deep=pay_with_deep,
+                expire_timestamp=expire_timestamp,
+                timestamp=timestamp,
+            )
+            (self.bids if is_bid else self.asks).add(order)
+            self.orders[order_id] = order
+            result.order_inserted = True
+            result.status = STATUS_PARTIALLY_FILLED if result.executed_quantity else STATUS_LIVE
+
+        return result
+
+    def _match(self, result: OrderResult, self_matching_option: int, timestamp: int):
+        book = self.asks if result.is_bid else self.bids
+
+        while result.executed_quantity < result.original_quantity:
+            best = book.best_price()
+            if not self._crosses(result.is_bid, result.price, best):
+                return
+            level = book.levels[best]
+
+            while level.orders and result.executed_quantity < result.original_quantity:
+                maker = level.orders[0]
+                if maker.status != STATUS_LIVE:
+                    level.orders.popleft()
+                    continue
+                if maker.expire_timestamp < timestamp:
+                    level.orders.popleft()
+                    self._close(maker, STATUS_EXPIRED)
+                    result.expired_order_ids.append(maker.order_id)
+                    continue
+                if (
+                    maker.balance_manager_key == result.balance_manager_key
+                    and self_matching_option == SelfMatchingOptions.CANCEL_MAKER.value
+                ):
+                    level.orders.popleft()
+                    self._close(maker, STATUS_CANCELED)
+                    result.canceled_maker_order_ids.append(maker.order_id)
+                    continue
+
+                base_quantity = min(
+                    maker.remaining_quantity,
+                    result.original_quantity - result.executed_quantity,
+                )
+                quote_quantity = base_quantity * maker.price // FLOAT_SCALAR
+                taker_fee = self._fee(self.taker_fee, base_quantity, quote_quantity, result.is_bid, result.fee_is_deep)
+                maker_fee = self._fee(self.maker_fee, base_quantity, quote_quantity, maker.is_bid, maker.fee_is_deep)
+
+                result.fills.append(
+                    Fill(
+                        maker_order_id=maker.order_id,
+                        maker_client_order_id=maker.client_order_id,
+                        maker_balance_manager_key=maker.balance_manager_key,
+                        price=maker.price,
+                        base_quantity=base_quantity,
+                        quote_quantity=quote_quantity,
+                        taker_is_bid=result.is_bid,
+                        taker_fee=taker_fee,
+                        taker_fee_is_deep=result.fee_is_deep,
+                        maker_fee=maker_fee,
+                        maker_fee_is_deep=maker.fee_is_deep,
+                        timestamp=timestamp,
+                    )
+                )
+                result.executed_quantity += base_quantity
+                result.cumulative_quote_quantity += quote_quantity
+                result.paid_fees += taker_fee
+
+                maker.filled_quantity += base_quantity
+                level.quantity -= base_quantity
+                if maker.remaining_quantity == 0:
+                    maker.status = STATUS_FILLED
+                    level.orders.popleft()
+                    self.orders.pop(maker.order_id, None)
+
+    def place_market_order(
+        self,
+        balance_manager_key: str,
+        client_order_id: int,
+        quantity: int,
+        is_bid: bool,
+        self_matching_option: Union[SelfMatchingOptions, int] = SelfMatchingOptions.SELF_MATCHING_ALLOWED,
+        pay_with_deep: bool = True,
+        timestamp: Optional[int] = None,
+    ) -> OrderResult:
+        """
+        Match an immediate or cancel order at any price
+
+        :param balance_manager_key: key of the placing BalanceManager
+        :param client_order_id: client order ID
+        :param quantity: base quantity in base coin units
+        :param is_bid: order side
+        :param self_matching_option: SelfMatchingOptions value
+        :param pay_with_deep: pay fees in DEEP
+        :param timestamp: current time in milliseconds, defaults to the wall clock
+        :raises MatchingEngineError: when DeepBook would abort the transaction
+        :returns: OrderResult object
+        """
+        price = MAX_PRICE - MAX_PRICE % self.tick_size if is_bid else self.tick_size
+        return self.place_limit_order(
+            balance_manager_key,
+            client_order_id,
+            price,
+            quantity,
+            is_bid,
+            order_type=OrderType.IMMEDIATE_OR_CANCEL,
+            self_matching_option=self_matching_option,
+            pay_with_deep=pay_with_deep,
+            timestamp=timestamp,
+        )
+
+    def _owned_order(self, balance_manager_key: str, order_id: int) -> BookOrder:
+        order = self.orders.get(int(order_id))
+        if order is None:
+            raise MatchingEngineError("EOrderNotFound", str(order_id))
+        if order.balance_manager_key != balance_manager_key:
+            raise MatchingEngineError("EInvalidOrderBalanceManager", str(order_id))
+        return order
+
+    def cancel_order(self, balance_manager_key: str, order_id: int) -> BookOrder:
+        """
+        Cancel a resting order
+
+        :param balance_manager_key: key of the BalanceManager owning the order
+        :param order_id: order ID
+        :raises MatchingEngineError: when the order does not exist or belongs to another balance manager
+        :returns: the canceled BookOrder object
+        """
+        order = self._owned_order(balance_manager_key, order_id)
+        self._close(order, STATUS_CANCELED)
+        return order
+
+    def cancel_all_orders(self, balance_manager_key: str) -> List[BookOrder]:
+        """
+        Cancel every resting order of a balance manager
+
+        :param balance_manager_key: key of the BalanceManager
+        :returns: list of canceled BookOrder objects
+        """
+        canceled = [
+            order for order in self.orders.values() if order.balance_manager_key == balance_manager_key
+        ]
+        for order in canceled:
+            self._close(order, STATUS_CANCELED)
+        return canceled
+
+    def modify_order(self, balance_manager_key: str, order_id: int, new_quantity: int) -> BookOrder:
+        """
+        Reduce the quantity of a resting order, keeping its queue position
+
+        :param balance_manager_key: key of the BalanceManager owning the order
+        :param order_id: order ID
+        :param new_quantity: new total quantity in base coin units
+        :raises MatchingEngineError: when the new quantity is invalid
+        :returns: the modified BookOrder object
+        """
+        order = self._owned_order(balance_manager_key, order_id)
+        if not order.filled_quantity < new_quantity < order.quantity:
+            raise MatchingEngineError("EInvalidNewQuantity", str(new_quantity))
+        if new_quantity % self.lot_size or new_quantity < self.min_size:
+            raise MatchingEngineError("EInvalidNewQuantity", str(new_quantity))
+
+        book = self.bids if order.is_bid else self.asks
+        book.levels[order.price].quantity -= order.quantity - new_quantity
+        order.quantity = new_quantity
+        return order
+
+    def open_orders(self, balance_manager_key: str) -> List[BookOrder]:
+        """
+        Get the resting orders of a balance manager
+
+        :param balance_manager_key: key of the BalanceManager
+        :returns: list of BookOrder objects
+        """
+        return [order for order in self.orders.values() if order.balance_manager_key == balance_manager_key]
+
+    def best_bid(self) -> Optional[int]:
+        return self.bids.best_price()
+
+    def best_ask(self) -> Optional[int]:
+        return self.asks.best_price()
+
+    def mid_price(self) -> Optional[int]:
+        """
+        Get the mid price
+
+        :returns: on-chain mid price or None when a side is empty
+        """
+        best_bid, best_ask = self.best_bid(), self.best_ask()
+        if best_bid is None or best_ask is None:
+            return None
+        return (best_bid + best_ask) // 2
+
+    def level2(self, is_bid: bool, depth: Optional[int] = None) -> tuple:
+        """
+        Get aggregated price levels of one side from best to worst
+
+        :param is_bid: book side
+        :param depth: optional number of levels
+        :returns: tuple of price and quantity lists
+        """
+        book = self.bids if is_bid else self.asks
+        prices = book.prices()[:depth]
+        return prices, [book.levels[price].quantity for price in prices]
+
+
+class SimulatedDeepBook:
+    """Matching engines for the pools of a DeepBookConfig, driven by the SDK order parameter types"""
+
+    def __init__(self, config: DeepBookConfig, timestamp: Optional[int] = None):
+        """
+        Initializes the SimulatedDeepBook class.
+
+        :param config: DeepBookConfig providing pools, coins and balance managers
+        :param timestamp: optional simulated time in milliseconds, the wall clock is used when not set
+        """
+        self._config = config
+        self.engines: Dict[str, MatchingEngine] = {}
+        self.timestamp = timestamp
+
+    def add_pool(
+        self,
+        pool_key: str,
+        tick_size: float,
+        lot_size: float,
+        min_size: float,
+        taker_fee: float = 0.0,
+        maker_fee: float = 0.0,
+        deep_per_base: float = 0.0,
+    ) -> MatchingEngine:
+        """
+        Create the matching engine of a pool from human readable book parameters
+
+        :param pool_key: key of the pool
+        :param tick_size: tick size as returned by ``pool_book_params``
+        :param lot_size: lot size as returned by ``pool_book_params``
+        :param min_size: min size as returned by ``pool_book_params``
+        :param taker_fee: taker fee rate as returned by ``pool_trade_params``, e.g. 0.001
+        :param maker_fee: maker fee rate as returned by ``pool_trade_params``
+        :param deep_per_base: DEEP paid per base coin, as returned by ``get_pool_deep_price``
+        :returns: MatchingEngine object
+        """
+        base_scalar, quote_scalar = self._scalars(pool_key)
+        deep_scalar = self._config.get_coin("DEEP")["scalar"]
+        engine = MatchingEngine(
+            tick_size=round(tick_size * FLOAT_SCALAR * quote_scalar / base_scalar),
+            lot_size=round(lot_size * base_scalar),
+            min_size=round(min_size * base_scalar),
+            taker_fee=round(taker_fee * FLOAT_SCALAR),
+            maker_fee=round(maker_fee * FLOAT_SCALAR),
+            deep_per_base=round(deep_per_base * deep_scalar * FLOAT_SCALAR / base_scalar),
+        )
+        self.engines[pool_key] = engine
+        return engine
+
+    def _scalars(self, pool_key: str) -> tuple:
+        pool = self._config.get_pool(pool_key)
+        base_scalar = self._config.get_coin(pool["base_coin"])["scalar"]
+        quote_scalar = self._config.get_coin(pool["quote_coin"])["scalar"]
+        return base_scalar, quote_scalar
+
+    def _engine(self, pool_key: str) -> MatchingEngine:
+        engine = self.engines.get(pool_key)
+        if engine is None:
+            raise KeyError(f"No simulated pool for key: {pool_key}")
+        return engine
+
+    def _now(self) -> int:
+        return int(time.time() * 1000) if self.timestamp is None else self.timestamp
+
+    def place_limit_order(self, params: PlaceLimitOrderParams) -> OrderResult:
+        """
+        Place a limit order
+
+        :param params: PlaceLimitOrder parameters
+        :returns: OrderResult object
+        """
+        base_scalar, quote_scalar = self._scalars(params.pool_key)
+        self._config.get_balance_manager(params.balance_manager_key)
+        return self._engine(params.pool_key).place_limit_order(
+            balance_manager_key=params.balance_manager_key,
+            client_order_id=int(params.client_order_id),
+            price=round((params.price * FLOAT_SCALAR * quote_scalar) / base_scalar),
+            quantity=round(params.quantity * base_scalar),
+            is_bid=params.is_bid,
+            order_type=_option_value(params.order_type),
+            self_matching_option=_option_value(params.self_matching_option),
+            pay_with_deep=True if params.pay_with_deep is None else params.pay_with_deep,
+            expire_timestamp=int(params.expiration or DEFAULT_EXPIRATION_TIMESTAMP),
+            timestamp=self._now(),
+        )
+
+    def place_market_order(self, params: PlaceMarketOrderParams) -> OrderResult:
+        """
+        Place a market order
+
+        :param params: PlaceMarketOrderParams parameters
+        :returns: OrderResult object
+        """
+        base_scalar, _ = self._scalars(params.pool_key)
+        self._config.get_balance_manager(params.balance_manager_key)
+        return self._engine(params.pool_key).place_market_order(
+            balance_manager_key=params.balance_manager_key,
+            client_order_id=int(params.client_order_id),
+            quantity=round(params.quantity * base_scalar),
+            is_bid=params.is_bid,
+            self_matching_option=_option_value(params.self_matching_option),
+            pay_with_deep=True if params.pay_with_deep is None else params.pay_with_deep,
+            timestamp=self._now(),
+        )
+
+    def modify_order(self, pool_key: str, balance_manager_key: str, order_id: int, new_quantity: float) -> BookOrder:
+        """
+        Modify a placed order
+
+        :param pool_key: key to identify the pool
+        :param balance_manager_key: key to identify the BalanceManager
+        :param order_id: order ID to modify
+        :param new_quantity: new quantity for the order
+        :returns: BookOrder object
+        """
+        base_scalar, _ = self._scalars(pool_key)
+        return self._engine(pool_key).modify_order(
+            balance_manager_key, int(order_id), round(new_quantity * base_scalar)
+        )
+
+    def cancel_order(self, pool_key: str, balance_manager_key: str, order_id: int) -> BookOrder:
+        """
+        Cancel a placed order
+
+        :param pool_key: key to identify the pool
+        :param balance_manager_key: key to identify the BalanceManager
+        :param order_id: order ID to cancel
+        :returns: BookOrder object
+        """
+        return self._engine(pool_key).cancel_order(balance_manager_key, int(order_id))
+
+    def cancel_all_orders(self, pool_key: str, balance_manager_key: str) -> List[BookOrder]:
+        """
+        Cancel all placed orders
+
+        :param pool_key: key to identify the pool
+        :param balance_manager_key: key to identify the BalanceManager
+        :returns: list of BookOrder objects
+        """
+        return self._engine(pool_key).cancel_all_orders(balance_manager_key)
+
+    def account_open_orders(self, pool_key: str, manager_key: str) -> List[int]:
+        """
+        Get open order IDs of a balance manager
+
+        :param pool_key: key of the pool
+        :param manager_key: key of the BalanceManager
+        :returns: list of order IDs
+        """
+        return [order.order_id for order in self._engine(pool_key).open_orders(manager_key)]
+
+    def mid_price(self, pool_key: str) -> Optional[float]:
+        """
+        Get the mid price for a pool
+
+        :param pool_key: key of the pool
+        :returns: mid price or None when a side of the book is empty
+        """
+        mid_price = self._engine(pool_key).mid_price()
+        if mid_price is None:
+            return None
+        base_scalar, quote_scalar = self._scalars(pool_key)
+        return mid_price * base_scalar / quote_scalar / FLOAT_SCALAR
+
+    def get_level2_ticks_from_mid(self, pool_key: str, ticks: int) -> dict:
+        """
+        Get level 2 order book ticks from mid-price for a pool
+
+        :param pool_key: key to identify the pool
+        :param ticks: number of levels per side
+        :returns: dictionary with arrays of prices and quantities, as ``DeepBookClient`` returns them
+        """
+        engine = self._engine(pool_key)
+        base_scalar, quote_scalar = self._scalars(pool_key)
+
+        def human(prices, quantities):
+            return (
+                [round(price / FLOAT_SCALAR / quote_scalar * base_scalar, 9) for price in prices],
+                [round(quantity / base_scalar, 9) for quantity in quantities],
+            )
+
+        bid_prices, bid_quantities = human(*engine.level2(True, ticks))
+        ask_prices, ask_quantities = human(*engine.level2(False, ticks))
+        return dict(
+            bid_prices=bid_prices,
+            bid_quantities=bid_quantities,
+            ask_prices=ask_prices,
+            ask_quantities=ask_quantities,
+        )
@@ -1,11 +1,11 @@
-from typing import Union
+from typing import Dict, Optional, Sequence, Tuple, Union
 
 from pysui import SuiRpcResult
 from pysui.sui.sui_txn.sync_transaction import SuiTransaction
 from pysui.sui.sui_types.scalars import ObjectID, SuiU64
 from pysui.sui.sui_types.address import SuiAddress
 
-from deepbookpy.utils.coin import coin_with_balance
+from deepbookpy.utils.coin import coin_with_balance, coins_with_balances
 
 
 class BalanceManagerContract:
@@ -66,6 +66,51 @@ class BalanceManagerContract:
 
         return tx
 
+    def create_and_share_balance_manager_with_caps(
+        self,
+        tx: SuiTransaction,
+        trade_cap_recipients: Sequence[str] = (),
+        deposit_cap_recipient: Optional[str] = None,
+        withdraw_cap_recipient: Optional[str] = None,
+    ) -> SuiTransaction:
+        """
+        Create a new BalanceManager owned by the sender, mint its caps and share it
+
+        :param tx: SuiTransaction object
+        :param trade_cap_recipients: addresses that each receive a TradeCap
+        :param deposit_cap_recipient: optional address receiving a DepositCap
+        :param withdraw_cap_recipient: optional address receiving a WithdrawCap
+        :return: SuiTransaction object
+        """
+
+        manager = tx.move_call(
+            target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::new",
+            arguments=[],
+        )
+
+        caps = [("mint_trade_cap", recipient) for recipient in trade_cap_recipients]
+        if deposit_cap_recipient:
+            caps.append(("mint_deposit_cap", deposit_cap_recipient))
+        if withdraw_cap_recipient:
+            caps.append(("mint_withdraw_cap", withdraw_cap_recipient))
+
+        for function, recipient in caps:
+            cap = tx.move_call(
+                target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::{function}",
+                arguments=[manager],
+            )
+            tx.transfer_objects(transfers=[cap], recipient=SuiAddress(recipient))
+
+        tx.move_call(
+            target="0x2::transfer::public_share_object",
+            arguments=[manager],
+            type_arguments=[
+                f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::BalanceManager"
+            ],
+        )
+
+        return tx
+
     def deposit_into_manager(
         self,
         manager_key: str,
@@ -93,7 +138,7 @@ class BalanceManagerContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::deposit",
-            arguments=[ObjectID(manager_id), deposit],
+            arguments=[self.__config.objects.argument(manager_id), deposit],
             type_arguments=[coin["type"]],
         )
 
@@ -124,7 +169,10 @@ class BalanceManagerContract:
 
         coin_object = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::withdraw",
-            arguments=[ObjectID(manager_id), SuiU64(withdraw_input)],
+            arguments=[
+                self.__config.objects.argument(manager_id),
+                SuiU64(withdraw_input),
+            ],
             type_arguments=[coin["type"]],
         )
 
@@ -150,7 +198,7 @@ class BalanceManagerContract:
 
         coin_object = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::withdraw_all",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
             type_arguments=[coin["type"]],
         )
 
@@ -158,6 +206,89 @@ class BalanceManagerContract:
 
         return tx
 
+    def deposit_many_into_managers(
+        self,
+        sender_with_result: Union[SuiRpcResult, Exception],
+        deposits: Dict[Tuple[str, str], float],
+        tx: SuiTransaction,
+    ) -> SuiTransaction:
+        """
+        Deposit several coins into several BalanceManagers. The coins of each coin type are
+        merged and split once for all of its deposits
+
+        :param sender_with_result: list of owned objects, coins are taken from it
+        :param deposits: dictionary of (manager key, coin key) to the amount to deposit
+        :param tx: SuiTransaction object
+        :return: SuiTransaction object
+        """
+        by_coin: Dict[str, list] = {}
+        for (manager_key, coin_key), amount in deposits.items():
+            by_coin.setdefault(coin_key, []).append((manager_key, amount))
+
+        for coin_key, manager_deposits in by_coin.items():
+            coin = self.__config.get_coin(coin_key)
+            amounts = [round(amount * coin["scalar"]) for _, amount in manager_deposits]
+            coins = coins_with_balances(sender_with_result, coin["type"], amounts, tx)
+
+            for (manager_key, _), deposit in zip(manager_deposits, coins):
+                manager_id = self.__config.get_balance_manager(manager_key)["address"]
+                tx.move_call(
+                    target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::deposit",
+                    arguments=[self.__config.objects.argument(manager_id), deposit],
+                    type_arguments=[coin["type"]],
+                )
+
+        return tx
+
+    def withdraw_many_from_managers(
+        self,
+        withdrawals: Dict[Tuple[str, str], Optional[float]],
+        recipient: str,
+        tx: SuiTransaction,
+    ) -> SuiTransaction:
+        """
+        Withdraw several coins from several BalanceManagers. Withdrawn coins of the same type
+        are merged and all are sent to the recipient with one transfer
+
+        :param withdrawals: dictionary of (manager key, coin key) to the amount to withdraw,
+            None withdraws the whole balance
+        :param recipient: recipient of the withdrawn funds
+        :param tx: SuiTransaction object
+        :return: SuiTransaction object
+        """
+        by_coin: Dict[str, list] = {}
+        for (manager_key, coin_key), amount in withdrawals.items():
+            manager_id = self.__config.get_balance_manager(manager_key)["address"]
+            coin = self.__config.get_coin(coin_key)
+
+            if amount is None:
+                coin_object = tx.move_call(
+                    target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::withdraw_all",
+                    arguments=[self.__config.objects.argument(manager_id)],
+                    type_arguments=[coin["type"]],
+                )
+            else:
+                coin_object = tx.move_call(
+                    target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::withdraw",
+                    arguments=[
+                        self.__config.objects.argument(manager_id),
+                        SuiU64(round(amount * coin["scalar"])),
+                    ],
+                    type_arguments=[coin["type"]],
+                )
+            by_coin.setdefault(coin_key, []).append(coin_object)
+
+        transfers = []
+        for coin_objects in by_coin.values():
+            if len(coin_objects) > 1:
+                tx.merge_coins(merge_to=coin_objects[0], merge_from=coin_objects[1:])
+            transfers.append(coin_objects[0])
+
+        if transfers:
+            tx.transfer_objects(transfers=transfers, recipient=SuiAddress(recipient))
+
+        return tx
+
     def check_manager_balance(
         self, manager_key: str, coin_key: str, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -175,7 +306,7 @@ class BalanceManagerContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::balance",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
             type_arguments=[coin["type"]],
         )
 
@@ -189,9 +320,9 @@ class BalanceManagerContract:
 
         balance_manager = self.__config.get_balance_manager(manager_key)
 
-        def generate_proof_as_trader(trade_cap_id, tx):
+        def generate_proof_as_trader(tx):
             return self.generate_proof_as_trader(
-                balance_manager["address"], trade_cap_id
+                balance_manager["address"], balance_manager["trade_cap"]
             )(tx)
 
         def generate_proof_as_owner(tx):
@@ -213,7 +344,7 @@ class BalanceManagerContract:
         def generate_proof_as_owner(tx):
             return tx.move_call(
                 target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::generate_proof_as_owner",
-                arguments=[ObjectID(manager_id)],
+                arguments=[self.__config.objects.argument(manager_id)],
             )
 
         return generate_proof_as_owner
@@ -230,9 +361,12 @@ class BalanceManagerContract:
         """
 
         def generate_proof_as_trader(tx):
-            tx.move_call(
+            return tx.move_call(
                 target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::generate_proof_as_trader",
-                arguments=[ObjectID(manager_id), ObjectID(trade_cap_id)],
+                arguments=[
+                    self.__config.objects.argument(manager_id),
+                    self.__config.objects.argument(trade_cap_id),
+                ],
             )
 
         return generate_proof_as_trader
@@ -253,7 +387,7 @@ class BalanceManagerContract:
 
         trade_cap = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::mint_trade_cap",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
         )
 
         tx.transfer_objects(transfers=[trade_cap], recipient=SuiAddress(recipient))
@@ -275,7 +409,7 @@ class BalanceManagerContract:
 
         deposit_cap = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::mint_deposit_cap",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
         )
 
         tx.transfer_objects(transfers=[deposit_cap], recipient=SuiAddress(recipient))
@@ -297,7 +431,7 @@ class BalanceManagerContract:
 
         withdrawal_cap = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::mint_withdraw_cap",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
         )
 
         tx.transfer_objects(transfers=[withdrawal_cap], recipient=SuiAddress(recipient))
@@ -338,7 +472,11 @@ class BalanceManagerContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::deposit_with_cap",
-            arguments=[ObjectID(manager_id), ObjectID(deposit_cap_id), deposit],
+            arguments=[
+                self.__config.objects.argument(manager_id),
+                self.__config.objects.argument(deposit_cap_id),
+                deposit,
+            ],
             type_arguments=[coin["type"]],
         )
 
@@ -375,8 +513,8 @@ class BalanceManagerContract:
         coins = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::withdraw_with_cap",
             arguments=[
-                ObjectID(manager_id),
-                ObjectID(withdraw_cap_id),
+                self.__config.objects.argument(manager_id),
+                self.__config.objects.argument(withdraw_cap_id),
                 SuiU64(withdraw_amount),
             ],
             type_arguments=[coin["type"]],
@@ -399,7 +537,7 @@ class BalanceManagerContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::owner",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
         )
 
         return tx
@@ -417,7 +555,7 @@ class BalanceManagerContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::balance_manager::id",
-            arguments=[ObjectID(manager_id)],
+            arguments=[self.__config.objects.argument(manager_id)],
         )
 
         return tx
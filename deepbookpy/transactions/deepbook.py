@@ -2,7 +2,7 @@ from typing import Union
 
 from pysui import SuiRpcResult
 from pysui.sui.sui_txn.sync_transaction import SuiTransaction
-from pysui.sui.sui_types.scalars import ObjectID, SuiU128, SuiU64, SuiU8, SuiBoolean
+from pysui.sui.sui_types.scalars import SuiU128, SuiU64, SuiU8, SuiBoolean
 
 from deepbookpy.utils.config import (
     DeepBookConfig,
@@ -18,6 +18,7 @@ from deepbookpy.custom_types import (
 )
 from deepbookpy.utils.constants import CLOCK, DEFAULT_EXPIRATION_TIMESTAMP
 from deepbookpy.utils.coin import coin_with_balance
+from deepbookpy.utils.tracing import traced
 
 
 class DeepBookContract:
@@ -29,6 +30,12 @@ class DeepBookContract:
         """
         self.__config = config
 
+    @property
+    def tracer(self):
+        """Tracer recording builder spans"""
+        return self.__config.tracer
+
+    @traced("build.place_limit_order")
     def place_limit_order(
         self, params: PlaceLimitOrderParams, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -65,8 +72,8 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::place_limit_order",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU64(client_order_id),
                 SuiU8(order_type),
@@ -76,13 +83,14 @@ class DeepBookContract:
                 SuiBoolean(is_bid),
                 SuiBoolean(pay_with_deep),
                 SuiU64(expiration),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return tx
 
+    @traced("build.place_market_order")
     def place_market_order(
         self, params: PlaceMarketOrderParams, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -113,21 +121,22 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::place_market_order",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU64(client_order_id),
                 SuiU8(self_matching_option),
                 SuiU64(input_quantity),
                 SuiBoolean(is_bid),
                 SuiBoolean(pay_with_deep),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return tx
 
+    @traced("build.modify_order")
     def modify_order(
         self,
         pool_key: str,
@@ -158,18 +167,19 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::modify_order",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU128(order_id),
                 SuiU64(input_quantity),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return tx
 
+    @traced("build.cancel_order")
     def cancel_order(
         self, pool_key: str, balance_manager_key: str, order_id: str, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -193,17 +203,18 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::cancel_order",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU128(order_id),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return tx
 
+    @traced("build.cancel_all_orders")
     def cancel_all_orders(
         self, pool_key: str, balance_manager_key: str, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -226,16 +237,17 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::cancel_all_orders",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return tx
 
+    @traced("build.withdraw_settled_amounts")
     def withdraw_settled_amounts(
         self, pool_key: str, balance_manager_key: str, tx: SuiTransaction
     ) -> SuiTransaction:
@@ -258,8 +270,8 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::withdraw_settled_amounts",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
@@ -287,9 +299,9 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::add_deep_price_point",
             arguments=[
-                ObjectID(target_pool["address"]),
-                ObjectID(reference_pool["address"]),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(target_pool["address"]),
+                self.__config.objects.argument(reference_pool["address"]),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[
                 target_base_coin["type"],
@@ -317,7 +329,10 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_order",
-            arguments=[ObjectID(pool["address"]), SuiU128(order_id)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                SuiU128(order_id),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -340,7 +355,7 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_orders",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 [SuiU128(order_id) for order_id in order_ids],
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
@@ -362,8 +377,8 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::burn_deep",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(self.__config.DEEP_TREASURY_ID),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(self.__config.DEEP_TREASURY_ID),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -383,7 +398,10 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::mid_price",
-            arguments=[ObjectID(pool["address"]), ObjectID(CLOCK)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(CLOCK),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -402,7 +420,7 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::whitelisted",
-            arguments=[ObjectID(pool["address"])],
+            arguments=[self.__config.objects.argument(pool["address"])],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -425,9 +443,9 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_quote_quantity_out",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(base_quantity * base_coin["scalar"]),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -451,9 +469,9 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_base_quantity_out",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(quote_quantity * quote_coin["scalar"]),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -477,10 +495,10 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_quantity_out",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(base_quantity * base_coin["scalar"]),
                 SuiU64(quote_quantity * quote_coin["scalar"]),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -504,7 +522,10 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::account_open_orders",
-            arguments=[ObjectID(pool["address"]), ObjectID(manager["address"])],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(manager["address"]),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -534,7 +555,7 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_level2_range",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(
                     (price_low * FLOAT_SCALAR * quote_coin["scalar"])
                     / base_coin["scalar"]
@@ -544,7 +565,7 @@ class DeepBookContract:
                     / base_coin["scalar"]
                 ),
                 SuiBoolean(is_bid),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -568,9 +589,9 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_level2_ticks_from_mid",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(tick_from_mid),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -590,7 +611,7 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::vault_balances",
-            arguments=[ObjectID(pool["address"])],
+            arguments=[self.__config.objects.argument(pool["address"])],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -608,12 +629,13 @@ class DeepBookContract:
         """
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_pool_id_by_asset",
-            arguments=[ObjectID(self.__config.REGISTRY_ID)],
+            arguments=[self.__config.objects.argument(self.__config.REGISTRY_ID)],
             type_arguments=[base_type, quote_type],
         )
 
         return tx
 
+    @traced("build.swap_exact_base_for_quote")
     def swap_exact_base_for_quote(
         self,
         sender_with_result: Union[SuiRpcResult, Exception],
@@ -661,17 +683,18 @@ class DeepBookContract:
         base_coin_result, quote_coin_result, deep_coin_result = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::swap_exact_base_for_quote",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 base_coin_input,
                 deep_coin_test,
                 SuiU64(min_quote_input),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
         return base_coin_result, quote_coin_result, deep_coin_result
 
+    @traced("build.swap_exact_quote_for_base")
     def swap_exact_quote_for_base(
         self,
         sender_with_result: Union[SuiRpcResult, Exception],
@@ -724,11 +747,11 @@ class DeepBookContract:
         base_coin_result, quote_coin_result, deep_coin_result = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::swap_exact_quote_for_base",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 quote_coin_input,
                 deep_coin,
                 SuiU64(min_base_input),
-                ObjectID(CLOCK),
+                self.__config.objects.argument(CLOCK),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -748,7 +771,7 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::pool_trade_params",
-            arguments=[ObjectID(pool["address"])],
+            arguments=[self.__config.objects.argument(pool["address"])],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -767,7 +790,7 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::pool_book_params",
-            arguments=[ObjectID(pool["address"])],
+            arguments=[self.__config.objects.argument(pool["address"])],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -790,7 +813,10 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::account",
-            arguments=[ObjectID(pool["address"]), ObjectID(manager_id)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(manager_id),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -813,7 +839,10 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::locked_balance",
-            arguments=[ObjectID(pool["address"]), ObjectID(manager_id)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(manager_id),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -832,7 +861,7 @@ class DeepBookContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::get_order_deep_price",
-            arguments=[ObjectID(pool["address"])],
+            arguments=[self.__config.objects.argument(pool["address"])],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -881,7 +910,7 @@ class DeepBookContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::create_permissionless_pool",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
                 SuiU64(adjusted_tick_size),
                 SuiU64(adjusted_lot_size),
                 SuiU64(adjusted_min_size),
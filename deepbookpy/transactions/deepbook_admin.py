@@ -1,5 +1,5 @@
 from pysui.sui.sui_txn.sync_transaction import SuiTransaction
-from pysui.sui.sui_types.scalars import ObjectID, SuiU64, SuiBoolean
+from pysui.sui.sui_types.scalars import SuiU64, SuiBoolean
 from pysui.sui.sui_types.address import SuiAddress
 
 from deepbookpy.utils.config import DeepBookConfig, FLOAT_SCALAR
@@ -51,20 +51,20 @@ class DeepBookAdminContract:
         base_scalar = base_coin["scalar"]
         quote_scalar = quote_coin["scalar"]
 
-        adjusted_tick_size = tick_size * FLOAT_SCALAR * quote_scalar
-        adjusted_lot_size = lot_size * base_scalar
-        adjusted_min_size = min_size * base_scalar
+        adjusted_tick_size = round((tick_size * FLOAT_SCALAR * quote_scalar) / base_scalar)
+        adjusted_lot_size = round(lot_size * base_scalar)
+        adjusted_min_size = round(min_size * base_scalar)
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::create_pool_admin",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
                 SuiU64(adjusted_tick_size),
                 SuiU64(adjusted_lot_size),
                 SuiU64(adjusted_min_size),
                 SuiBoolean(whitelisted),
                 SuiBoolean(stable_pool),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(admin_cap),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -88,9 +88,9 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::unregister_pool_admin",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(self.__config.REGISTRY_ID),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(admin_cap),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -114,9 +114,9 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::update_allowed_versions",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(self.__config.REGISTRY_ID),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(admin_cap),
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -136,9 +136,9 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::registry::enable_version",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
                 SuiU64(version),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(admin_cap),
             ],
         )
 
@@ -157,9 +157,9 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::registry::disable_version",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
                 SuiU64(version),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(admin_cap),
             ],
         )
 
@@ -178,9 +178,9 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::registry::set_treasury_address",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
                 SuiAddress(treasury_address),
-                ObjectID(admin_cap),
+                self.__config.objects.argument(admin_cap),
             ],
         )
 
@@ -202,8 +202,8 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::registry::add_stablecoin",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
-                ObjectID(self.__admin_cap()),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__admin_cap()),
             ],
             type_arguments=[stable_coin_type],
         )
@@ -226,8 +226,8 @@ class DeepBookAdminContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::registry::remove_stablecoin",
             arguments=[
-                ObjectID(self.__config.REGISTRY_ID),
-                ObjectID(self.__admin_cap()),
+                self.__config.objects.argument(self.__config.REGISTRY_ID),
+                self.__config.objects.argument(self.__admin_cap()),
             ],
             type_arguments=[stable_coin_type],
         )
@@ -250,15 +250,15 @@ class DeepBookAdminContract:
         base_scalar = base_coin["scalar"]
         quote_scalar = quote_coin["scalar"]
 
-        adjusted_tick_size = (new_tick_size * FLOAT_SCALAR * quote_scalar) / base_scalar
+        adjusted_tick_size = round((new_tick_size * FLOAT_SCALAR * quote_scalar) / base_scalar)
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::adjust_tick_size_admin",
             arguments=[
-                ObjectID(pool["address"]),
+                self.__config.objects.argument(pool["address"]),
                 SuiU64(adjusted_tick_size),
-                ObjectID(self.__admin_cap()),
-                ObjectID(CLOCK)
+                self.__config.objects.argument(self.__admin_cap()),
+                self.__config.objects.argument(CLOCK)
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
@@ -280,19 +280,18 @@ class DeepBookAdminContract:
         quote_coin = self.__config.get_coin(pool["quote_coin"])
 
         base_scalar = base_coin["scalar"]
-        quote_scalar = quote_coin["scalar"]
 
-        adjusted_lot_size = new_lot_size * base_scalar
-        adjusted_min_size = new_min_size * quote_scalar
+        adjusted_lot_size = round(new_lot_size * base_scalar)
+        adjusted_min_size = round(new_min_size * base_scalar)
 
         tx.move_call(
                 target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::adjust_min_lot_size_admin",
                 arguments=[
-                    ObjectID(pool["address"]),
+                    self.__config.objects.argument(pool["address"]),
                     SuiU64(adjusted_lot_size),
                     SuiU64(adjusted_min_size),
-                    ObjectID(self.__admin_cap()),
-                    ObjectID(CLOCK)
+                    self.__config.objects.argument(self.__admin_cap()),
+                    self.__config.objects.argument(CLOCK)
                 ],
                 type_arguments=[base_coin["type"], quote_coin["type"]],
             )
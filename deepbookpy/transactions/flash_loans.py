@@ -1,5 +1,5 @@
 from pysui.sui.sui_txn.sync_transaction import SuiTransaction
-from pysui.sui.sui_types.scalars import ObjectID, SuiU64
+from pysui.sui.sui_types.scalars import SuiU64
 
 from deepbookpy.utils.config import DeepBookConfig
 
@@ -31,7 +31,10 @@ class FlashLoanContract:
 
         base_coin_result, flash_loan = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::borrow_flashloan_base",
-            arguments=[ObjectID(pool["address"]), SuiU64(input_quantity)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                SuiU64(input_quantity),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -64,7 +67,11 @@ class FlashLoanContract:
         )
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::return_flashloan_base",
-            arguments=[ObjectID(pool["address"]), base_coin_return, flash_loan],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                base_coin_return,
+                flash_loan,
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -87,7 +94,10 @@ class FlashLoanContract:
 
         [quote_coin_result, flash_loan] = tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::borrow_flashloan_quote",
-            arguments=[ObjectID(pool["address"]), SuiU64(input_quantity)],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                SuiU64(input_quantity),
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
@@ -122,7 +132,11 @@ class FlashLoanContract:
 
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::return_flashloan_quote",
-            arguments=[ObjectID(pool["address"]), quote_coin_return, flash_loan],
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                quote_coin_return,
+                flash_loan,
+            ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
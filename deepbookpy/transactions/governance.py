@@ -1,5 +1,8 @@
+from typing import Dict, Optional, Sequence, Tuple
+
 from pysui.sui.sui_txn.sync_transaction import SuiTransaction
-from pysui.sui.sui_types.scalars import ObjectID, SuiU64
+from pysui.sui.sui_types.address import SuiAddress
+from pysui.sui.sui_types.scalars import SuiU64
 
 from deepbookpy.utils.config import DeepBookConfig, DEEP_SCALAR, FLOAT_SCALAR
 from deepbookpy.custom_types import ProposalParams
@@ -41,8 +44,8 @@ class GovernanceContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::stake",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU64(stake_input),
             ],
@@ -75,8 +78,8 @@ class GovernanceContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::unstake",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
@@ -112,8 +115,8 @@ class GovernanceContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::submit_proposal",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
                 SuiU64(round(taker_fee * FLOAT_SCALAR)),
                 SuiU64(round(maker_fee * FLOAT_SCALAR)),
@@ -152,12 +155,177 @@ class GovernanceContract:
         tx.move_call(
             target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::vote",
             arguments=[
-                ObjectID(pool["address"]),
-                ObjectID(balance_manager["address"]),
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
+                trade_proof,
+                SuiAddress(proposal_id),
+            ],
+            type_arguments=[base_coin["type"], quote_coin["type"]],
+        )
+
+        return tx
+
+    def _proofs(
+        self, tx: SuiTransaction, manager_keys, proofs: Optional[dict] = None
+    ) -> Dict[str, object]:
+        """
+        Generate one trade proof per BalanceManager, shared by all its calls
+
+        :param tx: SuiTransaction object
+        :param manager_keys: keys of the BalanceManagers
+        :param proofs: optional trade proofs already generated in the transaction, updated
+        :return: dictionary of manager keys to trade proof results
+        """
+        proofs = {} if proofs is None else proofs
+        for manager_key in manager_keys:
+            if manager_key not in proofs:
+                proofs[manager_key] = self.__config.balance_manager.generate_proof(
+                    manager_key
+                )(tx)
+        return proofs
+
+    def _pool_call(
+        self,
+        function: str,
+        pool_key: str,
+        balance_manager_key: str,
+        trade_proof,
+        arguments: list,
+        tx: SuiTransaction,
+    ):
+        pool = self.__config.get_pool(pool_key)
+        balance_manager = self.__config.get_balance_manager(balance_manager_key)
+        base_coin = self.__config.get_coin(pool["base_coin"])
+        quote_coin = self.__config.get_coin(pool["quote_coin"])
+
+        tx.move_call(
+            target=f"{self.__config.DEEPBOOK_PACKAGE_ID}::pool::{function}",
+            arguments=[
+                self.__config.objects.argument(pool["address"]),
+                self.__config.objects.argument(balance_manager["address"]),
                 trade_proof,
-                ObjectID(proposal_id),
+                *arguments,
             ],
             type_arguments=[base_coin["type"], quote_coin["type"]],
         )
 
+    def stake_many(
+        self,
+        stakes: Dict[Tuple[str, str], float],
+        tx: SuiTransaction,
+        trade_proofs: Optional[dict] = None,
+    ) -> SuiTransaction:
+        """
+        Stake in several pools from several BalanceManagers, with one trade proof per
+        BalanceManager
+
+        :param stakes: dictionary of (pool key, balance manager key) to the amount to stake
+        :param tx: SuiTransaction object
+        :param trade_proofs: optional dictionary of trade proofs generated earlier in the
+            transaction, keyed by balance manager key, reused and updated
+        :return: SuiTransaction object
+        """
+        proofs = self._proofs(
+            tx, [manager_key for _, manager_key in stakes], trade_proofs
+        )
+        for (pool_key, manager_key), stake_amount in stakes.items():
+            self._pool_call(
+                "stake",
+                pool_key,
+                manager_key,
+                proofs[manager_key],
+                [SuiU64(round(stake_amount * DEEP_SCALAR))],
+                tx,
+            )
+
+        return tx
+
+    def unstake_many(
+        self,
+        pairs: Sequence[Tuple[str, str]],
+        tx: SuiTransaction,
+        trade_proofs: Optional[dict] = None,
+    ) -> SuiTransaction:
+        """
+        Unstake from several pools and BalanceManagers, with one trade proof per
+        BalanceManager
+
+        :param pairs: (pool key, balance manager key) pairs
+        :param tx: SuiTransaction object
+        :param trade_proofs: optional dictionary of trade proofs generated earlier in the
+            transaction, keyed by balance manager key, reused and updated
+        :return: SuiTransaction object
+        """
+        proofs = self._proofs(
+            tx, [manager_key for _, manager_key in pairs], trade_proofs
+        )
+        for pool_key, manager_key in pairs:
+            self._pool_call("unstake", pool_key, manager_key, proofs[manager_key], [], tx)
+
+        return tx
+
+    def vote_many(
+        self,
+        votes: Dict[Tuple[str, str], str],
+        tx: SuiTransaction,
+        trade_proofs: Optional[dict] = None,
+    ) -> SuiTransaction:
+        """
+        Vote on proposals of several pools from several BalanceManagers, with one trade
+        proof per BalanceManager
+
+        :param votes: dictionary of (pool key, balance manager key) to the proposal ID
+        :param tx: SuiTransaction object
+        :param trade_proofs: optional dictionary of trade proofs generated earlier in the
+            transaction, keyed by balance manager key, reused and updated
+        :return: SuiTransaction object
+        """
+        proofs = self._proofs(
+            tx, [manager_key for _, manager_key in votes], trade_proofs
+        )
+        for (pool_key, manager_key), proposal_id in votes.items():
+            self._pool_call(
+                "vote",
+                pool_key,
+                manager_key,
+                proofs[manager_key],
+                [SuiAddress(proposal_id)],
+                tx,
+            )
+
+        return tx
+
+    def adjust_stakes(
+        self,
+        current: Dict[Tuple[str, str], dict],
+        targets: Dict[Tuple[str, str], float],
+        tx: SuiTransaction,
+    ) -> SuiTransaction:
+        """
+        Move the stakes of several pools and BalanceManagers to their targets. Unstaking
+        returns the whole stake, so a decrease unstakes and stakes the target again, which
+        becomes active from the next epoch
+
+        :param current: stake states returned by ``DeepBookClient.stake_states()``
+        :param targets: dictionary of (pool key, balance manager key) to the target stake
+        :param tx: SuiTransaction object
+        :return: SuiTransaction object
+        """
+        unstakes, stakes = [], {}
+        for pair, target in targets.items():
+            state = current.get(pair) or {}
+            staked = state.get("active_stake", 0) + state.get("inactive_stake", 0)
+            if target > staked:
+                stakes[pair] = target - staked
+            elif target < staked:
+                unstakes.append(pair)
+                if target > 0:
+                    stakes[pair] = target
+
+        trade_proofs = {}
+        if unstakes:
+            self.unstake_many(unstakes, tx, trade_proofs)
+        if stakes:
+            self.stake_many(stakes, tx, trade_proofs)
+
         return tx
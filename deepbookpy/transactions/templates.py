@@ -0,0 +1,348 @@
+"""
+Re-bindable transaction templates for requoting.
+
+A requote sends the same programmable transaction every time, only prices, quantities and IDs change. A template
+builds the transaction once with the regular ``DeepBookContract`` builders, serializes it and records where the bytes
+of each re-bindable pure argument sit in the BCS buffer. A new quote then overwrites those bytes in place instead of
+running the pysui builder again.
+
+Every re-bindable argument gets its own pure input, the builder would otherwise share one input between equal values,
+e.g. the price and quantity of an order. The bytes therefore match a fresh build with the same values whenever the
+bound values, and those the template was built with, are distinct. They are an equivalent transaction otherwise.
+
+A template is inspected with ``build_for_inspection``. After ``finalize`` it holds the full transaction data with a
+fixed gas budget and gas coin, whose reference is updated from the effects of every ``execute``.
+"""
+
+import base64
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_txn import SyncTransaction
+from pysui.sui.sui_txn.sync_transaction import SuiTransaction
+from pysui.sui.sui_types import bcs
+
+from deepbookpy.custom_types import PlaceLimitOrderParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.config import FLOAT_SCALAR
+from deepbookpy.utils.tracing import NOOP_TRACER, traced_execute_bytes
+
+
+def _uleb128(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_uleb128(buffer, offset: int) -> Tuple[int, int]:
+    value, shift = 0, 0
+    while True:
+        byte = buffer[offset]
+        value |= (byte & 0x7F) << shift
+        offset += 1
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+
+
+# Sizes of an address and of an ObjectReference of the gas payment: ID, version and length prefixed digest
+_ADDRESS_WIDTH = 32
+_OBJECT_REFERENCE_WIDTH = _ADDRESS_WIDTH + 8 + 1 + 32
+
+
+class TransactionTemplate:
+    """Serialized transaction whose pure arguments are overwritten in place"""
+
+    def __init__(self, tx: SuiTransaction, slots: Dict[str, Tuple[int, int]]):
+        """
+        Initializes the TransactionTemplate class.
+
+        :param tx: SuiTransaction object holding the built commands
+        :param slots: dictionary of slot names to the command index and argument position of a pure argument
+        """
+        self.tx = tx
+        builder = tx.builder
+        inputs = list(builder.inputs.values())
+
+        # Count how often each input is used, shared inputs cannot be rebound on their own
+        uses: Dict[int, int] = {}
+        for command in builder.commands:
+            for argument in getattr(command.value, "Arguments", None) or []:
+                if argument.enum_name == "Input":
+                    uses[argument.value] = uses.get(argument.value, 0) + 1
+
+        slot_inputs: Dict[str, int] = {}
+        for name, (command_index, position) in slots.items():
+            arguments = builder.commands[command_index].value.Arguments
+            argument = arguments[position]
+            if argument.enum_name != "Input" or inputs[argument.value].enum_name != "Pure":
+                raise ValueError(f"Slot {name} is not a pure argument")
+
+            index = argument.value
+            if uses[index] > 1:
+                value = list(inputs[index].value)
+                key = bcs.BuilderArg("Pure", value)
+                builder.inputs[key] = bcs.CallArg("Pure", value)
+                uses[index] -= 1
+                index = len(inputs)
+                inputs.append(builder.inputs[key])
+                uses[index] = 1
+                arguments[position] = bcs.Argument("Input", index)
+            slot_inputs[name] = index
+
+        kind = tx.raw_kind().serialize()
+
+        # TransactionKind variant, then the inputs vector of the ProgrammableTransaction
+        offsets, offset = [], 1 + len(_uleb128(len(inputs)))
+        for call_arg in inputs:
+            offsets.append(offset)
+            offset += len(call_arg.serialize())
+
+        self.slots: Dict[str, Tuple[int, int]] = {}
+        for name, index in slot_inputs.items():
+            value = inputs[index].value
+            start = offsets[index] + 1 + len(_uleb128(len(value)))
+            if kind[start : start + len(value)] != bytes(value):
+                raise ValueError(f"Unable to locate slot {name} in the transaction bytes")
+            self.slots[name] = (start, len(value))
+
+        self._kind_length = len(kind)
+        self._buffer = bytearray(kind)
+        self._kind_offset = 0
+        self._gas_offset: Optional[int] = None
+
+    @property
+    def finalized(self) -> bool:
+        return self._gas_offset is not None
+
+    def set(self, name: str, value: int):
+        """
+        Overwrite the value of a slot
+
+        :param name: slot name
+        :param value: new unsigned integer value, True and False for booleans
+        """
+        offset, width = self.slots[name]
+        self._buffer[offset : offset + width] = int(value).to_bytes(width, "little")
+
+    def get(self, name: str) -> int:
+        """
+        Get the value of a slot
+
+        :param name: slot name
+        :returns: current unsigned integer value
+        """
+        offset, width = self.slots[name]
+        return int.from_bytes(self._buffer[offset : offset + width], "little")
+
+    def kind_bytes(self) -> bytes:
+        """
+        Get the serialized TransactionKind with the current slot values
+
+        :returns: BCS bytes
+        """
+        return bytes(self._buffer[self._kind_offset : self._kind_offset + self._kind_length])
+
+    def build_for_inspection(self) -> str:
+        """
+        Get the TransactionKind with the current slot values for sui_devInspectTransactionBlock
+
+        :returns: base64 encoded TransactionKind, like ``SuiTransaction.build_for_inspection``
+        """
+        return base64.b64encode(self.kind_bytes()).decode()
+
+    def finalize(self, gas_budget: str = "", use_gas_object: Optional[str] = None):
+        """
+        Serialize the full transaction data once, slots and gas reference are then patched in place
+
+        :param gas_budget: gas budget, a dry-run sets it when empty
+        :param use_gas_object: optional gas coin object ID, the gas reference can only be rebound for a single coin
+        """
+        data = bytearray(
+            base64.b64decode(
+                self.tx.deferred_execution(gas_budget=gas_budget, use_gas_object=use_gas_object)
+            )
+        )
+        kind = self.tx.raw_kind().serialize()
+        if data[1 : 1 + len(kind)] != kind:
+            raise ValueError("Unexpected transaction data layout")
+        data[1 : 1 + len(kind)] = self.kind_bytes()
+
+        # TransactionData variant, kind, sender, then the gas payment vector
+        payment_offset = 1 + len(kind) + _ADDRESS_WIDTH
+        payments, reference_offset = _read_uleb128(data, payment_offset)
+
+        self.slots = {name: (offset + 1, width) for name, (offset, width) in self.slots.items()}
+        self._buffer = data
+        self._kind_offset = 1
+        self._gas_offset = reference_offset if payments == 1 else -1
+
+    def tx_bytes(self) -> str:
+        """
+        Get the transaction data with the current slot values
+
+        :returns: base64 encoded TransactionData
+        """
+        if not self.finalized:
+            raise ValueError("Template is not finalized")
+        return base64.b64encode(self._buffer).decode()
+
+    def set_gas_payment(self, version: int, digest: str):
+        """
+        Rebind the gas coin reference after the coin changed
+
+        :param version: new object version of the gas coin
+        :param digest: new base58 object digest of the gas coin
+        """
+        if not self.finalized:
+            raise ValueError("Template is not finalized")
+        if self._gas_offset < 0:
+            raise ValueError("Gas reference can only be rebound when paying with a single coin")
+
+        offset = self._gas_offset + _ADDRESS_WIDTH
+        self._buffer[offset : offset + 8] = int(version).to_bytes(8, "little")
+        self._buffer[offset + 8 : offset + _OBJECT_REFERENCE_WIDTH - _ADDRESS_WIDTH] = bcs.Digest.from_str(
+            digest
+        ).serialize()
+
+    def execute(
+        self,
+        options: Optional[dict] = None,
+        request_type: SuiRequestType = SuiRequestType.WAITFORLOCALEXECUTION,
+        tracer=NOOP_TRACER,
+        **attributes,
+    ) -> SuiRpcResult:
+        """
+        Sign and submit the transaction with the current slot values
+
+        The gas reference is rebound from the effects, so the template can be executed again.
+
+        :param options: optional sui_executeTransactionBlock options
+        :param request_type: execution request type
+        :param tracer: Tracer object, NOOP_TRACER records nothing
+        :param attributes: span attributes
+        :returns: SuiRpcResult object
+        """
+        result = traced_execute_bytes(
+            self.tx.client,
+            self.tx.signer_block,
+            self.tx_bytes(),
+            tracer,
+            options,
+            request_type,
+            **attributes,
+        )
+        if result.is_ok() and self._gas_offset >= 0:
+            reference = result.result_data.effects.gas_object.reference
+            self.set_gas_payment(int(reference.version), reference.digest)
+        return result
+
+
+class LimitOrderTemplate(TransactionTemplate):
+    """Batch of ``place_limit_order`` calls whose client order IDs, prices and quantities are rebound"""
+
+    def __init__(self, deepbook_client: DeepBookClient, orders: Sequence[PlaceLimitOrderParams]):
+        """
+        Initializes the LimitOrderTemplate class.
+
+        :param deepbook_client: DeepBookClient instance
+        :param orders: initial orders, pools, balance managers, sides, order types and expirations are fixed
+        """
+        tx = SyncTransaction(client=deepbook_client.client)
+        config = deepbook_client.config
+        slots = {}
+        self._scalars: List[Tuple[int, int]] = []
+        for index, params in enumerate(orders):
+            deepbook_client.deepbook.place_limit_order(params, tx)
+            command_index = len(tx.builder.commands) - 1
+            slots[f"{index}.client_order_id"] = (command_index, 3)
+            slots[f"{index}.price"] = (command_index, 6)
+            slots[f"{index}.quantity"] = (command_index, 7)
+
+            pool = config.get_pool(params.pool_key)
+            base_scalar = config.get_coin(pool["base_coin"])["scalar"]
+            quote_scalar = config.get_coin(pool["quote_coin"])["scalar"]
+            self._scalars.append((base_scalar, quote_scalar))
+
+        super().__init__(tx, slots)
+
+    def __len__(self) -> int:
+        return len(self._scalars)
+
+    def quote(
+        self,
+        index: int,
+        price: Optional[float] = None,
+        quantity: Optional[float] = None,
+        client_order_id: Optional[int] = None,
+    ):
+        """
+        Rebind an order of the batch, with the same rounding as ``place_limit_order``
+
+        :param index: position of the order in the batch
+        :param price: new price
+        :param quantity: new quantity
+        :param client_order_id: new client order ID
+        """
+        base_scalar, quote_scalar = self._scalars[index]
+        if price is not None:
+            self.set(f"{index}.price", round((price * FLOAT_SCALAR * quote_scalar) / base_scalar))
+        if quantity is not None:
+            self.set(f"{index}.quantity", round(quantity * base_scalar))
+        if client_order_id is not None:
+            self.set(f"{index}.client_order_id", int(client_order_id))
+
+
+class ModifyOrderTemplate(TransactionTemplate):
+    """Batch of ``modify_order`` calls whose order IDs and quantities are rebound"""
+
+    def __init__(
+        self,
+        deepbook_client: DeepBookClient,
+        pool_key: str,
+        balance_manager_key: str,
+        orders: Sequence[Tuple[str, float]],
+    ):
+        """
+        Initializes the ModifyOrderTemplate class.
+
+        :param deepbook_client: DeepBookClient instance
+        :param pool_key: key to identify the pool
+        :param balance_manager_key: key to identify the BalanceManager
+        :param orders: initial order IDs and new quantities
+        """
+        tx = SyncTransaction(client=deepbook_client.client)
+        config = deepbook_client.config
+        slots = {}
+        for index, (order_id, quantity) in enumerate(orders):
+            deepbook_client.deepbook.modify_order(pool_key, balance_manager_key, order_id, quantity, tx)
+            command_index = len(tx.builder.commands) - 1
+            slots[f"{index}.order_id"] = (command_index, 3)
+            slots[f"{index}.quantity"] = (command_index, 4)
+
+        self._orders = len(orders)
+        self._base_scalar = config.get_coin(config.get_pool(pool_key)["base_coin"])["scalar"]
+        super().__init__(tx, slots)
+
+    def __len__(self) -> int:
+        return self._orders
+
+    def modify(self, index: int, order_id: Optional[int] = None, quantity: Optional[float] = None):
+        """
+        Rebind an order of the batch, with the same rounding as ``modify_order``
+
+        :param index: position of the order in the batch
+        :param order_id: new order ID
+        :param quantity: new quantity
+        """
+        if order_id is not None:
+            self.set(f"{index}.order_id", int(order_id))
+        if quantity is not None:
+            self.set(f"{index}.quantity", round(quantity * self._base_scalar))
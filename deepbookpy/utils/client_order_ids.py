@@ -0,0 +1,262 @@
+"""
+Collision-free u64 client order IDs.
+
+Each ID packs the shard of the allocating process, the strategy placing the order and a sequence number, high bits
+first. With the default layout of 10 shard bits and 14 strategy bits, 40 bits are left for the sequence of each
+strategy::
+
+    | shard (10) | strategy (14) | sequence (40) |
+
+Every process, or every process and signer, allocates under its own shard, so IDs never collide across processes
+and the strategy of a fill is read back from the bits of its client order ID without a lookup table.
+
+Sequences are reserved in blocks of ``block_size``. Each thread takes IDs from its own block without locking, the
+lock is only taken to reserve the next block. The end of the reserved blocks is written to the state file before a
+block is used, a restart continues after it, skipping the unused rest of the blocks held before.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple, Union
+
+
+@dataclass
+class StrategyInfo:
+    strategy_id: int
+    name: str
+    metadata: dict = field(default_factory=dict)
+
+
+class StrategyIds:
+    """Iterator over the client order IDs of one strategy"""
+
+    def __init__(self, allocator: "ClientOrderIdAllocator", strategy_id: int):
+        self._allocator = allocator
+        self.strategy_id = strategy_id
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        return self._allocator.allocate(self.strategy_id)
+
+
+class ClientOrderIdAllocator:
+    """Hands out client order IDs encoding shard, strategy and sequence, from per thread blocks"""
+
+    def __init__(
+        self,
+        shard: int = 0,
+        path: Optional[str] = None,
+        block_size: int = 1024,
+        shard_bits: int = 10,
+        strategy_bits: int = 14,
+    ):
+        """
+        Initializes the ClientOrderIdAllocator class.
+
+        :param shard: shard of this process, unique among the processes trading at the same time
+        :param path: optional JSON state file, loaded if it exists and written on every block reservation
+        :param block_size: number of sequence numbers reserved at a time
+        :param shard_bits: bits of the shard, the high bits of the ID
+        :param strategy_bits: bits of the strategy ID, the sequence takes the remaining bits
+        """
+        self.sequence_bits = 64 - shard_bits - strategy_bits
+        if self.sequence_bits < 16:
+            raise ValueError("Shard and strategy bits leave less than 16 sequence bits")
+        if not 0 <= shard < 1 << shard_bits:
+            raise ValueError(f"Shard {shard} does not fit in {shard_bits} bits")
+        if block_size < 1:
+            raise ValueError("block_size must be positive")
+
+        self.shard = shard
+        self.path = path
+        self.block_size = block_size
+        self.shard_bits = shard_bits
+        self.strategy_bits = strategy_bits
+        self._strategy_mask = (1 << strategy_bits) - 1
+        self._sequence_mask = (1 << self.sequence_bits) - 1
+
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._strategies: Dict[int, StrategyInfo] = {}
+        self._names: Dict[str, int] = {}
+        # End of the reserved sequence blocks of each strategy
+        self._reserved: Dict[int, int] = {}
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._strategies)
+
+    # Strategies
+    def register(self, name: str, strategy_id: Optional[int] = None, **metadata) -> StrategyInfo:
+        """
+        Register a strategy, registering a name again returns its existing entry with the metadata updated
+
+        :param name: unique strategy name
+        :param strategy_id: optional strategy ID, defaults to the next free one
+        :param metadata: metadata returned by ``strategy_of`` for the strategy's IDs
+        :returns: StrategyInfo object
+        """
+        with self._lock:
+            existing = self._names.get(name)
+            if existing is not None:
+                if strategy_id is not None and strategy_id != existing:
+                    raise ValueError(f"Strategy {name} is registered with ID {existing}")
+                info = self._strategies[existing]
+                if metadata:
+                    info.metadata.update(metadata)
+                    self._persist()
+                return info
+
+            if strategy_id is None:
+                strategy_id = max(self._strategies, default=-1) + 1
+            if not 0 <= strategy_id <= self._strategy_mask:
+                raise ValueError(f"Strategy ID {strategy_id} does not fit in {self.strategy_bits} bits")
+            if strategy_id in self._strategies:
+                raise ValueError(f"Strategy ID {strategy_id} is registered to {self._strategies[strategy_id].name}")
+
+            info = StrategyInfo(strategy_id, name, dict(metadata))
+            self._strategies[strategy_id] = info
+            self._names[name] = strategy_id
+            self._reserved.setdefault(strategy_id, 0)
+            self._persist()
+        return info
+
+    def _strategy_id(self, strategy: Union[str, int]) -> int:
+        if isinstance(strategy, str):
+            strategy_id = self._names.get(strategy)
+            if strategy_id is None:
+                raise KeyError(f"Strategy {strategy} not registered")
+            return strategy_id
+        if strategy not in self._strategies:
+            raise KeyError(f"Strategy ID {strategy} not registered")
+        return strategy
+
+    def strategy(self, strategy: Union[str, int]) -> StrategyIds:
+        """
+        Get an iterator over the IDs of a strategy, e.g. to pass as the ID source of a scheduler
+
+        :param strategy: strategy name or ID
+        :returns: StrategyIds object
+        """
+        return StrategyIds(self, self._strategy_id(strategy))
+
+    # Allocation
+    def allocate(self, strategy: Union[str, int]) -> int:
+        """
+        Allocate a client order ID
+
+        :param strategy: strategy name or ID
+        :returns: u64 client order ID
+        """
+        blocks = getattr(self._local, "blocks", None)
+        if blocks is None:
+            blocks = self._local.blocks = {}
+        block = blocks.get(strategy)
+        if block is not None:
+            prefix, sequence, end = block
+            if sequence < end:
+                block[1] = sequence + 1
+                return prefix | sequence
+
+        strategy_id = self._strategy_id(strategy)
+        start, end = self._reserve(strategy_id)
+        prefix = (self.shard << (self.strategy_bits + self.sequence_bits)) | (strategy_id << self.sequence_bits)
+        blocks[strategy] = [prefix, start + 1, end]
+        return prefix | start
+
+    def _reserve(self, strategy_id: int) -> Tuple[int, int]:
+        """Reserve the next sequence block of a strategy and persist its end"""
+        with self._lock:
+            start = self._reserved[strategy_id]
+            end = min(start + self.block_size, self._sequence_mask + 1)
+            if start >= end:
+                raise ValueError(f"Sequence of strategy {self._strategies[strategy_id].name} is exhausted")
+            self._reserved[strategy_id] = end
+            self._persist()
+        return start, end
+
+    # Lookups
+    def decode(self, client_order_id: Union[int, str]) -> Tuple[int, int, int]:
+        """
+        Split a client order ID
+
+        :param client_order_id: client order ID
+        :returns: shard, strategy ID and sequence
+        """
+        client_order_id = int(client_order_id)
+        return (
+            client_order_id >> (self.strategy_bits + self.sequence_bits),
+            (client_order_id >> self.sequence_bits) & self._strategy_mask,
+            client_order_id & self._sequence_mask,
+        )
+
+    def strategy_of(self, client_order_id: Union[int, str]) -> Optional[StrategyInfo]:
+        """
+        Get the strategy of a client order ID
+
+        :param client_order_id: client order ID
+        :returns: StrategyInfo object, None if the strategy bits match no registered strategy
+        """
+        return self._strategies.get((int(client_order_id) >> self.sequence_bits) & self._strategy_mask)
+
+    # Persistence
+    def _persist(self):
+        if self.path:
+            self.save()
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the strategies and reserved sequence blocks to a JSON file
+
+        :param path: file path, defaults to the path the allocator was created with
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the allocator state to")
+        data = {
+            "shard": self.shard,
+            "shard_bits": self.shard_bits,
+            "strategy_bits": self.strategy_bits,
+            "strategies": {
+                info.name: {
+                    "strategy_id": info.strategy_id,
+                    "metadata": info.metadata,
+                    "reserved": self._reserved[info.strategy_id],
+                }
+                for info in self._strategies.values()
+            },
+        }
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary, path)
+
+    def load(self, path: Optional[str] = None):
+        """
+        Restore the strategies and reserved sequence blocks of a JSON file written by ``save``
+
+        :param path: file path, defaults to the path the allocator was created with
+        """
+        with open(path or self.path) as file:
+            data = json.load(file)
+        layout = (data["shard"], data["shard_bits"], data["strategy_bits"])
+        if layout != (self.shard, self.shard_bits, self.strategy_bits):
+            raise ValueError(f"State file was written for shard and layout {layout}")
+
+        with self._lock:
+            for name, entry in data.get("strategies", {}).items():
+                strategy_id = entry["strategy_id"]
+                self._strategies[strategy_id] = StrategyInfo(strategy_id, name, entry.get("metadata", {}))
+                self._names[name] = strategy_id
+                self._reserved[strategy_id] = max(self._reserved.get(strategy_id, 0), entry["reserved"])
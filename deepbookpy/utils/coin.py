@@ -137,3 +137,72 @@ def coin_with_balance(
     result = txn.split_coin(coin=highest_balance_object_id, amounts=amount)
 
     return result
+
+
+def owned_coins(
+    sender_with_result: Union[SuiRpcResult, Exception], coin_type: str
+) -> List[BalanceObject]:
+    """
+    Get the owned coins of a coin type, highest balance first
+
+    :param sender_with_result: list of owned objects
+    :param coin_type: coin type
+    :returns: list of BalanceObject
+    """
+    if not sender_with_result.is_ok():
+        raise ValueError(
+            f"Unable to list owned objects: {sender_with_result.result_string}"
+        )
+
+    wrapped_coin_type = wrap_coin_type(coin_type)
+    coins = []
+    for owned_object in sender_with_result.result_data.data:
+        r = json.loads(owned_object.to_json())
+        if r["type"] == wrapped_coin_type:
+            balance = int(r["content"]["fields"]["balance"])
+            if balance > 0:
+                coins.append(BalanceObject(r["objectId"], r["type"], balance))
+
+    return sorted(coins, key=lambda coin: coin.balance, reverse=True)
+
+
+def coins_with_balances(
+    sender_with_result: Union[SuiRpcResult, Exception],
+    coin_type: str,
+    amounts: List[int],
+    txn: SuiTransaction,
+) -> list[bcs.Argument]:
+    """
+    Split one coin per amount, merging as many owned coins as the total needs into the
+    largest one first. SUI is split from txn.gas
+
+    :param sender_with_result: list of owned objects
+    :param coin_type: coin type
+    :param amounts: amounts of the coins in the smallest unit
+    :param txn: SuiTransaction object
+    :returns: list of results, one per amount
+    """
+    if coin_type == SUI_COIN_TYPE:
+        source = txn.gas
+    else:
+        total = sum(amounts)
+        selected, selected_balance = [], 0
+        for coin in owned_coins(sender_with_result, coin_type):
+            if selected_balance >= total:
+                break
+            selected.append(coin)
+            selected_balance += coin.balance
+        if selected_balance < total:
+            raise InsufficientCoinsError(
+                f"Owned {coin_type} balance {selected_balance} is below {total}"
+            )
+
+        source = ObjectID(selected[0].object_id)
+        if len(selected) > 1:
+            txn.merge_coins(
+                merge_to=source,
+                merge_from=[ObjectID(coin.object_id) for coin in selected[1:]],
+            )
+
+    result = txn.split_coin(coin=source, amounts=list(amounts))
+    return result if isinstance(result, list) else [result]
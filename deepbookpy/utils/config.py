@@ -1,5 +1,6 @@
 from deepbookpy.transactions.balance_manager import BalanceManagerContract
 from .constants import (
+    CLOCK,
     mainnet_coins,
     mainnet_pools,
     mainnet_package_ids,
@@ -7,7 +8,10 @@ from .constants import (
     testnet_pools,
     testnet_package_ids,
 )
+from deepbookpy.utils.discovery import load_registry_cache
 from deepbookpy.utils.normalizer import normalize_sui_address
+from deepbookpy.utils.object_cache import ObjectReferenceCache
+from deepbookpy.utils.tracing import NOOP_TRACER
 from dataclasses import dataclass
 
 FLOAT_SCALAR = 1000000000
@@ -28,32 +32,58 @@ class DeepBookConfig:
         balance_managers=None,
         coins=None,
         pools=None,
+        tracer=None,
+        objects=None,
+        gas_model=None,
+        registry_cache=None,
     ):
+        self.env = env
+        self.registry_cache = registry_cache
         self._coins = None
         self._pools = None
         self.balance_managers = balance_managers or {}
         self.address = self.normalize_sui_address(address)
         self.admin_cap = admin_cap
+        self.tracer = tracer if tracer is not None else NOOP_TRACER
+        self.objects = objects if objects is not None else ObjectReferenceCache()
+        self.gas_model = gas_model
 
         if env == "mainnet":
-            self._coins = coins or mainnet_coins
-            self._pools = pools or mainnet_pools
+            self._coins = coins or dict(mainnet_coins)
+            self._pools = pools or dict(mainnet_pools)
             self.DEEPBOOK_PACKAGE_ID = mainnet_package_ids["DEEPBOOK_PACKAGE_ID"]
             self.REGISTRY_ID = mainnet_package_ids["REGISTRY_ID"]
             self.DEEP_TREASURY_ID = mainnet_package_ids["DEEP_TREASURY_ID"]
         else:
-            self._coins = coins or testnet_coins
-            self._pools = pools or testnet_pools
+            self._coins = coins or dict(testnet_coins)
+            self._pools = pools or dict(testnet_pools)
             self.DEEPBOOK_PACKAGE_ID = testnet_package_ids["DEEPBOOK_PACKAGE_ID"]
             self.REGISTRY_ID = testnet_package_ids["REGISTRY_ID"]
             self.DEEP_TREASURY_ID = testnet_package_ids["DEEP_TREASURY_ID"]
 
+        # Pools discovered from the registry, configured ones keep their entries
+        cached = load_registry_cache(registry_cache, env, self.REGISTRY_ID)
+        if cached is not None:
+            for key, coin in cached["coins"].items():
+                self._coins.setdefault(key, coin)
+            for key, pool in cached["pools"].items():
+                if pool["base_coin"] in self._coins and pool["quote_coin"] in self._coins:
+                    self._pools.setdefault(key, pool)
+
         self.balance_manager = BalanceManagerContract(self)
 
     @staticmethod
     def normalize_sui_address(address):
         return normalize_sui_address(address)
 
+    @property
+    def coins(self):
+        return self._coins
+
+    @property
+    def pools(self):
+        return self._pools
+
     # Getters
     def get_coin(self, key):
         coin = self._coins.get(key)
@@ -67,6 +97,38 @@ class DeepBookConfig:
             raise KeyError(f"Pool not found for key: {key}")
         return pool
 
+    def get_pool_key(self, address):
+        address = self.normalize_sui_address(address)
+        for key, pool in self._pools.items():
+            if self.normalize_sui_address(pool["address"]) == address:
+                return key
+        raise KeyError(f"Pool not found for address: {address}")
+
+    def add_coin(self, key, address, coin_type, scalar):
+        self._coins[key] = {
+            "address": self.normalize_sui_address(address),
+            "type": coin_type,
+            "scalar": scalar,
+        }
+        return self._coins[key]
+
+    def add_pool(self, key, address, base_coin, quote_coin):
+        if base_coin not in self._coins or quote_coin not in self._coins:
+            raise KeyError(f"Coins of pool {key} not found: {base_coin}, {quote_coin}")
+        self._pools[key] = {
+            "address": self.normalize_sui_address(address),
+            "base_coin": base_coin,
+            "quote_coin": quote_coin,
+        }
+        return self._pools[key]
+
+    def shared_object_ids(self):
+        """Object IDs of the pools, balance managers, registry, treasury and clock"""
+        object_ids = [self.REGISTRY_ID, self.DEEP_TREASURY_ID, CLOCK]
+        object_ids.extend(pool["address"] for pool in self._pools.values())
+        object_ids.extend(manager["address"] for manager in self.balance_managers.values())
+        return object_ids
+
     def get_balance_manager(self, manager_key):
         if manager_key not in self.balance_managers:
             raise KeyError(f"Balance manager with key {manager_key} not found.")
@@ -0,0 +1,263 @@
+"""
+Pool and coin discovery from the DeepBook registry, with a persistent disk cache.
+
+The registry keeps every registered pool in a ``Bag`` keyed by ``PoolKey { base, quote }`` coin types.
+``RegistryDiscovery`` walks that bag page by page, fetches the metadata of coin types not configured yet for their
+decimals and symbol, and names the new entries the way the hard-coded ones are named, coins by symbol and pools
+``"<BASE>_<QUOTE>"``. Pools and coins already in the config keep their keys.
+
+The result is written to a versioned JSON cache. ``DeepBookConfig(registry_cache=...)`` loads it at startup, so a cold
+start knows every discovered pool without a request. ``refresh`` adds newly registered pools to a running config and
+rewrites the cache, ``run`` refreshes on schedule from a background thread.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from pysui import SyncClient
+from pysui.sui.sui_builders.get_builders import GetCoinMetaData, GetDynamicFieldObject, GetDynamicFields
+from pysui.sui.sui_types.scalars import ObjectID, SuiString
+
+from deepbookpy.utils.normalizer import normalize_coin_type, normalize_sui_address, normalize_sui_object_id
+
+
+# Layout of the cache file, caches of another layout are ignored and rebuilt
+CACHE_VERSION = 1
+
+
+def load_registry_cache(
+    path: Optional[str], env: Optional[str] = None, registry_id: Optional[str] = None
+) -> Optional[dict]:
+    """
+    Load a registry cache written by ``RegistryDiscovery``
+
+    :param path: cache file path
+    :param env: environment the cache must be written for, any when None
+    :param registry_id: registry the cache must be written for, any when None
+    :returns: cache with ``coins`` and ``pools`` mappings, None if the file is missing, of another version or written
+        for another environment or registry
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if data.get("version") != CACHE_VERSION:
+        return None
+    if env is not None and data.get("env") != env:
+        return None
+    if registry_id is not None and normalize_sui_object_id(data.get("registry_id", "0x0")) != (
+        normalize_sui_object_id(registry_id)
+    ):
+        return None
+    return data
+
+
+def save_registry_cache(path: str, env: str, registry_id: str, coins: Dict[str, dict], pools: Dict[str, dict]):
+    """
+    Write a registry cache
+
+    :param path: cache file path
+    :param env: environment of the registry
+    :param registry_id: registry the pools were read from
+    :param coins: coins mapping
+    :param pools: pools mapping
+    """
+    data = {
+        "version": CACHE_VERSION,
+        "env": env,
+        "registry_id": registry_id,
+        "updated_at": int(time.time()),
+        "coins": coins,
+        "pools": pools,
+    }
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file, indent=2, sort_keys=True)
+    os.replace(temporary, path)
+
+
+def _result(result, what: str):
+    if not result.is_ok():
+        raise ValueError(f"Unable to fetch {what}: {result.result_string}")
+    return result.result_data
+
+
+def _struct_fields(value) -> dict:
+    """Fields of a nested Move struct of an object's JSON content"""
+    return value["fields"] if isinstance(value, dict) and "fields" in value else value
+
+
+def _uid(value) -> str:
+    return value["id"] if isinstance(value, dict) else value
+
+
+class RegistryDiscovery:
+    """Enumerates the pools of the DeepBook registry and the metadata of their coins"""
+
+    def __init__(self, client: SyncClient, config, path: Optional[str] = None, page_size: int = 50):
+        """
+        Initializes the RegistryDiscovery class.
+
+        :param client: SyncClient instance
+        :param config: DeepBookConfig the discovered pools and coins are added to
+        :param path: cache file path, defaults to the config's ``registry_cache``
+        :param page_size: dynamic fields fetched per page
+        """
+        self.client = client
+        self.config = config
+        self.path = path or config.registry_cache
+        self.page_size = page_size
+        self._lock = threading.Lock()
+        self._metadata: Dict[str, Tuple[str, int]] = {}
+        self.last_error: Optional[Exception] = None
+
+    # Chain reads
+    def _pools_bag(self) -> str:
+        """ID of the Bag of registered pools, under the registry's versioned inner object"""
+        registry = _result(self.client.get_object(ObjectID(self.config.REGISTRY_ID)), "the registry")
+        inner = _struct_fields(registry.content.fields["inner"])
+        versioned_id = _uid(inner["id"])
+        field = _result(
+            self.client.execute(
+                GetDynamicFieldObject(ObjectID(versioned_id), {"type": "u64", "value": str(inner["version"])})
+            ),
+            "the registry inner object",
+        )
+        registry_inner = _struct_fields(field.content.fields["value"])
+        return _uid(_struct_fields(registry_inner["pools"])["id"])
+
+    def registered_pools(self) -> Dict[Tuple[str, str], str]:
+        """
+        Get every pool of the registry
+
+        :returns: dictionary of (base coin type, quote coin type) to pool address
+        """
+        bag_id = self._pools_bag()
+        field_ids, cursor = [], None
+        while True:
+            page = _result(
+                self.client.execute(
+                    GetDynamicFields(
+                        ObjectID(bag_id), cursor=ObjectID(cursor) if cursor else None, limit=self.page_size
+                    )
+                ),
+                "the registered pools",
+            )
+            field_ids.extend(item.object_id for item in page.data)
+            if not page.has_next_page or not page.next_cursor:
+                break
+            cursor = page.next_cursor
+
+        pools = {}
+        if not field_ids:
+            return pools
+        for field in _result(self.client.get_objects_for([ObjectID(field_id) for field_id in field_ids]), "pool keys"):
+            fields = field.content.fields
+            pool_key = _struct_fields(fields["name"])
+            base_type = normalize_coin_type("0x" + _struct_fields(pool_key["base"])["name"])
+            quote_type = normalize_coin_type("0x" + _struct_fields(pool_key["quote"])["name"])
+            pools[(base_type, quote_type)] = normalize_sui_object_id(fields["value"])
+        return pools
+
+    def coin_metadata(self, coin_type: str) -> Tuple[str, int]:
+        """
+        Get the symbol and decimals of a coin type, fetched once and kept
+
+        :param coin_type: coin type
+        :returns: symbol and decimals
+        """
+        metadata = self._metadata.get(coin_type)
+        if metadata is None:
+            data = _result(
+                self.client.execute(GetCoinMetaData(coin_type=SuiString(coin_type))), f"the {coin_type} metadata"
+            )
+            metadata = self._metadata[coin_type] = (data.symbol, int(data.decimals))
+        return metadata
+
+    # Naming
+    @staticmethod
+    def _free_key(name: str, taken) -> str:
+        key, suffix = name, 2
+        while key in taken:
+            key, suffix = f"{name}{suffix}", suffix + 1
+        return key
+
+    def discover(self) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+        """
+        Enumerate the registry pools and their coins, named after the configured ones when they are known
+
+        :returns: coins and pools mappings of every registered pool
+        """
+        config = self.config
+        coin_keys = {normalize_coin_type(coin["type"]): key for key, coin in config.coins.items()}
+        pool_keys = {normalize_sui_object_id(pool["address"]): key for key, pool in config.pools.items()}
+
+        coins: Dict[str, dict] = {}
+        pools: Dict[str, dict] = {}
+        for (base_type, quote_type), address in self.registered_pools().items():
+            keys = []
+            for coin_type in (base_type, quote_type):
+                key = coin_keys.get(coin_type)
+                if key is None:
+                    symbol, decimals = self.coin_metadata(coin_type)
+                    key = coin_keys[coin_type] = self._free_key(symbol.upper(), set(config.coins) | set(coins))
+                    coins[key] = {
+                        "address": normalize_sui_address(coin_type.split("::", 1)[0]),
+                        "type": coin_type,
+                        "scalar": 10**decimals,
+                    }
+                elif key not in coins:
+                    coins[key] = dict(config.coins[key])
+                keys.append(key)
+
+            pool_key = pool_keys.get(address)
+            if pool_key is None:
+                pool_key = self._free_key(f"{keys[0]}_{keys[1]}", set(config.pools) | set(pools))
+            pools[pool_key] = {"address": address, "base_coin": keys[0], "quote_coin": keys[1]}
+        return coins, pools
+
+    # Refresh
+    def refresh(self) -> List[str]:
+        """
+        Discover the registry pools, add the new ones and their coins to the config and rewrite the cache
+
+        :returns: keys of the pools added to the config
+        """
+        with self._lock:
+            coins, pools = self.discover()
+            for key, coin in coins.items():
+                if key not in self.config.coins:
+                    self.config.add_coin(key, coin["address"], coin["type"], coin["scalar"])
+            added = [key for key in pools if key not in self.config.pools]
+            for key in added:
+                pool = pools[key]
+                self.config.add_pool(key, pool["address"], pool["base_coin"], pool["quote_coin"])
+            if self.path:
+                save_registry_cache(self.path, self.config.env, self.config.REGISTRY_ID, coins, pools)
+        return added
+
+    def run(self, interval: float = 300.0, stop: Optional[threading.Event] = None):
+        """
+        Refresh on schedule until the stop event is set, e.g. from a background thread
+
+        :param interval: seconds between refreshes
+        :param stop: optional threading.Event ending the run
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # A failed refresh keeps the pools known so far, the next one retries
+                self.last_error = e
+            stop.wait(interval)
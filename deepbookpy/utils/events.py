@@ -0,0 +1,275 @@
+"""
+DeepBook event helpers.
+
+Events can come from ``suix_queryEvents``, from the ``events`` of a transaction response, or as plain dictionaries
+with ``type`` and ``parsedJson`` members. ``parse_event`` turns any of those into an event name and its fields.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from pysui import SyncClient
+from pysui.sui.sui_builders.get_builders import GetCheckpointBySequence, GetMultipleTx, QueryEvents
+from pysui.sui.sui_types.collections import EventID
+from pysui.sui.sui_types.event_filter import MoveEventTypeQuery
+from pysui.sui.sui_types.scalars import SuiBoolean
+
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+ORDER_PLACED = "OrderPlaced"
+ORDER_FILLED = "OrderFilled"
+ORDER_CANCELED = "OrderCanceled"
+ORDER_MODIFIED = "OrderModified"
+ORDER_EXPIRED = "OrderExpired"
+
+# Module declaring each event struct
+EVENT_MODULES = {
+    ORDER_PLACED: "order_info",
+    ORDER_FILLED: "order_info",
+    ORDER_EXPIRED: "order_info",
+    ORDER_CANCELED: "order",
+    ORDER_MODIFIED: "order",
+}
+
+# Fields decoded as integers, JSON-RPC returns u64 and u128 values as strings
+INTEGER_FIELDS = {
+    "order_id",
+    "client_order_id",
+    "maker_order_id",
+    "taker_order_id",
+    "maker_client_order_id",
+    "taker_client_order_id",
+    "price",
+    "placed_quantity",
+    "expire_timestamp",
+    "timestamp",
+    "original_quantity",
+    "base_asset_quantity_canceled",
+    "previous_quantity",
+    "filled_quantity",
+    "new_quantity",
+    "base_quantity",
+    "quote_quantity",
+    "taker_fee",
+    "maker_fee",
+}
+
+# Fields holding object IDs
+ID_FIELDS = {"pool_id", "balance_manager_id", "maker_balance_manager_id", "taker_balance_manager_id"}
+
+# Transactions fetched per sui_multiGetTransactionBlocks call
+MULTI_GET_LIMIT = 50
+
+
+def event_type(package_id: str, name: str) -> str:
+    """
+    Get the full Move type of a DeepBook event
+
+    :param package_id: package that declared the event struct
+    :param name: event name, e.g. ``OrderPlaced``
+    :returns: Move type, e.g. ``0x..::order_info::OrderPlaced``
+    """
+    return f"{package_id}::{EVENT_MODULES[name]}::{name}"
+
+
+def parse_event(event) -> Tuple[Optional[str], dict]:
+    """
+    Get the name and decoded fields of an event
+
+    :param event: pysui Event object or dictionary with ``type`` and ``parsedJson`` members
+    :returns: tuple of event name (None for non DeepBook order events) and fields
+    """
+    if isinstance(event, dict):
+        type_name = event.get("type", "")
+        parsed_json = event.get("parsedJson", event.get("parsed_json", {}))
+    else:
+        type_name = event.event_type
+        parsed_json = event.parsed_json
+
+    name = type_name.split("<")[0].rsplit("::", 1)[-1]
+    if name not in EVENT_MODULES:
+        return None, parsed_json
+
+    fields = {}
+    for key, value in parsed_json.items():
+        if key in INTEGER_FIELDS:
+            fields[key] = int(value)
+        elif key in ID_FIELDS:
+            fields[key] = normalize_sui_object_id(value)
+        else:
+            fields[key] = value
+
+    return name, fields
+
+
+def event_id(event) -> Optional[tuple]:
+    """
+    Get the unique ID of an event
+
+    :param event: pysui Event object or event dictionary
+    :returns: tuple of transaction digest and event sequence, None if the event carries no ID
+    """
+    if isinstance(event, dict):
+        id_ = event.get("id")
+    else:
+        id_ = event.event_id
+    if not id_:
+        return None
+    return id_["txDigest"], int(id_["eventSeq"])
+
+
+def transaction_events(tx_response) -> list:
+    """
+    Get the events of a transaction response
+
+    :param tx_response: pysui TxResponse object or JSON-RPC response dictionary
+    :returns: list of events
+    """
+    if isinstance(tx_response, dict):
+        return tx_response.get("events") or []
+    return tx_response.events or []
+
+
+class EventPoller:
+    """
+    Pages through DeepBook events emitted since the previous poll
+
+    Each event type is queried separately. The pages are merged into chain order by checkpoint timestamp, and when
+    several transactions share a timestamp by checkpoint and position of the transaction in its checkpoint, fetched
+    for those transactions only.
+    """
+
+    def __init__(
+        self,
+        client: SyncClient,
+        package_id: str,
+        names: Iterable[str] = tuple(EVENT_MODULES),
+        limit: int = 50,
+        start_at_latest: bool = False,
+        cursors: Optional[Dict[str, Tuple[str, int]]] = None,
+    ):
+        """
+        Initializes the EventPoller class.
+
+        :param client: SyncClient instance
+        :param package_id: package that declared the event structs
+        :param names: event names to poll
+        :param limit: page size of each event query
+        :param start_at_latest: if True the first poll of each event type only returns events emitted after the
+            newest one, otherwise it starts at the oldest event
+        :param cursors: event IDs to start after, keyed by event name, e.g. ``cursors`` of a previous poller, event
+            types with a cursor ignore ``start_at_latest``
+        """
+        self.client = client
+        self.names = dict(zip((event_type(package_id, name) for name in names), names))
+        self.structs = list(self.names)
+        self.limit = limit
+        self.start_at_latest = start_at_latest
+        # (transaction digest, event sequence) of the last event returned per event type
+        self._cursors: Dict[str, Tuple[str, int]] = {}
+        self._started = set()
+        for struct, name in self.names.items():
+            if cursors and name in cursors:
+                self._cursors[struct] = cursors[name]
+                self._started.add(struct)
+
+    @property
+    def cursors(self) -> Dict[str, Tuple[str, int]]:
+        """Event ID of the last event returned per event name, to resume polling with ``cursors``"""
+        return {self.names[struct]: cursor for struct, cursor in self._cursors.items()}
+
+    def _execute(self, builder, what: str):
+        result = self.client.execute(builder)
+        if result.is_err():
+            raise ValueError(f"{what} failed: {result.result_string}")
+        return result.result_data
+
+    def _query(
+        self,
+        struct: str,
+        cursor: Optional[Tuple[str, int]] = None,
+        limit: Optional[int] = None,
+        descending_order: bool = False,
+    ):
+        return self._execute(
+            QueryEvents(
+                query=MoveEventTypeQuery(struct),
+                cursor=EventID(str(cursor[1]), cursor[0]) if cursor else None,
+                limit=limit or self.limit,
+                # A plain bool is coerced to true once the builder properties exist, pass the Sui type
+                descending_order=SuiBoolean(descending_order),
+            ),
+            f"Event query for {struct}",
+        )
+
+    def _seek_latest(self, struct: str):
+        page = self._query(struct, limit=1, descending_order=True)
+        if page.data:
+            self._cursors[struct] = event_id(page.data[0])
+
+    def seek_latest(self):
+        """Start the event types not polled yet after their newest event"""
+        for struct in self.structs:
+            if struct not in self._started:
+                self._started.add(struct)
+                self._seek_latest(struct)
+
+    def _positions(self, events: List) -> Dict[str, Tuple[int, int]]:
+        """
+        Get the checkpoint and position in the checkpoint of the transactions sharing a timestamp with another one
+
+        :param events: list of pysui Event objects
+        :returns: dictionary of (checkpoint, position) keyed by transaction digest
+        """
+        digests = {}
+        for event in events:
+            digests.setdefault(int(event.timestamp_ms or 0), set()).add(event.event_id["txDigest"])
+        tied = sorted(digest for same_time in digests.values() if len(same_time) > 1 for digest in same_time)
+        if not tied:
+            return {}
+
+        checkpoints = {}
+        for start in range(0, len(tied), MULTI_GET_LIMIT):
+            page = self._execute(
+                GetMultipleTx(digests=tied[start : start + MULTI_GET_LIMIT], options={}), "Transaction query"
+            )
+            for tx in page.transactions:
+                checkpoints[tx.digest] = int(tx.checkpoint or 0)
+
+        positions = {}
+        for sequence in set(checkpoints.values()):
+            checkpoint = self._execute(GetCheckpointBySequence(str(sequence)), f"Checkpoint {sequence} query")
+            for index, digest in enumerate(checkpoint.transactions):
+                if digest in checkpoints:
+                    positions[digest] = (sequence, index)
+        return positions
+
+    def poll(self) -> List:
+        """
+        Fetch new events
+
+        :returns: list of pysui Event objects in chain order
+        """
+        if self.start_at_latest:
+            self.seek_latest()
+        events = []
+        for struct in self.structs:
+            self._started.add(struct)
+            while True:
+                page = self._query(struct, self._cursors.get(struct))
+                events.extend(page.data)
+                if page.data:
+                    self._cursors[struct] = event_id(page.data[-1])
+                if not page.has_next_page:
+                    break
+
+        # Event types are fetched separately, merge them back into chain order
+        positions = self._positions(events)
+        events.sort(
+            key=lambda event: (
+                int(event.timestamp_ms or 0),
+                positions.get(event.event_id["txDigest"], (0, 0)),
+                int(event.event_id.get("eventSeq", 0)),
+            )
+        )
+        return events
@@ -0,0 +1,360 @@
+"""
+A local stand-in for a Sui fullnode JSON-RPC endpoint.
+
+``FullnodeStub`` serves recorded responses so that ``DeepBookClient`` read paths can be exercised without a live fullnode.
+Responses are stored as fixture files, one JSON file per request key:
+
+- ``sui_devInspectTransactionBlock`` requests are keyed by the Move call targets, type arguments and arguments found in the transaction
+- ``sui_getObject`` / ``sui_multiGetObjects`` requests are keyed by the requested object IDs
+- every other method is keyed by its method name and parameters
+
+In recorder mode (``record_from`` set) requests without a fixture are forwarded to a real fullnode and the response is saved.
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import httpx
+from pysui.sui.sui_types import bcs
+
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+DEV_INSPECT_METHOD = "sui_devInspectTransactionBlock"
+GET_OBJECT_METHOD = "sui_getObject"
+MULTI_GET_OBJECTS_METHOD = "sui_multiGetObjects"
+
+# JSON-RPC server error code returned when no fixture exists for a request
+FIXTURE_NOT_FOUND_CODE = -32001
+
+
+class FixtureNotFoundError(Exception):
+    pass
+
+
+def _address_hex(address: bcs.Address) -> str:
+    return "0x" + bytes(address.Address).hex()
+
+
+def _type_tag_key(type_tag: bcs.TypeTag) -> str:
+    """
+    Render a bcs TypeTag as a Move type string
+
+    :param type_tag: bcs TypeTag
+    :returns: type string, e.g. ``0x..02::sui::SUI``
+    """
+    if type_tag.enum_name == "Struct":
+        struct_tag = type_tag.value
+        type_name = f"{_address_hex(struct_tag.address)}::{struct_tag.module}::{struct_tag.name}"
+        if struct_tag.type_parameters:
+            type_parameters = ",".join(
+                _type_tag_key(type_parameter)
+                for type_parameter in struct_tag.type_parameters
+            )
+            type_name += f"<{type_parameters}>"
+        return type_name
+    if type_tag.enum_name == "Vector":
+        return f"vector<{_type_tag_key(type_tag.value[0])}>"
+    return type_tag.enum_name.lower()
+
+
+def _argument_key(argument: bcs.Argument, inputs: list) -> str:
+    """
+    Describe a PTB argument by value rather than by position
+
+    :param argument: bcs Argument of a command
+    :param inputs: list of transaction CallArg inputs
+    :returns: argument description
+    """
+    if argument.enum_name == "Input":
+        call_arg = inputs[argument.value]
+        if call_arg.enum_name == "Pure":
+            return "pure:" + bytes(call_arg.value).hex()
+        object_ref = call_arg.value.value
+        return "object:" + _address_hex(object_ref.ObjectID)
+    if argument.enum_name == "Result":
+        return f"result:{argument.value}"
+    if argument.enum_name == "NestedResult":
+        return f"result:{argument.value[0]}:{argument.value[1]}"
+    return "gas"
+
+
+def inspect_key(tx_bytes: str) -> str:
+    """
+    Build the fixture key of a devInspect transaction from its Move calls
+
+    :param tx_bytes: base64 encoded TransactionKind
+    :returns: key made of every Move call target, type arguments and arguments
+    """
+    kind = bcs.TransactionKind.deserialize(base64.b64decode(tx_bytes))
+    inputs = kind.value.Inputs
+
+    calls = []
+    for command in kind.value.Command:
+        if command.enum_name != "MoveCall":
+            calls.append(command.enum_name)
+            continue
+        move_call = command.value
+        target = f"{_address_hex(move_call.Package)}::{move_call.Module}::{move_call.Function}"
+        type_arguments = ",".join(
+            _type_tag_key(type_tag) for type_tag in move_call.Type_Arguments
+        )
+        arguments = ",".join(
+            _argument_key(argument, inputs) for argument in move_call.Arguments
+        )
+        calls.append(f"{target}<{type_arguments}>({arguments})")
+
+    return f"{DEV_INSPECT_METHOD}|" + ";".join(calls)
+
+
+def fixture_key(method: str, params: list) -> str:
+    """
+    Build the fixture key of a JSON-RPC request
+
+    :param method: JSON-RPC method name
+    :param params: JSON-RPC params
+    :returns: key used to store and look up the recorded response
+    """
+    if method == DEV_INSPECT_METHOD:
+        return inspect_key(params[1])
+    if method == GET_OBJECT_METHOD:
+        return f"{method}|{normalize_sui_object_id(params[0])}"
+    if method == MULTI_GET_OBJECTS_METHOD:
+        object_ids = [normalize_sui_object_id(object_id) for object_id in params[0]]
+        return f"{method}|{','.join(object_ids)}"
+    return f"{method}|{json.dumps(params, sort_keys=True)}"
+
+
+class FixtureStore:
+    """Directory of recorded JSON-RPC responses"""
+
+    def __init__(self, fixtures_dir: str):
+        """
+        :param fixtures_dir: directory holding fixture files
+        """
+        self.fixtures_dir = fixtures_dir
+        self._lock = threading.Lock()
+        self._fixtures = {}
+
+        if os.path.isdir(fixtures_dir):
+            for file_name in sorted(os.listdir(fixtures_dir)):
+                if not file_name.endswith(".json"):
+                    continue
+                with open(os.path.join(fixtures_dir, file_name)) as fixture_file:
+                    fixture = json.load(fixture_file)
+                self._fixtures[fixture["key"]] = fixture
+
+    def __len__(self) -> int:
+        return len(self._fixtures)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._fixtures
+
+    def get(self, key: str) -> dict:
+        """
+        Get a recorded fixture
+
+        :param key: fixture key
+        :returns: fixture with ``result`` or ``error`` member
+        """
+        fixture = self._fixtures.get(key)
+        if fixture is None:
+            raise FixtureNotFoundError(f"No recorded response for {key}")
+        return fixture
+
+    def put(self, key: str, method: str, params: list, response: dict) -> dict:
+        """
+        Store a fixture in memory and on disk
+
+        :param key: fixture key
+        :param method: JSON-RPC method name
+        :param params: JSON-RPC params
+        :param response: JSON-RPC response body from the fullnode
+        :returns: stored fixture
+        """
+        fixture = dict(key=key, method=method, params=params)
+        if "error" in response:
+            fixture["error"] = response["error"]
+        else:
+            fixture["result"] = response.get("result")
+
+        digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+        path = os.path.join(self.fixtures_dir, f"{method}-{digest}.json")
+
+        with self._lock:
+            os.makedirs(self.fixtures_dir, exist_ok=True)
+            with open(path, "w") as fixture_file:
+                json.dump(fixture, fixture_file, indent=4)
+            self._fixtures[key] = fixture
+
+        return fixture
+
+
+class FullnodeStub:
+    """Local JSON-RPC server replaying (and optionally recording) fullnode responses"""
+
+    def __init__(
+        self,
+        fixtures_dir: str,
+        record_from: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+    ):
+        """
+        Initializes the FullnodeStub class.
+
+        :param fixtures_dir: directory holding fixture files
+        :param record_from: optional fullnode RPC URL, requests without a fixture are forwarded there and recorded
+        :param host: interface to bind
+        :param port: port to bind, 0 picks a free port
+        :param latency: artificial delay in seconds added to every response
+        """
+        self.store = FixtureStore(fixtures_dir)
+        self.record_from = record_from
+        self.latency = latency
+        self.hits = 0
+        self.misses = 0
+
+        self._upstream = httpx.Client(timeout=120.0) if record_from else None
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """RPC URL to pass as ``rpc_url`` of a pysui config"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self) -> "FullnodeStub":
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        """Serve requests in the calling thread until interrupted"""
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        """Shut the server down"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._upstream is not None:
+            self._upstream.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "FullnodeStub":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answer a single JSON-RPC request
+
+        :param request: JSON-RPC request body
+        :returns: JSON-RPC response body
+        """
+        method = request.get("method")
+        params = request.get("params") or []
+        response = dict(jsonrpc="2.0", id=request.get("id"))
+
+        try:
+            key = fixture_key(method, params)
+        except Exception as e:
+            response["error"] = dict(code=-32602, message=f"Unable to key request: {e}")
+            return response
+
+        if key in self.store:
+            self.hits += 1
+            fixture = self.store.get(key)
+        elif self.record_from:
+            self.misses += 1
+            upstream = self._upstream.post(self.record_from, json=request).json()
+            fixture = self.store.put(key, method, params, upstream)
+        else:
+            self.misses += 1
+            response["error"] = dict(
+                code=FIXTURE_NOT_FOUND_CODE, message=f"No recorded response for {key}"
+            )
+            return response
+
+        if "error" in fixture:
+            response["error"] = fixture["error"]
+        else:
+            response["result"] = fixture["result"]
+
+        return response
+
+    def _handler_class(self):
+        stub = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are separate writes, with Nagle's algorithm the body waits for the client's delayed
+            # ACK of the headers, adding ~40ms to every keep-alive request after the first
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = json.loads(self.rfile.read(length))
+
+                if isinstance(payload, list):
+                    body = [stub.handle(request) for request in payload]
+                else:
+                    body = stub.handle(payload)
+
+                if stub.latency:
+                    time.sleep(stub.latency)
+
+                data = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Local Sui fullnode stand-in")
+    parser.add_argument("fixtures_dir", help="directory holding fixture files")
+    parser.add_argument(
+        "--record-from", default=None, help="fullnode RPC URL to record missing responses from"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency", type=float, default=0.0, help="artificial delay in seconds")
+    args = parser.parse_args()
+
+    stub = FullnodeStub(
+        args.fixtures_dir,
+        record_from=args.record_from,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+    )
+    print(f"Serving {len(stub.store)} fixtures on {stub.url}")
+    stub.serve_forever()
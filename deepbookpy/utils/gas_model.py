@@ -0,0 +1,152 @@
+"""
+Gas budgets learned from the gas used by each transaction shape.
+
+The shape of a transaction is the sequence of its commands, e.g. ``balance_manager::generate_proof_as_owner,
+pool::place_limit_order*3``. Transactions of one shape use about the same gas, so ``GasModel`` keeps the cost of the
+last ``window`` executions or dry-runs of each shape and budgets the next one at the highest of them plus a margin.
+Shapes not seen yet get the ``default`` budget, ``GAS_BUDGET`` unless set.
+
+The model is fed by ``BatchValidator`` dry-runs and by the effects of executed transactions when it is passed to
+``DeepBookClient(gas_model=...)``.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Deque, Dict, Optional, Union
+
+from pysui.sui.sui_txn.sync_transaction import SuiTransaction
+
+from deepbookpy.utils.config import GAS_BUDGET
+
+
+def transaction_shape(tx: SuiTransaction) -> str:
+    """
+    Get the shape of a transaction, its commands with runs of the same command counted
+
+    :param tx: SuiTransaction object
+    :returns: shape string
+    """
+    runs = []
+    for command in tx.builder.commands:
+        if command.enum_name == "MoveCall":
+            name = f"{command.value.Module}::{command.value.Function}"
+        else:
+            name = command.enum_name
+        if runs and runs[-1][0] == name:
+            runs[-1][1] += 1
+        else:
+            runs.append([name, 1])
+    return ",".join(name if count == 1 else f"{name}*{count}" for name, count in runs)
+
+
+class GasModel:
+    """Recent gas costs per transaction shape turned into gas budgets"""
+
+    def __init__(
+        self,
+        margin: float = 0.2,
+        window: int = 32,
+        minimum: int = 2_000_000,
+        default: Optional[int] = None,
+        path: Optional[str] = None,
+    ):
+        """
+        Initializes the GasModel class.
+
+        :param margin: fraction added to the highest recent cost of a shape
+        :param window: number of recent costs kept per shape
+        :param minimum: lowest budget given, in MIST
+        :param default: budget of shapes not seen yet, in MIST, defaults to ``GAS_BUDGET``
+        :param path: optional JSON file the costs are loaded from if it exists, and saved to by ``save``
+        """
+        self.margin = margin
+        self.window = window
+        self.minimum = minimum
+        self.default = int(GAS_BUDGET) if default is None else default
+        self.path = path
+        self._lock = threading.Lock()
+        self._costs: Dict[str, Deque[int]] = {}
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._costs)
+
+    def __contains__(self, shape: str) -> bool:
+        return shape in self._costs
+
+    @staticmethod
+    def _shape(shape: Union[str, SuiTransaction]) -> str:
+        return shape if isinstance(shape, str) else transaction_shape(shape)
+
+    def record_cost(self, shape: Union[str, SuiTransaction], computation_cost: int, storage_cost: int):
+        """
+        Record the gas of one run of a shape
+
+        :param shape: shape string or SuiTransaction object
+        :param computation_cost: computation cost in MIST
+        :param storage_cost: storage cost in MIST, the rebate is only paid back after the budget is charged
+        """
+        shape = self._shape(shape)
+        with self._lock:
+            costs = self._costs.get(shape)
+            if costs is None:
+                costs = self._costs[shape] = deque(maxlen=self.window)
+            costs.append(int(computation_cost) + int(storage_cost))
+
+    def record(self, shape: Union[str, SuiTransaction], effects):
+        """
+        Record the gas used by an executed or dry-run transaction
+
+        :param shape: shape string or SuiTransaction object
+        :param effects: transaction effects
+        """
+        gas_used = effects.gas_used
+        self.record_cost(shape, gas_used.computation_cost, gas_used.storage_cost)
+
+    def budget(self, shape: Union[str, SuiTransaction], default: Optional[int] = None) -> int:
+        """
+        Get the gas budget of a shape
+
+        :param shape: shape string or SuiTransaction object
+        :param default: budget of a shape not seen yet, defaults to the model's ``default``
+        :returns: budget in MIST
+        """
+        costs = self._costs.get(self._shape(shape))
+        if not costs:
+            return self.default if default is None else default
+        return max(int(max(costs) * (1 + self.margin)), self.minimum)
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the recent costs to a JSON file
+
+        :param path: file path, defaults to the path the model was created with
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the gas model to")
+        with self._lock:
+            data = {shape: list(costs) for shape, costs in self._costs.items()}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+        os.replace(temporary, path)
+
+    def load(self, path: Optional[str] = None):
+        """
+        Add the costs of a JSON file written by ``save``
+
+        :param path: file path, defaults to the path the model was created with
+        """
+        with open(path or self.path) as file:
+            data = json.load(file)
+        with self._lock:
+            for shape, costs in data.items():
+                self._costs.setdefault(shape, deque(maxlen=self.window)).extend(int(cost) for cost in costs)
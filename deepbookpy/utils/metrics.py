@@ -0,0 +1,284 @@
+"""
+Optional hot-path instrumentation for DeepBook calls.
+
+``Metrics`` keeps per-method latency histograms split by phase (``build``, ``inspect``, ``decode``, ``format``) and
+counters such as bytes decoded, commands per PTB and cache hits. Data can be exported as OpenMetrics text or streamed
+to a callback.
+
+Instrumentation is off unless a ``Metrics`` instance is passed to ``DeepBookClient``. When off, call sites only
+touch ``NOOP_TIMER`` whose methods do nothing.
+"""
+
+import threading
+import time
+from typing import Callable, Optional
+
+
+# Upper bounds in seconds
+LATENCY_BUCKETS = (
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+)
+
+
+def _label_key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(label_key: tuple) -> str:
+    if not label_key:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in label_key
+    )
+    return "{" + pairs + "}"
+
+
+class Histogram:
+    """Cumulative bucket histogram"""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        """
+        Record a value
+
+        :param value: observed value
+        """
+        self.count += 1
+        self.sum += value
+        for index, upper_bound in enumerate(self.buckets):
+            if value <= upper_bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def cumulative_counts(self) -> list:
+        counts = []
+        running = 0
+        for bucket_count in self.bucket_counts:
+            running += bucket_count
+            counts.append(running)
+        return counts
+
+
+class PhaseTimer:
+    """Times consecutive phases of a single call"""
+
+    __slots__ = ("_metrics", "_method", "_last")
+
+    def __init__(self, metrics: "Metrics", method: str):
+        self._metrics = metrics
+        self._method = method
+        self._last = time.perf_counter()
+
+    def mark(self, phase: str, result=None):
+        """
+        Close the current phase and start the next one
+
+        :param phase: name of the phase that just ended
+        :param result: optional value passed through, so the last phase can wrap a return value
+        :returns: result
+        """
+        now = time.perf_counter()
+        self._metrics.observe(self._method, phase, now - self._last)
+        self._last = now
+        return result
+
+    def count(self, name: str, value: float = 1):
+        """
+        Increment a counter labelled with this timer's method
+
+        :param name: counter name
+        :param value: increment
+        """
+        self._metrics.count(name, value, method=self._method)
+
+
+class _NoopTimer:
+    """Timer used when instrumentation is off"""
+
+    __slots__ = ()
+
+    def mark(self, phase: str, result=None):
+        return result
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+
+NOOP_TIMER = _NoopTimer()
+
+
+class Metrics:
+    """Latency histograms and counters for DeepBook calls"""
+
+    def __init__(
+        self,
+        namespace: str = "deepbookpy",
+        buckets: tuple = LATENCY_BUCKETS,
+        callback: Optional[Callable[[str, dict, float], None]] = None,
+    ):
+        """
+        Initializes the Metrics class.
+
+        :param namespace: prefix of exported metric names
+        :param buckets: latency histogram bucket upper bounds in seconds
+        :param callback: optional hook called as ``callback(name, labels, value)`` for every sample
+        """
+        self.namespace = namespace
+        self.buckets = buckets
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+
+    def timer(self, method: str) -> PhaseTimer:
+        """
+        Start timing a call
+
+        :param method: name of the instrumented method
+        :returns: PhaseTimer object
+        """
+        return PhaseTimer(self, method)
+
+    def observe(self, method: str, phase: str, seconds: float):
+        """
+        Record the latency of a call phase
+
+        :param method: name of the instrumented method
+        :param phase: phase name
+        :param seconds: elapsed time
+        """
+        key = (method, phase)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+        if self.callback is not None:
+            self.callback(
+                "latency_seconds", dict(method=method, phase=phase), seconds
+            )
+
+    def count(self, name: str, value: float = 1, **labels):
+        """
+        Increment a counter
+
+        :param name: counter name, e.g. ``bytes_decoded``, ``ptb_commands`` or ``cache_hits``
+        :param value: increment
+        :param labels: counter labels
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+        if self.callback is not None:
+            self.callback(name, labels, value)
+
+    def get_counter(self, name: str, **labels) -> float:
+        """
+        Get the current value of a counter
+
+        :param name: counter name
+        :param labels: counter labels
+        :returns: counter value
+        """
+        return self._counters.get((name, _label_key(labels)), 0)
+
+    def get_histogram(self, method: str, phase: str) -> Optional[Histogram]:
+        """
+        Get the latency histogram of a call phase
+
+        :param method: name of the instrumented method
+        :param phase: phase name
+        :returns: Histogram object or None if nothing was recorded
+        """
+        return self._histograms.get((method, phase))
+
+    def reset(self):
+        """Drop all recorded data"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self) -> dict:
+        """
+        Get recorded data as plain dictionaries
+
+        :returns: dictionary with latency and counters members
+        """
+        with self._lock:
+            latency = [
+                dict(
+                    method=method,
+                    phase=phase,
+                    count=histogram.count,
+                    sum=histogram.sum,
+                    buckets=dict(zip(histogram.buckets, histogram.cumulative_counts())),
+                )
+                for (method, phase), histogram in self._histograms.items()
+            ]
+            counters = [
+                dict(name=name, labels=dict(label_key), value=value)
+                for (name, label_key), value in self._counters.items()
+            ]
+        return dict(latency=latency, counters=counters)
+
+    def to_openmetrics(self) -> str:
+        """
+        Export recorded data in the OpenMetrics text format
+
+        :returns: OpenMetrics exposition text
+        """
+        lines = []
+        latency_name = f"{self.namespace}_latency_seconds"
+
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        if histograms:
+            lines.append(f"# TYPE {latency_name} histogram")
+            lines.append(f"# UNIT {latency_name} seconds")
+            lines.append(f"# HELP {latency_name} DeepBook call latency by method and phase.")
+            for (method, phase), histogram in histograms:
+                label_key = (("method", method), ("phase", phase))
+                for upper_bound, cumulative in zip(
+                    histogram.buckets, histogram.cumulative_counts()
+                ):
+                    bucket_labels = _format_labels(label_key + (("le", repr(float(upper_bound))),))
+                    lines.append(f"{latency_name}_bucket{bucket_labels} {cumulative}")
+                inf_labels = _format_labels(label_key + (("le", "+Inf"),))
+                lines.append(f"{latency_name}_bucket{inf_labels} {histogram.count}")
+                lines.append(f"{latency_name}_count{_format_labels(label_key)} {histogram.count}")
+                lines.append(f"{latency_name}_sum{_format_labels(label_key)} {histogram.sum}")
+
+        declared = set()
+        for (name, label_key), value in counters:
+            counter_name = f"{self.namespace}_{name}"
+            if counter_name not in declared:
+                declared.add(counter_name)
+                lines.append(f"# TYPE {counter_name} counter")
+            lines.append(f"{counter_name}_total{_format_labels(label_key)} {value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
@@ -34,3 +34,10 @@ def normalize_sui_object_id(value: str, force_add_0x: bool = False) -> ObjectID:
     """Normalize Sui Object Id"""
 
     return normalize_sui_address(value, force_add_0x)
+
+
+def normalize_coin_type(value: str) -> str:
+    """Normalize the address of a coin type, e.g. `0x2::sui::SUI`, so types compare equal however they are printed"""
+
+    address, rest = value.split("::", 1)
+    return f"{normalize_sui_address(address)}::{rest}"
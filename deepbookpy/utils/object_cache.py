@@ -0,0 +1,191 @@
+"""
+Object reference cache for transaction inputs.
+
+Passing an ``ObjectID`` to ``move_call`` makes pysui fetch the object on every build to learn whether it is shared
+and, if so, its initial shared version. Shared objects keep that version for their lifetime, so it is fetched once and
+kept here by object ID. ``argument`` then returns the resolved object input, which the builder takes as is.
+
+Owned objects change version on every transaction and are only recorded as owned, their ``argument`` stays an
+``ObjectID`` resolved by the builder. The cache can be saved to and loaded from a JSON file to skip the preload on
+the next start.
+
+With a ``Metrics`` instance set, every ``argument`` call counts a ``cache_hits`` or ``cache_misses`` sample labelled
+``cache="object_references"``. ``DeepBookClient`` sets its own when created with one.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Iterable, Optional, Union
+
+from pysui.sui.sui_txresults.single_tx import SharedOwner
+from pysui.sui.sui_types import bcs
+from pysui.sui.sui_types.scalars import ObjectID
+
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+# System shared objects only taken by immutable reference: clock (0x6), authenticator state (0x7), random (0x8) and
+# deny list (0x403)
+IMMUTABLE_SHARED_OBJECTS = frozenset(
+    normalize_sui_object_id(object_id) for object_id in ("0x6", "0x7", "0x8", "0x403")
+)
+
+
+class ObjectReferenceCache:
+    """Initial shared versions and ownership of objects by object ID"""
+
+    def __init__(self, path: Optional[str] = None, metrics=None):
+        """
+        Initializes the ObjectReferenceCache class.
+
+        :param path: optional JSON file the cache is loaded from if it exists, and saved to by ``save``
+        :param metrics: optional Metrics instance counting hits and misses
+        """
+        self.path = path
+        self.metrics = metrics
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._shared: Dict[str, int] = {}
+        self._owned = set()
+        self._object_args: Dict[str, bcs.ObjectArg] = {}
+        self._normalized: Dict[str, str] = {}
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self._shared) + len(self._owned)
+
+    def __contains__(self, object_id: str) -> bool:
+        object_id = self._normalize(object_id)
+        return object_id in self._shared or object_id in self._owned
+
+    def _normalize(self, object_id: str) -> str:
+        normalized = self._normalized.get(object_id)
+        if normalized is None:
+            normalized = normalize_sui_object_id(object_id)
+            self._normalized[object_id] = normalized
+        return normalized
+
+    def add_shared(self, object_id: str, initial_shared_version: int):
+        """
+        Record a shared object
+
+        :param object_id: object ID
+        :param initial_shared_version: version the object was shared at
+        """
+        object_id = self._normalize(object_id)
+        with self._lock:
+            self._owned.discard(object_id)
+            self._shared[object_id] = int(initial_shared_version)
+            self._object_args[object_id] = bcs.ObjectArg(
+                "SharedObject",
+                bcs.SharedObjectReference(
+                    bcs.Address.from_str(object_id),
+                    int(initial_shared_version),
+                    object_id not in IMMUTABLE_SHARED_OBJECTS,
+                ),
+            )
+
+    def add_owned(self, object_id: str):
+        """
+        Record an owned or immutable object, resolved by the builder on every build
+
+        :param object_id: object ID
+        """
+        object_id = self._normalize(object_id)
+        with self._lock:
+            if object_id not in self._shared:
+                self._owned.add(object_id)
+
+    def initial_shared_version(self, object_id: str) -> Optional[int]:
+        """
+        Get the initial shared version of an object
+
+        :param object_id: object ID
+        :returns: initial shared version, None if the object is not a cached shared object
+        """
+        return self._shared.get(self._normalize(object_id))
+
+    def argument(self, object_id: str) -> Union[tuple, ObjectID]:
+        """
+        Get the ``move_call`` argument of an object
+
+        :param object_id: object ID
+        :returns: resolved object input for cached shared objects, ``ObjectID`` otherwise
+        """
+        object_arg = self._object_args.get(object_id)
+        if object_arg is None:
+            object_arg = self._object_args.get(self._normalize(object_id))
+        if object_arg is None:
+            self.misses += 1
+            if self.metrics is not None:
+                self.metrics.count("cache_misses", cache="object_references")
+            return ObjectID(object_id)
+        self.hits += 1
+        if self.metrics is not None:
+            self.metrics.count("cache_hits", cache="object_references")
+        return bcs.BuilderArg("Object", object_arg.value.ObjectID), object_arg
+
+    def preload(self, client, object_ids: Iterable[str]) -> int:
+        """
+        Fetch the objects missing from the cache in one call
+
+        :param client: SyncClient instance
+        :param object_ids: object IDs, IDs already cached are skipped
+        :returns: number of objects added
+        """
+        missing = list(dict.fromkeys(self._normalize(object_id) for object_id in object_ids if object_id))
+        missing = [object_id for object_id in missing if object_id not in self]
+        if not missing:
+            return 0
+
+        result = client.get_objects_for([ObjectID(object_id) for object_id in missing])
+        if not result.is_ok():
+            raise ValueError(f"Unable to fetch objects: {result.result_string}")
+
+        added = 0
+        for item in result.result_data:
+            owner = getattr(item, "owner", None)
+            if owner is None:
+                continue
+            if isinstance(owner, SharedOwner):
+                self.add_shared(item.object_id, owner.initial_shared_version)
+            else:
+                self.add_owned(item.object_id)
+            added += 1
+        return added
+
+    def save(self, path: Optional[str] = None):
+        """
+        Write the cache to a JSON file
+
+        :param path: file path, defaults to the path the cache was created with
+        """
+        path = path or self.path
+        if not path:
+            raise ValueError("No path to save the object cache to")
+        with self._lock:
+            data = {"shared": dict(self._shared), "owned": sorted(self._owned)}
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(data, file, indent=2, sort_keys=True)
+        os.replace(temporary, path)
+
+    def load(self, path: Optional[str] = None):
+        """
+        Add the objects of a JSON file written by ``save``
+
+        :param path: file path, defaults to the path the cache was created with
+        """
+        with open(path or self.path) as file:
+            data = json.load(file)
+        for object_id, version in data.get("shared", {}).items():
+            self.add_shared(object_id, version)
+        for object_id in data.get("owned", []):
+            self.add_owned(object_id)
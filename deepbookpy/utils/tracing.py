@@ -0,0 +1,417 @@
+"""
+Tracing spans for order flows.
+
+A ``Tracer`` records nested spans, e.g. a strategy decision, the ``place_limit_order`` build, signing, submission and
+effects of the resulting transaction. Spans started while another span is active on the same thread become its
+children and inherit its order attributes (``client_order_id``, ``pool_key``, ``balance_manager_key``), so every
+step of an order can be found by its client order ID.
+
+Finished spans are handed to exporters. ``InMemoryExporter`` keeps them in a list and ``JsonLinesExporter`` writes
+one JSON object per span. Any object with an ``export(span)`` method can be used.
+
+Tracing is off by default: ``NOOP_TRACER`` returns a shared span whose methods do nothing.
+"""
+
+import base64
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional
+
+from pysui import SuiRpcResult
+from pysui.sui.sui_builders.base_builder import SuiRequestType
+from pysui.sui.sui_builders.exec_builders import ExecuteTransaction
+from pysui.sui.sui_txn.sync_transaction import SuiTransaction
+
+
+# Attributes copied from a parent span to its children
+PROPAGATED_ATTRIBUTES = ("client_order_id", "pool_key", "balance_manager_key")
+
+# Builder arguments recorded as span attributes
+TRACED_ARGUMENTS = (
+    "pool_key",
+    "balance_manager_key",
+    "manager_key",
+    "client_order_id",
+    "order_id",
+    "is_bid",
+)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def _new_id(n_bytes: int) -> str:
+    return os.urandom(n_bytes).hex()
+
+
+class Span:
+    """A timed operation with attributes"""
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        trace_id: str,
+        parent_id: Optional[str] = None,
+        attributes: Optional[dict] = None,
+    ):
+        self._tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id(8)
+        self.parent_id = parent_id
+        self.attributes = attributes or {}
+        self.status = STATUS_OK
+        self.error = None
+        self.start_time = time.time_ns()
+        self.end_time = None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Span duration in seconds, None while the span is open"""
+        if self.end_time is None:
+            return None
+        return (self.end_time - self.start_time) / 1e9
+
+    def set_attribute(self, name: str, value):
+        """
+        Set a span attribute
+
+        :param name: attribute name
+        :param value: attribute value
+        """
+        self.attributes[name] = value
+
+    def set_error(self, error):
+        """
+        Mark the span as failed
+
+        :param error: exception or error message
+        """
+        self.status = STATUS_ERROR
+        self.error = str(error)
+
+    def end(self):
+        """Close the span and hand it to the exporters"""
+        if self.end_time is not None:
+            return
+        self.end_time = time.time_ns()
+        self._tracer._finish(self)
+
+    def to_dict(self) -> dict:
+        return dict(
+            name=self.name,
+            trace_id=self.trace_id,
+            span_id=self.span_id,
+            parent_id=self.parent_id,
+            attributes=self.attributes,
+            status=self.status,
+            error=self.error,
+            start_time=self.start_time,
+            end_time=self.end_time,
+            duration=self.duration,
+        )
+
+    def __enter__(self) -> "Span":
+        self._tracer._push(self)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_value is not None:
+            self.set_error(exc_value)
+        self._tracer._pop(self)
+        self.end()
+        return False
+
+
+class InMemoryExporter:
+    """Keeps finished spans in memory"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.spans = []
+
+    def export(self, span: Span):
+        with self._lock:
+            self.spans.append(span)
+
+    def get_spans(self, name: Optional[str] = None, **attributes) -> List[Span]:
+        """
+        Get finished spans
+
+        :param name: optional span name filter
+        :param attributes: optional attribute filters, e.g. ``client_order_id=1``
+        :returns: list of Span objects in finish order
+        """
+        with self._lock:
+            spans = list(self.spans)
+        return [
+            span
+            for span in spans
+            if (name is None or span.name == name)
+            and all(span.attributes.get(key) == value for key, value in attributes.items())
+        ]
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+class JsonLinesExporter:
+    """Writes every finished span as a JSON line"""
+
+    def __init__(self, path: str):
+        """
+        :param path: file to append spans to
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a") as spans_file:
+                spans_file.write(line + "\n")
+
+
+class Tracer:
+    """Creates spans and sends finished spans to exporters"""
+
+    def __init__(self, exporters: Optional[list] = None):
+        """
+        Initializes the Tracer class.
+
+        :param exporters: list of objects with an ``export(span)`` method
+        """
+        self.exporters = list(exporters or [])
+        self._local = threading.local()
+
+    def add_exporter(self, exporter):
+        """
+        Register an exporter
+
+        :param exporter: object with an ``export(span)`` method
+        """
+        self.exporters.append(exporter)
+
+    @property
+    def current_span(self) -> Optional[Span]:
+        """Innermost active span of the calling thread"""
+        stack = getattr(self._local, "stack", None)
+        return stack[-1] if stack else None
+
+    def start_span(self, name: str, parent: Optional[Span] = None, **attributes) -> Span:
+        """
+        Start a span, use it as a context manager to make it the parent of spans started inside
+
+        :param name: span name
+        :param parent: optional parent span, defaults to the active span of the calling thread
+        :param attributes: span attributes
+        :returns: Span object
+        """
+        parent = parent or self.current_span
+        if parent is None:
+            return Span(self, name, _new_id(16), attributes=attributes)
+
+        inherited = {
+            key: parent.attributes[key]
+            for key in PROPAGATED_ATTRIBUTES
+            if key in parent.attributes
+        }
+        inherited.update(attributes)
+        return Span(self, name, parent.trace_id, parent.span_id, inherited)
+
+    def _push(self, span: Span):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        self._local.stack.append(span)
+
+    def _pop(self, span: Span):
+        stack = getattr(self._local, "stack", [])
+        if span in stack:
+            stack.remove(span)
+
+    def _finish(self, span: Span):
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+class _NoopSpan:
+    """Span used when tracing is off"""
+
+    __slots__ = ()
+
+    name = None
+    attributes = {}
+
+    def set_attribute(self, name: str, value):
+        pass
+
+    def set_error(self, error):
+        pass
+
+    def end(self):
+        pass
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class _NoopTracer:
+    """Tracer used when tracing is off"""
+
+    __slots__ = ()
+
+    current_span = None
+
+    def start_span(self, name: str, parent=None, **attributes) -> _NoopSpan:
+        return NOOP_SPAN
+
+
+NOOP_SPAN = _NoopSpan()
+NOOP_TRACER = _NoopTracer()
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorate a transaction builder so each call records a span
+
+    The decorated object must expose a ``tracer`` attribute. Builder arguments listed in ``TRACED_ARGUMENTS``,
+    directly or as fields of a params dataclass, become span attributes.
+
+    :param name: span name
+    :returns: decorator
+    """
+
+    def decorator(method: Callable) -> Callable:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            tracer = self.tracer
+            if tracer is NOOP_TRACER:
+                return method(self, *args, **kwargs)
+
+            attributes = {}
+            arguments = signature.bind(self, *args, **kwargs).arguments
+            for arg_name, value in arguments.items():
+                if arg_name in TRACED_ARGUMENTS:
+                    attributes[arg_name] = value
+                elif arg_name == "params":
+                    for field_name in TRACED_ARGUMENTS:
+                        if hasattr(value, field_name):
+                            attributes[field_name] = getattr(value, field_name)
+            if "manager_key" in attributes:
+                attributes["balance_manager_key"] = attributes.pop("manager_key")
+
+            with tracer.start_span(name, **attributes) as span:
+                result = method(self, *args, **kwargs)
+                # Swap builders return their coin results, the transaction is always the ``tx`` argument
+                tx = arguments.get("tx")
+                if tx is not None:
+                    span.set_attribute("commands", len(tx.builder.commands))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def traced_execute(
+    tx: SuiTransaction,
+    tracer=NOOP_TRACER,
+    gas_budget: str = "",
+    use_gas_object: Optional[str] = None,
+    options: Optional[dict] = None,
+    request_type: SuiRequestType = SuiRequestType.WAITFORLOCALEXECUTION,
+    **attributes,
+) -> SuiRpcResult:
+    """
+    Finalize, sign and submit a transaction, recording a span for each step
+
+    Records an ``execute`` span with ``execute.finalize``, ``execute.sign``, ``execute.submit`` and
+    ``execute.effects`` children. The ``execute`` span gets the transaction digest and effects status.
+
+    :param tx: SuiTransaction object
+    :param tracer: Tracer object, NOOP_TRACER records nothing
+    :param gas_budget: gas budget, a dry-run sets it when empty
+    :param use_gas_object: optional gas coin object ID
+    :param options: optional sui_executeTransactionBlock options
+    :param request_type: execution request type
+    :param attributes: span attributes, e.g. ``client_order_id`` and ``pool_key``
+    :returns: SuiRpcResult object
+    """
+    with tracer.start_span("execute", **attributes) as execute_span:
+        with tracer.start_span("execute.finalize"):
+            tx_bytes = tx.deferred_execution(
+                gas_budget=gas_budget, use_gas_object=use_gas_object
+            )
+        return _sign_and_submit(
+            tracer, execute_span, tx.client, tx.signer_block, tx_bytes, options, request_type
+        )
+
+
+def traced_execute_bytes(
+    client,
+    signer_block,
+    tx_bytes: str,
+    tracer=NOOP_TRACER,
+    options: Optional[dict] = None,
+    request_type: SuiRequestType = SuiRequestType.WAITFORLOCALEXECUTION,
+    **attributes,
+) -> SuiRpcResult:
+    """
+    Sign and submit finalized transaction bytes, recording a span for each step
+
+    :param client: SyncClient instance
+    :param signer_block: SignerBlock of the transaction the bytes were built from
+    :param tx_bytes: base64 encoded TransactionData
+    :param tracer: Tracer object, NOOP_TRACER records nothing
+    :param options: optional sui_executeTransactionBlock options
+    :param request_type: execution request type
+    :param attributes: span attributes
+    :returns: SuiRpcResult object
+    """
+    with tracer.start_span("execute", **attributes) as execute_span:
+        return _sign_and_submit(
+            tracer, execute_span, client, signer_block, tx_bytes, options, request_type
+        )
+
+
+def _sign_and_submit(tracer, execute_span, client, signer_block, tx_bytes, options, request_type) -> SuiRpcResult:
+    execute_span.set_attribute("tx_bytes", len(base64.b64decode(tx_bytes)))
+
+    with tracer.start_span("execute.sign"):
+        signatures = signer_block.get_signatures(client=client, tx_bytes=tx_bytes)
+
+    with tracer.start_span("execute.submit") as submit_span:
+        result = client.execute(
+            ExecuteTransaction(
+                tx_bytes=tx_bytes,
+                signatures=signatures,
+                options=options,
+                request_type=request_type,
+            )
+        )
+        if result.is_err():
+            submit_span.set_error(result.result_string)
+
+    with tracer.start_span("execute.effects") as effects_span:
+        if result.is_ok():
+            response = result.result_data
+            execute_span.set_attribute("digest", response.digest)
+            execute_span.set_attribute("effects_status", response.status)
+            effects_span.set_attribute("checkpoint", response.checkpoint)
+            if not response.succeeded:
+                execute_span.set_error(response.status)
+        else:
+            execute_span.set_error(result.result_string)
+
+    return result
@@ -16,13 +16,17 @@ from deepbookpy.utils.config import DeepBookConfig
 # cd deepbookpy 
 # python3 -m venv env && source ./env/bin/activate
 # python3 examples/deepbook_client.py
+#
+# To run against recorded responses instead of a live fullnode:
+# python3 -m deepbookpy.utils.fullnode_stub fixtures/ --port 9000
+# SUI_RPC_URL=http://127.0.0.1:9000/ python3 examples/deepbook_client.py
 if __name__ == "__main__":
 
     # Init pysui config
     def cfg_user():
         cfg = SuiConfig.user_config(
             # Required
-            rpc_url="https://fullnode.mainnet.sui.io:443/",
+            rpc_url=os.environ.get("SUI_RPC_URL", "https://fullnode.mainnet.sui.io:443/"),
             # Must be a valid Sui keystring (i.e. 'key_type_flag | private_key_seed' )
             prv_keys=["AIUPxQveY18QggDDdTO0D0OD6PNVvtet50072d1grIyl"],
             # Needed for subscribing
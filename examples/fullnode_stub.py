@@ -0,0 +1,34 @@
+from pysui import SyncClient, SuiConfig
+import sys, os, pathlib
+
+PROJECT_DIR = pathlib.Path(os.path.dirname(__file__))
+PARENT = PROJECT_DIR.parent
+sys.path.insert(0, str(PROJECT_DIR))
+sys.path.insert(0, str(PARENT))
+sys.path.insert(0, str(os.path.join(PARENT, "deepbookpy")))
+
+
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.utils.fullnode_stub import FullnodeStub
+
+FIXTURES_DIR = os.path.join(PROJECT_DIR, "fixtures")
+
+# Record responses from mainnet once:
+# RECORD_FROM=https://fullnode.mainnet.sui.io:443/ python3 examples/fullnode_stub.py
+# Then replay them offline:
+# python3 examples/fullnode_stub.py
+if __name__ == "__main__":
+
+    with FullnodeStub(FIXTURES_DIR, record_from=os.environ.get("RECORD_FROM")) as stub:
+        cfg = SuiConfig.user_config(
+            rpc_url=stub.url,
+            prv_keys=["AIUPxQveY18QggDDdTO0D0OD6PNVvtet50072d1grIyl"],
+        )
+        client = SyncClient(cfg)
+
+        deepbook_client = DeepBookClient(client, cfg.addresses[0], "mainnet")
+
+        print(deepbook_client.mid_price("SUI_USDC"))
+        print(deepbook_client.get_level2_ticks_from_mid("SUI_USDC", 10))
+
+        print(f"fixture hits: {stub.hits}, misses: {stub.misses}")
@@ -0,0 +1,82 @@
+import pytest
+
+from deepbookpy.custom_types import PlaceLimitOrderParams
+from deepbookpy.simulator.backtest import Backtest, BookSnapshot, Trade
+from deepbookpy.simulator.matching_engine import FEE_PENALTY_MULTIPLIER
+from deepbookpy.utils.config import DeepBookConfig
+
+
+def make_backtest(orders, **kwargs):
+    config = DeepBookConfig("mainnet", "0x1")
+    placed = []
+
+    def strategy(backtest, event):
+        if not placed:
+            for is_bid, price, quantity in orders:
+                params = PlaceLimitOrderParams(
+                    pool_key="SUI_USDC",
+                    balance_manager_key="MANAGER",
+                    client_order_id=str(len(placed)),
+                    price=price,
+                    quantity=quantity,
+                    is_bid=is_bid,
+                    pay_with_deep=False,
+                )
+                placed.append(backtest.place_limit_order(params))
+
+    return Backtest(config, "SUI_USDC", strategy, **kwargs)
+
+
+def snapshot(backtest, timestamp, bids, asks):
+    return BookSnapshot(
+        timestamp,
+        [backtest.to_price(price) for price, _ in bids],
+        [backtest.to_quantity(quantity) for _, quantity in bids],
+        [backtest.to_price(price) for price, _ in asks],
+        [backtest.to_quantity(quantity) for _, quantity in asks],
+    )
+
+
+def test_one_trade_fills_our_bids_once_in_price_time_priority():
+    backtest = make_backtest([(True, 0.99, 10), (True, 0.98, 10), (True, 0.99, 10)], queue_position=False)
+    events = [
+        snapshot(backtest, 0, [(0.97, 100)], [(1.01, 100)]),
+        snapshot(backtest, 1, [(0.97, 100)], [(1.01, 100)]),
+        Trade(2, backtest.to_price(0.98), backtest.to_quantity(10), False),
+    ]
+    report = backtest.run(events)
+
+    assert report.maker_quantity == pytest.approx(10)
+    # The first bid at the best price filled, the later one at the same price and the lower bid did not
+    resting = sorted((order.price, order.order_id, order.filled_quantity) for order in backtest.orders.values())
+    assert [filled for _, _, filled in resting] == [0, 0]
+    assert resting[1][0] == backtest.to_price(0.99)
+
+
+def test_trade_beyond_the_queue_fills_the_next_orders():
+    backtest = make_backtest([(True, 0.99, 10), (True, 0.99, 10), (True, 0.98, 10)])
+    events = [
+        snapshot(backtest, 0, [(0.99, 5)], [(1.01, 100)]),
+        snapshot(backtest, 1, [(0.99, 5)], [(1.01, 100)]),
+        Trade(2, backtest.to_price(0.99), backtest.to_quantity(20), False),
+    ]
+    report = backtest.run(events)
+
+    # 5 of queue ahead at 0.99, then 10 and 5 of our two bids at 0.99, none left for the bid at 0.98
+    assert report.maker_quantity == pytest.approx(15)
+    remaining = sorted(backtest.from_quantity(order.remaining_quantity) for order in backtest.orders.values())
+    assert remaining == pytest.approx([5, 10])
+
+
+def test_fees_not_paid_in_deep_use_the_input_coin_with_the_penalty():
+    backtest = make_backtest([(True, 1.0, 10), (False, 1.02, 10)], queue_position=False, maker_fee=0.001)
+    events = [
+        snapshot(backtest, 0, [(0.99, 100)], [(1.03, 100)]),
+        snapshot(backtest, 1, [(0.99, 100)], [(1.03, 100)]),
+        Trade(2, backtest.to_price(1.0), backtest.to_quantity(10), False),
+        Trade(3, backtest.to_price(1.02), backtest.to_quantity(10), True),
+    ]
+    report = backtest.run(events)
+
+    assert report.fees_quote == pytest.approx(10 * 1.0 * 0.001 * FEE_PENALTY_MULTIPLIER)
+    assert report.fees_base == pytest.approx(10 * 0.001 * FEE_PENALTY_MULTIPLIER)
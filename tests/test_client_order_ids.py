@@ -0,0 +1,82 @@
+import threading
+
+import pytest
+
+from deepbookpy.utils.client_order_ids import ClientOrderIdAllocator
+
+
+def test_decode_round_trip():
+    allocator = ClientOrderIdAllocator(shard=5)
+    allocator.register("maker")
+    taker = allocator.register("taker", strategy_id=1234, desk="rates")
+
+    client_order_id = allocator.allocate("taker")
+    assert client_order_id < 1 << 64
+    assert allocator.decode(client_order_id) == (5, 1234, 0)
+    by_id = allocator.allocate(1234)
+    assert by_id != client_order_id
+    assert allocator.decode(str(by_id))[:2] == (5, 1234)
+    assert allocator.strategy_of(client_order_id) is taker
+    assert allocator.strategy_of(client_order_id).metadata == {"desk": "rates"}
+
+
+def test_ids_are_not_reused_after_a_reload(tmp_path):
+    path = str(tmp_path / "client_order_ids.json")
+    allocator = ClientOrderIdAllocator(shard=1, path=path, block_size=4)
+    allocator.register("maker")
+    before = [allocator.allocate("maker") for _ in range(6)]
+
+    reloaded = ClientOrderIdAllocator(shard=1, path=path, block_size=4)
+    after = [reloaded.allocate("maker") for _ in range(6)]
+
+    assert not set(before) & set(after)
+    # The unused rest of the second block is skipped
+    assert reloaded.decode(after[0])[2] == 8
+
+
+def test_threads_allocate_distinct_ids():
+    allocator = ClientOrderIdAllocator(block_size=16)
+    allocator.register("maker")
+    allocated = []
+
+    def allocate():
+        ids = [allocator.allocate("maker") for _ in range(500)]
+        allocated.extend(ids)
+
+    threads = [threading.Thread(target=allocate) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(set(allocated)) == 2000
+
+
+def test_registering_again_persists_the_metadata(tmp_path):
+    path = str(tmp_path / "client_order_ids.json")
+    allocator = ClientOrderIdAllocator(path=path)
+    allocator.register("maker", owner="alice")
+    allocator.register("maker", owner="bob")
+
+    assert ClientOrderIdAllocator(path=path).strategy_of(allocator.allocate("maker")).metadata == {"owner": "bob"}
+
+
+def test_invalid_layouts_and_strategies_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        ClientOrderIdAllocator(shard=1 << 10)
+    with pytest.raises(ValueError):
+        ClientOrderIdAllocator(shard_bits=30, strategy_bits=30)
+
+    allocator = ClientOrderIdAllocator()
+    allocator.register("maker", strategy_id=3)
+    with pytest.raises(ValueError):
+        allocator.register("taker", strategy_id=3)
+    with pytest.raises(ValueError):
+        allocator.register("maker", strategy_id=4)
+    with pytest.raises(KeyError):
+        allocator.allocate("unknown")
+
+    path = str(tmp_path / "client_order_ids.json")
+    ClientOrderIdAllocator(shard=1, path=path).register("maker")
+    with pytest.raises(ValueError):
+        ClientOrderIdAllocator(shard=2, path=path)
@@ -0,0 +1,137 @@
+import pytest
+
+from deepbookpy.custom_types import OrderType
+from deepbookpy.simulator.matching_engine import (
+    STATUS_CANCELED,
+    STATUS_FILLED,
+    MatchingEngine,
+    MatchingEngineError,
+)
+from deepbookpy.utils.config import FLOAT_SCALAR
+
+
+LOT = 1_000_000
+PRICE = 2 * FLOAT_SCALAR
+TICK = FLOAT_SCALAR // 1000
+
+
+def make_engine():
+    return MatchingEngine(
+        tick_size=TICK,
+        lot_size=LOT,
+        min_size=10 * LOT,
+        taker_fee=FLOAT_SCALAR // 1000,
+        maker_fee=FLOAT_SCALAR // 2000,
+        deep_per_base=FLOAT_SCALAR // 2,
+    )
+
+
+def ask(engine, client_order_id, price, quantity, manager="MAKER", **kwargs):
+    return engine.place_limit_order(manager, client_order_id, price, quantity, False, timestamp=1, **kwargs)
+
+
+def test_better_price_then_older_order_fills_first():
+    engine = make_engine()
+    first = ask(engine, 1, PRICE, 10 * LOT)
+    second = ask(engine, 2, PRICE, 10 * LOT)
+    better = ask(engine, 3, PRICE - TICK, 10 * LOT)
+
+    result = engine.place_limit_order("TAKER", 4, PRICE, 25 * LOT, True, timestamp=2)
+
+    assert [fill.maker_order_id for fill in result.fills] == [better.order_id, first.order_id, second.order_id]
+    assert [fill.base_quantity for fill in result.fills] == [10 * LOT, 10 * LOT, 5 * LOT]
+    assert result.status == STATUS_FILLED
+    assert engine.orders[second.order_id].remaining_quantity == 5 * LOT
+    assert engine.level2(False) == ([PRICE], [5 * LOT])
+
+
+def test_remainder_rests_and_immediate_or_cancel_does_not():
+    engine = make_engine()
+    ask(engine, 1, PRICE, 10 * LOT)
+
+    rested = engine.place_limit_order("TAKER", 2, PRICE, 15 * LOT, True, timestamp=2)
+    assert rested.order_inserted
+    assert engine.best_bid() == PRICE
+
+    ask(engine, 3, PRICE + TICK, 10 * LOT)
+    canceled = engine.place_limit_order(
+        "TAKER", 4, PRICE + TICK, 15 * LOT, True, order_type=OrderType.IMMEDIATE_OR_CANCEL, timestamp=3
+    )
+    assert canceled.executed_quantity == 10 * LOT
+    assert canceled.status == STATUS_CANCELED
+    assert not canceled.order_inserted
+
+
+def test_fees_in_deep_and_in_the_input_coin_with_the_penalty():
+    engine = make_engine()
+    ask(engine, 1, PRICE, 10 * LOT, pay_with_deep=True)
+
+    result = engine.place_limit_order("TAKER", 2, PRICE, 10 * LOT, True, pay_with_deep=False, timestamp=2)
+    fill = result.fills[0]
+
+    quote_quantity = 10 * LOT * PRICE // FLOAT_SCALAR
+    assert fill.quote_quantity == quote_quantity
+    # Taker pays 0.1% of the quote input, 25% more than in DEEP
+    assert fill.taker_fee == pytest.approx(quote_quantity / 1000 * 1.25)
+    assert not fill.taker_fee_is_deep
+    # Maker pays 0.05% of the DEEP value of the base quantity
+    assert fill.maker_fee == 10 * LOT // 2 // 2000
+    assert fill.maker_fee_is_deep
+    assert result.paid_fees == fill.taker_fee
+
+
+def test_invalid_orders_are_rejected_like_on_chain():
+    engine = make_engine()
+    with pytest.raises(MatchingEngineError) as error:
+        ask(engine, 1, PRICE + 1, 10 * LOT)
+    assert error.value.code == "EOrderInvalidPrice"
+    with pytest.raises(MatchingEngineError) as error:
+        ask(engine, 1, PRICE, 10 * LOT + 1)
+    assert error.value.code == "EOrderInvalidLotSize"
+
+    ask(engine, 1, PRICE, 10 * LOT)
+    with pytest.raises(MatchingEngineError) as error:
+        engine.place_limit_order("TAKER", 2, PRICE, 10 * LOT, True, order_type=OrderType.POST_ONLY, timestamp=2)
+    assert error.value.code == "EPOSTOrderCrossesOrderbook"
+    with pytest.raises(MatchingEngineError) as error:
+        engine.place_limit_order("TAKER", 3, PRICE, 20 * LOT, True, order_type=OrderType.FILL_OR_KILL, timestamp=2)
+    assert error.value.code == "EFOKOrderCannotBeFullyFilled"
+    # Aborted orders leave the book untouched
+    assert engine.level2(False) == ([PRICE], [10 * LOT])
+
+
+def test_modify_keeps_queue_position_and_cancel_removes():
+    engine = make_engine()
+    first = ask(engine, 1, PRICE, 20 * LOT)
+    second = ask(engine, 2, PRICE, 10 * LOT)
+
+    modified = engine.modify_order("MAKER", first.order_id, 12 * LOT)
+    assert modified.quantity == 12 * LOT
+    assert engine.level2(False) == ([PRICE], [22 * LOT])
+    with pytest.raises(MatchingEngineError) as error:
+        engine.modify_order("MAKER", first.order_id, 15 * LOT)
+    assert error.value.code == "EInvalidNewQuantity"
+
+    result = engine.place_limit_order("TAKER", 3, PRICE, 12 * LOT, True, timestamp=2)
+    assert [fill.maker_order_id for fill in result.fills] == [first.order_id]
+
+    with pytest.raises(MatchingEngineError) as error:
+        engine.cancel_order("TAKER", second.order_id)
+    assert error.value.code == "EInvalidOrderBalanceManager"
+    canceled = engine.cancel_order("MAKER", second.order_id)
+    assert canceled.status == STATUS_CANCELED
+    assert engine.best_ask() is None
+    assert engine.open_orders("MAKER") == []
+
+
+def test_expired_makers_are_skipped_and_reported():
+    engine = make_engine()
+    expired = ask(engine, 1, PRICE, 10 * LOT, expire_timestamp=5)
+    live = ask(engine, 2, PRICE, 10 * LOT)
+
+    result = engine.place_limit_order("TAKER", 3, PRICE, 10 * LOT, True, timestamp=10)
+
+    assert result.expired_order_ids == [expired.order_id]
+    assert [fill.maker_order_id for fill in result.fills] == [live.order_id]
+    assert engine.orders.get(live.order_id) is None
+    assert engine.orders.get(expired.order_id) is None
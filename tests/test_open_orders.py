@@ -0,0 +1,165 @@
+from types import SimpleNamespace
+
+from deepbookpy.orders.open_orders import STATUS_FILLED, OpenOrderTracker
+from deepbookpy.utils.config import DeepBookConfig
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+MANAGER = normalize_sui_object_id("0xa1")
+OTHER_MANAGER = normalize_sui_object_id("0xb2")
+PRICE = 3_500_000
+
+
+class FakeDeepBookClient:
+    def __init__(self):
+        self.client = None
+        self.config = DeepBookConfig(
+            "mainnet", "0x1", balance_managers={"MANAGER": {"address": MANAGER, "trade_cap": ""}}
+        )
+        self.chain_orders = []
+        self.calls = []
+
+    def account_open_orders(self, pool_key, manager_key):
+        self.calls.append("read")
+        return [order.order_id for order in self.chain_orders]
+
+    def get_orders(self, pool_key, order_ids):
+        return list(self.chain_orders)
+
+    def decode_order_id(self, order_id):
+        return {"is_bid": True, "price": PRICE, "order_id": order_id}
+
+
+class FakePoller:
+    def __init__(self, client):
+        self.client = client
+        self.pending = []
+
+    def poll(self):
+        self.client.calls.append("poll")
+        events, self.pending = self.pending, []
+        return events
+
+    def seek_latest(self):
+        self.client.calls.append("seek")
+
+
+def event(name, module, digest, **fields):
+    return {
+        "id": {"txDigest": digest, "eventSeq": "0"},
+        "type": f"0x2::{module}::{name}",
+        # JSON-RPC returns u64 values as strings
+        "parsedJson": {
+            key: str(value) if isinstance(value, int) and not isinstance(value, bool) else value
+            for key, value in fields.items()
+        },
+    }
+
+
+def placed(tracker, order_id, quantity, digest="placed"):
+    return event(
+        "OrderPlaced",
+        "order_info",
+        digest,
+        balance_manager_id=MANAGER,
+        pool_id=tracker._pool_id("SUI_USDC"),
+        order_id=order_id,
+        client_order_id=order_id,
+        is_bid=True,
+        price=PRICE,
+        placed_quantity=quantity,
+        expire_timestamp=0,
+        timestamp=1,
+    )
+
+
+def filled(order_id, quantity, digest):
+    return event(
+        "OrderFilled",
+        "order_info",
+        digest,
+        maker_balance_manager_id=MANAGER,
+        taker_balance_manager_id=OTHER_MANAGER,
+        maker_order_id=order_id,
+        taker_order_id=99,
+        base_quantity=quantity,
+        timestamp=2,
+    )
+
+
+def chain_order(order_id, quantity, filled_quantity):
+    return SimpleNamespace(
+        order_id=order_id,
+        client_order_id=order_id,
+        quantity=quantity,
+        filled_quantity=filled_quantity,
+        expire_timestamp=0,
+    )
+
+
+def make_tracker():
+    client = FakeDeepBookClient()
+    tracker = OpenOrderTracker(client, "MANAGER")
+    tracker._poller = FakePoller(client)
+    return client, tracker
+
+
+def test_fill_from_own_transaction_and_poll_is_applied_once():
+    client, tracker = make_tracker()
+    tracker.apply_event(placed(tracker, 1, 10))
+
+    fill = filled(1, 4, "fill")
+    assert tracker.apply_events([fill]) == 1
+    tracker._poller.pending = [fill]
+    assert tracker.poll() == 0
+
+    assert tracker.get(1).filled_quantity == 4
+    assert tracker.level_quantity("SUI_USDC", True, PRICE) == 6
+
+
+def test_first_reconcile_seeks_before_reading_the_chain():
+    client = FakeDeepBookClient()
+    tracker = OpenOrderTracker(client, "MANAGER")
+    poller = FakePoller(client)
+    tracker._event_poller = lambda *args, **kwargs: poller
+    client.chain_orders = [chain_order(1, 10, 0)]
+
+    assert tracker.reconcile("SUI_USDC") == 1
+    assert client.calls == ["seek", "read"]
+
+
+def test_reconcile_then_poll_does_not_count_fills_in_the_snapshot_twice():
+    client, tracker = make_tracker()
+    tracker.apply_event(placed(tracker, 1, 10))
+    tracker.reconcile("SUI_USDC")
+    assert client.calls == ["poll", "read"]
+
+    # Filled while the next reconcile reads the chain: part of the snapshot and returned by the next poll
+    client.chain_orders = [chain_order(1, 10, 4)]
+    tracker.reconcile("SUI_USDC")
+    tracker._poller.pending = [filled(1, 4, "during-read")]
+    tracker.poll()
+    assert tracker.get(1).filled_quantity == 4
+
+    # Once caught up, fills add up again
+    tracker._poller.pending = [filled(1, 2, "after")]
+    tracker.poll()
+    assert tracker.get(1).filled_quantity == 6
+
+
+def test_reconcile_then_poll_applies_fills_missing_from_the_snapshot():
+    client, tracker = make_tracker()
+    client.chain_orders = [chain_order(1, 10, 3)]
+    tracker.reconcile("SUI_USDC")
+    closed = []
+    tracker.on_close = closed.append
+
+    # Emitted after the read, the snapshot does not include them
+    client.chain_orders = [chain_order(1, 10, 3)]
+    tracker.reconcile("SUI_USDC")
+    tracker._poller.pending = [filled(1, 3, "first"), filled(1, 4, "second")]
+    tracker.poll()
+
+    assert tracker.get(1) is None
+    assert closed[0].status == STATUS_FILLED
+    assert closed[0].filled_quantity == 10
@@ -0,0 +1,114 @@
+import pytest
+
+from deepbookpy.orders.positions import PositionEngine
+from deepbookpy.utils.config import FLOAT_SCALAR, DeepBookConfig
+from deepbookpy.utils.normalizer import normalize_sui_object_id
+
+
+MANAGER = normalize_sui_object_id("0xa1")
+OTHER_MANAGER = normalize_sui_object_id("0xb2")
+
+
+class FakeDeepBookClient:
+    def __init__(self):
+        self.client = None
+        self.config = DeepBookConfig(
+            "mainnet", "0x1", balance_managers={"MANAGER": {"address": MANAGER, "trade_cap": ""}}
+        )
+
+
+def make_engine():
+    return PositionEngine(FakeDeepBookClient(), ["MANAGER"])
+
+
+def fill(engine, digest, is_bid, quantity, price, pool_id=None, fee=0, fee_is_deep=True):
+    """Fill of MANAGER as taker, quantity in SUI and price in USDC"""
+    config = engine._config
+    pool = config.get_pool("SUI_USDC")
+    base_scalar = config.get_coin(pool["base_coin"])["scalar"]
+    quote_scalar = config.get_coin(pool["quote_coin"])["scalar"]
+    return {
+        "id": {"txDigest": digest, "eventSeq": "0"},
+        "type": "0x2::order_info::OrderFilled",
+        "parsedJson": {
+            "pool_id": pool_id or pool["address"],
+            "maker_order_id": "1",
+            "taker_order_id": "2",
+            "price": str(round(price * FLOAT_SCALAR * quote_scalar / base_scalar)),
+            "taker_is_bid": is_bid,
+            "taker_fee": str(fee),
+            "taker_fee_is_deep": fee_is_deep,
+            "maker_fee": "0",
+            "maker_fee_is_deep": True,
+            "base_quantity": str(round(quantity * base_scalar)),
+            "quote_quantity": str(round(quantity * price * quote_scalar)),
+            "maker_balance_manager_id": OTHER_MANAGER,
+            "taker_balance_manager_id": MANAGER,
+            "timestamp": "1",
+        },
+    }
+
+
+def test_duplicate_fill_is_applied_once():
+    engine = make_engine()
+    event = fill(engine, "a", True, 10, 2.0)
+
+    assert engine.apply_events([event, event]) == 2
+    position = engine.get("MANAGER", "SUI_USDC")
+    assert position.fills == 1
+    assert position.base_position == pytest.approx(10)
+
+
+def test_average_cost_realized_pnl_and_flip():
+    engine = make_engine()
+    engine.apply_events(
+        [
+            fill(engine, "a", True, 10, 1.0),
+            fill(engine, "b", True, 10, 2.0),
+        ]
+    )
+    position = engine.get("MANAGER", "SUI_USDC")
+    assert position.average_entry_price == pytest.approx(1.5)
+
+    engine.apply_event(fill(engine, "c", False, 15, 3.0))
+    position = engine.get("MANAGER", "SUI_USDC")
+    assert position.base_position == pytest.approx(5)
+    assert position.average_entry_price == pytest.approx(1.5)
+    assert position.realized_pnl == pytest.approx(22.5)
+
+    # Selling through the position opens a short at the fill price
+    engine.apply_event(fill(engine, "d", False, 10, 1.0))
+    position = engine.get("MANAGER", "SUI_USDC")
+    assert position.base_position == pytest.approx(-5)
+    assert position.average_entry_price == pytest.approx(1.0)
+    assert position.realized_pnl == pytest.approx(20)
+
+    engine.set_mark("SUI_USDC", 0.5)
+    assert engine.get("MANAGER", "SUI_USDC").unrealized_pnl == pytest.approx(2.5)
+
+
+def test_fees_are_kept_in_the_coin_paid():
+    engine = make_engine()
+    engine.apply_events(
+        [
+            fill(engine, "a", True, 10, 1.0, fee=2_000_000, fee_is_deep=True),
+            fill(engine, "b", True, 10, 1.0, fee=3_000, fee_is_deep=False),
+            fill(engine, "c", False, 10, 1.0, fee=4_000_000, fee_is_deep=False),
+        ]
+    )
+    position = engine.get("MANAGER", "SUI_USDC")
+    assert position.fees_deep == pytest.approx(2)
+    assert position.fees_quote == pytest.approx(0.003)
+    assert position.fees_base == pytest.approx(0.004)
+
+
+def test_fill_in_unknown_pool_is_skipped():
+    engine = make_engine()
+    unknown_pool = normalize_sui_object_id("0xdead")
+
+    assert engine.apply_events(
+        [fill(engine, "a", True, 10, 1.0, pool_id=unknown_pool), fill(engine, "b", True, 10, 1.0)]
+    ) == 1
+    assert engine.skipped_fills == 1
+    assert engine.unknown_pools == {unknown_pool}
+    assert engine.get("MANAGER", "SUI_USDC").fills == 1
@@ -0,0 +1,86 @@
+import pytest
+from pysui import SuiConfig, SyncClient
+from pysui.sui.sui_txn import SyncTransaction
+
+from benchmarks.synthetic import write_fixtures
+from deepbookpy.custom_types import PlaceLimitOrderParams
+from deepbookpy.deepbook_client import DeepBookClient
+from deepbookpy.transactions.templates import LimitOrderTemplate, ModifyOrderTemplate
+from deepbookpy.utils.fullnode_stub import FullnodeStub
+
+
+ENV = "mainnet"
+POOL_KEY = "SUI_USDC"
+MANAGER_KEY = "MANAGER_1"
+BALANCE_MANAGERS = {
+    MANAGER_KEY: {
+        "address": "0x344c2734b1d211bd15212bfb7847c66a3b18803f3f5ab00f5ff6f87b6fe6d27d",
+        "trade_cap": "",
+    }
+}
+# Throwaway key, only used to derive a sender address for the stub
+PRIVATE_KEY = "AIUPxQveY18QggDDdTO0D0OD6PNVvtet50072d1grIyl"
+
+
+@pytest.fixture(scope="module")
+def deepbook_client(tmp_path_factory):
+    fixtures_dir = str(tmp_path_factory.mktemp("fullnode") / "fixtures")
+    write_fixtures(fixtures_dir, ENV, POOL_KEY, BALANCE_MANAGERS[MANAGER_KEY]["address"], 100)
+    stub = FullnodeStub(fixtures_dir).start()
+    try:
+        client = SyncClient(SuiConfig.user_config(rpc_url=stub.url, prv_keys=[PRIVATE_KEY]))
+        yield DeepBookClient(client, client.config.active_address.address, ENV, BALANCE_MANAGERS)
+    finally:
+        stub.stop()
+
+
+def limit_order(client_order_id, price, quantity, is_bid=True):
+    return PlaceLimitOrderParams(
+        pool_key=POOL_KEY,
+        balance_manager_key=MANAGER_KEY,
+        client_order_id=str(client_order_id),
+        price=price,
+        quantity=quantity,
+        is_bid=is_bid,
+    )
+
+
+def fresh_build(deepbook_client, build):
+    tx = SyncTransaction(client=deepbook_client.client)
+    build(tx)
+    return tx.build_for_inspection()
+
+
+def test_requoted_limit_orders_match_a_fresh_build(deepbook_client):
+    template = LimitOrderTemplate(deepbook_client, [limit_order(1, 3.5, 10), limit_order(2, 3.6, 11, False)])
+
+    for client_order_id, (bid, ask) in enumerate([((3.4, 12), (3.7, 13)), ((3.45, 14), (3.75, 15))], 10):
+        template.quote(0, price=bid[0], quantity=bid[1], client_order_id=client_order_id)
+        template.quote(1, price=ask[0], quantity=ask[1], client_order_id=client_order_id + 100)
+
+        def build(tx):
+            deepbook_client.deepbook.place_limit_order(limit_order(client_order_id, *bid), tx)
+            deepbook_client.deepbook.place_limit_order(limit_order(client_order_id + 100, *ask, False), tx)
+
+        assert template.build_for_inspection() == fresh_build(deepbook_client, build)
+
+
+def test_template_splits_inputs_shared_by_equal_values(deepbook_client):
+    # Same client order ID, price and quantity integers: the builder shares one input, the template one per slot
+    template = LimitOrderTemplate(deepbook_client, [limit_order(1, 3.5, 10), limit_order(1, 3.5, 10)])
+
+    template.quote(1, price=3.6)
+    assert template.get("0.price") != template.get("1.price")
+    assert template.get("0.quantity") == template.get("1.quantity")
+
+
+def test_modified_orders_match_a_fresh_build(deepbook_client):
+    order_ids = [170141183460487678475761013267500113861, 170141183460487678475761013267500113862]
+    template = ModifyOrderTemplate(deepbook_client, POOL_KEY, MANAGER_KEY, [(str(order_ids[0]), 5)])
+
+    template.modify(0, order_id=order_ids[1], quantity=7)
+
+    def build(tx):
+        deepbook_client.deepbook.modify_order(POOL_KEY, MANAGER_KEY, str(order_ids[1]), 7, tx)
+
+    assert template.build_for_inspection() == fresh_build(deepbook_client, build)